@@ -0,0 +1,104 @@
+# bench_bezoekvolgorde.py - Meet de BezoekPlanner: kwaliteit, één proces tegen een pool van processen, en onthouden
+# Starten vanuit de map "Startcode treintje":
+#   python -m benchmarks.bench_bezoekvolgorde
+#
+# Een park met AANTAL_LOCATIES locaties en AANTAL_PLANNEN bezoekplannen van 3 tot 12 attracties.
+# Een deel van de bezoekers kiest een populaire combinatie, die hoeft maar één keer uitgerekend te worden.
+# Kwaliteit: voor kleine plannen vergelijken we met de beste volgorde (alle volgordes proberen).
+
+import itertools
+import os
+import random
+import time
+
+from planning.bezoekvolgorde import BezoekPlanner, _los_op, maak_netwerk
+
+AANTAL_LOCATIES = 60
+AANTAL_PLANNEN = 5000
+POPULAIR = 0.2
+
+
+def maak_park(rng):
+    locaties = [{"locatie_id": 1, "naam": "Perron 1", "wachttijd": 0, "loc_x": 12, "loc_y": 86}]
+    for i in range(2, AANTAL_LOCATIES + 1):
+        locaties.append({
+            "locatie_id": i,
+            "naam": f"Perron {i}" if i % 10 == 0 else f"Attractie {i}",
+            "wachttijd": rng.randint(0, 40),
+            "loc_x": rng.randint(0, 100),
+            "loc_y": rng.randint(0, 100),
+        })
+    return locaties
+
+
+def maak_plannen(rng):
+    attracties = list(range(2, AANTAL_LOCATIES + 1))
+    populair = [rng.sample(attracties, rng.randint(3, 8)) for _ in range(20)]
+    plannen = {}
+    for qr_id in range(AANTAL_PLANNEN):
+        if rng.random() < POPULAIR:
+            plannen[qr_id] = list(rng.choice(populair))
+        else:
+            plannen[qr_id] = rng.sample(attracties, rng.randint(3, 12))
+    return plannen
+
+
+def beste(m):
+    n = len(m)
+    return min(
+        sum(m[a][b] for a, b in zip((0,) + volgorde, volgorde))
+        for volgorde in itertools.permutations(range(1, n))
+    )
+
+
+def kwaliteit(netwerk, rng, aantal=200):
+    afwijkingen = []
+    for _ in range(aantal):
+        knopen = [0] + rng.sample(range(1, len(netwerk)), 7)
+        m = netwerk.reistijd[knopen][:, knopen].tolist()
+        _volgorde, minuten = _los_op(m)
+        afwijkingen.append(minuten / beste(m) - 1.0)
+    afwijkingen.sort()
+    print(f"kwaliteit (7 attracties, {aantal} plannen): gem {sum(afwijkingen) / aantal * 100:.2f}% "
+          f"boven optimaal, max {afwijkingen[-1] * 100:.2f}%, optimaal in {sum(a < 1e-9 for a in afwijkingen)}/{aantal}")
+
+
+def meet(planner, plannen, naam):
+    berekend = planner.berekend
+    start = time.perf_counter()
+    planner.optimaliseer(plannen, 1)
+    ms = (time.perf_counter() - start) * 1000.0
+    print(f"{naam:<34}: {ms:8.1f} ms   {planner.berekend - berekend} uitgerekend, de rest onthouden")
+
+
+def main():
+    rng = random.Random(7)
+    locaties = maak_park(rng)
+    netwerk = maak_netwerk(locaties)
+    plannen = maak_plannen(rng)
+    kwaliteit(netwerk, rng)
+
+    een = BezoekPlanner(netwerk, werkers=1)
+    meet(een, plannen, f"{AANTAL_PLANNEN} plannen, 1 proces")
+
+    # de eerste keer starten de processen, dat tellen we niet mee
+    pool = BezoekPlanner(netwerk, werkers=max(2, os.cpu_count() or 1))
+    pool.optimaliseer(plannen, 1)
+    pool.vergeet()
+    meet(pool, plannen, f"{AANTAL_PLANNEN} plannen, {pool.werkers} processen")
+    meet(pool, plannen, "nog een keer (onthouden)")
+
+    # nieuwe wachttijden: de volgordes blijven, alleen de minuten veranderen; een langzamer stuk spoor: alles opnieuw
+    for rij in locaties:
+        rij["wachttijd"] = rng.randint(0, 40)
+    pool.zet_netwerk(maak_netwerk(locaties))
+    meet(pool, plannen, "na nieuwe wachttijden")
+    netwerk = maak_netwerk(locaties)
+    netwerk.reistijd[netwerk.reistijd > 10.0] *= 1.5
+    pool.zet_netwerk(netwerk)
+    meet(pool, plannen, "na nieuwe reistijden")
+    pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# bench_checkin.py - Meet hoeveel check-ins per seconde er in Reis geschreven kunnen worden
+# Starten vanuit de map "Startcode treintje":
+#   python -m benchmarks.bench_checkin
+#
+# Vergelijking tussen de oude manier (één rij per transactie, via Bezetting.check_in)
+# en de CheckinPijplijn (begrensde wachtrij, batches van meerdere rijen per transactie).
+# De database is een SQLite bestand in een tijdelijke map, dus inclusief schrijven naar schijf.
+# Vooraf twee controles: wie instapt bij halte 1 en uitstapt bij halte 3 telt af bij halte 1, niet bij halte 3,
+# en een scan die twee keer binnenkomt (zelfde scan_id) telt als dubbel en niet als geschreven;
+# een scan die op een constraint fout gaat (qr_id NULL) telt als mislukt, niet als dubbel.
+
+import os
+import random
+import tempfile
+import time
+
+from database.bezetting import Bezetting
+from database.checkin import CheckinPijplijn
+from database.gegevens import vul_demo
+from database.verbinding import maak_schema, sqlite_pool
+
+AANTAL_QR = 5000
+
+
+def maak_database(pad):
+    pool = sqlite_pool(pad)
+    maak_schema(pool)
+    vul_demo(pool)
+    pool.voer_veel_uit("INSERT INTO QRCode (data, datum) VALUES (?, ?)", [(f"QR-{i}", "2026-10-18") for i in range(AANTAL_QR)])
+    return pool
+
+
+def scans(aantal, rng):
+    for _ in range(aantal):
+        yield rng.randint(1, AANTAL_QR), rng.randint(1, 5), rng.random() < 0.6, 1
+
+
+def controleer_uitchecken_elders(pad):
+    pool = maak_database(pad)
+    bezetting = Bezetting(pool)
+    bezetting.check_in(1, 1, 1)
+    bezetting.check_in(2, 1, 1)
+    bezetting.check_uit(1, 3, 1)
+    bezetting.check_uit(3, 2)
+    verwacht = {"trein 1": 1, "locatie 1": 1, "locatie 2": 0, "locatie 3": 0}
+
+    def tellers():
+        trein = {f"trein {r['trein_id']}": r["aanwezig"] for r in pool.haal_op("SELECT trein_id, aanwezig FROM TreinBezetting")}
+        locatie = {f"locatie {r['locatie_id']}": r["aanwezig"] for r in pool.haal_op("SELECT locatie_id, aanwezig FROM LocatieBezetting")}
+        return {naam: {**trein, **locatie}.get(naam, 0) for naam in verwacht}
+
+    na_triggers = tellers()
+    bezetting.herbereken()
+    na_herbereken = tellers()
+    pool.sluit()
+    return [f"{naam}: {na_triggers[naam]} / {na_herbereken[naam]} (verwacht {aantal})"
+            for naam, aantal in verwacht.items() if na_triggers[naam] != aantal or na_herbereken[naam] != aantal]
+
+
+def controleer_dubbele_scans(pad):
+    pool = maak_database(pad)
+    pijplijn = CheckinPijplijn(pool).start()
+    for scan_id in ("scan-1", "scan-2", "scan-1"):
+        pijplijn.aanbieden(1, 1, True, scan_id=scan_id)
+    pijplijn.leeg()
+    pijplijn.stop()
+    tellers = pijplijn.tellers()
+    rijen = pool.haal_op("SELECT COUNT(*) AS n FROM Reis")[0]["n"]
+
+    fout = CheckinPijplijn(pool, pogingen=2).start()
+    fout.aanbieden(None, 1, True, scan_id="scan-3")
+    fout.leeg()
+    fout.stop()
+    pool.sluit()
+    return ((tellers["geschreven"], tellers["dubbel"], rijen) == (2, 1, 2)
+            and (fout.tellers()["mislukt"], fout.tellers()["dubbel"]) == (1, 0))
+
+
+def main(aantal_rij_voor_rij=2000, aantal_pijplijn=100_000):
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as map_:
+        fouten = controleer_uitchecken_elders(os.path.join(map_, "elders.db"))
+        if fouten:
+            raise SystemExit(f"CONTROLE MISLUKT: check-out bij een andere locatie ({', '.join(fouten)})")
+        if not controleer_dubbele_scans(os.path.join(map_, "dubbel.db")):
+            raise SystemExit("CONTROLE MISLUKT: dubbele of foute scans worden verkeerd geteld")
+        pool = maak_database(os.path.join(map_, "rij.db"))
+        bezetting = Bezetting(pool)
+        start = time.perf_counter()
+        for (qr_id, locatie_id, ingecheckt, trein_id) in scans(aantal_rij_voor_rij, rng):
+            if ingecheckt:
+                bezetting.check_in(qr_id, locatie_id, trein_id)
+            else:
+                bezetting.check_uit(qr_id, locatie_id, trein_id)
+        rij_per_s = aantal_rij_voor_rij / (time.perf_counter() - start)
+        pool.sluit()
+
+        pool = maak_database(os.path.join(map_, "batch.db"))
+        pijplijn = CheckinPijplijn(pool, max_wachtrij=20_000).start()
+        start = time.perf_counter()
+        for (qr_id, locatie_id, ingecheckt, trein_id) in scans(aantal_pijplijn, rng):
+            while not pijplijn.aanbieden(qr_id, locatie_id, ingecheckt, trein_id=trein_id):
+                pass
+        pijplijn.leeg()
+        batch_per_s = aantal_pijplijn / (time.perf_counter() - start)
+        pijplijn.stop()
+        tellers = pijplijn.tellers()
+        rijen = pool.haal_op("SELECT COUNT(*) AS n FROM Reis")[0]["n"]
+        pool.sluit()
+
+    print(f"rij voor rij : {aantal_rij_voor_rij:>7} check-ins  {rij_per_s:>10,.0f} inserts/s")
+    print(f"pijplijn     : {aantal_pijplijn:>7} check-ins  {batch_per_s:>10,.0f} inserts/s  ({batch_per_s / rij_per_s:.0f}x)")
+    print(f"pijplijn tellers : {tellers}, rijen in Reis: {rijen}")
+
+
+if __name__ == "__main__":
+    main()
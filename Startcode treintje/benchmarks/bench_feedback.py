@@ -0,0 +1,76 @@
+# bench_feedback.py - Vergelijkt het dashboard uit de rollups met GROUP BY over de hele Feedback tabel
+# Starten vanuit de map "Startcode treintje":
+#   python -m benchmarks.bench_feedback
+#
+# Per grootte van de Feedback tabel meten we hoe lang het dashboard van Scherm1 duurt (uit de rollups)
+# en dezelfde cijfers met GROUP BY over de ruwe tabel. Ook het invoegen (met triggers) wordt gemeten.
+
+import random
+import time
+
+from database.feedback import FeedbackRollups
+from database.gegevens import vul_demo
+from database.verbinding import maak_schema, sqlite_pool
+
+GROOTTES = (10_000, 100_000, 1_000_000)
+HERHALINGEN = 20
+AANTAL_LOCATIES = 30
+
+
+def vul(pool, aantal, rng):
+    rijen = [
+        (1, rng.randint(1, AANTAL_LOCATIES), rng.randint(1, AANTAL_LOCATIES), rng.randint(1, 5), f"-{rng.randint(0, 90 * 24 * 60)} minutes")
+        for _ in range(aantal)
+    ]
+    start = time.perf_counter()
+    with pool.verbinding() as conn:
+        conn.executemany(
+            "INSERT INTO Feedback (qr_code, van_locatie_id, naar_locatie_id, rating, bericht, verzonden_op) "
+            "VALUES (?, ?, ?, ?, '', datetime('now', ?))",
+            rijen,
+        )
+    return (time.perf_counter() - start) / aantal * 1e6
+
+
+def ruw(pool):
+    pool.haal_op(
+        "SELECT van_locatie_id, naar_locatie_id, COUNT(*), AVG(rating) FROM Feedback GROUP BY van_locatie_id, naar_locatie_id"
+    )
+    pool.haal_op(
+        "SELECT strftime('%Y-%m-%d %H:00', verzonden_op) AS uur, COUNT(*), AVG(rating) FROM Feedback "
+        "WHERE verzonden_op >= datetime('now', '-24 hours') GROUP BY uur"
+    )
+    pool.haal_op("SELECT rating, COUNT(*) FROM Feedback GROUP BY rating")
+
+
+def per_keer_ms(functie):
+    start = time.perf_counter()
+    for _ in range(HERHALINGEN):
+        functie()
+    return (time.perf_counter() - start) / HERHALINGEN * 1000.0
+
+
+def main():
+    rng = random.Random(1)
+    pool = sqlite_pool()
+    maak_schema(pool)
+    vul_demo(pool)
+    pool.voer_veel_uit(
+        "INSERT INTO Locatie (naam, beschrijving, wachttijd, loc_x, loc_y) VALUES (?, '', 0, 0, 0)",
+        [(f"Attractie {i}",) for i in range(AANTAL_LOCATIES)],
+    )
+    pool.voer_uit("INSERT INTO QRCode (data, datum) VALUES ('bench', '2026-01-01')")
+    rollups = FeedbackRollups(pool)
+
+    print(f"{'feedback':>10}  {'invoegen':>12}  {'dashboard (rollups)':>20}  {'GROUP BY (ruw)':>15}")
+    gevuld = 0
+    for grootte in GROOTTES:
+        per_rij = vul(pool, grootte - gevuld, rng)
+        gevuld = grootte
+        dashboard = per_keer_ms(rollups.dashboard)
+        groep = per_keer_ms(lambda: ruw(pool))
+        print(f"{grootte:>10}  {per_rij:>7.1f} µs/rij  {dashboard:>17.2f} ms  {groep:>12.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
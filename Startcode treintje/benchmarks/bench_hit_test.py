@@ -0,0 +1,57 @@
+# bench_hit_test.py - Meet het opzoeken van markers bij een klik of tooltip
+# Starten vanuit de map "Startcode treintje":
+#   python -m benchmarks.bench_hit_test
+#
+# We vergelijken de oude manier (de hele lijst met markers langslopen) met de RasterIndex.
+
+import random
+import time
+
+from schermen.ruimtelijke_index import RasterIndex
+
+
+def lineair_zoeken(posities, x, y):
+    for (cx, cy, r, label) in posities:
+        dx = x - cx
+        dy = y - cy
+        if dx * dx + dy * dy <= r * r:
+            return label
+    return None
+
+
+def percentiel(waarden, p):
+    gesorteerd = sorted(waarden)
+    return gesorteerd[min(len(gesorteerd) - 1, int(len(gesorteerd) * p))]
+
+
+def meet(functie, punten):
+    tijden = []
+    for (x, y) in punten:
+        start = time.perf_counter()
+        functie(x, y)
+        tijden.append((time.perf_counter() - start) * 1e6)
+    return sum(tijden) / len(tijden), percentiel(tijden, 0.99)
+
+
+def main(aantal_markers=10_000, aantal_klikken=20_000, grootte=4000, radius=12):
+    rng = random.Random(42)
+    posities = [(rng.randrange(grootte), rng.randrange(grootte), radius, f"Marker {i}") for i in range(aantal_markers)]
+    punten = [(rng.uniform(0, grootte), rng.uniform(0, grootte)) for _ in range(aantal_klikken)]
+
+    start = time.perf_counter()
+    index = RasterIndex(celgrootte=radius * 2)
+    for i, (x, y, r, label) in enumerate(posities):
+        index.voeg_toe(i, x, y, r, "attractie", label)
+    opbouw_ms = (time.perf_counter() - start) * 1000.0
+
+    lin_gem, lin_p99 = meet(lambda x, y: lineair_zoeken(posities, x, y), punten[:2000])
+    idx_gem, idx_p99 = meet(index.zoek, punten)
+
+    print(f"{aantal_markers} markers, kaart {grootte}x{grootte} px, radius {radius} px")
+    print(f"index opbouwen       : {opbouw_ms:8.2f} ms (eenmalig per indeling)")
+    print(f"lineair  per klik    : gem {lin_gem:8.2f} us   p99 {lin_p99:8.2f} us")
+    print(f"raster   per klik    : gem {idx_gem:8.2f} us   p99 {idx_p99:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
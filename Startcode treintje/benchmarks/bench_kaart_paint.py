@@ -0,0 +1,66 @@
+# bench_kaart_paint.py - Meet hoe lang het tekenen van de MapWidget duurt
+# Starten vanuit de map "Startcode treintje":
+#   QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_kaart_paint
+#
+# We vergelijken drie situaties:
+#   - zonder cache : de statische laag wordt elke keer opnieuw opgebouwd (zoals vroeger elke paint)
+#   - volledig     : de hele widget wordt opnieuw getekend vanuit de statische laag
+#   - dirty-rect   : de trein beweegt en alleen de oude + nieuwe rechthoek wordt getekend
+
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from schermen.scherm2 import MapWidget
+
+
+def maak_kaart(aantal_markers, grootte):
+    rng = random.Random(42)
+    kaart = MapWidget()
+    kaart.set_attractions([(rng.random(), rng.random(), f"Attractie {i}") for i in range(aantal_markers)])
+    kaart.set_platforms([(rng.random(), rng.random(), f"Perron {i}") for i in range(max(2, aantal_markers // 10))])
+    kaart.setFixedSize(grootte, grootte)
+    kaart.show()
+    QApplication.processEvents()
+    return kaart
+
+
+def meet(functie, herhalingen):
+    start = time.perf_counter()
+    for _ in range(herhalingen):
+        functie()
+    return (time.perf_counter() - start) / herhalingen * 1000.0
+
+
+def main(herhalingen=200):
+    app = QApplication.instance() or QApplication(sys.argv)
+    rng = random.Random(7)
+    print(f"{'markers':>8} {'grootte':>8} {'zonder cache':>14} {'volledig':>10} {'dirty-rect':>11}  (ms per paint)")
+    for aantal in (3, 100, 1000):
+        for grootte in (300, 800):
+            kaart = maak_kaart(aantal, grootte)
+
+            def zonder_cache():
+                kaart._statische_laag = None
+                kaart.repaint()
+
+            def dirty_rect():
+                oud = kaart._dot_rect()
+                kaart.set_dot_normalized(rng.random(), rng.random())
+                kaart.repaint(oud.united(kaart._dot_rect()))
+
+            t_zonder = meet(zonder_cache, max(10, herhalingen // 10))
+            t_vol = meet(kaart.repaint, herhalingen)
+            t_dirty = meet(dirty_rect, herhalingen)
+            print(f"{aantal:>8} {grootte:>8} {t_zonder:>14.3f} {t_vol:>10.3f} {t_dirty:>11.3f}")
+            kaart.close()
+    app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# bench_metrieken.py - Meet wat de instrumentatie kost als hij uit en aan staat
+# Starten vanuit de map "Startcode treintje":
+#   QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_metrieken
+#
+# We meten een lege functie (alleen de kosten van @gemeten zelf) en een echte paint van de MapWidget,
+# telkens zonder decorator, met decorator maar uit, en met decorator aan.
+
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from live.metrieken import METRIEKEN, gemeten
+from schermen.scherm2 import MapWidget
+
+
+def leeg():
+    return None
+
+
+def per_aanroep_ns(functie, herhalingen):
+    start = time.perf_counter()
+    for _ in range(herhalingen):
+        functie()
+    return (time.perf_counter() - start) / herhalingen * 1e9
+
+
+def main(herhalingen=500_000, paints=500):
+    app = QApplication.instance() or QApplication(sys.argv)
+    gemeten_leeg = gemeten("bench_leeg")(leeg)
+    was_actief = METRIEKEN.actief
+
+    METRIEKEN.actief = False
+    kaal = per_aanroep_ns(leeg, herhalingen)
+    uit = per_aanroep_ns(gemeten_leeg, herhalingen)
+    METRIEKEN.actief = True
+    aan = per_aanroep_ns(gemeten_leeg, herhalingen)
+
+    print(f"lege functie        : kaal {kaal:7.0f} ns   @gemeten uit {uit:7.0f} ns   @gemeten aan {aan:7.0f} ns")
+
+    rng = random.Random(1)
+    kaart = MapWidget()
+    kaart.set_attractions([(rng.random(), rng.random(), f"Attractie {i}") for i in range(100)])
+    kaart.setFixedSize(800, 800)
+    kaart.show()
+    app.processEvents()
+
+    def dirty_rect():
+        oud = kaart._dot_rect()
+        kaart.set_dot_normalized(rng.random(), rng.random())
+        kaart.repaint(oud.united(kaart._dot_rect()))
+
+    METRIEKEN.actief = False
+    paint_uit = per_aanroep_ns(dirty_rect, paints) / 1000.0
+    METRIEKEN.actief = True
+    paint_aan = per_aanroep_ns(dirty_rect, paints) / 1000.0
+    METRIEKEN.actief = was_actief
+    print(f"dirty-rect paint    : uit {paint_uit:7.1f} us   aan {paint_aan:7.1f} us")
+    print(f"paint histogram     : {METRIEKEN.histogram('paint').samenvatting()}")
+    kaart.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# bench_parksimulatie.py - Meet de parksimulatie: hoeveel sneller dan echt, met en zonder database
+# Starten vanuit de map "Startcode treintje":
+#   python -m benchmarks.bench_parksimulatie
+#
+# 1. Deterministisch: twee runs met dezelfde seed geven dezelfde checksum over alle events, een andere seed niet
+# 2. Alleen de simulatie (Afnemer die niets doet) voor verschillende aantallen bezoekers
+# 3. Een piekdag met DATABASE_BEZOEKERS bezoekers in een SQLite bestand (scans, check-ins, reserveringen, feedback)
+# 4. Een gestopte schrijfthread: reis geeft de scan meteen op (verloren) in plaats van eeuwig te wachten
+# "x echt" is de gesimuleerde tijd (opening tot het einde) gedeeld door de rekentijd.
+
+import os
+import random
+import tempfile
+import time
+
+from database.gegevens import Gegevens
+from database.verbinding import maak_schema, sqlite_pool
+from live.parksimulatie import OPENING, DatabaseAfnemer, Park, ParkSimulatie, TelAfnemer, demo_park, maak_park
+
+GROOTTES = (10_000, 50_000, 100_000)
+DATABASE_BEZOEKERS = 50_000
+DATUM = "2026-10-18"
+
+
+def regel(naam, simulatie, duur):
+    print(f"{naam:<28} {simulatie.events:>9} events  {duur:6.2f} s  {simulatie.events / duur:>9,.0f} events/s  "
+          f"{(simulatie.nu - OPENING) / duur:>7,.0f}x echt  {simulatie.attractiebezoeken:>7} attracties  "
+          f"{simulatie.ritten:>6} ritten")
+
+
+def deterministisch(park):
+    checksums = []
+    for seed in (1, 1, 2):
+        simulatie = ParkSimulatie(park, TelAfnemer(), bezoekers=10_000, seed=seed, datum=DATUM).draai()
+        checksums.append(simulatie.afnemer.tellers()["checksum"])
+    print(f"checksums seed 1, 1, 2: {', '.join(checksums)}  "
+          f"({'gelijk' if checksums[0] == checksums[1] else 'VERSCHILLEND'} / "
+          f"{'anders' if checksums[0] != checksums[2] else 'GELIJK'})")
+
+
+def gestopte_pijplijn(gegevens, park):
+    afnemer = DatabaseAfnemer(gegevens, park)
+    afnemer.begin_dag(DATUM, [])
+    afnemer.pijplijn.stop()
+    start = time.perf_counter()
+    afnemer.reis(OPENING, None, park.ids[0], None, True)
+    duur = time.perf_counter() - start
+    tellers = afnemer.tellers()
+    goed = tellers["verloren"] == 1 and tellers["checkin"]["aangeboden"] == 0 and duur < 1.0
+    print(f"gestopte schrijfthread: verloren {tellers['verloren']} na {duur * 1000:.1f} ms  ({'goed' if goed else 'FOUT'})")
+    return goed
+
+
+def main():
+    park = demo_park(1)
+    deterministisch(park)
+    print()
+
+    for bezoekers in GROOTTES:
+        simulatie = ParkSimulatie(park, bezoekers=bezoekers, seed=1, datum=DATUM)
+        start = time.perf_counter()
+        simulatie.draai()
+        regel(f"{bezoekers} bezoekers, geen db", simulatie, time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as map_:
+        pool = sqlite_pool(os.path.join(map_, "piekdag.db"))
+        maak_schema(pool)
+        maak_park(pool, random.Random(1))
+        gegevens = Gegevens(pool)
+        park = Park(gegevens.locaties(), gegevens.treinen())
+        simulatie = ParkSimulatie(park, DatabaseAfnemer(gegevens, park), bezoekers=DATABASE_BEZOEKERS, seed=1, datum=DATUM)
+        start = time.perf_counter()
+        simulatie.draai()
+        regel(f"{DATABASE_BEZOEKERS} bezoekers, SQLite", simulatie, time.perf_counter() - start)
+        rijen = pool.haal_op("SELECT (SELECT COUNT(*) FROM Reis) AS reis, (SELECT COUNT(*) FROM Feedback) AS feedback")[0]
+        print(f"  Reis {rijen['reis']} rijen, Feedback {rijen['feedback']} rijen, {simulatie.reserveringen} reserveringen, "
+              f"{simulatie.afnemer.verloren} scans verloren")
+        goed = gestopte_pijplijn(gegevens, park)
+        pool.sluit()
+    if not goed:
+        raise SystemExit("DatabaseAfnemer.reis blijft wachten op een gestopte pijplijn")
+
+
+if __name__ == "__main__":
+    main()
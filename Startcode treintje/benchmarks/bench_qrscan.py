@@ -0,0 +1,107 @@
+# bench_qrscan.py - Meet de tijd per QR-scan bij de poorten met de ScanValidatie
+# Starten vanuit de map "Startcode treintje":
+#   python -m benchmarks.bench_qrscan
+#
+# Een SQLite bestand in een tijdelijke map met CODES_PER_DAG codes voor elk van de DAGEN (miljoenen codes).
+# De dag van vandaag wordt in het Bloom filter geladen. Daarna per soort scan de p50/p99/max per scan:
+#   onbekend     : codes die niet bestaan (het Bloom filter wijst ze af, of een enkele keer de database)
+#   andere dag   : codes van een andere dag, niet geldig vandaag
+#   eerste scan  : geldige codes die nog niet in de LRU staan (opzoeken via de index)
+#   opnieuw      : geldige codes die net gescand zijn (uit de LRU)
+#   gemengd      : 70% opnieuw, 25% eerste scan, 5% ongeldig, zoals bij de poorten
+# Ter vergelijking: dezelfde query zonder de indexen op QRCode (een table scan per scan).
+
+import os
+import random
+import tempfile
+import time
+
+from database.qrscan import ScanValidatie
+from database.verbinding import maak_schema, sqlite_pool
+
+DAGEN = ("2026-10-15", "2026-10-16", "2026-10-17", "2026-10-18")
+VANDAAG = DAGEN[-1]
+CODES_PER_DAG = 500_000
+SCANS = 100_000
+ZONDER_INDEX = 20
+
+
+def code(datum, rng):
+    return f"LSM-{datum}-{rng.getrandbits(64):016x}"
+
+
+def vul(pool, rng):
+    codes = {}
+    start = time.perf_counter()
+    for datum in DAGEN:
+        codes[datum] = [code(datum, rng) for _ in range(CODES_PER_DAG)]
+        pool.voer_veel_uit("INSERT INTO QRCode (data, datum) VALUES (?, ?)", [(c, datum) for c in codes[datum]])
+    print(f"{len(DAGEN) * CODES_PER_DAG} codes ingevoegd in {time.perf_counter() - start:.1f} s")
+    return codes
+
+
+def meet(validatie, naam, scans, verwacht_geldig):
+    tijden = []
+    fouten = 0
+    for data in scans:
+        start = time.perf_counter_ns()
+        qr_id = validatie.valideer(data)
+        tijden.append(time.perf_counter_ns() - start)
+        if verwacht_geldig is not None and (qr_id is not None) != verwacht_geldig:
+            fouten += 1
+    tijden.sort()
+    p50, p99 = tijden[len(tijden) // 2] / 1000, tijden[int(len(tijden) * 0.99)] / 1000
+    print(f"{naam:<14} {len(tijden):>8}  p50 {p50:8.1f} µs  p99 {p99:8.1f} µs  max {tijden[-1] / 1000:9.1f} µs"
+          + (f"  {fouten} FOUT" if fouten else ""))
+
+
+def main():
+    rng = random.Random(24)
+    with tempfile.TemporaryDirectory() as map_:
+        pool = sqlite_pool(os.path.join(map_, "qr.db"))
+        maak_schema(pool)
+        codes = vul(pool, rng)
+        vandaag = codes[VANDAAG]
+
+        validatie = ScanValidatie(pool)
+        start = time.perf_counter()
+        geladen = validatie.laad_dag(VANDAAG)
+        tellers = validatie.tellers()
+        print(f"laad_dag: {geladen} codes in {time.perf_counter() - start:.2f} s, "
+              f"Bloom filter {tellers['bloom_bytes'] / 2 ** 20:.1f} MiB")
+        print()
+
+        meet(validatie, "onbekend", [code(VANDAAG, rng) for _ in range(SCANS)], False)
+        meet(validatie, "andere dag", rng.sample(codes[DAGEN[0]], SCANS), False)
+        eerste = rng.sample(vandaag, SCANS)
+        meet(validatie, "eerste scan", eerste, True)
+        meet(validatie, "opnieuw", rng.sample(eerste, SCANS), True)
+
+        nieuw = iter(rng.sample(vandaag, SCANS))
+        recent = eerste[-5000:]
+        gemengd = []
+        for _ in range(SCANS):
+            kans = rng.random()
+            if kans < 0.70:
+                gemengd.append(rng.choice(recent))
+            elif kans < 0.95:
+                gemengd.append(next(nieuw))
+            else:
+                gemengd.append(code(VANDAAG, rng))
+        meet(validatie, "gemengd", gemengd, None)
+        print(validatie.tellers())
+        print()
+
+        pool.voer_uit("DROP INDEX idx_qrcode_data")
+        pool.voer_uit("DROP INDEX idx_qrcode_datum")
+        steekproef = rng.sample(vandaag, ZONDER_INDEX)
+        start = time.perf_counter()
+        for data in steekproef:
+            pool.haal_op("SELECT qr_id FROM QRCode WHERE data = ? AND datum = ? LIMIT 1", (data, VANDAAG))
+        print(f"zonder indexen: {(time.perf_counter() - start) / ZONDER_INDEX * 1000:.1f} ms per scan "
+              f"({ZONDER_INDEX} scans)")
+        pool.sluit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# bench_routegraaf.py - Meet de ETA-tabel: volledig berekenen, incrementeel bijwerken en opzoeken
+# Starten vanuit de map "Startcode treintje":
+#   python -m benchmarks.bench_routegraaf
+
+import random
+import time
+
+from planning.routegraaf import RouteGraaf
+
+
+def maak_graaf(aantal_haltes, rng):
+    graaf = RouteGraaf(range(aantal_haltes))
+    for i in range(aantal_haltes):
+        graaf.voeg_segment_toe(i, (i + 1) % aantal_haltes, rng.uniform(1, 5))
+        for _ in range(2):
+            graaf.voeg_segment_toe(i, rng.randrange(aantal_haltes), rng.uniform(3, 15))
+    return graaf
+
+
+def main(aantal_haltes=300, wijzigingen=200, opzoekingen=100_000):
+    rng = random.Random(42)
+    graaf = maak_graaf(aantal_haltes, rng)
+
+    start = time.perf_counter()
+    graaf.bereken()
+    volledig_ms = (time.perf_counter() - start) * 1000.0
+
+    segmenten = [(u, v) for u in range(aantal_haltes) for v in graaf._buren[u]]
+    tijden = []
+    for _ in range(wijzigingen):
+        u, v = rng.choice(segmenten)
+        minuten = graaf.reistijd(u, v) * rng.choice((0.5, 2.0))
+        start = time.perf_counter()
+        graaf.zet_reistijd(u, v, minuten)
+        tijden.append((time.perf_counter() - start) * 1000.0)
+
+    paren = [(rng.randrange(aantal_haltes), rng.randrange(aantal_haltes)) for _ in range(opzoekingen)]
+    start = time.perf_counter()
+    for (van, naar) in paren:
+        graaf.eta(van, naar)
+    opzoeken_us = (time.perf_counter() - start) / opzoekingen * 1e6
+
+    tijden.sort()
+    print(f"{aantal_haltes} haltes, {len(segmenten)} segmenten")
+    print(f"volledige berekening   : {volledig_ms:8.2f} ms")
+    print(f"incrementele wijziging : gem {sum(tijden) / len(tijden):6.2f} ms   p99 {tijden[int(len(tijden) * 0.99) - 1]:6.2f} ms")
+    print(f"ETA opzoeken           : {opzoeken_us:8.2f} us")
+    print(f"volledige berekeningen : {graaf.volledige_berekeningen}, incrementele updates: {graaf.incrementele_updates}")
+
+
+if __name__ == "__main__":
+    main()
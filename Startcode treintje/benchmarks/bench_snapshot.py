@@ -0,0 +1,102 @@
+# bench_snapshot.py - Meet de tijd tot de eerste bruikbare kaart, met en zonder lokale snapshot
+# Starten vanuit de map "Startcode treintje":
+#   QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_snapshot
+#
+# We bouwen het hoofdvenster, gaan naar Scherm2 en tekenen de kaart. De tijd loopt tot de kaart
+# voor het eerst getekend is. "Bruikbaar" betekent dat de attracties uit de database (of de snapshot)
+# komen en niet de ingebouwde demo-waarden zijn.
+# Vier gevallen: een trage database (elke verbinding wacht VERTRAGING seconden) en een onbereikbare
+# database, telkens zonder en met een snapshot die eerder gesynchroniseerd is.
+
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from database.gegevens import Gegevens, vul_demo
+from database.snapshot import SnapshotSync, open_snapshot
+from database.verbinding import Verbindingspool, maak_schema
+from schermen.main_window import MainWindow
+
+VERTRAGING = 0.5
+AANTAL_ATTRACTIES = 200
+
+
+# Klasse : TragePool
+# Pool naar een SQLite bestand waarbij elke geleende verbinding eerst vertraging seconden wacht,
+# of meteen een fout geeft als de database onbereikbaar is
+
+class TragePool(Verbindingspool):
+    def __init__(self, pad, vertraging=0.0, bereikbaar=True):
+        super().__init__(lambda: sqlite3.connect(pad, check_same_thread=False))
+        self.vertraging = vertraging
+        self.bereikbaar = bereikbaar
+
+    @contextmanager
+    def verbinding(self):
+        if not self.bereikbaar:
+            raise ConnectionError("database onbereikbaar")
+        time.sleep(self.vertraging)
+        with super().verbinding() as conn:
+            yield conn
+
+
+def maak_database(pad):
+    pool = TragePool(pad)
+    maak_schema(pool)
+    vul_demo(pool)
+    pool.voer_veel_uit(
+        "INSERT INTO Locatie (naam, beschrijving, wachttijd, loc_x, loc_y) VALUES (?, ?, ?, ?, ?)",
+        [(f"Attractie {i}", "", i % 30, i % 97 + 1, (i * 7) % 97 + 1) for i in range(AANTAL_ATTRACTIES)],
+    )
+    return pool
+
+
+# Bouwt het venster met deze database en snapshot en meet tot de kaart op Scherm2 getekend is
+
+def eerste_kaart(app, gegevens, snapshot):
+    start = time.perf_counter()
+    venster = MainWindow(voorverwarmen=False)
+    venster.gegevens = gegevens
+    venster.snapshot = snapshot
+    venster.show()
+    venster.toon_pagina("scherm2")
+    venster.scherm2.map_widget.repaint()
+    ms = (time.perf_counter() - start) * 1000.0
+    bruikbaar = len(venster.scherm2.attractions) > AANTAL_ATTRACTIES
+    venster.close()
+    venster.deleteLater()
+    app.processEvents()
+    return ms, bruikbaar
+
+
+def main():
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as map_:
+        server = os.path.join(map_, "server.db")
+        maak_database(server)
+
+        snapshot = open_snapshot(os.path.join(map_, "snapshot.db"))
+        SnapshotSync(snapshot, Gegevens(TragePool(server))).sync()
+        start = time.perf_counter()
+        snapshot.laad()
+        print(f"snapshot laden: {(time.perf_counter() - start) * 1000.0:.2f} ms ({AANTAL_ATTRACTIES + 3} attracties)")
+
+        # De eerste keer worden alle modules geïmporteerd, die tijd tellen we niet mee
+        eerste_kaart(app, None, None)
+
+        print(f"{'database':<22} {'snapshot':<9} {'eerste kaart':>13}  bruikbaar")
+        for naam, vertraging, bereikbaar in [(f"traag ({VERTRAGING:g} s)", VERTRAGING, True), ("onbereikbaar", 0.0, False)]:
+            for met_snapshot in (False, True):
+                gegevens = Gegevens(TragePool(server, vertraging, bereikbaar))
+                ms, bruikbaar = eerste_kaart(app, gegevens, snapshot if met_snapshot else None)
+                print(f"{naam:<22} {'ja' if met_snapshot else 'nee':<9} {ms:>10.1f} ms  {'ja' if bruikbaar else 'nee (demo)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# bench_taken.py - Meet wat de TaakPool de GUI thread kost en oplevert
+# Starten vanuit de map "Startcode treintje":
+#   QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_taken
+#
+# 1. Overhead: een lege taak starten en het resultaat terugkrijgen op de GUI thread (p50 / p99).
+# 2. Samenvoegen: veel aanvragen met dezelfde sleutel terwijl de taak loopt, hoe vaak draait de functie echt.
+# 3. Ververs locatie met een trage database (elke verbinding wacht VERTRAGING seconden): hoe lang de
+#    GUI thread vastzit, zonder pool (alles op de GUI thread) en met pool.
+
+import os
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from benchmarks.bench_snapshot import TragePool, maak_database
+from database.gegevens import Gegevens
+from live.taken import TaakPool
+from schermen.main_window import MainWindow
+
+VERTRAGING = 0.2
+AANTAL = 1000
+AANVRAGEN = 50
+
+
+def kwantiel(waarden, q):
+    waarden = sorted(waarden)
+    return waarden[min(len(waarden) - 1, int(q * len(waarden)))]
+
+
+def wacht_tot(app, voorwaarde, timeout=5.0):
+    einde = time.perf_counter() + timeout
+    while not voorwaarde() and time.perf_counter() < einde:
+        app.processEvents()
+    return voorwaarde()
+
+
+def meet_overhead(app, pool):
+    tijden = []
+    for i in range(AANTAL):
+        klaar = []
+        start = time.perf_counter()
+        pool.start(("leeg", i), int, i, klaar=klaar.append)
+        wacht_tot(app, lambda: klaar)
+        tijden.append((time.perf_counter() - start) * 1000.0)
+    print(f"lege taak tot resultaat : p50 {kwantiel(tijden, 0.5):.3f} ms   p99 {kwantiel(tijden, 0.99):.3f} ms")
+
+
+def meet_samenvoegen(app, pool):
+    uitgevoerd = []
+    ontvangen = []
+
+    def traag():
+        uitgevoerd.append(threading.get_ident())
+        time.sleep(0.05)
+        return len(uitgevoerd)
+
+    for i in range(AANVRAGEN):
+        pool.start("traag", traag, klaar=lambda r, i=i: ontvangen.append(i))
+    wacht_tot(app, lambda: len(ontvangen) == AANVRAGEN)
+    print(f"samenvoegen             : {AANVRAGEN} aanvragen, functie {len(uitgevoerd)}x uitgevoerd, {len(ontvangen)} resultaten")
+
+
+def meet_ververs(app, server):
+    venster = MainWindow(voorverwarmen=False)
+    venster.gegevens = Gegevens(TragePool(server, VERTRAGING))
+    venster.show()
+    venster.toon_pagina("scherm2")
+    s2 = venster.scherm2
+    pool = venster.taken
+    bijgewerkt = []
+    s2.train_updated.connect(lambda info, pos: bijgewerkt.append(time.perf_counter()))
+
+    for naam, taken in (("zonder pool", None), ("met pool", pool)):
+        venster.taken = taken
+        bijgewerkt.clear()
+        start = time.perf_counter()
+        s2.ververs_locatie()
+        gui = (time.perf_counter() - start) * 1000.0
+        wacht_tot(app, lambda: bijgewerkt)
+        klaar = (bijgewerkt[0] - start) * 1000.0 if bijgewerkt else float("nan")
+        print(f"ververs locatie {naam:<11}: GUI thread {gui:7.1f} ms   stand bijgewerkt na {klaar:7.1f} ms")
+
+    venster.taken = pool
+    venster.close()
+    venster.deleteLater()
+    app.processEvents()
+
+
+def main():
+    app = QApplication.instance() or QApplication([])
+    pool = TaakPool()
+    meet_overhead(app, pool)
+    meet_samenvoegen(app, pool)
+    pool.stop()
+    with tempfile.TemporaryDirectory() as map_:
+        server = os.path.join(map_, "server.db")
+        maak_database(server)
+        meet_ververs(app, server)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# bench_telemetrie.py - Meet hoeveel telemetrie frames per seconde de ontvanger verwerkt
+# Starten vanuit de map "Startcode treintje":
+#   QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_telemetrie
+#
+# De simulator stuurt zo snel mogelijk frames. Ondertussen draait de Qt event loop door en meten
+# we hoe lang die maximaal blijft hangen (lag), en hoeveel batches de GUI daadwerkelijk krijgt.
+
+import os
+import resource
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QCoreApplication
+
+from live.simulator import TelemetrieSimulator
+from live.telemetrie import TelemetrieOntvanger, wacht_op_verbinding
+
+
+def main(treinen=50, duur=3.0):
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    simulator = TelemetrieSimulator(poort=0, treinen=treinen, maximaal=True).start()
+    ontvanger = TelemetrieOntvanger(poort=simulator.poort)
+
+    batches = []
+    ontvanger.treinen_bijgewerkt.connect(lambda updates: batches.append(len(updates)))
+    ontvanger.start()
+    if not wacht_op_verbinding(ontvanger):
+        print("Geen verbinding met de simulator")
+        return
+
+    rss_start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    frames_start = ontvanger.frames_ontvangen
+    start = time.perf_counter()
+    vorige = start
+    max_lag = 0.0
+    while time.perf_counter() - start < duur:
+        app.processEvents()
+        nu = time.perf_counter()
+        max_lag = max(max_lag, nu - vorige)
+        vorige = nu
+    verstreken = time.perf_counter() - start
+    frames = ontvanger.frames_ontvangen - frames_start
+    rss_eind = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    ontvanger.stop()
+    simulator.stop()
+
+    print(f"{treinen} treinen, {verstreken:.1f} s")
+    print(f"frames ontvangen     : {frames} ({frames / verstreken:,.0f} frames/s)")
+    print(f"frames verworpen     : {ontvanger.frames_verworpen}")
+    print(f"batches naar de GUI  : {len(batches)} (gem {sum(batches) / max(1, len(batches)):.1f} treinen per batch)")
+    print(f"max event loop lag   : {max_lag * 1000:.2f} ms")
+    print(f"max RSS groei        : {(rss_eind - rss_start) / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# bench_thema.py - Meet polish/layout van de schermen met inline stylesheets tegenover de thema's
+# Starten vanuit de map "Startcode treintje" (zonder scherm):
+#   QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_thema
+#
+# "inline" is de oude manier: elke knop krijgt zijn eigen setStyleSheet(...), die Qt apart moet parsen.
+# "thema" is de nieuwe manier: knoppen krijgen een rol/maat property en er is één gecompileerde stylesheet.
+# Daarna meten we het wisselen van thema: opnieuw alle inline stylesheets zetten, de app stylesheet
+# vervangen (hele boom opnieuw polishen) of zet_thema (alleen zichtbare widgets met een rol; verborgen
+# pagina's worden pas bijgewerkt als ze getoond worden, dat staat in de kolom "pagina tonen").
+# Elke meting draait een paar keer om en om; we tonen de mediaan.
+
+import statistics
+import time
+
+from PyQt6.QtWidgets import QApplication, QHBoxLayout, QLabel, QMainWindow, QPushButton, QStackedWidget, QVBoxLayout, QWidget
+
+from schermen.thema import THEMAS, compileer, stijl, werk_thema_bij, zet_thema
+
+INLINE = {
+    ("primair", "klein"): "QPushButton{background-color: #28a745; color: white; border-radius: 20px; font-weight: 600;}",
+    ("primair", "groot"): "QPushButton{background-color: #28a745; color: white; border-radius: 25px; font-weight: 600;}",
+    ("secundair", "groot"): "QPushButton{background-color: #0069d9; color: white; border-radius: 25px;}",
+}
+
+INLINE_NACHT = {
+    ("primair", "klein"): "QPushButton{background-color: #2E7D45; color: #F0F0F0; border-radius: 20px; font-weight: 600;}",
+    ("primair", "groot"): "QPushButton{background-color: #2E7D45; color: #F0F0F0; border-radius: 25px; font-weight: 600;}",
+    ("secundair", "groot"): "QPushButton{background-color: #2F5F9E; color: #F0F0F0; border-radius: 25px;}",
+}
+
+
+def lees_basis():
+    with open("style.qss", "r") as f:
+        return f.read()
+
+
+# Bouwt een venster met een aantal pagina's die lijken op scherm2 (terug, ververs, vergroot, reserveer + labels)
+
+def bouw_venster(paginas, inline):
+    venster = QMainWindow()
+    stack = QStackedWidget()
+    venster.setCentralWidget(stack)
+    knoppen = []
+    for p in range(paginas):
+        pagina = QWidget()
+        layout = QVBoxLayout(pagina)
+        rij = QHBoxLayout()
+        for rol, maat in [("primair", "klein"), ("primair", "groot"), ("secundair", "groot"), ("primair", "groot")]:
+            knop = QPushButton(f"{rol} {p}")
+            knop.setFixedSize(120 if maat == "klein" else 200, 40 if maat == "klein" else 50)
+            if inline:
+                knop.setStyleSheet(INLINE[(rol, maat)])
+            else:
+                stijl(knop, rol, maat)
+            knoppen.append((knop, rol, maat))
+            rij.addWidget(knop)
+        layout.addLayout(rij)
+        for i in range(4):
+            layout.addWidget(QLabel(f"Label {p}.{i}"))
+        stack.addWidget(pagina)
+    return venster, stack, knoppen
+
+
+# Toont elke pagina één keer zodat alle widgets gepolished en ingedeeld worden
+
+def toon_alles(app, venster, stack):
+    venster.show()
+    for i in range(stack.count()):
+        stack.setCurrentIndex(i)
+        app.processEvents()
+
+
+def ms(start):
+    return (time.perf_counter() - start) * 1000.0
+
+
+def meet_inline(app, basis, paginas):
+    app.setStyleSheet(basis)
+    start = time.perf_counter()
+    venster, stack, knoppen = bouw_venster(paginas, inline=True)
+    toon_alles(app, venster, stack)
+    opbouw = ms(start)
+
+    start = time.perf_counter()
+    for knop, rol, maat in knoppen:
+        knop.setStyleSheet(INLINE_NACHT[(rol, maat)])
+    app.processEvents()
+    wissel = ms(start)
+    venster.close()
+    venster.deleteLater()
+    app.processEvents()
+    return opbouw, wissel
+
+
+def meet_thema(app, basis, paginas):
+    app.setStyleSheet(compileer(basis))
+    start = time.perf_counter()
+    venster, stack, knoppen = bouw_venster(paginas, inline=False)
+    zet_thema(venster, "standaard")
+    toon_alles(app, venster, stack)
+    opbouw = ms(start)
+
+    start = time.perf_counter()
+    zet_thema(venster, "nacht")
+    app.processEvents()
+    wissel = ms(start)
+
+    start = time.perf_counter()
+    pagina = stack.widget(0)
+    werk_thema_bij(venster, pagina)
+    stack.setCurrentWidget(pagina)
+    app.processEvents()
+    tonen = ms(start)
+
+    # Ter vergelijking: de hele app stylesheet opnieuw zetten polisht de complete boom
+    start = time.perf_counter()
+    app.setStyleSheet(compileer(basis) + "\n")
+    app.processEvents()
+    hele_boom = ms(start)
+    venster.close()
+    venster.deleteLater()
+    app.processEvents()
+    return opbouw, wissel, tonen, hele_boom
+
+
+def main(paginas_lijst=(5, 50, 200), herhalingen=3):
+    app = QApplication.instance() or QApplication([])
+    basis = lees_basis()
+    print(f"thema's: {', '.join(THEMAS)}   (mediaan van {herhalingen} runs)")
+    print(f"{'pagina':>7} {'knoppen':>8} | {'inline opbouw':>14} {'thema opbouw':>13} | {'inline wissel':>14} {'zet_thema':>10} {'pagina tonen':>13} {'hele boom':>10}")
+    for paginas in paginas_lijst:
+        inline, thema = [], []
+        for _ in range(herhalingen):
+            inline.append(meet_inline(app, basis, paginas))
+            thema.append(meet_thema(app, basis, paginas))
+        in_opbouw, in_wissel = [statistics.median(k) for k in zip(*inline)]
+        th_opbouw, th_wissel, tonen, hele_boom = [statistics.median(k) for k in zip(*thema)]
+        print(
+            f"{paginas:>7} {paginas * 4:>8} | {in_opbouw:>11.2f} ms {th_opbouw:>10.2f} ms | "
+            f"{in_wissel:>11.2f} ms {th_wissel:>7.2f} ms {tonen:>10.2f} ms {hele_boom:>7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# bench_vloot.py - Meet of de kaart 1000 rijdende treinen op 60 fps kan tekenen
+# Starten vanuit de map "Startcode treintje":
+#   QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_vloot
+#
+# Per frame: alle posities in bulk verplaatsen en begrenzen, de kaart laten weten dat de vloot
+# is bijgewerkt en de paint afwachten. Het budget voor 60 fps is 16,7 ms per frame.
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+
+from live.vloot import Vloot
+from schermen.scherm2 import MapWidget
+
+BUDGET_MS = 1000.0 / 60.0
+
+
+def maak_vloot(aantal, rng):
+    vloot = Vloot(capaciteit=aantal)
+    for trein_id in range(aantal):
+        vloot.voeg_toe(trein_id, *rng.random(2), plekken=int(rng.integers(0, 21)), totaal=20, aankomst=float(rng.uniform(1, 12)))
+    return vloot
+
+
+def main(aantal_treinen=1000, frames=300, grootte=800):
+    app = QApplication.instance() or QApplication(sys.argv)
+    rng = np.random.default_rng(42)
+
+    vloot = maak_vloot(aantal_treinen, rng)
+    snelheid = rng.uniform(-0.2, 0.2, size=(aantal_treinen, 2))
+
+    kaart = MapWidget()
+    kaart.set_attractions([(0.2, 0.2, "Rollercoaster"), (0.8, 0.25, "Ferris Wheel"), (0.5, 0.7, "Haunted House")])
+    kaart.set_platforms([(0.12, 0.86, "Perron 1"), (0.88, 0.86, "Perron 2")])
+    kaart.set_vloot(vloot)
+    kaart.setFixedSize(grootte, grootte)
+    kaart.show()
+    app.processEvents()
+
+    dt = 1.0 / 60.0
+    tijden = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        nieuw = vloot.posities + snelheid * dt
+        buiten = (nieuw < 0.0) | (nieuw > 1.0)
+        snelheid[buiten] *= -1.0
+        vloot.zet_posities(nieuw)
+        kaart.vloot_bijgewerkt()
+        app.processEvents()
+        tijden.append((time.perf_counter() - start) * 1000.0)
+
+    tijden.sort()
+    gemiddeld = sum(tijden) / len(tijden)
+    p99 = tijden[min(len(tijden) - 1, int(len(tijden) * 0.99))]
+    print(f"{aantal_treinen} treinen, {frames} frames, kaart {grootte}x{grootte}")
+    print(f"frame tijd : gem {gemiddeld:6.2f} ms   p99 {p99:6.2f} ms   (budget {BUDGET_MS:.1f} ms)")
+    print(f"haalbare fps (gem) : {1000.0 / gemiddeld:6.1f}")
+    kaart.close()
+
+
+if __name__ == "__main__":
+    main()
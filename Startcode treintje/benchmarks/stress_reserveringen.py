@@ -0,0 +1,148 @@
+# stress_reserveringen.py - Stresstest voor de ReserveringsAllocator met veel kiosken tegelijk
+# Starten vanuit de map "Startcode treintje":
+#   python -m benchmarks.stress_reserveringen
+#
+# Elke kiosk heeft een eigen allocator en een eigen verbindingspool naar hetzelfde SQLite bestand,
+# net als losse kiosken in het park. Alle kiosken vuren tegelijk willekeurige reserveringen en
+# annuleringen af. Na afloop controleren we in de database dat geen enkel segment van geen enkele
+# trein boven de capaciteit zit en dat het aantal rijen klopt met wat de kiosken hebben geaccepteerd.
+
+import os
+import random
+import tempfile
+import threading
+import time
+
+from database.verbinding import maak_schema, sqlite_pool
+from planning.reserveringen import AL_GERESERVEERD, GERESERVEERD, ONGELDIG, ReserveringsAllocator
+
+HALTES = ["Perron 1", "Rollercoaster", "Ferris Wheel", "Perron 2", "Haunted House", "Meer", "Bos", "Perron 3"]
+TREINEN = [1, 2, 3]
+CAPACITEIT = 6
+AANTAL_QR = 3000
+
+
+def maak_database(pad):
+    pool = sqlite_pool(pad)
+    maak_schema(pool)
+    pool.voer_veel_uit(
+        "INSERT INTO Locatie (naam, beschrijving, wachttijd, loc_x, loc_y) VALUES (?, ?, 0, 0, 0)",
+        [(naam, naam) for naam in HALTES],
+    )
+    pool.voer_veel_uit("INSERT INTO Trein (max_capaciteit) VALUES (?)", [(CAPACITEIT,) for _ in TREINEN])
+    pool.voer_veel_uit("INSERT INTO QRCode (data, datum) VALUES (?, ?)", [(f"QR-{i}", "2026-10-18") for i in range(AANTAL_QR)])
+    return pool
+
+
+def kiosk(pad, seed, aanvragen, resultaten):
+    pool = sqlite_pool(pad, grootte=1)
+    allocator = ReserveringsAllocator(pool, HALTES, capaciteit=lambda _trein: CAPACITEIT)
+    rng = random.Random(seed)
+    eigen = []
+    for _ in range(aanvragen):
+        if eigen and rng.random() < 0.3:
+            qr_id, trein_id = eigen.pop(rng.randrange(len(eigen)))
+            if allocator.annuleer(qr_id, trein_id):
+                resultaten["geannuleerd"] += 1
+            continue
+        van, naar = rng.sample(range(len(HALTES)), 2)
+        qr_id = rng.randint(1, AANTAL_QR)
+        trein_id = rng.choice(TREINEN)
+        if allocator.reserveer(qr_id, trein_id, HALTES[van], HALTES[naar]) == GERESERVEERD:
+            eigen.append((qr_id, trein_id))
+    with resultaten["lock"]:
+        for naam, waarde in allocator.tellers().items():
+            resultaten[naam] += waarde
+    pool.sluit()
+
+
+def controleer(pool):
+    allocator = ReserveringsAllocator(pool, HALTES, capaciteit=lambda _trein: CAPACITEIT)
+    fouten = 0
+    for trein_id in TREINEN:
+        bezet = [0] * len(HALTES)
+        for rij in pool.haal_op("SELECT van_halte, naar_halte FROM Reservering WHERE trein_id = ?", (trein_id,)):
+            for (a, b) in allocator.bereiken(rij["van_halte"], rij["naar_halte"]):
+                for segment in range(a, b):
+                    bezet[segment] += 1
+        fouten += sum(1 for aantal in bezet if aantal > CAPACITEIT)
+    return fouten
+
+
+# Een nieuwe kiosk op een database waar de trein al vol gereserveerd is: vrij() moet 0 geven, niet de capaciteit.
+# Daarna reserveert een andere kiosk een plek op een andere trein; de eerste kiosk moet dat ook zien.
+
+def controleer_nieuwe_kiosk(pad):
+    pool = sqlite_pool(pad, grootte=1)
+    pool.voer_veel_uit(
+        "INSERT INTO Reservering (qr_id, trein_id, type_behoefte, van_halte, naar_halte) VALUES (?, 1, 'rolstoel', 0, ?)",
+        [(qr_id, len(HALTES) - 1) for qr_id in range(1, CAPACITEIT + 1)],
+    )
+    nieuw = ReserveringsAllocator(pool, HALTES, capaciteit=lambda _trein: CAPACITEIT)
+    fouten = 0
+    if nieuw.vrij(1, HALTES[0], HALTES[-1]) != 0:
+        fouten += 1
+    ander = ReserveringsAllocator(sqlite_pool(pad, grootte=1), HALTES, capaciteit=lambda _trein: CAPACITEIT)
+    voor = nieuw.vrij(2, HALTES[0], HALTES[1])
+    if ander.reserveer(CAPACITEIT + 1, 2, HALTES[0], HALTES[1]) != GERESERVEERD or nieuw.vrij(2, HALTES[0], HALTES[1]) != voor - 1:
+        fouten += 1
+    ander.annuleer(CAPACITEIT + 1, 2)
+    pool.voer_uit("DELETE FROM Reservering")
+    ander.pool.sluit()
+    pool.sluit()
+    return fouten
+
+
+# Twee keer dezelfde reservering is AL_GERESERVEERD; een onbekende qr_id of trein_id is ONGELDIG, niet AL_GERESERVEERD
+
+def controleer_uitkomsten(pad):
+    pool = sqlite_pool(pad, grootte=1)
+    allocator = ReserveringsAllocator(pool, HALTES, capaciteit=lambda _trein: CAPACITEIT)
+    uitkomsten = {
+        "nieuw": (allocator.reserveer(1, 3, HALTES[0], HALTES[1]), GERESERVEERD),
+        "nog een keer": (allocator.reserveer(1, 3, HALTES[0], HALTES[1]), AL_GERESERVEERD),
+        "onbekende qr_id": (allocator.reserveer(AANTAL_QR + 1, 3, HALTES[0], HALTES[1]), ONGELDIG),
+        "onbekende trein_id": (allocator.reserveer(1, len(TREINEN) + 1, HALTES[0], HALTES[1]), ONGELDIG),
+    }
+    allocator.annuleer(1, 3)
+    pool.sluit()
+    return [f"{naam}: {kreeg} (verwacht {verwacht})" for naam, (kreeg, verwacht) in uitkomsten.items() if kreeg != verwacht]
+
+
+def main(kiosken=16, aanvragen_per_kiosk=400):
+    with tempfile.TemporaryDirectory() as map_:
+        pad = os.path.join(map_, "stress.db")
+        pool = maak_database(pad)
+        if controleer_nieuwe_kiosk(pad):
+            raise SystemExit("STRESSTEST MISLUKT: een nieuwe kiosk ziet de bestaande reserveringen niet")
+        fouten = controleer_uitkomsten(pad)
+        if fouten:
+            raise SystemExit(f"STRESSTEST MISLUKT: {', '.join(fouten)}")
+        resultaten = {"lock": threading.Lock(), "geaccepteerd": 0, "afgewezen": 0, "conflicten": 0, "geannuleerd": 0}
+
+        threads = [threading.Thread(target=kiosk, args=(pad, seed, aanvragen_per_kiosk, resultaten)) for seed in range(kiosken)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duur = time.perf_counter() - start
+
+        rijen = pool.haal_op("SELECT COUNT(*) AS n FROM Reservering")[0]["n"]
+        fouten = controleer(pool)
+        pool.sluit()
+
+    totaal = kiosken * aanvragen_per_kiosk
+    print(f"{kiosken} kiosken x {aanvragen_per_kiosk} aanvragen = {totaal} in {duur:.2f} s ({totaal / duur:,.0f} aanvragen/s)")
+    print(f"geaccepteerd {resultaten['geaccepteerd']}, afgewezen {resultaten['afgewezen']}, "
+          f"geannuleerd {resultaten['geannuleerd']}, conflicten (opnieuw geprobeerd) {resultaten['conflicten']}")
+    verwacht = resultaten["geaccepteerd"] - resultaten["geannuleerd"]
+    print(f"rijen in Reservering: {rijen} (verwacht {verwacht})")
+    print(f"segmenten boven capaciteit: {fouten}")
+    if fouten or rijen != verwacht:
+        raise SystemExit("STRESSTEST MISLUKT")
+    print("stresstest geslaagd")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,499 @@
+# suite.py - Benchmark suite voor de hete paden van de GUI (draait zonder scherm)
+# Starten vanuit de map "Startcode treintje":
+#   QT_QPA_PLATFORM=offscreen python -m benchmarks.suite                 meten en vergelijken met drempels.json
+#   QT_QPA_PLATFORM=offscreen python -m benchmarks.suite --zet-drempels  drempels opnieuw vastleggen
+#   QT_QPA_PLATFORM=offscreen python -m benchmarks.suite --snel          minder herhalingen (bijv. in CI)
+#
+# Wat wordt gemeten (alle tijden in ms):
+#   paint        : MapWidget.paintEvent, volledig en dirty-rect, voor verschillende aantallen markers en groottes
+#   klik         : MapWidget.mousePressEvent (hit-test) op markers en op lege plekken
+#   update       : van train_updated.emit in Scherm2 tot de paint van de kaart in Scherm4 (via het gedeelde kaartmodel)
+#   scherm4      : Scherm4.showEvent en de hele paginawissel
+#   spoor        : de kaart met het spoor van een trein met een volle historie, live en bij het terugspelen
+#   render       : één frame van de renderklok terwijl 1, 100 of 1000 treinen naar hun nieuwe positie rijden
+#   zoom         : pannen en zoomen op de inzoombare kaart van Scherm4 met 3300 markers
+#   koude_start  : main.main() in een nieuw proces tot de kiosk interactief is
+#
+# De resultaten komen in resultaten.json. Staat een meting in drempels.json en is hij hoger dan de drempel,
+# dan wordt hij als regressie gemeld en eindigt het script met exitcode 1.
+
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEvent, QObject, QPointF, Qt
+from PyQt6.QtGui import QMouseEvent, QShowEvent
+from PyQt6.QtWidgets import QApplication
+
+MAP = os.path.dirname(os.path.abspath(__file__))
+PROJECT = os.path.dirname(MAP)
+RESULTATEN = os.path.join(MAP, "resultaten.json")
+DREMPELS = os.path.join(MAP, "drempels.json")
+
+# Drempel = meting * marge + minimum; de marge vangt ruis tussen machines en runs op,
+# het minimum voorkomt dat metingen van een paar microseconden bij elke hik als regressie tellen.
+# p99 is veel gevoeliger voor toevallige pauzes (GC, scheduler) en krijgt daarom meer ruimte.
+
+MARGE = 2.0
+MINIMUM_MS = 0.05
+MARGE_P99 = 3.0
+MINIMUM_P99_MS = 1.0
+
+
+def percentiel(waarden, p):
+    gesorteerd = sorted(waarden)
+    return gesorteerd[min(len(gesorteerd) - 1, int(len(gesorteerd) * p))]
+
+
+def samenvatting(naam, tijden):
+    return {
+        f"{naam}/gem_ms": statistics.fmean(tijden),
+        f"{naam}/p50_ms": percentiel(tijden, 0.50),
+        f"{naam}/p99_ms": percentiel(tijden, 0.99),
+    }
+
+
+def meet_elk(functie, herhalingen, opwarmen=3):
+    for _ in range(opwarmen):
+        functie()
+    tijden = []
+    for _ in range(herhalingen):
+        start = time.perf_counter()
+        functie()
+        tijden.append((time.perf_counter() - start) * 1000.0)
+    return tijden
+
+
+def maak_kaart(aantal_markers, grootte, zoombaar=False):
+    from schermen.scherm2 import MapWidget
+
+    rng = random.Random(42)
+    kaart = MapWidget(zoombaar=zoombaar)
+    kaart.set_attractions([(rng.random(), rng.random(), f"Attractie {i}") for i in range(aantal_markers)])
+    kaart.set_platforms([(rng.random(), rng.random(), f"Perron {i}") for i in range(max(2, aantal_markers // 10))])
+    kaart.setFixedSize(grootte, grootte)
+    kaart.show()
+    QApplication.processEvents()
+    return kaart
+
+
+# paintEvent: de hele kaart vanuit de statische laag, en alleen de rechthoek rond een bewegende trein.
+# De renderklok staat op pauze zodat de trein meteen op zijn nieuwe plek staat; de klok zelf meet "render".
+
+def meet_paint(herhalingen):
+    rng = random.Random(7)
+    resultaat = {}
+    for aantal in (10, 100, 1000):
+        for grootte in (300, 800):
+            kaart = maak_kaart(aantal, grootte)
+            kaart.pauzeer_klok()
+            kaart.repaint()
+
+            def dirty_rect():
+                oud = kaart._dot_rect()
+                kaart.set_dot_normalized(rng.random(), rng.random())
+                kaart.repaint(oud.united(kaart._dot_rect()))
+
+            sleutel = f"paint/markers={aantal}/grootte={grootte}"
+            resultaat.update(samenvatting(f"{sleutel}/volledig", meet_elk(kaart.repaint, herhalingen)))
+            resultaat.update(samenvatting(f"{sleutel}/dirty_rect", meet_elk(dirty_rect, herhalingen)))
+            kaart.close()
+            kaart.deleteLater()
+    QApplication.processEvents()
+    return resultaat
+
+
+# mousePressEvent: klikken precies op een marker (treffer) en op willekeurige plekken (meestal mis)
+
+def meet_klik(herhalingen):
+    rng = random.Random(11)
+    resultaat = {}
+    for aantal in (100, 1000, 10000):
+        kaart = maak_kaart(aantal, 800)
+        kaart._zorg_voor_layout()
+        markers = kaart._last_attraction_positions
+        geklikt = []
+        kaart.attraction_clicked.connect(geklikt.append)
+
+        def klik(x, y):
+            event = QMouseEvent(
+                QEvent.Type.MouseButtonPress, QPointF(x, y), QPointF(x, y),
+                Qt.MouseButton.LeftButton, Qt.MouseButton.LeftButton, Qt.KeyboardModifier.NoModifier,
+            )
+            kaart.mousePressEvent(event)
+
+        treffers = [markers[rng.randrange(len(markers))][:2] for _ in range(herhalingen + 10)]
+        lukraak = [(rng.uniform(0, 800), rng.uniform(0, 800)) for _ in range(herhalingen + 10)]
+        sleutel = f"klik/markers={aantal}"
+        resultaat.update(samenvatting(f"{sleutel}/treffer", meet_elk(lambda: klik(*treffers.pop()), herhalingen)))
+        resultaat.update(samenvatting(f"{sleutel}/lukraak", meet_elk(lambda: klik(*lukraak.pop()), herhalingen)))
+        if not geklikt:
+            raise RuntimeError("hit-test benchmark heeft geen enkele attractie geraakt")
+        kaart.close()
+        kaart.deleteLater()
+    QApplication.processEvents()
+    return resultaat
+
+
+# Zet een tijdstempel bij de eerste paint van een widget na elke update
+
+class PaintKlok(QObject):
+    def __init__(self, widget):
+        super().__init__()
+        self.laatste = None
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and self.laatste is None:
+            self.laatste = time.perf_counter()
+        return False
+
+
+def maak_venster():
+    from schermen.main_window import MainWindow
+
+    venster = MainWindow(voorverwarmen=False)
+    venster.show()
+    QApplication.processEvents()
+    return venster
+
+
+# train_updated: Scherm2 verwerkt een nieuwe positie en emit train_updated.
+# Scherm4 staat open en tekent uit hetzelfde kaartmodel; we meten tot zijn kaart getekend is.
+
+def meet_update(herhalingen):
+    venster = maak_venster()
+    s2 = venster.scherm2
+    venster.toon_pagina("scherm4")
+    QApplication.processEvents()
+    s4 = venster.scherm4
+    klok = PaintKlok(s4.map_widget)
+
+    uitgezonden = []
+    s2.train_updated.connect(lambda info, pos: uitgezonden.append(time.perf_counter()))
+
+    rng = random.Random(3)
+    tijden = []
+    for _ in range(herhalingen):
+        klok.laatste = None
+        s2.verwerk_telemetrie({
+            s2.trein_id: (b"LS", s2.trein_id, time.time(), rng.random(), rng.random(), 10, 20, 3.0),
+        })
+        deadline = time.perf_counter() + 1.0
+        while klok.laatste is None and time.perf_counter() < deadline:
+            QApplication.processEvents()
+        if klok.laatste is not None and uitgezonden:
+            tijden.append((klok.laatste - uitgezonden[-1]) * 1000.0)
+
+    venster.close()
+    if not tijden:
+        raise RuntimeError("Scherm4 is na train_updated niet opnieuw getekend")
+    return samenvatting("update/train_updated_tot_paint", tijden)
+
+
+# Scherm4.showEvent: wat er bij het tonen van de vergrote kaart gebeurt.
+# Daarnaast de hele wissel scherm2 -> scherm4 inclusief layout en paint.
+
+def meet_scherm4(herhalingen):
+    venster = maak_venster()
+    s2 = venster.scherm2
+    s4 = venster.scherm4
+    venster.toon_pagina("scherm4")
+    QApplication.processEvents()
+
+    resultaat = samenvatting("scherm4/showEvent", meet_elk(lambda: s4.showEvent(QShowEvent()), herhalingen))
+
+    def wissel():
+        venster.toon_pagina(s2)
+        venster.toon_pagina(s4)
+        QApplication.processEvents()
+
+    resultaat.update(samenvatting("scherm4/paginawissel", meet_elk(wissel, max(10, herhalingen // 5))))
+    venster.close()
+    return resultaat
+
+
+# Spoor: een trein met een volle ringbuffer (een uur rijden, met wat ruis) en het spoor aan.
+#   volledig       : de hele kaart opnieuw, het vereenvoudigde spoor komt uit de cache
+#   nieuwe_positie : één nieuwe positie in de historie tot en met de paint (alleen het laatste blok opnieuw vereenvoudigen)
+#   terugspelen    : één stap afspelen op 64x (40 ms verder op de tijdlijn) en tekenen
+#   zoeken         : naar een willekeurig moment springen en tekenen (vaste laag van het spoor opnieuw)
+
+def meet_spoor(herhalingen):
+    from live.historie import CAPACITEIT, MIN_INTERVAL
+
+    kaart = maak_kaart(100, 800)
+    model = kaart.model
+    tijd = [0.0]
+    model._klok = lambda: tijd[0]
+    rng = random.Random(5)
+    for i in range(CAPACITEIT):
+        tijd[0] += MIN_INTERVAL
+        model.zet_positie(0.5 + 0.4 * math.cos(i / 300) + rng.gauss(0, 0.002), 0.5 + 0.4 * math.sin(i / 300))
+    trein_id = int(model.vloot.ids[0])
+    kaart.set_spoor(trein_id)
+    kaart.repaint()
+
+    def nieuwe_positie():
+        tijd[0] += MIN_INTERVAL
+        hoek = tijd[0] / MIN_INTERVAL / 300
+        model.zet_positie(0.5 + 0.4 * math.cos(hoek), 0.5 + 0.4 * math.sin(hoek))
+        QApplication.processEvents()
+
+    begin, eind = model.historie.bereik()
+    speeltijd = [begin]
+
+    def terugspelen():
+        speeltijd[0] = begin + (speeltijd[0] - begin + 64 * 0.04) % (eind - begin)
+        kaart.set_terugspeeltijd(speeltijd[0])
+        kaart.repaint()
+
+    def zoeken():
+        kaart.set_terugspeeltijd(rng.uniform(begin, eind))
+        kaart.repaint()
+
+    resultaat = samenvatting("spoor/volledig", meet_elk(kaart.repaint, herhalingen))
+    resultaat.update(samenvatting("spoor/nieuwe_positie", meet_elk(nieuwe_positie, herhalingen)))
+    resultaat.update(samenvatting("spoor/terugspelen", meet_elk(terugspelen, herhalingen)))
+    resultaat.update(samenvatting("spoor/zoeken", meet_elk(zoeken, max(10, herhalingen // 5))))
+    kaart.close()
+    kaart.deleteLater()
+    QApplication.processEvents()
+    return resultaat
+
+
+# Renderklok: alle treinen krijgen een nieuwe positie en rijden daar in STANDAARD_DUUR naartoe.
+# Eén frame is een tik (posities interpoleren, de bewegende rechthoeken) plus de paint die daarop volgt.
+# Tussen twee frames wachten we één verversing van het scherm, net als de klok zelf.
+# Zodra de treinen aangekomen zijn krijgen ze buiten de meting een nieuwe positie.
+
+def meet_render(herhalingen):
+    from live.vloot import Vloot
+
+    resultaat = {}
+    for aantal in (1, 100, 1000):
+        rng = random.Random(13)
+        kaart = maak_kaart(100, 800)
+        vloot = Vloot(capaciteit=aantal)
+        for trein_id in range(aantal):
+            vloot.voeg_toe(trein_id, rng.random(), rng.random())
+        kaart.set_vloot(vloot)
+        kaart.repaint()
+
+        tijden = []
+        while len(tijden) < herhalingen:
+            if not kaart._beweging.beweegt(time.perf_counter()):
+                vloot.zet_posities([(rng.random(), rng.random()) for _ in range(aantal)])
+                kaart.vloot_bijgewerkt()
+                QApplication.processEvents()
+            start = time.perf_counter()
+            kaart._tik()
+            QApplication.processEvents()
+            tijden.append((time.perf_counter() - start) * 1000.0)
+            kaart._klok.stop()
+            time.sleep(kaart._frame_s)
+        resultaat.update(samenvatting(f"render/treinen={aantal}/frame", tijden))
+        kaart.close()
+        kaart.deleteLater()
+    QApplication.processEvents()
+    return resultaat
+
+
+# Inzoombare kaart met een park vol markers (3000 attracties, 300 perrons), 800x800:
+#   pannen       : tot 20 pixels verschuiven op niveau 6 en tekenen (meestal uit de tegelcache, soms nieuwe tegels)
+#   zoomen       : één stap naar een niveau dat nog niet bekend is (labels wegstrepen en alle tegels nieuw),
+#                  tot het eerste beeld; de tegels die niet in het budget van die paint passen komen daarna
+#   zoomen_af    : dezelfde stap tot alle tegels getekend zijn
+#   zoomen_terug : heen en weer tussen twee niveaus die al in de cache staan
+
+def meet_zoom(herhalingen):
+    rng = random.Random(17)
+    kaart = maak_kaart(3000, 800, zoombaar=True)
+    kaart.pauzeer_klok()
+    kaart.zoom(6)
+    kaart.repaint()
+
+    def pannen():
+        kaart.verschuif(rng.randint(-20, 20), rng.randint(-20, 20))
+        kaart.repaint()
+
+    resultaat = samenvatting("zoom/pannen", meet_elk(pannen, herhalingen * 10))
+
+    tijden = []
+    af = []
+    for i in range(herhalingen):
+        kaart.zoom(4 - kaart.niveau)
+        kaart.repaint()
+        while kaart._onaf is not None:
+            QApplication.processEvents()
+        kaart._niveaus.leeg()
+        kaart._tegels.leeg()
+        start = time.perf_counter()
+        kaart.zoom(1)
+        kaart.repaint()
+        tijden.append((time.perf_counter() - start) * 1000.0)
+        while kaart._onaf is not None:
+            QApplication.processEvents()
+        af.append((time.perf_counter() - start) * 1000.0)
+    resultaat.update(samenvatting("zoom/zoomen", tijden))
+    resultaat.update(samenvatting("zoom/zoomen_af", af))
+
+    def zoomen_terug():
+        kaart.zoom(1 if kaart.niveau == 4 else -1)
+        kaart.repaint()
+
+    resultaat.update(samenvatting("zoom/zoomen_terug", meet_elk(zoomen_terug, herhalingen)))
+    kaart.close()
+    kaart.deleteLater()
+    QApplication.processEvents()
+    return resultaat
+
+
+# main.main() in een nieuw proces. Het kind stopt de event loop zodra Opstartmeting "interactief" meldt
+# en schrijft de mijlpalen naar LSM_OPSTART_RAPPORT.
+
+def koude_start_kind():
+    import main
+    from schermen.opstartmeting import Opstartmeting
+
+    interactief = Opstartmeting._interactief
+
+    def _interactief_en_stop(self):
+        interactief(self)
+        QApplication.instance().quit()
+
+    Opstartmeting._interactief = _interactief_en_stop
+    main.main()
+
+
+def meet_koude_start(herhalingen):
+    omgeving = dict(os.environ)
+    omgeving.pop("LSM_DATABASE", None)
+    omgeving.pop("LSM_SNAPSHOT", None)
+    mijlpalen = {}
+    totaal = []
+    for _ in range(herhalingen):
+        with tempfile.TemporaryDirectory() as map_:
+            pad = os.path.join(map_, "opstart.json")
+            omgeving["LSM_OPSTART_RAPPORT"] = pad
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.suite", "--koude-start-kind"],
+                cwd=PROJECT, env=omgeving, check=True, capture_output=True, timeout=60,
+            )
+            totaal.append((time.perf_counter() - start) * 1000.0)
+            with open(pad) as f:
+                for naam, ms in json.load(f)["mijlpalen_ms"].items():
+                    mijlpalen.setdefault(naam, []).append(ms)
+
+    resultaat = {"koude_start/proces_ms": statistics.median(totaal)}
+    for naam, waarden in mijlpalen.items():
+        resultaat[f"koude_start/{naam}_ms"] = statistics.median(waarden)
+    return resultaat
+
+
+ONDERDELEN = {
+    "paint": meet_paint,
+    "klik": meet_klik,
+    "update": meet_update,
+    "scherm4": meet_scherm4,
+    "spoor": meet_spoor,
+    "render": meet_render,
+    "zoom": meet_zoom,
+    "koude_start": meet_koude_start,
+}
+
+
+def vergelijk(metingen, drempels):
+    regressies = []
+    for naam, drempel in drempels.items():
+        waarde = metingen.get(naam)
+        if waarde is not None and waarde > drempel:
+            regressies.append((naam, waarde, drempel))
+    return regressies
+
+
+def maak_drempels(metingen):
+    drempels = {}
+    for naam, waarde in sorted(metingen.items()):
+        if naam.endswith("/p99_ms"):
+            drempels[naam] = round(waarde * MARGE_P99 + MINIMUM_P99_MS, 3)
+        else:
+            drempels[naam] = round(waarde * MARGE + MINIMUM_MS, 3)
+    return drempels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite voor de GUI van Lake Side Mania")
+    parser.add_argument("onderdelen", nargs="*", help=f"alleen deze onderdelen meten ({', '.join(ONDERDELEN)})")
+    parser.add_argument("--snel", action="store_true", help="minder herhalingen")
+    parser.add_argument("--uitvoer", default=RESULTATEN)
+    parser.add_argument("--drempels", default=DREMPELS)
+    parser.add_argument("--zet-drempels", action="store_true", help="drempels vastleggen op basis van deze meting")
+    parser.add_argument("--koude-start-kind", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.koude_start_kind:
+        koude_start_kind()
+        return 0
+    onbekend = [naam for naam in args.onderdelen if naam not in ONDERDELEN]
+    if onbekend:
+        parser.error(f"onbekend onderdeel: {', '.join(onbekend)}")
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    herhalingen = {"paint": 200, "klik": 500, "update": 30, "scherm4": 50, "spoor": 200, "render": 100, "zoom": 20, "koude_start": 3}
+    if args.snel:
+        herhalingen = {naam: max(1, n // 5) for naam, n in herhalingen.items()}
+
+    metingen = {}
+    for naam in args.onderdelen or ONDERDELEN:
+        start = time.perf_counter()
+        metingen.update(ONDERDELEN[naam](herhalingen[naam]))
+        print(f"{naam:<12} klaar in {time.perf_counter() - start:6.2f} s")
+    app.processEvents()
+
+    drempels = {}
+    if os.path.exists(args.drempels):
+        with open(args.drempels) as f:
+            drempels = json.load(f)
+    if args.zet_drempels:
+        drempels.update(maak_drempels(metingen))
+        with open(args.drempels, "w") as f:
+            json.dump(dict(sorted(drempels.items())), f, indent=2)
+            f.write("\n")
+        print(f"{len(metingen)} drempels geschreven naar {args.drempels}")
+
+    regressies = vergelijk(metingen, drempels)
+    with open(args.uitvoer, "w") as f:
+        json.dump({
+            "tijdstip": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": QApplication.platformName(),
+            "metingen": dict(sorted(metingen.items())),
+            "regressies": [{"meting": n, "waarde": w, "drempel": d} for (n, w, d) in regressies],
+        }, f, indent=2)
+        f.write("\n")
+
+    print()
+    print(f"{'meting':<58} {'waarde':>10} {'drempel':>10}")
+    for naam, waarde in sorted(metingen.items()):
+        drempel = drempels.get(naam)
+        teken = "  REGRESSIE" if drempel is not None and waarde > drempel else ""
+        tekst = f"{drempel:>10.3f}" if drempel is not None else f"{'-':>10}"
+        print(f"{naam:<58} {waarde:>10.3f} {tekst}{teken}")
+    print()
+    print(f"{len(regressies)} regressie(s), resultaten in {args.uitvoer}")
+    return 1 if regressies else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# bezetting.py - Hoeveel mensen zitten er nu in een trein of zijn er bij een locatie
+# In plaats van elke keer COUNT(*) over de hele Reis tabel te doen, houden triggers in de database
+# per trein en per locatie een teller bij (TreinBezetting / LocatieBezetting). Elke check-in telt
+# één op, elke check-out telt één af bij de trein en locatie van de check-in (OpenReis onthoudt die per QR-code).
+# Lezen is daardoor één opzoeking op de primary key.
+
+
+# Klasse : Bezetting
+# check_in / check_uit schrijven een rij in Reis, de tellers worden door de triggers in dezelfde transactie bijgewerkt
+
+class Bezetting:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def check_in(self, qr_id, locatie_id, trein_id=None):
+        self._schrijf(qr_id, locatie_id, trein_id, 1)
+
+    def check_uit(self, qr_id, locatie_id, trein_id=None):
+        self._schrijf(qr_id, locatie_id, trein_id, 0)
+
+    def _schrijf(self, qr_id, locatie_id, trein_id, ingecheckt):
+        self.pool.voer_uit(
+            "INSERT INTO Reis (qr_id, trein_id, locatie_id, ingecheckt) VALUES (?, ?, ?, ?)",
+            (qr_id, trein_id, locatie_id, ingecheckt),
+        )
+
+# Lezen uit de tellers. De tellers horen nooit negatief te zijn; max(0, ...) is alleen een vangnet.
+
+    def in_trein(self, trein_id):
+        rijen = self.pool.haal_op("SELECT aanwezig FROM TreinBezetting WHERE trein_id = ?", (trein_id,))
+        return max(0, rijen[0]["aanwezig"]) if rijen else 0
+
+    def bij_locatie(self, locatie_id):
+        rijen = self.pool.haal_op("SELECT aanwezig FROM LocatieBezetting WHERE locatie_id = ?", (locatie_id,))
+        return max(0, rijen[0]["aanwezig"]) if rijen else 0
+
+# Beschikbare plekken (max_capaciteit min bezetting) en de capaciteit, in één query
+
+    def plekken_beschikbaar(self, trein_id):
+        rijen = self.pool.haal_op(
+            "SELECT t.max_capaciteit, COALESCE(b.aanwezig, 0) AS aanwezig "
+            "FROM Trein t LEFT JOIN TreinBezetting b ON b.trein_id = t.trein_id WHERE t.trein_id = ?",
+            (trein_id,),
+        )
+        if not rijen:
+            return None
+        capaciteit = rijen[0]["max_capaciteit"]
+        return max(0, capaciteit - max(0, rijen[0]["aanwezig"])), capaciteit
+
+# Zet de tellers opnieuw op basis van alle rijen in Reis (bijvoorbeeld na een import buiten de triggers om).
+# Per QR-code telt alleen de laatste scan: is dat een check-in, dan is die open en telt hij mee bij zijn trein en locatie.
+
+    def herbereken(self):
+        with self.pool.verbinding() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM OpenReis")
+            cursor.execute("DELETE FROM TreinBezetting")
+            cursor.execute("DELETE FROM LocatieBezetting")
+            cursor.execute(
+                "INSERT INTO OpenReis (qr_id, reis_check_id, trein_id, locatie_id) "
+                "SELECT r.qr_id, r.reis_check_id, r.trein_id, r.locatie_id FROM Reis r "
+                "JOIN (SELECT qr_id, MAX(reis_check_id) AS laatste FROM Reis GROUP BY qr_id) l "
+                "ON r.reis_check_id = l.laatste WHERE r.ingecheckt = 1"
+            )
+            cursor.execute(
+                "INSERT INTO TreinBezetting (trein_id, aanwezig) "
+                "SELECT trein_id, COUNT(*) FROM OpenReis WHERE trein_id IS NOT NULL GROUP BY trein_id"
+            )
+            cursor.execute(
+                "INSERT INTO LocatieBezetting (locatie_id, aanwezig) "
+                "SELECT locatie_id, COUNT(*) FROM OpenReis GROUP BY locatie_id"
+            )
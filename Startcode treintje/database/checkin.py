@@ -0,0 +1,161 @@
+# checkin.py - Write-behind pijplijn voor QR-scans bij de poorten (rijen in Reis)
+# Bij de opening van het park en bij de uitgangen van attracties komen scans in pieken binnen.
+# In plaats van per scan een eigen transactie te doen, zetten we scans in een begrensde wachtrij.
+# Een achtergrondthread schrijft ze in batches (meerdere rijen per INSERT, één transactie per batch).
+# Een batch wordt weggeschreven als hij vol is of als de oudste scan te lang wacht.
+# Elke scan heeft een scan_id (UNIQUE in Reis), dus een batch opnieuw proberen levert nooit dubbele rijen op.
+
+import queue
+import threading
+import time
+import uuid
+
+KOLOMMEN = ("qr_id", "trein_id", "locatie_id", "ingecheckt", "scan_id")
+
+# SQLite staat standaard maximaal 999 parameters per query toe
+
+MAX_PARAMETERS = 999
+
+
+# Klasse : CheckinPijplijn
+# max_wachtrij : maximaal aantal scans dat op schrijven wacht (daarna weigert aanbieden)
+# batch_grootte: maximaal aantal scans per transactie
+# deadline     : maximaal aantal seconden dat een scan in de wachtrij blijft voordat er geschreven wordt
+# pogingen     : aantal keer dat een batch opnieuw wordt geprobeerd voordat hij als mislukt telt
+
+class CheckinPijplijn:
+    def __init__(self, pool, max_wachtrij=10_000, batch_grootte=500, deadline=0.05, pogingen=5):
+        self.pool = pool
+        self.batch_grootte = batch_grootte
+        self.deadline = deadline
+        self.pogingen = pogingen
+        self._wachtrij = queue.Queue(maxsize=max_wachtrij)
+        self._stop = threading.Event()
+        self._thread = None
+        self.mislukte_batches = []
+
+        self.aangeboden = 0
+        self.geweigerd = 0
+        self.geschreven = 0
+        self.dubbel = 0
+        self.batches = 0
+        self.herhalingen = 0
+
+        per_query = max(1, min(batch_grootte, MAX_PARAMETERS // len(KOLOMMEN)))
+        self._rijen_per_query = per_query
+        self._insert = _insert_sql(pool.dialect, per_query)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._draai, name="checkin", daemon=True)
+            self._thread.start()
+        return self
+
+# Stopt de thread nadat alles wat nog in de wachtrij staat is weggeschreven
+
+    def stop(self, timeout=10.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+# Zet een scan in de wachtrij. Is de wachtrij vol, dan wachten we maximaal timeout seconden
+# en geven we False terug als er nog steeds geen plek is (tegendruk naar de poort).
+
+    def aanbieden(self, qr_id, locatie_id, ingecheckt, trein_id=None, scan_id=None, timeout=0.1):
+        rij = (qr_id, trein_id, locatie_id, 1 if ingecheckt else 0, scan_id or uuid.uuid4().hex)
+        try:
+            self._wachtrij.put(rij, timeout=timeout)
+        except queue.Full:
+            self.geweigerd += 1
+            return False
+        self.aangeboden += 1
+        return True
+
+    def wachtend(self):
+        return self._wachtrij.qsize()
+
+    def loopt(self):
+        return self._thread is not None and self._thread.is_alive()
+
+# Wacht tot alle aangeboden scans zijn weggeschreven (of mislukt)
+
+    def leeg(self, timeout=10.0):
+        einde = time.monotonic() + timeout
+        while self._wachtrij.unfinished_tasks and time.monotonic() < einde:
+            time.sleep(0.001)
+        return self._wachtrij.unfinished_tasks == 0
+
+    def tellers(self):
+        return {
+            "aangeboden": self.aangeboden,
+            "geweigerd": self.geweigerd,
+            "geschreven": self.geschreven,
+            "dubbel": self.dubbel,
+            "batches": self.batches,
+            "herhalingen": self.herhalingen,
+            "mislukt": sum(len(batch) for batch in self.mislukte_batches),
+            "wachtend": self.wachtend(),
+        }
+
+# Hoofdlus: wacht op de eerste scan en verzamel daarna tot de batch vol is of de deadline verloopt
+
+    def _draai(self):
+        while not (self._stop.is_set() and self._wachtrij.empty()):
+            try:
+                eerste = self._wachtrij.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            batch = [eerste]
+            einde = time.monotonic() + self.deadline
+            while len(batch) < self.batch_grootte:
+                rest = einde - time.monotonic()
+                try:
+                    batch.append(self._wachtrij.get_nowait() if rest <= 0 else self._wachtrij.get(timeout=rest))
+                except queue.Empty:
+                    break
+            self._schrijf_met_herhaling(batch)
+            for _ in batch:
+                self._wachtrij.task_done()
+
+    def _schrijf_met_herhaling(self, batch):
+        wacht = 0.01
+        for poging in range(self.pogingen):
+            try:
+                ingevoegd = self._schrijf(batch)
+                self.batches += 1
+                self.geschreven += ingevoegd
+                self.dubbel += len(batch) - ingevoegd
+                return
+            except Exception:
+                if poging == self.pogingen - 1:
+                    self.mislukte_batches.append(batch)
+                    return
+                self.herhalingen += 1
+                time.sleep(wacht)
+                wacht = min(wacht * 2, 1.0)
+
+# Eén transactie per batch; scans die al bestaan (zelfde scan_id) worden overgeslagen, zie _insert_sql.
+# Geeft het aantal echt ingevoegde rijen terug (rowcount telt de overgeslagen rijen niet mee).
+
+    def _schrijf(self, batch):
+        with self.pool.verbinding() as conn:
+            cursor = conn.cursor()
+            ingevoegd = 0
+            for start in range(0, len(batch), self._rijen_per_query):
+                deel = batch[start:start + self._rijen_per_query]
+                sql = self._insert if len(deel) == self._rijen_per_query else _insert_sql(self.pool.dialect, len(deel))
+                cursor.execute(self.pool.sql(sql), [waarde for rij in deel for waarde in rij])
+                ingevoegd += cursor.rowcount
+        return ingevoegd
+
+
+# Alleen een bestaande scan_id wordt overgeslagen. INSERT OR IGNORE / INSERT IGNORE zou ook rijen weggooien die
+# op NOT NULL, CHECK of (MySQL) een foreign key fout gaan; die moeten als fout de batch laten mislukken.
+# Op MySQL telt een overgeslagen rij als 0 rijen (zolang de verbinding niet met CLIENT_FOUND_ROWS is geopend).
+
+def _insert_sql(dialect, aantal_rijen):
+    waarden = ", ".join(["(" + ", ".join("?" * len(KOLOMMEN)) + ")"] * aantal_rijen)
+    bij_dubbel = "ON CONFLICT (scan_id) DO NOTHING" if dialect == "sqlite" else "ON DUPLICATE KEY UPDATE scan_id = scan_id"
+    return f"INSERT INTO Reis ({', '.join(KOLOMMEN)}) VALUES {waarden} {bij_dubbel}"
@@ -0,0 +1,140 @@
+# feedback.py - Rollups van de feedback (ratings) voor het dashboard op Scherm1
+# De Feedback tabel groeit elke dag, en elke keer GROUP BY over de hele tabel wordt steeds trager.
+# Net als bij de bezetting houden triggers in de database de rollups bij terwijl de feedback binnenkomt:
+#   FeedbackRoute : per route (van -> naar) het aantal ratings per ratingwaarde
+#   FeedbackUur   : per uur het aantal ratings per ratingwaarde
+# Een rating is een geheel getal, dus het aantal per waarde is een exacte verdeling. Daaruit volgen aantal, som,
+# gemiddelde en elk kwantiel zonder benadering, en het blijven een handvol rijen per route of per uur,
+# hoe lang de geschiedenis ook is.
+
+import time
+
+UUR_FORMAAT = "%Y-%m-%d %H:00"
+DASHBOARD_UREN = 24
+
+
+# Klasse : Verdeling
+# Aantal ratings per ratingwaarde. voeg_toe kan per rating (als de feedback binnenkomt) of met een aantal
+# (een rij uit een rollup); twee verdelingen optellen geeft de verdeling van allebei samen.
+
+class Verdeling:
+    __slots__ = ("aantallen", "aantal", "som")
+
+    def __init__(self):
+        self.aantallen = {}
+        self.aantal = 0
+        self.som = 0
+
+    def voeg_toe(self, rating, aantal=1):
+        if aantal <= 0:
+            return
+        self.aantallen[rating] = self.aantallen.get(rating, 0) + aantal
+        self.aantal += aantal
+        self.som += rating * aantal
+
+    def __iadd__(self, andere):
+        for rating, aantal in andere.aantallen.items():
+            self.voeg_toe(rating, aantal)
+        return self
+
+    def gemiddelde(self):
+        return self.som / self.aantal if self.aantal else None
+
+# De kleinste rating waarvoor minstens een fractie q van de ratings kleiner of gelijk is
+
+    def kwantiel(self, q):
+        if not self.aantal:
+            return None
+        doel = q * self.aantal
+        cumulatief = 0
+        for rating in sorted(self.aantallen):
+            cumulatief += self.aantallen[rating]
+            if cumulatief >= doel:
+                return rating
+        return max(self.aantallen)
+
+
+# Klasse : FeedbackRollups
+# geef schrijft een rij in Feedback, de rollups worden door de triggers in dezelfde transactie bijgewerkt
+
+class FeedbackRollups:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def geef(self, qr_code, van_locatie_id, naar_locatie_id, rating, bericht=""):
+        self.pool.voer_uit(
+            "INSERT INTO Feedback (qr_code, van_locatie_id, naar_locatie_id, rating, bericht) VALUES (?, ?, ?, ?, ?)",
+            (qr_code, van_locatie_id, naar_locatie_id, rating, bericht),
+        )
+
+# Veel feedback in één transactie: rijen (qr_code, van_locatie_id, naar_locatie_id, rating, bericht, verzonden_op),
+# bijvoorbeeld uit de parksimulatie met de tijd van de gesimuleerde dag
+
+    def geef_veel(self, rijen):
+        self.pool.voer_veel_uit(
+            "INSERT INTO Feedback (qr_code, van_locatie_id, naar_locatie_id, rating, bericht, verzonden_op) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rijen,
+        )
+
+# Lezen uit de rollups: {(van_naam, naar_naam): Verdeling} en {uur: Verdeling}
+
+    def per_route(self):
+        rijen = self.pool.haal_op(
+            "SELECT v.naam AS van, n.naam AS naar, r.rating, r.aantal FROM FeedbackRoute r "
+            "JOIN Locatie v ON v.locatie_id = r.van_locatie_id JOIN Locatie n ON n.locatie_id = r.naar_locatie_id"
+        )
+        routes = {}
+        for rij in rijen:
+            verdeling = routes.get((rij["van"], rij["naar"]))
+            if verdeling is None:
+                verdeling = routes[(rij["van"], rij["naar"])] = Verdeling()
+            verdeling.voeg_toe(rij["rating"], rij["aantal"])
+        return routes
+
+    def per_uur(self, vanaf):
+        rijen = self.pool.haal_op("SELECT uur, rating, aantal FROM FeedbackUur WHERE uur >= ?", (vanaf,))
+        uren = {}
+        for rij in rijen:
+            verdeling = uren.get(rij["uur"])
+            if verdeling is None:
+                verdeling = uren[rij["uur"]] = Verdeling()
+            verdeling.voeg_toe(rij["rating"], rij["aantal"])
+        return uren
+
+# Alles voor het dashboard: het totaal, de routes (meeste feedback eerst) en de laatste uren (oudste eerst,
+# ook de uren zonder feedback). De uren zijn in UTC, zoals CURRENT_TIMESTAMP in de database.
+
+    def dashboard(self, uren=DASHBOARD_UREN, nu=None):
+        nu = time.time() if nu is None else nu
+        sleutels = [time.strftime(UUR_FORMAAT, time.gmtime(nu - 3600 * i)) for i in reversed(range(uren))]
+        per_uur = self.per_uur(sleutels[0])
+        routes = self.per_route()
+        totaal = Verdeling()
+        for verdeling in routes.values():
+            totaal += verdeling
+        return {
+            "totaal": totaal,
+            "routes": sorted(routes.items(), key=lambda item: -item[1].aantal),
+            "uren": [(sleutel, per_uur.get(sleutel) or Verdeling()) for sleutel in sleutels],
+        }
+
+# Zet de rollups opnieuw op basis van alle rijen in Feedback (bijvoorbeeld na een import buiten de triggers om).
+# Dit is de enige plek waar nog over Feedback wordt gegroepeerd.
+
+    def herbereken(self):
+        uur = ("strftime('%Y-%m-%d %H:00', verzonden_op)" if self.pool.dialect == "sqlite"
+               else "DATE_FORMAT(verzonden_op, '%Y-%m-%d %H:00')")
+        with self.pool.verbinding() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM FeedbackRoute")
+            cursor.execute("DELETE FROM FeedbackUur")
+            cursor.execute(
+                "INSERT INTO FeedbackRoute (van_locatie_id, naar_locatie_id, rating, aantal) "
+                "SELECT van_locatie_id, naar_locatie_id, rating, COUNT(*) FROM Feedback "
+                "GROUP BY van_locatie_id, naar_locatie_id, rating"
+            )
+            cursor.execute(
+                f"INSERT INTO FeedbackUur (uur, rating, aantal) "
+                f"SELECT {uur}, rating, COUNT(*) FROM Feedback GROUP BY {uur}, rating"
+            )
@@ -0,0 +1,231 @@
+# gegevens.py - Alle queries op de LSM_treintje database op één plek
+# De schermen vragen hier hun gegevens op in plaats van zelf SQL te schrijven.
+# Lijsten met id's worden in batches met IN (...) opgehaald, dus één query per batch in plaats van per item.
+
+import os
+
+from .bezetting import Bezetting
+from .feedback import FeedbackRollups
+from .verbinding import maak_schema, sqlite_pool
+
+# loc_x / loc_y staan in de database als gehele getallen van 0 t/m 100 (procent van de kaart)
+
+KAART_SCHAAL = 100
+BATCH_GROOTTE = 500
+
+# Een locatie is een perron als de naam met "Perron" begint, anders is het een attractie
+
+PERRON_PREFIX = "Perron"
+
+
+# Klasse : Gegevens
+# Dunne laag boven een Verbindingspool met een functie per vraag die de app stelt
+
+class Gegevens:
+    def __init__(self, pool):
+        self.pool = pool
+        self.bezetting = Bezetting(pool)
+        self.feedback = FeedbackRollups(pool)
+
+# Locatie
+
+    def locaties(self):
+        return self.pool.haal_op(
+            "SELECT locatie_id, naam, beschrijving, wachttijd, loc_x, loc_y FROM Locatie ORDER BY locatie_id"
+        )
+
+    def locaties_op_id(self, locatie_ids):
+        return self._in_batches(
+            "SELECT locatie_id, naam, beschrijving, wachttijd, loc_x, loc_y FROM Locatie WHERE locatie_id IN ({})",
+            locatie_ids,
+        )
+
+    def wachttijden_voor(self, namen):
+        rijen = self._in_batches("SELECT naam, wachttijd FROM Locatie WHERE naam IN ({})", namen)
+        return {rij["naam"]: rij["wachttijd"] or 0 for rij in rijen}
+
+    def wachttijden(self):
+        rijen = self.pool.haal_op("SELECT naam, wachttijd FROM Locatie WHERE naam NOT LIKE ?", (PERRON_PREFIX + "%",))
+        return {rij["naam"]: rij["wachttijd"] or 0 for rij in rijen}
+
+# Nieuwe wachttijden {locatie_id: minuten} in één transactie (bijvoorbeeld uit de parksimulatie)
+
+    def bewaar_wachttijden(self, wachttijden):
+        self.pool.voer_veel_uit(
+            "UPDATE Locatie SET wachttijd = ? WHERE locatie_id = ?",
+            [(minuten, locatie_id) for locatie_id, minuten in wachttijden.items()],
+        )
+
+# Trein
+
+    def treinen(self):
+        return self.pool.haal_op(
+            "SELECT trein_id, max_capaciteit, vertrekkend_locatie_id, aankomend_locatie_id FROM Trein ORDER BY trein_id"
+        )
+
+    def treinen_op_id(self, trein_ids):
+        return self._in_batches(
+            "SELECT trein_id, max_capaciteit, vertrekkend_locatie_id, aankomend_locatie_id FROM Trein WHERE trein_id IN ({})",
+            trein_ids,
+        )
+
+# Een trein vertrekt van de ene locatie naar de volgende
+
+    def zet_trein_rit(self, trein_id, vertrekkend_locatie_id, aankomend_locatie_id):
+        self.pool.voer_uit(
+            "UPDATE Trein SET vertrekkend_locatie_id = ?, aankomend_locatie_id = ? WHERE trein_id = ?",
+            (vertrekkend_locatie_id, aankomend_locatie_id, trein_id),
+        )
+
+# Reis, Reservering en Feedback
+
+    def reizen_voor_treinen(self, trein_ids):
+        return self._in_batches(
+            "SELECT reis_check_id, qr_id, trein_id, locatie_id, ingecheckt FROM Reis WHERE trein_id IN ({})",
+            trein_ids,
+        )
+
+    def reserveringen(self):
+        return self.pool.haal_op("SELECT qr_id, trein_id, type_behoefte, van_halte, naar_halte FROM Reservering")
+
+    def reserveringen_voor_treinen(self, trein_ids):
+        return self._in_batches(
+            "SELECT qr_id, trein_id, type_behoefte, van_halte, naar_halte FROM Reservering WHERE trein_id IN ({})",
+            trein_ids,
+        )
+
+    def feedback_voor_locaties(self, locatie_ids):
+        return self._in_batches(
+            "SELECT feedback_id, qr_code, van_locatie_id, naar_locatie_id, rating, bericht, verzonden_op "
+            "FROM Feedback WHERE van_locatie_id IN ({})",
+            locatie_ids,
+        )
+
+# Reisplan: de attracties per QR-code {qr_id: [locatie_id, ...]} en de volgorde waarin ze bezocht worden
+# (zie planning/bezoekvolgorde.py). bewaar_volgordes krijgt {qr_id: [locatie_id, ...] in bezoekvolgorde}.
+
+    def reisplannen(self):
+        plannen = {}
+        for rij in self.pool.haal_op("SELECT qr_id, locatie_id FROM Reisplan ORDER BY qr_id, COALESCE(volgorde, 0), locatie_id"):
+            plannen.setdefault(rij["qr_id"], []).append(rij["locatie_id"])
+        return plannen
+
+    def bewaar_volgordes(self, volgordes):
+        self.pool.voer_veel_uit(
+            "UPDATE Reisplan SET volgorde = ? WHERE qr_id = ? AND locatie_id = ?",
+            [(plek, qr_id, locatie_id) for qr_id, volgorde in volgordes.items() for plek, locatie_id in enumerate(volgorde, 1)],
+        )
+
+# Bezetting van alle treinen: {trein_id: aanwezig}
+
+    def treinbezetting(self):
+        return {rij["trein_id"]: rij["aanwezig"] for rij in self.pool.haal_op("SELECT trein_id, aanwezig FROM TreinBezetting")}
+
+# Wijzigingslog (voor de delta-sync van de lokale snapshot, zie snapshot.py)
+
+    def laatste_wijziging(self):
+        rijen = self.pool.haal_op("SELECT MAX(wijziging_id) AS laatste FROM Wijziging")
+        return (rijen[0]["laatste"] or 0) if rijen else 0
+
+    def wijzigingen_sinds(self, wijziging_id, limiet=BATCH_GROOTTE):
+        return self.pool.haal_op(
+            "SELECT wijziging_id, tabel, sleutel FROM Wijziging WHERE wijziging_id > ? ORDER BY wijziging_id LIMIT ?",
+            (wijziging_id, limiet),
+        )
+
+# Alles wat Scherm2 nodig heeft in één keer: attracties, perrons, treinen en reserveringen per trein.
+# Alle queries gaan over één geleende verbinding.
+
+    def laad_kaart(self):
+        with self.pool.verbinding() as conn:
+            cursor = conn.cursor()
+            cursor.execute(self.pool.sql("SELECT naam, wachttijd, loc_x, loc_y FROM Locatie ORDER BY locatie_id"))
+            locaties = cursor.fetchall()
+            cursor.execute(self.pool.sql(
+                "SELECT t.trein_id, t.max_capaciteit, COUNT(r.qr_id) "
+                "FROM Trein t LEFT JOIN Reservering r ON r.trein_id = t.trein_id "
+                "GROUP BY t.trein_id, t.max_capaciteit ORDER BY t.trein_id"
+            ))
+            treinen = cursor.fetchall()
+        return kaart_uit_rijen(locaties, treinen)
+
+# Voert een query met IN ({}) uit voor maximaal BATCH_GROOTTE id's per keer, over één verbinding
+
+    def _in_batches(self, query, ids):
+        ids = list(dict.fromkeys(ids))
+        rijen = []
+        if not ids:
+            return rijen
+        with self.pool.verbinding() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(ids), BATCH_GROOTTE):
+                batch = ids[start:start + BATCH_GROOTTE]
+                cursor.execute(self.pool.sql(query.format(", ".join("?" * len(batch)))), batch)
+                kolommen = [kolom[0] for kolom in cursor.description]
+                rijen.extend(dict(zip(kolommen, rij)) for rij in cursor.fetchall())
+        return rijen
+
+
+# Zet rijen (naam, wachttijd, loc_x, loc_y) en (trein_id, max_capaciteit, reserveringen) om naar de kaart voor Scherm2.
+# Ook gebruikt door de lokale snapshot, zodat die precies hetzelfde formaat teruggeeft.
+
+def kaart_uit_rijen(locaties, treinen):
+    attracties = []
+    perrons = []
+    wachttijden = {}
+    for (naam, wachttijd, loc_x, loc_y) in locaties:
+        if loc_x is None or loc_y is None:
+            continue
+        punt = (loc_x / KAART_SCHAAL, loc_y / KAART_SCHAAL, naam)
+        if naam.startswith(PERRON_PREFIX):
+            perrons.append(punt)
+        else:
+            attracties.append(punt)
+            wachttijden[naam] = wachttijd or 0
+    return {
+        "attracties": attracties,
+        "perrons": perrons,
+        "wachttijden": wachttijden,
+        "treinen": [
+            {"trein_id": trein_id, "max_capaciteit": capaciteit, "reserveringen": aantal}
+            for (trein_id, capaciteit, aantal) in treinen
+        ],
+    }
+
+
+# Demo-gegevens: dezelfde attracties en perrons die eerst hardcoded in Scherm2 stonden
+
+def vul_demo(pool):
+    locaties = [
+        ("Rollercoaster", "Snelle achtbaan", 12, 20, 20),
+        ("Ferris Wheel", "Reuzenrad met uitzicht over het meer", 8, 80, 25),
+        ("Haunted House", "Spookhuis", 20, 50, 70),
+        ("Perron 1", "Treinperron bij de ingang", 0, 12, 86),
+        ("Perron 2", "Treinperron bij het meer", 0, 88, 86),
+    ]
+    with pool.verbinding() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            pool.sql("INSERT INTO Locatie (naam, beschrijving, wachttijd, loc_x, loc_y) VALUES (?, ?, ?, ?, ?)"),
+            locaties,
+        )
+        cursor.execute(
+            pool.sql("INSERT INTO Trein (max_capaciteit, vertrekkend_locatie_id, aankomend_locatie_id) VALUES (?, ?, ?)"),
+            (20, 4, 5),
+        )
+
+
+# Opent de database uit de omgevingsvariabele LSM_DATABASE (pad naar een SQLite bestand).
+# Een nieuw bestand krijgt het schema en de demo-gegevens. Zonder LSM_DATABASE geven we None terug
+# en gebruiken de schermen hun ingebouwde demo-waarden.
+
+def open_uit_omgeving(omgeving=os.environ):
+    pad = omgeving.get("LSM_DATABASE")
+    if not pad:
+        return None
+    nieuw = pad == ":memory:" or not os.path.exists(pad)
+    pool = sqlite_pool(pad)
+    if nieuw:
+        maak_schema(pool)
+        vul_demo(pool)
+    return Gegevens(pool)
@@ -0,0 +1,175 @@
+# qrscan.py - Snel controleren van QR-codes bij de poorten
+# Elke scan moet QRCode.data omzetten naar een qr_id. Zonder index is dat een table scan over alle codes
+# van alle dagen, en bij de opening van het park komen honderden scans per minuut binnen.
+# De ScanValidatie doet het in drie stappen, van goedkoop naar duur:
+#   1. LRU met recent gescande codes: dezelfde bezoeker scant de hele dag bij poorten en attracties
+#   2. Bloom filter met alle codes van de dag: een onbekende code wordt afgewezen zonder de database
+#   3. Opzoeken via de index idx_qrcode_data op (data, datum)
+# Het Bloom filter kan zich vergissen in één richting: "misschien bekend" terwijl de code niet bestaat
+# (ongeveer een fractie foutkans van de onbekende codes). Die gaan dan naar de database, dus het antwoord
+# klopt altijd. "Zeker onbekend" is altijd juist.
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Aantal codes per fetchmany bij het laden van een dag
+
+LAAD_BATCH = 50_000
+MASKER_32 = 0xFFFFFFFF
+
+
+# Klasse : BloomFilter
+# capaciteit : verwacht aantal codes
+# foutkans   : kans dat een onbekende code toch als "misschien bekend" wordt gezien (bij capaciteit codes)
+# De k posities komen uit één hash (dubbel hashen: h1 + i * h2). Dat is de hash() van Python: snel,
+# maar per proces anders, dus het filter wordt altijd in het eigen proces opgebouwd en nooit bewaard.
+
+class BloomFilter:
+    def __init__(self, capaciteit, foutkans=0.01):
+        capaciteit = max(1, capaciteit)
+        bits = math.ceil(-capaciteit * math.log(foutkans) / math.log(2) ** 2)
+        self.m = max(64, (bits + 7) // 8 * 8)
+        self.k = max(1, round(self.m / capaciteit * math.log(2)))
+        self._bits = bytearray(self.m // 8)
+        self.aantal = 0
+
+    def voeg_toe(self, code):
+        h = hash(code)
+        h1, h2 = h & MASKER_32, ((h >> 32) & MASKER_32) | 1
+        for i in range(self.k):
+            positie = (h1 + i * h2) % self.m
+            self._bits[positie >> 3] |= 1 << (positie & 7)
+        self.aantal += 1
+
+# Hetzelfde voor een hele lijst codes tegelijk, met numpy in plaats van een Python lus per code
+
+    def voeg_veel_toe(self, codes):
+        if not codes:
+            return
+        h = np.fromiter(map(hash, codes), dtype=np.int64, count=len(codes)).view(np.uint64)
+        h1 = h & np.uint64(MASKER_32)
+        h2 = ((h >> np.uint64(32)) & np.uint64(MASKER_32)) | np.uint64(1)
+        bits = np.frombuffer(self._bits, dtype=np.uint8)
+        m = np.uint64(self.m)
+        for i in range(self.k):
+            posities = (h1 + np.uint64(i) * h2) % m
+            np.bitwise_or.at(bits, posities >> np.uint64(3),
+                             np.left_shift(1, posities & np.uint64(7)).astype(np.uint8))
+        self.aantal += len(codes)
+
+    def __contains__(self, code):
+        h = hash(code)
+        h1, h2 = h & MASKER_32, ((h >> 32) & MASKER_32) | 1
+        bits, m = self._bits, self.m
+        for i in range(self.k):
+            positie = (h1 + i * h2) % m
+            if not bits[positie >> 3] & (1 << (positie & 7)):
+                return False
+        return True
+
+    def geheugen(self):
+        return len(self._bits)
+
+
+# Klasse : ScanValidatie
+# pool        : Verbindingspool met de tabel QRCode
+# foutkans    : foutkans van het Bloom filter
+# lru_grootte : maximaal aantal recent gescande codes in het geheugen
+# Eerst laad_dag aanroepen (bij de opening en na middernacht); daarna geeft valideer het qr_id van een code
+# van die dag, of None. Codes van een andere dag zijn niet geldig.
+
+class ScanValidatie:
+    def __init__(self, pool, foutkans=0.01, lru_grootte=100_000):
+        self.pool = pool
+        self.foutkans = foutkans
+        self.lru_grootte = lru_grootte
+        self.datum = None
+        self._bloom = None
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.scans = 0
+        self.lru_treffers = 0
+        self.bloom_afgewezen = 0
+        self.opgezocht = 0
+        self.vals_positief = 0
+
+# Laadt alle codes van één dag in een nieuw Bloom filter. Het filter krijgt de grootte van het aantal codes
+# (met ruimte voor codes die later die dag nog verkocht worden) en vervangt het oude pas als het klaar is,
+# dus scannen gaat door tijdens het laden.
+
+    def laad_dag(self, datum=None, groei=1.25):
+        datum = time.strftime("%Y-%m-%d") if datum is None else datum
+        with self.pool.verbinding() as conn:
+            cursor = conn.cursor()
+            cursor.execute(self.pool.sql("SELECT COUNT(*) FROM QRCode WHERE datum = ?"), (datum,))
+            aantal = cursor.fetchone()[0]
+            bloom = BloomFilter(int(aantal * groei) + 1000, self.foutkans)
+            cursor.execute(self.pool.sql("SELECT data FROM QRCode WHERE datum = ?"), (datum,))
+            while True:
+                rijen = cursor.fetchmany(LAAD_BATCH)
+                if not rijen:
+                    break
+                bloom.voeg_veel_toe([rij[0] for rij in rijen])
+        with self._lock:
+            self.datum = datum
+            self._bloom = bloom
+            self._recent.clear()
+        return bloom.aantal
+
+# Een code die na laad_dag is aangemaakt (bijvoorbeeld verkocht aan de kassa) moet ook in het filter
+
+    def voeg_toe(self, data, qr_id=None):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.voeg_toe(data)
+            if qr_id is not None:
+                self._onthoud(data, qr_id)
+
+    def valideer(self, data):
+        with self._lock:
+            self.scans += 1
+            qr_id = self._recent.get(data)
+            if qr_id is not None:
+                self._recent.move_to_end(data)
+                self.lru_treffers += 1
+                return qr_id
+            bloom, datum = self._bloom, self.datum
+            if bloom is None or data not in bloom:
+                self.bloom_afgewezen += 1
+                return None
+            self.opgezocht += 1
+
+        rijen = self.pool.haal_op("SELECT qr_id FROM QRCode WHERE data = ? AND datum = ? LIMIT 1", (data, datum))
+        with self._lock:
+            if not rijen:
+                self.vals_positief += 1
+                return None
+            qr_id = rijen[0]["qr_id"]
+            if self.datum == datum:
+                self._onthoud(data, qr_id)
+            return qr_id
+
+    def _onthoud(self, data, qr_id):
+        self._recent[data] = qr_id
+        self._recent.move_to_end(data)
+        while len(self._recent) > self.lru_grootte:
+            self._recent.popitem(last=False)
+
+    def tellers(self):
+        with self._lock:
+            return {
+                "datum": self.datum,
+                "codes": self._bloom.aantal if self._bloom is not None else 0,
+                "bloom_bytes": self._bloom.geheugen() if self._bloom is not None else 0,
+                "recent": len(self._recent),
+                "scans": self.scans,
+                "lru_treffers": self.lru_treffers,
+                "bloom_afgewezen": self.bloom_afgewezen,
+                "opgezocht": self.opgezocht,
+                "vals_positief": self.vals_positief,
+            }
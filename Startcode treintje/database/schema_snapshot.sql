@@ -0,0 +1,53 @@
+-- ========================================
+-- Lokale snapshot van de kiosk (SQLite), zie snapshot.py
+-- Een kopie van wat de kaart nodig heeft, zodat de kiosk direct iets kan tonen bij het opstarten
+-- en blijft werken als de centrale database traag of onbereikbaar is.
+-- ========================================
+
+-- bron_versie is het wijziging_id op de server waarmee de rij het laatst is bijgewerkt.
+-- Een rij wordt alleen overschreven door een wijziging met een gelijke of hogere bron_versie.
+CREATE TABLE IF NOT EXISTS SnapLocatie (
+  locatie_id INTEGER PRIMARY KEY,
+  naam TEXT NOT NULL,
+  wachttijd INTEGER DEFAULT 0,
+  loc_x INTEGER NULL,
+  loc_y INTEGER NULL,
+  bron_versie INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS SnapTrein (
+  trein_id INTEGER PRIMARY KEY,
+  max_capaciteit INTEGER NOT NULL,
+  aanwezig INTEGER NOT NULL DEFAULT 0,
+  bron_versie INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS SnapReservering (
+  qr_id INTEGER NOT NULL,
+  trein_id INTEGER NOT NULL,
+  type_behoefte TEXT NOT NULL,
+  van_halte INTEGER NULL,
+  naar_halte INTEGER NULL,
+  bron_versie INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (qr_id, trein_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_snapreservering_trein ON SnapReservering (trein_id);
+
+-- Laatst bekende stand van de treinen uit de telemetrie (alleen lokaal, de server kent deze niet)
+CREATE TABLE IF NOT EXISTS SnapTreinStand (
+  trein_id INTEGER PRIMARY KEY,
+  x REAL NOT NULL,
+  y REAL NOT NULL,
+  plekken INTEGER NOT NULL,
+  totaal INTEGER NOT NULL,
+  aankomst REAL NOT NULL,
+  tijd REAL NOT NULL
+);
+
+-- laatste_wijziging : hoogste wijziging_id dat verwerkt is
+-- laatste_sync      : tijdstip (epoch) van de laatste geslaagde sync
+CREATE TABLE IF NOT EXISTS SnapStatus (
+  sleutel TEXT PRIMARY KEY,
+  waarde REAL NOT NULL
+);
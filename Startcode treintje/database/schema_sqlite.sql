@@ -0,0 +1,236 @@
+-- ========================================
+-- SQLite versie van dp10_start_db_bc2b.sql
+-- Wordt gebruikt als lokale vervanger van de LSM_treintje database (tests, demo, benchmarks)
+-- ========================================
+PRAGMA foreign_keys = ON;
+
+-- Tabel: Locatie (Attracties)
+CREATE TABLE IF NOT EXISTS Locatie (
+  locatie_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  naam TEXT NOT NULL,
+  beschrijving TEXT NOT NULL,
+  wachttijd INTEGER DEFAULT 0,
+  loc_x INTEGER NULL,
+  loc_y INTEGER NULL
+);
+
+-- Tabel: QRCode
+CREATE TABLE IF NOT EXISTS QRCode (
+  qr_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  data TEXT NOT NULL,
+  datum DATE NOT NULL
+);
+
+-- Tabel: Trein (een enkele parktrein)
+CREATE TABLE IF NOT EXISTS Trein (
+  trein_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  max_capaciteit INTEGER NOT NULL,
+  vertrekkend_locatie_id INTEGER REFERENCES Locatie (locatie_id) ON UPDATE CASCADE ON DELETE RESTRICT,
+  aankomend_locatie_id INTEGER REFERENCES Locatie (locatie_id) ON UPDATE CASCADE ON DELETE RESTRICT
+);
+
+-- Tabel: Reis (check-ins bij attractie of trein)
+CREATE TABLE IF NOT EXISTS Reis (
+  reis_check_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  qr_id INTEGER NOT NULL REFERENCES QRCode (qr_id) ON UPDATE CASCADE ON DELETE RESTRICT,
+  trein_id INTEGER NULL REFERENCES Trein (trein_id) ON UPDATE CASCADE ON DELETE SET NULL,
+  locatie_id INTEGER NOT NULL REFERENCES Locatie (locatie_id) ON UPDATE CASCADE ON DELETE RESTRICT,
+  ingecheckt INTEGER NOT NULL,
+  scan_id TEXT NULL UNIQUE
+);
+
+-- Tabel: Reisplan (bezoekplan per QR-code; volgorde is de berekende bezoekvolgorde, 1 = eerst)
+CREATE TABLE IF NOT EXISTS Reisplan (
+  qr_id INTEGER NOT NULL REFERENCES QRCode (qr_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  locatie_id INTEGER NOT NULL REFERENCES Locatie (locatie_id) ON UPDATE CASCADE ON DELETE RESTRICT,
+  volgorde INTEGER NULL,
+  PRIMARY KEY (qr_id, locatie_id)
+);
+
+-- Tabel: Reservering (alleen voor mindervalide/kinderwagen e.d.)
+CREATE TABLE IF NOT EXISTS Reservering (
+  qr_id INTEGER NOT NULL REFERENCES QRCode (qr_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  trein_id INTEGER NOT NULL REFERENCES Trein (trein_id) ON UPDATE CASCADE ON DELETE RESTRICT,
+  type_behoefte TEXT NOT NULL,
+  van_halte INTEGER NULL,
+  naar_halte INTEGER NULL,
+  PRIMARY KEY (qr_id, trein_id)
+);
+
+-- Versienummer per trein voor optimistische concurrency bij het reserveren
+CREATE TABLE IF NOT EXISTS ReserveringVersie (
+  trein_id INTEGER PRIMARY KEY REFERENCES Trein (trein_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  versie INTEGER NOT NULL DEFAULT 0
+);
+
+-- Tabel: Feedback
+CREATE TABLE IF NOT EXISTS Feedback (
+  feedback_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  qr_code INTEGER NOT NULL REFERENCES QRCode (qr_id) ON UPDATE CASCADE ON DELETE RESTRICT,
+  van_locatie_id INTEGER NOT NULL REFERENCES Locatie (locatie_id) ON UPDATE CASCADE ON DELETE RESTRICT,
+  naar_locatie_id INTEGER NOT NULL REFERENCES Locatie (locatie_id) ON UPDATE CASCADE ON DELETE RESTRICT,
+  rating INTEGER NOT NULL,
+  bericht TEXT NOT NULL,
+  verzonden_op DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ========================================
+-- Indexen en bezettingstellers
+-- ========================================
+
+-- Reis groeit de hele dag: tellen per trein/locatie moet via een index en niet via een table scan
+CREATE INDEX IF NOT EXISTS idx_reis_trein_ingecheckt ON Reis (trein_id, ingecheckt);
+CREATE INDEX IF NOT EXISTS idx_reis_locatie ON Reis (locatie_id);
+
+-- QR-scans bij de poorten zoeken een code op via data (en alleen codes van die dag zijn geldig);
+-- laden per dag gaat via datum
+CREATE INDEX IF NOT EXISTS idx_qrcode_data ON QRCode (data, datum);
+CREATE INDEX IF NOT EXISTS idx_qrcode_datum ON QRCode (datum);
+
+-- Bezetting: aantal mensen dat nu in een trein / bij een locatie is ingecheckt
+CREATE TABLE IF NOT EXISTS TreinBezetting (
+  trein_id INTEGER PRIMARY KEY REFERENCES Trein (trein_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  aanwezig INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS LocatieBezetting (
+  locatie_id INTEGER PRIMARY KEY REFERENCES Locatie (locatie_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  aanwezig INTEGER NOT NULL DEFAULT 0
+);
+
+-- Open check-in per QR-code: waar (locatie en trein) de bezoeker nu is ingecheckt.
+-- Een check-out telt af bij de plek van de check-in, niet bij de plek waar uitgecheckt wordt
+-- (uitstappen gebeurt bij een andere halte dan instappen).
+CREATE TABLE IF NOT EXISTS OpenReis (
+  qr_id INTEGER PRIMARY KEY REFERENCES QRCode (qr_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  reis_check_id INTEGER NOT NULL,
+  trein_id INTEGER NULL,
+  locatie_id INTEGER NOT NULL
+);
+
+-- Elke scan sluit eerst de open check-in van die QR-code af (één af bij die trein en locatie).
+-- Een check-in (ingecheckt = 1) wordt daarna de nieuwe open check-in en telt één op.
+-- Een check-out zonder open check-in telt niets af.
+CREATE TRIGGER IF NOT EXISTS trg_reis_bezetting_insert AFTER INSERT ON Reis
+BEGIN
+  UPDATE TreinBezetting SET aanwezig = aanwezig - 1
+    WHERE trein_id = (SELECT trein_id FROM OpenReis WHERE qr_id = NEW.qr_id);
+  UPDATE LocatieBezetting SET aanwezig = aanwezig - 1
+    WHERE locatie_id = (SELECT locatie_id FROM OpenReis WHERE qr_id = NEW.qr_id);
+  DELETE FROM OpenReis WHERE qr_id = NEW.qr_id;
+  INSERT INTO OpenReis (qr_id, reis_check_id, trein_id, locatie_id)
+    SELECT NEW.qr_id, NEW.reis_check_id, NEW.trein_id, NEW.locatie_id WHERE NEW.ingecheckt;
+  INSERT INTO TreinBezetting (trein_id, aanwezig)
+    SELECT NEW.trein_id, 1 WHERE NEW.ingecheckt AND NEW.trein_id IS NOT NULL
+    ON CONFLICT (trein_id) DO UPDATE SET aanwezig = aanwezig + 1;
+  INSERT INTO LocatieBezetting (locatie_id, aanwezig)
+    SELECT NEW.locatie_id, 1 WHERE NEW.ingecheckt
+    ON CONFLICT (locatie_id) DO UPDATE SET aanwezig = aanwezig + 1;
+END;
+
+-- Alleen het verwijderen van de open check-in verandert de tellers; voor oudere rijen is de
+-- bezetting al door een latere scan bijgewerkt (Bezetting.herbereken zet alles weer recht)
+CREATE TRIGGER IF NOT EXISTS trg_reis_bezetting_delete AFTER DELETE ON Reis
+BEGIN
+  UPDATE TreinBezetting SET aanwezig = aanwezig - 1
+    WHERE trein_id = (SELECT trein_id FROM OpenReis WHERE qr_id = OLD.qr_id AND reis_check_id = OLD.reis_check_id);
+  UPDATE LocatieBezetting SET aanwezig = aanwezig - 1
+    WHERE locatie_id = (SELECT locatie_id FROM OpenReis WHERE qr_id = OLD.qr_id AND reis_check_id = OLD.reis_check_id);
+  DELETE FROM OpenReis WHERE qr_id = OLD.qr_id AND reis_check_id = OLD.reis_check_id;
+END;
+
+-- ========================================
+-- Rollups van de feedback (zie feedback.py)
+-- ========================================
+
+-- Per route en per uur het aantal ratings per ratingwaarde. Daaruit volgen aantal, som, gemiddelde en kwantielen,
+-- zonder elke keer over de hele Feedback tabel te groeperen. uur is 'YYYY-MM-DD HH:00' (UTC, zoals verzonden_op).
+CREATE TABLE IF NOT EXISTS FeedbackRoute (
+  van_locatie_id INTEGER NOT NULL REFERENCES Locatie (locatie_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  naar_locatie_id INTEGER NOT NULL REFERENCES Locatie (locatie_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  rating INTEGER NOT NULL,
+  aantal INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (van_locatie_id, naar_locatie_id, rating)
+);
+
+CREATE TABLE IF NOT EXISTS FeedbackUur (
+  uur TEXT NOT NULL,
+  rating INTEGER NOT NULL,
+  aantal INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (uur, rating)
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_feedback_rollup_insert AFTER INSERT ON Feedback
+BEGIN
+  INSERT INTO FeedbackRoute (van_locatie_id, naar_locatie_id, rating, aantal)
+    VALUES (NEW.van_locatie_id, NEW.naar_locatie_id, NEW.rating, 1)
+    ON CONFLICT (van_locatie_id, naar_locatie_id, rating) DO UPDATE SET aantal = aantal + 1;
+  INSERT INTO FeedbackUur (uur, rating, aantal)
+    VALUES (strftime('%Y-%m-%d %H:00', NEW.verzonden_op), NEW.rating, 1)
+    ON CONFLICT (uur, rating) DO UPDATE SET aantal = aantal + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_feedback_rollup_delete AFTER DELETE ON Feedback
+BEGIN
+  UPDATE FeedbackRoute SET aantal = aantal - 1
+    WHERE van_locatie_id = OLD.van_locatie_id AND naar_locatie_id = OLD.naar_locatie_id AND rating = OLD.rating;
+  UPDATE FeedbackUur SET aantal = aantal - 1
+    WHERE uur = strftime('%Y-%m-%d %H:00', OLD.verzonden_op) AND rating = OLD.rating;
+END;
+
+-- ========================================
+-- Wijzigingslog voor de delta-sync van de kiosks
+-- ========================================
+
+-- Elke insert/update/delete op Locatie, Trein of Reservering krijgt een oplopend wijziging_id.
+-- sleutel is locatie_id (Locatie) of trein_id (Trein en Reservering: de reserveringen worden per trein ververst).
+CREATE TABLE IF NOT EXISTS Wijziging (
+  wijziging_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  tabel TEXT NOT NULL,
+  sleutel INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_locatie_wijziging_insert AFTER INSERT ON Locatie
+BEGIN
+  INSERT INTO Wijziging (tabel, sleutel) VALUES ('Locatie', NEW.locatie_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_locatie_wijziging_update AFTER UPDATE ON Locatie
+BEGIN
+  INSERT INTO Wijziging (tabel, sleutel) VALUES ('Locatie', NEW.locatie_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_locatie_wijziging_delete AFTER DELETE ON Locatie
+BEGIN
+  INSERT INTO Wijziging (tabel, sleutel) VALUES ('Locatie', OLD.locatie_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_trein_wijziging_insert AFTER INSERT ON Trein
+BEGIN
+  INSERT INTO Wijziging (tabel, sleutel) VALUES ('Trein', NEW.trein_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_trein_wijziging_update AFTER UPDATE ON Trein
+BEGIN
+  INSERT INTO Wijziging (tabel, sleutel) VALUES ('Trein', NEW.trein_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_trein_wijziging_delete AFTER DELETE ON Trein
+BEGIN
+  INSERT INTO Wijziging (tabel, sleutel) VALUES ('Trein', OLD.trein_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_reservering_wijziging_insert AFTER INSERT ON Reservering
+BEGIN
+  INSERT INTO Wijziging (tabel, sleutel) VALUES ('Reservering', NEW.trein_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_reservering_wijziging_update AFTER UPDATE ON Reservering
+BEGIN
+  INSERT INTO Wijziging (tabel, sleutel) VALUES ('Reservering', OLD.trein_id), ('Reservering', NEW.trein_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_reservering_wijziging_delete AFTER DELETE ON Reservering
+BEGIN
+  INSERT INTO Wijziging (tabel, sleutel) VALUES ('Reservering', OLD.trein_id);
+END;
@@ -0,0 +1,371 @@
+# snapshot.py - Lokale snapshot van de kaartgegevens voor een snelle start en werken zonder database
+# Bij het opstarten lezen we de laatst bekende locaties, treinen, reserveringen, wachttijden en
+# treinstanden uit een lokaal SQLite bestand (LSM_SNAPSHOT). Dat duurt milliseconden, ook als de
+# centrale database traag of onbereikbaar is.
+#
+# Een achtergrondthread (SnapshotSync) brengt de snapshot daarna in lijn met de server:
+#   - delta : de server houdt in de tabel Wijziging bij welke rij van Locatie, Trein of Reservering veranderde.
+#             We halen alle wijzigingen na ons laatste wijziging_id op en lezen alleen die rijen opnieuw.
+#             Bestaat een rij niet meer op de server, dan was het een delete.
+#   - volledig : bij een lege snapshot, een te grote achterstand, of als het wijziging_id op de server
+#             lager is dan het onze (de server is teruggezet of het log is opnieuw begonnen).
+#
+# Conflicten: de server is de bron van de gedeelde tabellen. Elke rij onthoudt met welk wijziging_id
+# hij geschreven is (bron_versie). Een wijziging met een lagere bron_versie dan wat er al staat
+# (bijvoorbeeld een delta die na een volledige sync binnenkomt) wordt genegeerd en geteld als conflict.
+# De treinstanden zijn alleen lokaal en worden nooit door de server overschreven, behalve als de trein verdwijnt.
+
+import os
+import threading
+import time
+
+from .gegevens import BATCH_GROOTTE, kaart_uit_rijen
+from .verbinding import maak_schema, sqlite_pool
+
+SCHEMA_SNAPSHOT = os.path.join(os.path.dirname(__file__), "schema_snapshot.sql")
+
+# Bij meer openstaande wijzigingen dan dit is één volledige sync goedkoper dan alle rijen los ophalen
+
+MAX_DELTA = 20 * BATCH_GROOTTE
+
+SYNC_INTERVAL = 10.0
+MAX_WACHTTIJD = 120.0
+
+_UPSERT_LOCATIE = (
+    "INSERT INTO SnapLocatie (locatie_id, naam, wachttijd, loc_x, loc_y, bron_versie) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (locatie_id) DO UPDATE SET naam = excluded.naam, wachttijd = excluded.wachttijd, "
+    "loc_x = excluded.loc_x, loc_y = excluded.loc_y, bron_versie = excluded.bron_versie "
+    "WHERE excluded.bron_versie >= SnapLocatie.bron_versie"
+)
+
+_UPSERT_TREIN = (
+    "INSERT INTO SnapTrein (trein_id, max_capaciteit, bron_versie) VALUES (?, ?, ?) "
+    "ON CONFLICT (trein_id) DO UPDATE SET max_capaciteit = excluded.max_capaciteit, bron_versie = excluded.bron_versie "
+    "WHERE excluded.bron_versie >= SnapTrein.bron_versie"
+)
+
+_UPSERT_RESERVERING = (
+    "INSERT INTO SnapReservering (qr_id, trein_id, type_behoefte, van_halte, naar_halte, bron_versie) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (qr_id, trein_id) DO UPDATE SET type_behoefte = excluded.type_behoefte, "
+    "van_halte = excluded.van_halte, naar_halte = excluded.naar_halte, bron_versie = excluded.bron_versie "
+    "WHERE excluded.bron_versie >= SnapReservering.bron_versie"
+)
+
+
+# Klasse : SnapshotStore
+# Leest en schrijft de snapshot. Alle schrijfacties van één sync gaan in één transactie,
+# een kiosk die halverwege uitvalt houdt dus altijd een complete (oudere) snapshot over.
+
+class SnapshotStore:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def status(self, sleutel, standaard=None):
+        rijen = self.pool.haal_op("SELECT waarde FROM SnapStatus WHERE sleutel = ?", (sleutel,))
+        return rijen[0]["waarde"] if rijen else standaard
+
+    def leeg(self):
+        return self.status("laatste_sync") is None
+
+    def laatste_wijziging(self):
+        return int(self.status("laatste_wijziging", 0))
+
+# Alles voor de kaart in hetzelfde formaat als Gegevens.laad_kaart, aangevuld met de bezetting,
+# de laatst bekende treinstanden en wanneer er voor het laatst met de server gesynchroniseerd is
+
+    def laad(self):
+        with self.pool.verbinding() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT naam, wachttijd, loc_x, loc_y FROM SnapLocatie ORDER BY locatie_id")
+            locaties = cursor.fetchall()
+            cursor.execute(
+                "SELECT t.trein_id, t.max_capaciteit, COUNT(r.qr_id), t.aanwezig "
+                "FROM SnapTrein t LEFT JOIN SnapReservering r ON r.trein_id = t.trein_id "
+                "GROUP BY t.trein_id ORDER BY t.trein_id"
+            )
+            treinen = cursor.fetchall()
+            cursor.execute("SELECT trein_id, x, y, plekken, totaal, aankomst, tijd FROM SnapTreinStand ORDER BY trein_id")
+            kolommen = [kolom[0] for kolom in cursor.description]
+            standen = [dict(zip(kolommen, rij)) for rij in cursor.fetchall()]
+            cursor.execute("SELECT sleutel, waarde FROM SnapStatus")
+            status = dict(cursor.fetchall())
+        kaart = kaart_uit_rijen(locaties, [rij[:3] for rij in treinen])
+        kaart["bezetting"] = {rij[0]: rij[3] for rij in treinen}
+        kaart["treinstanden"] = standen
+        kaart["laatste_wijziging"] = int(status.get("laatste_wijziging", 0))
+        kaart["laatste_sync"] = status.get("laatste_sync")
+        return kaart
+
+    def wachttijden_voor(self, namen):
+        namen = list(namen)
+        if not namen:
+            return {}
+        rijen = self.pool.haal_op(
+            "SELECT naam, wachttijd FROM SnapLocatie WHERE naam IN ({})".format(", ".join("?" * len(namen))),
+            namen,
+        )
+        return {rij["naam"]: rij["wachttijd"] or 0 for rij in rijen}
+
+# Volledige sync: alle gedeelde tabellen leeg en opnieuw vullen met de stand van de server bij wijziging_id
+
+    def vervang_alles(self, wijziging_id, locaties, treinen, reserveringen, bezetting=None):
+        bezetting = bezetting or {}
+        with self.pool.verbinding() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM SnapReservering")
+            cursor.execute("DELETE FROM SnapTrein")
+            cursor.execute("DELETE FROM SnapLocatie")
+            cursor.executemany(
+                "INSERT INTO SnapLocatie (locatie_id, naam, wachttijd, loc_x, loc_y, bron_versie) VALUES (?, ?, ?, ?, ?, ?)",
+                [(r["locatie_id"], r["naam"], r["wachttijd"], r["loc_x"], r["loc_y"], wijziging_id) for r in locaties],
+            )
+            cursor.executemany(
+                "INSERT INTO SnapTrein (trein_id, max_capaciteit, aanwezig, bron_versie) VALUES (?, ?, ?, ?)",
+                [(r["trein_id"], r["max_capaciteit"], bezetting.get(r["trein_id"], 0), wijziging_id) for r in treinen],
+            )
+            cursor.executemany(
+                "INSERT INTO SnapReservering (qr_id, trein_id, type_behoefte, van_halte, naar_halte, bron_versie) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [_reservering(r, wijziging_id) for r in reserveringen],
+            )
+            _zet_status(cursor, wijziging_id)
+
+# Delta-sync tot en met wijziging_id. De rijen zijn na het lezen van het wijzigingslog opgehaald,
+# ze zijn dus minstens zo nieuw als wijziging_id.
+#   locaties / treinen        : rijen om te upserten
+#   weg_locaties / weg_treinen : id's die niet meer op de server bestaan
+#   reserveringen             : {trein_id: alle reserveringen van die trein}, vervangt wat er lokaal staat
+# Geeft het aantal genegeerde rijen terug (conflicten: lokaal stond al een nieuwere versie).
+
+    def pas_toe(self, wijziging_id, locaties=(), weg_locaties=(), treinen=(), weg_treinen=(), reserveringen=None):
+        reserveringen = reserveringen or {}
+        conflicten = 0
+        with self.pool.verbinding() as conn:
+            cursor = conn.cursor()
+            if locaties:
+                cursor.executemany(
+                    _UPSERT_LOCATIE,
+                    [(r["locatie_id"], r["naam"], r["wachttijd"], r["loc_x"], r["loc_y"], wijziging_id) for r in locaties],
+                )
+                conflicten += len(locaties) - max(0, cursor.rowcount)
+            if treinen:
+                cursor.executemany(_UPSERT_TREIN, [(r["trein_id"], r["max_capaciteit"], wijziging_id) for r in treinen])
+                conflicten += len(treinen) - max(0, cursor.rowcount)
+            for trein_id, rijen in reserveringen.items():
+                cursor.execute(
+                    "DELETE FROM SnapReservering WHERE trein_id = ? AND bron_versie <= ?", (trein_id, wijziging_id)
+                )
+                if rijen:
+                    cursor.executemany(_UPSERT_RESERVERING, [_reservering(r, wijziging_id) for r in rijen])
+                    conflicten += len(rijen) - max(0, cursor.rowcount)
+            for tabel, kolom, ids in (("SnapLocatie", "locatie_id", weg_locaties), ("SnapTrein", "trein_id", weg_treinen)):
+                for sleutel in ids:
+                    cursor.execute(
+                        f"DELETE FROM {tabel} WHERE {kolom} = ? AND bron_versie <= ?", (sleutel, wijziging_id)
+                    )
+                    if cursor.rowcount == 0 and _bestaat(cursor, tabel, kolom, sleutel):
+                        conflicten += 1
+            if weg_treinen:
+                cursor.executemany("DELETE FROM SnapTreinStand WHERE trein_id = ?", [(t,) for t in weg_treinen])
+                cursor.execute("DELETE FROM SnapReservering WHERE trein_id NOT IN (SELECT trein_id FROM SnapTrein)")
+            _zet_status(cursor, wijziging_id)
+        return conflicten
+
+# Bezetting per trein ({trein_id: aanwezig}); dit is een teller op de server, de nieuwste waarde wint altijd
+
+    def zet_bezetting(self, bezetting):
+        if bezetting:
+            self.pool.voer_veel_uit(
+                "UPDATE SnapTrein SET aanwezig = ? WHERE trein_id = ?",
+                [(aanwezig, trein_id) for trein_id, aanwezig in bezetting.items()],
+            )
+
+# Laatst bekende standen uit de telemetrie: lijst met dicts (trein_id, x, y, plekken, totaal, aankomst)
+
+    def zet_treinstanden(self, standen, tijd=None):
+        tijd = time.time() if tijd is None else tijd
+        self.pool.voer_veel_uit(
+            "INSERT OR REPLACE INTO SnapTreinStand (trein_id, x, y, plekken, totaal, aankomst, tijd) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(s["trein_id"], s["x"], s["y"], s["plekken"], s["totaal"], s["aankomst"], tijd) for s in standen],
+        )
+
+
+def _reservering(rij, wijziging_id):
+    return (rij["qr_id"], rij["trein_id"], rij["type_behoefte"], rij.get("van_halte"), rij.get("naar_halte"), wijziging_id)
+
+
+def _bestaat(cursor, tabel, kolom, sleutel):
+    cursor.execute(f"SELECT 1 FROM {tabel} WHERE {kolom} = ?", (sleutel,))
+    return cursor.fetchone() is not None
+
+
+def _zet_status(cursor, wijziging_id):
+    cursor.executemany(
+        "INSERT OR REPLACE INTO SnapStatus (sleutel, waarde) VALUES (?, ?)",
+        [("laatste_wijziging", wijziging_id), ("laatste_sync", time.time())],
+    )
+
+
+# Klasse : SnapshotSync
+# Achtergrondthread die de snapshot elke interval seconden met de server synchroniseert.
+# Lukt dat niet (database weg), dan wacht hij steeds langer (tot MAX_WACHTTIJD) en blijft de snapshot staan.
+# bij_wijziging(kaart) wordt vanuit de thread aangeroepen met store.laad() als er iets veranderd is;
+# een Qt scherm stuurt dat door via een signaal, zodat het op de GUI thread verwerkt wordt.
+
+class SnapshotSync:
+    def __init__(self, store, gegevens, bij_wijziging=None, interval=SYNC_INTERVAL):
+        self.store = store
+        self.gegevens = gegevens
+        self.bij_wijziging = bij_wijziging
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._standen = None
+        self._bezetting = None
+        self._stop = threading.Event()
+        self._nu = threading.Event()
+        self._thread = None
+        self.verbonden = False
+
+        self.syncs = 0
+        self.volledig = 0
+        self.wijzigingen = 0
+        self.conflicten = 0
+        self.fouten = 0
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._draai, name="snapshot", daemon=True)
+            self._thread.start()
+        return self
+
+# Stopt de thread; de laatst doorgegeven treinstanden worden nog weggeschreven
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._nu.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._schrijf_standen()
+
+# Vraagt om een sync zo snel mogelijk (bijvoorbeeld als het scherm getoond wordt)
+
+    def nu(self):
+        self._nu.set()
+
+# Bewaart de treinstanden bij de volgende ronde van de thread (de GUI thread schrijft niet zelf)
+
+    def bewaar_treinstanden(self, standen):
+        with self._lock:
+            self._standen = standen
+
+    def tellers(self):
+        return {
+            "syncs": self.syncs,
+            "volledig": self.volledig,
+            "wijzigingen": self.wijzigingen,
+            "conflicten": self.conflicten,
+            "fouten": self.fouten,
+            "verbonden": self.verbonden,
+        }
+
+    def _draai(self):
+        wachttijd = self.interval
+        while not self._stop.is_set():
+            self._schrijf_standen()
+            try:
+                gewijzigd = self.sync()
+                self.verbonden = self.gegevens is not None
+                wachttijd = self.interval
+            except Exception:
+                self.fouten += 1
+                self.verbonden = False
+                gewijzigd = False
+                wachttijd = min(wachttijd * 2, MAX_WACHTTIJD)
+            if gewijzigd and self.bij_wijziging is not None and not self._stop.is_set():
+                self.bij_wijziging(self.store.laad())
+            self._nu.wait(wachttijd)
+            self._nu.clear()
+
+    def _schrijf_standen(self):
+        with self._lock:
+            standen, self._standen = self._standen, None
+        if standen:
+            try:
+                self.store.zet_treinstanden(standen)
+            except Exception:
+                self.fouten += 1
+
+# Eén sync met de server. Geeft True terug als er in de snapshot iets veranderd is.
+# Zonder database (gegevens is None) bewaart de thread alleen de treinstanden.
+
+    def sync(self):
+        g = self.gegevens
+        if g is None:
+            return False
+        server = g.laatste_wijziging()
+        lokaal = self.store.laatste_wijziging()
+        bezetting = g.treinbezetting()
+        if self.store.leeg() or server < lokaal or server - lokaal > MAX_DELTA:
+            self.store.vervang_alles(server, g.locaties(), g.treinen(), g.reserveringen(), bezetting)
+            self.volledig += 1
+            gewijzigd = True
+        else:
+            gewijzigd = self._delta(lokaal, server)
+            if gewijzigd or bezetting != self._bezetting:
+                self.store.zet_bezetting(bezetting)
+                gewijzigd = True
+        self._bezetting = bezetting
+        self.syncs += 1
+        return gewijzigd
+
+    def _delta(self, lokaal, server):
+        g = self.gegevens
+        gewijzigd = False
+        while lokaal < server:
+            wijzigingen = g.wijzigingen_sinds(lokaal)
+            if not wijzigingen:
+                break
+            versie = wijzigingen[-1]["wijziging_id"]
+            sleutels = {"Locatie": set(), "Trein": set(), "Reservering": set()}
+            for w in wijzigingen:
+                sleutels.setdefault(w["tabel"], set()).add(w["sleutel"])
+
+            locaties = g.locaties_op_id(sleutels["Locatie"])
+            treinen = g.treinen_op_id(sleutels["Trein"])
+            trein_ids = sleutels["Trein"] | sleutels["Reservering"]
+            reserveringen = {trein_id: [] for trein_id in trein_ids}
+            for rij in g.reserveringen_voor_treinen(trein_ids):
+                reserveringen[rij["trein_id"]].append(rij)
+
+            self.conflicten += self.store.pas_toe(
+                versie,
+                locaties=locaties,
+                weg_locaties=sleutels["Locatie"] - {r["locatie_id"] for r in locaties},
+                treinen=treinen,
+                weg_treinen=sleutels["Trein"] - {r["trein_id"] for r in treinen},
+                reserveringen=reserveringen,
+            )
+            self.wijzigingen += len(wijzigingen)
+            lokaal = versie
+            gewijzigd = True
+        return gewijzigd
+
+
+# Opent (of maakt) een snapshot bestand
+
+def open_snapshot(pad):
+    pool = sqlite_pool(pad, grootte=2)
+    maak_schema(pool, SCHEMA_SNAPSHOT)
+    return SnapshotStore(pool)
+
+
+# Opent de snapshot uit de omgevingsvariabele LSM_SNAPSHOT (pad naar een SQLite bestand), of None zonder snapshot
+
+def snapshot_uit_omgeving(omgeving=os.environ):
+    pad = omgeving.get("LSM_SNAPSHOT")
+    if not pad:
+        return None
+    return open_snapshot(pad)
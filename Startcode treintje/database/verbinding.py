@@ -0,0 +1,146 @@
+# verbinding.py - Pool met databaseverbindingen
+# Verbindingen openen is duur, dus we maken er een vast aantal aan en lenen die uit.
+# Queries schrijven we altijd met ? als placeholder (geparametriseerd, nooit met f-strings).
+# Voor een MySQL driver (paramstijl "format") wordt ? eenmalig omgezet naar %s en onthouden.
+
+import itertools
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+SCHEMA_SQLITE = os.path.join(os.path.dirname(__file__), "schema_sqlite.sql")
+
+_geheugen_teller = itertools.count(1)
+
+
+# Klasse : Verbindingspool
+# maak_verbinding : functie die een nieuwe DB-API verbinding teruggeeft
+# grootte         : maximaal aantal verbindingen tegelijk
+# paramstijl      : "qmark" (sqlite3) of "format" (pymysql / mysql-connector)
+# dialect         : "sqlite" of "mysql", voor de paar plekken waar de SQL verschilt
+
+class Verbindingspool:
+    def __init__(self, maak_verbinding, grootte=4, paramstijl="qmark", timeout=5.0, dialect="sqlite"):
+        self._maak_verbinding = maak_verbinding
+        self._vrij = queue.LifoQueue(maxsize=grootte)
+        self._lock = threading.Lock()
+        self._aangemaakt = 0
+        self.grootte = grootte
+        self.paramstijl = paramstijl
+        self.dialect = dialect
+        self.timeout = timeout
+
+# Leent een verbinding uit. Bij een fout wordt de transactie teruggedraaid, anders gecommit.
+# Lukt ook het terugdraaien niet, dan is de verbinding niet meer te vertrouwen: die gaat dicht en zijn plek komt vrij.
+
+    @contextmanager
+    def verbinding(self):
+        conn = self._neem()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                self._gooi_weg(conn)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._vrij.put(conn)
+
+    def _neem(self):
+        try:
+            return self._vrij.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._aangemaakt < self.grootte:
+                # de plek telt pas als de verbinding er echt is, anders houdt een mislukte poging hem bezet
+                conn = self._maak_verbinding()
+                self._aangemaakt += 1
+                return conn
+        try:
+            return self._vrij.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError("geen vrije databaseverbinding beschikbaar") from None
+
+    def _gooi_weg(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._aangemaakt -= 1
+
+    def sql(self, query):
+        return _zet_om(query, self.paramstijl)
+
+# Voert een query uit en geeft alle rijen terug als dicts
+
+    def haal_op(self, query, parameters=()):
+        with self.verbinding() as conn:
+            return _als_dicts(_voer_uit(conn, self.sql(query), parameters))
+
+    def voer_uit(self, query, parameters=()):
+        with self.verbinding() as conn:
+            cursor = _voer_uit(conn, self.sql(query), parameters)
+            return cursor.rowcount
+
+    def voer_veel_uit(self, query, rijen):
+        with self.verbinding() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(self.sql(query), rijen)
+            return cursor.rowcount
+
+    def sluit(self):
+        while True:
+            try:
+                self._vrij.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+@lru_cache(maxsize=256)
+def _zet_om(query, paramstijl):
+    if paramstijl == "format":
+        return query.replace("%", "%%").replace("?", "%s")
+    return query
+
+
+def _voer_uit(conn, query, parameters):
+    cursor = conn.cursor()
+    cursor.execute(query, parameters)
+    return cursor
+
+
+def _als_dicts(cursor):
+    kolommen = [kolom[0] for kolom in cursor.description or ()]
+    return [dict(zip(kolommen, rij)) for rij in cursor.fetchall()]
+
+
+# SQLite vervanger: elke verbinding mag door de thread gebruikt worden die hem uit de pool leent.
+# ":memory:" wordt een gedeelde in-memory database die blijft bestaan zolang de pool verbindingen open heeft.
+
+def sqlite_pool(pad=":memory:", grootte=4):
+    if pad == ":memory:":
+        pad = f"file:lsm_{next(_geheugen_teller)}?mode=memory&cache=shared"
+
+    def maak_verbinding():
+        conn = sqlite3.connect(pad, uri=pad.startswith("file:"), check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")
+        return conn
+
+    return Verbindingspool(maak_verbinding, grootte=grootte)
+
+
+def maak_schema(pool, pad=SCHEMA_SQLITE):
+    with open(pad, "r") as f:
+        script = f.read()
+    with pool.verbinding() as conn:
+        conn.executescript(script)
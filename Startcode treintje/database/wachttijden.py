@@ -0,0 +1,147 @@
+# wachttijden.py - Cache voor wachttijden met TTL, LRU en verversen op de achtergrond
+# Elke waarde is ttl seconden vers. Een verouderde waarde geven we toch direct terug
+# (stale-while-revalidate) en we zetten de naam klaar om op de achtergrond te verversen.
+# Een achtergrondthread haalt alles wat klaarstaat in batches op, dus een klik wacht nooit op de database.
+# De cache heeft een maximale grootte: de minst recent gebruikte waarde gaat er als eerste uit.
+
+import threading
+import time
+from collections import OrderedDict
+
+
+# Klasse : WachttijdCache
+# laad_batch  : functie die een lijst namen krijgt en {naam: waarde} teruggeeft (bijvoorbeeld Gegevens.wachttijden_voor)
+# ttl         : aantal seconden dat een waarde vers is
+# max_grootte : maximaal aantal waarden in de cache
+# batch_grootte: maximaal aantal namen per aanroep van laad_batch
+
+class WachttijdCache:
+    def __init__(self, laad_batch, ttl=30.0, max_grootte=256, batch_grootte=50, klok=time.monotonic):
+        self._laad_batch = laad_batch
+        self.ttl = ttl
+        self.max_grootte = max_grootte
+        self.batch_grootte = batch_grootte
+        self._klok = klok
+        self._waarden = OrderedDict()
+        self._te_verversen = OrderedDict()
+        self._lock = threading.Lock()
+        self._werk = threading.Condition(self._lock)
+        self._stop = False
+        self._bezig = False
+        self._thread = None
+
+        self.hits = 0
+        self.verouderde_hits = 0
+        self.missers = 0
+        self.verversingen = 0
+        self.fouten = 0
+        self.verwijderd = 0
+
+# Geeft de waarde direct terug, ook als hij verouderd is. Bij een misser geven we standaard terug.
+# In beide laatste gevallen wordt de naam op de achtergrond (opnieuw) opgehaald.
+
+    def get(self, naam, standaard=None):
+        with self._lock:
+            item = self._waarden.get(naam)
+            if item is None:
+                self.missers += 1
+                self._plan(naam)
+                return standaard
+            self._waarden.move_to_end(naam)
+            waarde, opgehaald = item
+            if self._klok() - opgehaald <= self.ttl:
+                self.hits += 1
+            else:
+                self.verouderde_hits += 1
+                self._plan(naam)
+            return waarde
+
+    def __contains__(self, naam):
+        with self._lock:
+            return naam in self._waarden
+
+# Zet namen klaar om in één batch op te halen (bijvoorbeeld alle attracties bij het tonen van een scherm)
+
+    def vernieuw(self, namen):
+        with self._lock:
+            for naam in namen:
+                self._plan(naam)
+
+    def zet(self, naam, waarde):
+        with self._lock:
+            self._bewaar(naam, waarde)
+
+    def tellers(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "verouderde_hits": self.verouderde_hits,
+                "missers": self.missers,
+                "verversingen": self.verversingen,
+                "fouten": self.fouten,
+                "verwijderd": self.verwijderd,
+                "grootte": len(self._waarden),
+                "wachtend": len(self._te_verversen),
+            }
+
+    def stop(self):
+        with self._lock:
+            self._stop = True
+            self._werk.notify_all()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+# Wacht tot er niets meer te verversen is (voor tests en benchmarks)
+
+    def wacht_tot_klaar(self, timeout=5.0):
+        einde = time.monotonic() + timeout
+        with self._lock:
+            while (self._te_verversen or self._bezig) and time.monotonic() < einde:
+                self._werk.wait(0.01)
+            return not self._te_verversen
+
+# Onderstaande functies worden aangeroepen terwijl self._lock vastgehouden wordt
+
+    def _plan(self, naam):
+        self._te_verversen[naam] = True
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._draai, name="wachttijden", daemon=True)
+            self._thread.start()
+        self._werk.notify()
+
+    def _bewaar(self, naam, waarde):
+        self._waarden[naam] = (waarde, self._klok())
+        self._waarden.move_to_end(naam)
+        while len(self._waarden) > self.max_grootte:
+            self._waarden.popitem(last=False)
+            self.verwijderd += 1
+
+# Achtergrondthread: haalt steeds een batch namen op en zet de resultaten in de cache
+
+    def _draai(self):
+        while True:
+            with self._lock:
+                while not self._te_verversen and not self._stop:
+                    self._werk.wait()
+                if self._stop:
+                    return
+                batch = []
+                while self._te_verversen and len(batch) < self.batch_grootte:
+                    batch.append(self._te_verversen.popitem(last=False)[0])
+                self._bezig = True
+
+            try:
+                resultaat = self._laad_batch(batch)
+            except Exception:
+                resultaat = None
+
+            with self._lock:
+                self._bezig = False
+                if resultaat is None:
+                    self.fouten += 1
+                else:
+                    for naam, waarde in resultaat.items():
+                        self._bewaar(naam, waarde)
+                    self.verversingen += 1
+                self._werk.notify_all()
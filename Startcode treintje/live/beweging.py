@@ -0,0 +1,128 @@
+# beweging.py - Vloeiende beweging van de treinen tussen twee (schaarse) posities uit de telemetrie
+# Zonder dit springt een trein op de kaart bij elke nieuwe positie naar zijn nieuwe plek,
+# hoe vloeiend het eruitziet hangt dan af van hoe vaak de backend stuurt.
+# Nu beweegt elke trein van de plek waar hij getekend staat naar zijn nieuwe positie, in ongeveer
+# de tijd tot de volgende positie verwacht wordt. Daardoor rijdt de trein (één interval achter)
+# continu door, ook als de backend maar eens per seconde of minder vaak stuurt.
+# We interpoleren alleen en voorspellen niet vooruit: een voorspelling schiet bij een bocht of halte voorbij.
+
+import numpy as np
+
+# Grenzen voor de duur van één beweging in seconden; tot er twee posities van een trein binnen zijn
+# duurt een beweging STANDAARD_DUUR
+
+STANDAARD_DUUR = 0.25
+MIN_DUUR = 0.03
+MAX_DUUR = 2.0
+
+# Gewicht van een nieuw interval in het lopende gemiddelde van de tijd tussen twee posities
+
+GEWICHT = 0.3
+
+
+# Klasse : Beweging
+# Per trein (dezelfde rijen als de Vloot):
+#   van, naar : begin en doel van de huidige beweging (genormaliseerd)
+#   start     : tijdstip waarop de beweging begon, duur : hoe lang hij duurt
+#   laatste   : tijdstip van de laatste nieuwe positie, interval : gemiddelde tijd tussen nieuwe posities
+
+class Beweging:
+    def __init__(self):
+        self._van = np.zeros((0, 2), dtype=np.float64)
+        self._naar = np.zeros((0, 2), dtype=np.float64)
+        self._start = np.zeros(0, dtype=np.float64)
+        self._duur = np.ones(0, dtype=np.float64)
+        self._laatste = np.zeros(0, dtype=np.float64)
+        self._interval = np.zeros(0, dtype=np.float64)
+        self._eind = 0.0
+
+    def __len__(self):
+        return len(self._naar)
+
+# Nieuwe doelen voor de opgegeven rijen (None = alle rijen) uit posities (de hele vloot, (n, 2)).
+# Nieuwe treinen en een andere vloot beginnen meteen op hun plek.
+# Eén trein (de gewone telemetrie) gaat met gewone getallen, dat is een stuk sneller dan numpy voor één rij.
+
+    def zet(self, posities, nu, rijen=None):
+        if len(posities) != len(self._naar):
+            self._pas_aan(np.asarray(posities, dtype=np.float64))
+        if rijen is not None and len(rijen) == 1:
+            self._zet_een(int(rijen[0]), float(posities[rijen[0], 0]), float(posities[rijen[0], 1]), nu)
+            return
+        posities = np.asarray(posities, dtype=np.float64)
+        if rijen is None:
+            rijen = slice(None)
+        else:
+            rijen = np.asarray(rijen, dtype=np.int64)
+        huidig = self.posities(nu)[rijen]
+        vorige = self._laatste[rijen]
+        interval = self._interval[rijen]
+        verstreken = np.minimum(nu - vorige, MAX_DUUR)
+        interval = np.where(vorige > 0, interval + (verstreken - interval) * GEWICHT, interval)
+        self._interval[rijen] = interval
+        self._van[rijen] = huidig
+        self._naar[rijen] = posities[rijen]
+        self._start[rijen] = nu
+        duur = np.clip(interval, MIN_DUUR, MAX_DUUR)
+        self._duur[rijen] = duur
+        self._laatste[rijen] = nu
+        if len(duur):
+            self._eind = max(self._eind, nu + float(duur.max()))
+
+    def _zet_een(self, rij, x, y, nu):
+        fractie = min(max((nu - self._start[rij]) / self._duur[rij], 0.0), 1.0)
+        van = self._van[rij]
+        naar = self._naar[rij]
+        van[0] += (naar[0] - van[0]) * fractie
+        van[1] += (naar[1] - van[1]) * fractie
+        naar[0] = x
+        naar[1] = y
+        interval = self._interval[rij]
+        vorige = self._laatste[rij]
+        if vorige > 0:
+            interval += (min(nu - vorige, MAX_DUUR) - interval) * GEWICHT
+            self._interval[rij] = interval
+        duur = min(max(interval, MIN_DUUR), MAX_DUUR)
+        self._start[rij] = nu
+        self._duur[rij] = duur
+        self._laatste[rij] = nu
+        self._eind = max(self._eind, nu + duur)
+
+    def _pas_aan(self, posities):
+        n = len(posities)
+        oud = min(n, len(self._naar))
+        van = posities.copy()
+        van[:oud] = self._van[:oud]
+        naar = posities.copy()
+        naar[:oud] = self._naar[:oud]
+        self._van, self._naar = van, naar
+        for naam, begin in (("_start", 0.0), ("_laatste", 0.0), ("_interval", STANDAARD_DUUR), ("_duur", 1.0)):
+            waarden = np.full(n, begin, dtype=np.float64)
+            waarden[:oud] = getattr(self, naam)[:oud]
+            setattr(self, naam, waarden)
+
+# Alle treinen direct op hun doel (bijvoorbeeld als de kaart weer getoond wordt na een tijd verborgen te zijn).
+# De tijd sinds de laatste positie telt dan niet mee voor het interval.
+
+    def spring(self, posities=None):
+        if posities is not None:
+            posities = np.asarray(posities, dtype=np.float64)
+            if len(posities) != len(self._naar):
+                self._pas_aan(posities)
+            self._naar[:] = posities
+        self._van[:] = self._naar
+        self._start[:] = 0.0
+        self._laatste[:] = 0.0
+        self._eind = 0.0
+
+# Waar de treinen op tijdstip nu getekend moeten worden. Als alles stilstaat zijn dat de doelen zelf
+# (niet aanpassen, het is geen kopie). Een beweging begint nooit na nu, de fractie is dus niet negatief.
+
+    def posities(self, nu):
+        if nu >= self._eind:
+            return self._naar
+        fractie = np.minimum((nu - self._start) / self._duur, 1.0)
+        return self._van + (self._naar - self._van) * fractie[:, None]
+
+    def beweegt(self, nu):
+        return nu < self._eind
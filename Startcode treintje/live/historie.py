@@ -0,0 +1,346 @@
+# historie.py - Begrensde geschiedenis van de treinposities, om het spoor te tekenen en incidenten terug te spelen
+# Per trein is er een ringbuffer met een vaste capaciteit: als hij vol is overschrijft de nieuwste positie de oudste.
+# Alle ringbuffers staan in aaneengesloten NumPy arrays (één rij per trein), net als de Vloot.
+# Een update van veel treinen tegelijk is daardoor één bulk-toewijzing.
+#
+# Geheugen per trein: CAPACITEIT * (8 bytes tijd + 2 * 4 bytes positie) = ongeveer 115 kB.
+# Met MIN_INTERVAL bewaren we maximaal twee posities per seconde, de buffer dekt dus minstens een uur.
+# Hoogstens MAX_TREINEN treinen hebben een geschiedenis (ongeveer 7 MB). Is dat vol, dan krijgt een nieuwe trein
+# de rij van de trein die het langst niets gemeld heeft, maar alleen als dat langer dan TTL seconden geleden is.
+# Anders heeft de nieuwe trein (nog) geen geschiedenis; zo gaan de rijen niet heen en weer bij een grote vloot.
+# De gevolgde trein (registreer_een) gaat voor en krijgt altijd een rij, desnoods die van de stilste trein.
+
+import numpy as np
+
+CAPACITEIT = 7200
+MIN_INTERVAL = 0.5
+MAX_TREINEN = 64
+TTL = 300.0
+
+
+# Klasse : Historie
+# tijd     : (treinen, capaciteit) tijdstip van elke positie (seconden, bijvoorbeeld time.time())
+# xy       : (treinen, capaciteit, 2) genormaliseerde posities
+# kop      : per trein de plek waar de volgende positie geschreven wordt
+# aantal   : per trein het aantal geldige posities (maximaal capaciteit)
+# versies  : per trein een teller die bij elke nieuwe positie ophoogt (voor caches van het spoor)
+
+class Historie:
+    def __init__(self, capaciteit=CAPACITEIT, min_interval=MIN_INTERVAL, treinen=16, max_treinen=MAX_TREINEN, ttl=TTL):
+        self.capaciteit = max(2, int(capaciteit))
+        self.min_interval = min_interval
+        self.max_treinen = max(1, int(max_treinen))
+        self.ttl = ttl
+        treinen = min(max(1, int(treinen)), self.max_treinen)
+        self._tijd = np.zeros((treinen, self.capaciteit), dtype=np.float64)
+        self._xy = np.zeros((treinen, self.capaciteit, 2), dtype=np.float32)
+        self._kop = np.zeros(treinen, dtype=np.int64)
+        self._aantal = np.zeros(treinen, dtype=np.int64)
+        self._versies = np.zeros(treinen, dtype=np.int64)
+        self._rij_van_id = {}
+        self._id_van_rij = []
+        self._vol_tot = None
+        self.vergeten = 0
+
+    def __len__(self):
+        return len(self._rij_van_id)
+
+    def __contains__(self, trein_id):
+        return trein_id in self._rij_van_id
+
+    def aantal(self, trein_id):
+        rij = self._rij_van_id.get(trein_id)
+        return 0 if rij is None else int(self._aantal[rij])
+
+    def versie(self, trein_id):
+        rij = self._rij_van_id.get(trein_id)
+        return 0 if rij is None else int(self._versies[rij])
+
+# De rij van een trein, een nieuwe rij, de rij van een trein die langer dan ttl stil is, of -1 als alles vol is.
+# Met voorrang telt de ttl niet en krijgt de trein de rij van de stilste trein.
+
+    def _rij(self, trein_id, tijd, voorrang=False):
+        rij = self._rij_van_id.get(trein_id)
+        if rij is not None:
+            return rij
+        rij = len(self._rij_van_id)
+        if rij < self.max_treinen:
+            if rij == len(self._kop):
+                self._groei(min(rij * 2, self.max_treinen))
+            self._id_van_rij.append(trein_id)
+        else:
+            rij = self._stilste(tijd, voorrang)
+            if rij is None:
+                return -1
+            del self._rij_van_id[self._id_van_rij[rij]]
+            self._id_van_rij[rij] = trein_id
+            self._kop[rij] = 0
+            self._aantal[rij] = 0
+            self._versies[rij] += 1
+            self.vergeten += 1
+        self._rij_van_id[trein_id] = rij
+        return rij
+
+# De rij die het langst niets gemeld heeft, als dat langer dan ttl voor tijd is. Lukt dat niet, dan onthouden
+# we tot wanneer er zeker niets vrijkomt (de laatste tijden worden alleen groter), zodat we niet elke keer zoeken.
+# Rijen zonder posities zijn net in deze update uitgedeeld en komen niet in aanmerking.
+
+    def _stilste(self, tijd, voorrang=False):
+        if not voorrang and self._vol_tot is not None and tijd < self._vol_tot:
+            return None
+        laatste = self._tijd[np.arange(len(self._kop)), (self._kop - 1) % self.capaciteit]
+        laatste[self._aantal == 0] = np.inf
+        rij = int(laatste.argmin())
+        if voorrang and np.isfinite(laatste[rij]):
+            return rij
+        if laatste[rij] + self.ttl > tijd:
+            self._vol_tot = laatste[rij] + self.ttl if np.isfinite(laatste[rij]) else None
+            return None
+        self._vol_tot = None
+        return rij
+
+# Extra rijen voor nieuwe treinen; de capaciteit per trein verandert nooit
+
+    def _groei(self, treinen):
+        extra = treinen - len(self._kop)
+        self._tijd = np.concatenate([self._tijd, np.zeros((extra, self.capaciteit), dtype=np.float64)])
+        self._xy = np.concatenate([self._xy, np.zeros((extra, self.capaciteit, 2), dtype=np.float32)])
+        self._kop = np.concatenate([self._kop, np.zeros(extra, dtype=np.int64)])
+        self._aantal = np.concatenate([self._aantal, np.zeros(extra, dtype=np.int64)])
+        self._versies = np.concatenate([self._versies, np.zeros(extra, dtype=np.int64)])
+
+# Bewaart de posities xy (n, 2) van n verschillende treinen op tijdstip tijd, in één keer.
+# Treinen waarvan de vorige positie minder dan min_interval geleden is slaan we over.
+
+    def registreer(self, trein_ids, xy, tijd):
+        if len(trein_ids) == 1:
+            x, y = np.asarray(xy).reshape(2)
+            self.registreer_een(int(trein_ids[0]), x, y, tijd)
+            return
+        rijen = np.fromiter((self._rij(int(t), tijd) for t in trein_ids), dtype=np.int64)
+        xy = np.asarray(xy, dtype=np.float32).reshape(-1, 2)
+        if len(rijen) and rijen.min() < 0:
+            xy = xy[rijen >= 0]
+            rijen = rijen[rijen >= 0]
+        if not len(rijen):
+            return
+        vorige = self._tijd[rijen, (self._kop[rijen] - 1) % self.capaciteit]
+        nieuw = (self._aantal[rijen] == 0) | (tijd - vorige >= self.min_interval)
+        if not nieuw.all():
+            rijen = rijen[nieuw]
+            xy = xy[nieuw]
+        kop = self._kop[rijen]
+        self._tijd[rijen, kop] = tijd
+        self._xy[rijen, kop] = xy
+        self._kop[rijen] = (kop + 1) % self.capaciteit
+        self._aantal[rijen] = np.minimum(self._aantal[rijen] + 1, self.capaciteit)
+        self._versies[rijen] += 1
+
+# Hetzelfde voor één trein, zonder NumPy-bewerkingen op arrays (dit is het pad van de gevolgde trein bij elke update)
+
+    def registreer_een(self, trein_id, x, y, tijd):
+        rij = self._rij(trein_id, tijd, voorrang=True)
+        if rij < 0:
+            return
+        kop = int(self._kop[rij])
+        aantal = int(self._aantal[rij])
+        if aantal and tijd - self._tijd[rij, kop - 1] < self.min_interval:
+            return
+        self._tijd[rij, kop] = tijd
+        self._xy[rij, kop] = (x, y)
+        self._kop[rij] = (kop + 1) % self.capaciteit
+        self._aantal[rij] = min(aantal + 1, self.capaciteit)
+        self._versies[rij] += 1
+
+# Eerste en laatste tijdstip over alle treinen, of None als er nog niets is
+
+    def bereik(self):
+        if not len(self._rij_van_id):
+            return None
+        n = len(self._rij_van_id)
+        aantal = self._aantal[:n]
+        gevuld = np.flatnonzero(aantal)
+        if not len(gevuld):
+            return None
+        start = np.where(aantal[gevuld] == self.capaciteit, self._kop[gevuld], 0)
+        laatste = (self._kop[gevuld] - 1) % self.capaciteit
+        return float(self._tijd[gevuld, start].min()), float(self._tijd[gevuld, laatste].max())
+
+# In een ringbuffer staat de oudste positie op kop (als hij vol is) of op 0.
+# Logisch index i (0 = oudste) staat dus fysiek op (start + i) % capaciteit.
+
+    def _start(self, rij):
+        return int(self._kop[rij]) if self._aantal[rij] == self.capaciteit else 0
+
+# Aantal posities van deze trein met tijd <= tijd (twee gesorteerde stukken, dus twee keer bisect)
+
+    def _tot_en_met(self, rij, tijd):
+        aantal = int(self._aantal[rij])
+        start = self._start(rij)
+        tijden = self._tijd[rij]
+        if start == 0:
+            return int(np.searchsorted(tijden[:aantal], tijd, side="right"))
+        eerste = tijden[start:]
+        if eerste[-1] > tijd:
+            return int(np.searchsorted(eerste, tijd, side="right"))
+        return len(eerste) + int(np.searchsorted(tijden[:start], tijd, side="right"))
+
+# Tijden en posities van één trein tussen van en tot (chronologisch, een kopie van alleen dat stuk)
+
+    def spoor(self, trein_id, van=None, tot=None):
+        rij = self._rij_van_id.get(trein_id)
+        if rij is None or not self._aantal[rij]:
+            return np.zeros(0, dtype=np.float64), np.zeros((0, 2), dtype=np.float32)
+        a = 0 if van is None else self._tot_en_met(rij, van)
+        if van is not None and a > 0:
+            a -= 1
+        b = int(self._aantal[rij]) if tot is None else self._tot_en_met(rij, tot)
+        index = (self._start(rij) + np.arange(a, b)) % self.capaciteit
+        return self._tijd[rij, index], self._xy[rij, index]
+
+    def laatste_tijd(self, trein_id):
+        rij = self._rij_van_id.get(trein_id)
+        if rij is None or not self._aantal[rij]:
+            return None
+        return float(self._tijd[rij, (self._kop[rij] - 1) % self.capaciteit])
+
+# Posities van alle treinen op tijdstip tijd, lineair geïnterpoleerd tussen de twee omliggende posities.
+# Treinen die toen nog niet bekend waren doen niet mee. Geeft (trein_ids, xy) terug.
+
+    def posities_op(self, tijd):
+        ids = []
+        posities = []
+        for trein_id, rij in self._rij_van_id.items():
+            k = self._tot_en_met(rij, tijd)
+            if k == 0:
+                continue
+            start = self._start(rij)
+            i = (start + k - 1) % self.capaciteit
+            xy = self._xy[rij, i].astype(np.float64)
+            if k < self._aantal[rij]:
+                j = (i + 1) % self.capaciteit
+                t0 = self._tijd[rij, i]
+                t1 = self._tijd[rij, j]
+                if t1 > t0:
+                    xy = xy + (self._xy[rij, j] - xy) * ((tijd - t0) / (t1 - t0))
+            ids.append(trein_id)
+            posities.append(xy)
+        return np.asarray(ids, dtype=np.int64), np.asarray(posities, dtype=np.float64).reshape(-1, 2)
+
+
+# Douglas-Peucker: de index van de punten die overblijven als alle punten die minder dan epsilon van de
+# vereenvoudigde lijn af liggen weg mogen. Eerst gooien we punten weg die gelijk zijn aan hun voorganger
+# (een stilstaande trein), daarna werken we met een stapel in plaats van recursie.
+
+def vereenvoudig(punten, epsilon):
+    punten = np.asarray(punten, dtype=np.float64)
+    n = len(punten)
+    if n <= 2:
+        return np.arange(n)
+    anders = np.ones(n, dtype=bool)
+    anders[1:] = np.any(punten[1:] != punten[:-1], axis=1)
+    anders[-1] = True
+    index = np.flatnonzero(anders)
+    punten = punten[index]
+    n = len(punten)
+    if n <= 2:
+        return index
+
+    houd = np.zeros(n, dtype=bool)
+    houd[0] = houd[-1] = True
+    stapel = [(0, n - 1)]
+    while stapel:
+        a, b = stapel.pop()
+        if b - a < 2:
+            continue
+        begin = punten[a]
+        richting = punten[b] - begin
+        tussen = punten[a + 1:b] - begin
+        lengte = float(np.hypot(richting[0], richting[1]))
+        if lengte == 0.0:
+            afstand = np.hypot(tussen[:, 0], tussen[:, 1])
+        else:
+            afstand = np.abs(richting[0] * tussen[:, 1] - richting[1] * tussen[:, 0]) / lengte
+        i = int(afstand.argmax())
+        if afstand[i] > epsilon:
+            m = a + 1 + i
+            houd[m] = True
+            stapel.append((a, m))
+            stapel.append((m, b))
+    return index[houd]
+
+
+# Klasse : Spoor
+# Het vereenvoudigde spoor van één trein in pixels, bijgehouden per blok van BLOK posities.
+# Een vol blok wordt één keer vereenvoudigd en daarna niet meer aangeraakt ("vast"); bij een nieuwe positie
+# hoeft alleen de staart na het laatste volle blok opnieuw. Een update kost dus hoogstens één blok werk,
+# hoe lang de geschiedenis ook is. Bij een andere schaal (resize) beginnen we opnieuw.
+# Als het oudste blok helemaal uit de ringbuffer verdwenen is, valt het ook uit het spoor.
+
+BLOK = 256
+
+
+class Spoor:
+    def __init__(self, historie, trein_id, epsilon=1.0, blok=BLOK):
+        self.historie = historie
+        self.trein_id = trein_id
+        self.epsilon = epsilon
+        self.blok = blok
+        self._schaal = None
+        self._begin()
+
+    def _begin(self):
+        self._tijd = np.zeros(0, dtype=np.float64)
+        self._vast = np.zeros((0, 2), dtype=np.float64)
+        self._grenzen = []
+        self._weg = 0
+
+# Het spoor tot en met tijdstip tot (None = alles) voor een kaart van schaal = (w, h), in twee delen:
+#   sleutel : verandert alleen als het vaste deel verandert (voor een cache van het getekende vaste deel)
+#   vast    : de punten van de volle blokken (k, 2)
+#   staart  : de punten daarna, beginnend bij het laatste vaste punt
+
+    def delen(self, schaal, tot=None):
+        schaal = (float(schaal[0]), float(schaal[1]))
+        if schaal != self._schaal:
+            self._schaal = schaal
+            self._begin()
+        self._vries()
+
+        n = len(self._grenzen)
+        if tot is not None and n:
+            n = int(np.searchsorted(self._tijd[self._grenzen], tot, side="right"))
+        vast = self._vast[:self._grenzen[n - 1] + 1] if n else self._vast[:0]
+        van = self._tijd[self._grenzen[n - 1]] if n else None
+        _tijden, xy = self.historie.spoor(self.trein_id, van=van, tot=tot)
+        staart = xy * schaal
+        if len(staart) > 2:
+            staart = staart[vereenvoudig(staart, self.epsilon)]
+        return (self._weg, n), vast, staart
+
+# Vereenvoudigt alle volle blokken na het laatste vaste punt en zet het resultaat vast.
+# Daarna vallen de blokken weg die helemaal voor de oudste positie in de ringbuffer liggen.
+
+    def _vries(self):
+        while True:
+            van = self._tijd[self._grenzen[-1]] if self._grenzen else None
+            tijden, xy = self.historie.spoor(self.trein_id, van=van)
+            if len(tijden) <= self.blok:
+                break
+            tijden = tijden[:self.blok + 1]
+            pixels = xy[:self.blok + 1] * self._schaal
+            houd = vereenvoudig(pixels, self.epsilon)
+            if van is not None:
+                houd = houd[1:]
+            self._tijd = np.concatenate([self._tijd, tijden[houd]])
+            self._vast = np.concatenate([self._vast, pixels[houd]])
+            self._grenzen.append(len(self._tijd) - 1)
+
+        if self._grenzen:
+            oudste, _ = self.historie.spoor(self.trein_id, tot=self._tijd[self._grenzen[0]])
+            if not len(oudste):
+                eerste = self._grenzen.pop(0)
+                self._tijd = self._tijd[eerste:]
+                self._vast = self._vast[eerste:]
+                self._grenzen = [g - eerste for g in self._grenzen]
+                self._weg += 1
@@ -0,0 +1,231 @@
+# metrieken.py - Lichte instrumentatie voor de hete paden van de GUI
+# Als gasten melden dat de kaart "hapert" willen we kunnen zien waar het aan ligt: de paint zelf,
+# een event loop die vastzit, of de snelheid waarmee updates binnenkomen.
+#
+# Aanzetten via de omgeving:
+#   LSM_METRIEKEN=pad           histogrammen en tellers worden elke 10 s naar dit pad geschreven;
+#                               eindigt het pad op .prom dan in Prometheus tekstformaat, anders als JSON
+#   LSM_METRIEKEN_OVERLAY=1     FPS en p99 frametijd linksboven op de kaart
+#
+# Staat alles uit (standaard), dan kost een @gemeten functie alleen een extra functieaanroep en één if.
+# Alle metingen gebeuren op de GUI thread, daarom is er geen lock nodig.
+
+import json
+import os
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from PyQt6.QtCore import QObject, QTimer
+
+# Grenzen van de emmers in ms: van 0.01 ms tot ongeveer 10 s, elke emmer een factor wortel 2 groter
+
+GRENZEN_MS = tuple(round(0.01 * 2 ** (i / 2), 4) for i in range(41))
+
+EXPORT_INTERVAL_MS = 10_000
+LAG_INTERVAL_MS = 50
+
+
+# Klasse : Histogram
+# Telt waarnemingen in vaste emmers (zoals een Prometheus histogram). Waarnemen is een bisect en een paar optellingen,
+# kwantielen worden geschat op de bovengrens van de emmer waar het kwantiel in valt.
+
+class Histogram:
+    __slots__ = ("naam", "grenzen", "emmers", "aantal", "som", "maximum")
+
+    def __init__(self, naam, grenzen=GRENZEN_MS):
+        self.naam = naam
+        self.grenzen = grenzen
+        self.emmers = [0] * (len(grenzen) + 1)
+        self.aantal = 0
+        self.som = 0.0
+        self.maximum = 0.0
+
+    def observeer(self, ms):
+        self.emmers[bisect_left(self.grenzen, ms)] += 1
+        self.aantal += 1
+        self.som += ms
+        if ms > self.maximum:
+            self.maximum = ms
+
+# Kwantiel over alle waarnemingen, of over een eigen lijst emmers (bijvoorbeeld het verschil met een eerdere kopie)
+
+    def kwantiel(self, q, emmers=None):
+        emmers = self.emmers if emmers is None else emmers
+        aantal = sum(emmers)
+        if aantal == 0:
+            return 0.0
+        doel = q * aantal
+        cumulatief = 0
+        for i, n in enumerate(emmers):
+            cumulatief += n
+            if cumulatief >= doel:
+                return min(self.grenzen[i], self.maximum) if i < len(self.grenzen) else self.maximum
+        return self.maximum
+
+    def gemiddelde(self):
+        return self.som / self.aantal if self.aantal else 0.0
+
+    def samenvatting(self):
+        return {
+            "aantal": self.aantal,
+            "gem_ms": self.gemiddelde(),
+            "p50_ms": self.kwantiel(0.50),
+            "p99_ms": self.kwantiel(0.99),
+            "max_ms": self.maximum,
+        }
+
+
+# Klasse : Metrieken
+# Verzameling histogrammen, tellers en meters op naam. actief bepaalt of @gemeten iets meet.
+# Een meter is een momentane waarde (zoals de lengte van een wachtrij): een getal, of een functie zonder
+# argumenten die pas bij het wegschrijven wordt aangeroepen.
+
+class Metrieken:
+    def __init__(self, actief=False, overlay=False):
+        self.actief = actief or overlay
+        self.overlay = overlay
+        self._histogrammen = {}
+        self._tellers = {}
+        self._meters = {}
+
+    def histogram(self, naam):
+        histogram = self._histogrammen.get(naam)
+        if histogram is None:
+            histogram = self._histogrammen[naam] = Histogram(naam)
+        return histogram
+
+    def observeer(self, naam, ms):
+        self.histogram(naam).observeer(ms)
+
+    def tel(self, naam, aantal=1):
+        self._tellers[naam] = self._tellers.get(naam, 0) + aantal
+
+    def meter(self, naam, waarde):
+        self._meters[naam] = waarde
+
+    def _meterstanden(self):
+        standen = {}
+        for naam, waarde in sorted(self._meters.items()):
+            try:
+                standen[naam] = waarde() if callable(waarde) else waarde
+            except Exception:
+                pass
+        return standen
+
+    def momentopname(self):
+        return {
+            "tijdstip": time.time(),
+            "histogrammen": {naam: h.samenvatting() for naam, h in sorted(self._histogrammen.items())},
+            "tellers": dict(sorted(self._tellers.items())),
+            "meters": self._meterstanden(),
+        }
+
+    def prometheus(self):
+        regels = []
+        for naam, h in sorted(self._histogrammen.items()):
+            metriek = f"lsm_{naam}_ms"
+            regels.append(f"# TYPE {metriek} histogram")
+            cumulatief = 0
+            for grens, n in zip(h.grenzen, h.emmers):
+                cumulatief += n
+                regels.append(f'{metriek}_bucket{{le="{grens:g}"}} {cumulatief}')
+            regels.append(f'{metriek}_bucket{{le="+Inf"}} {h.aantal}')
+            regels.append(f"{metriek}_sum {h.som:.6f}")
+            regels.append(f"{metriek}_count {h.aantal}")
+        for naam, waarde in sorted(self._tellers.items()):
+            regels.append(f"# TYPE lsm_{naam}_totaal counter")
+            regels.append(f"lsm_{naam}_totaal {waarde}")
+        for naam, waarde in self._meterstanden().items():
+            regels.append(f"# TYPE lsm_{naam} gauge")
+            regels.append(f"lsm_{naam} {waarde}")
+        return "\n".join(regels) + "\n"
+
+# Schrijft eerst naar een tijdelijk bestand en vervangt dan het oude, zodat een lezer nooit een half bestand ziet
+
+    def schrijf(self, pad):
+        tekst = self.prometheus() if pad.endswith(".prom") else json.dumps(self.momentopname(), indent=2)
+        tijdelijk = pad + ".tmp"
+        with open(tijdelijk, "w") as f:
+            f.write(tekst)
+        os.replace(tijdelijk, pad)
+
+
+METRIEKEN = Metrieken(
+    actief=bool(os.environ.get("LSM_METRIEKEN")),
+    overlay=os.environ.get("LSM_METRIEKEN_OVERLAY") == "1",
+)
+
+
+# Decorator: meet de duur van een functie (in ms) in het histogram met deze naam, alleen als METRIEKEN.actief is
+
+def gemeten(naam):
+    def decorator(functie):
+        @wraps(functie)
+        def omhulsel(*args, **kwargs):
+            if not METRIEKEN.actief:
+                return functie(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return functie(*args, **kwargs)
+            finally:
+                METRIEKEN.observeer(naam, (time.perf_counter() - start) * 1000.0)
+        return omhulsel
+    return decorator
+
+
+# Klasse : LagMeter
+# Een timer die elke LAG_INTERVAL_MS zou moeten afgaan; hoeveel later hij echt afgaat is de event loop lag.
+
+class LagMeter(QObject):
+    def __init__(self, metrieken=METRIEKEN, interval_ms=LAG_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.metrieken = metrieken
+        self.interval_ms = interval_ms
+        self._vorige = time.perf_counter()
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._tik)
+
+    def start(self):
+        self._vorige = time.perf_counter()
+        self._timer.start()
+        return self
+
+    def stop(self):
+        self._timer.stop()
+
+    def _tik(self):
+        nu = time.perf_counter()
+        lag = (nu - self._vorige) * 1000.0 - self.interval_ms
+        self._vorige = nu
+        self.metrieken.observeer("event_loop_lag", max(0.0, lag))
+
+
+# Klasse : MetriekExport
+# Start de LagMeter en schrijft de metrieken periodiek (en bij stop) naar schijf
+
+class MetriekExport(QObject):
+    def __init__(self, pad, metrieken=METRIEKEN, interval_ms=EXPORT_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.pad = pad
+        self.metrieken = metrieken
+        self.lag = LagMeter(metrieken, parent=self).start()
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.schrijf)
+        if pad:
+            self._timer.start()
+
+    def schrijf(self):
+        if not self.pad:
+            return
+        try:
+            self.metrieken.schrijf(self.pad)
+        except OSError:
+            pass
+
+    def stop(self):
+        self._timer.stop()
+        self.lag.stop()
+        self.schrijf()
@@ -0,0 +1,679 @@
+# parksimulatie.py - Deterministische simulatie van een parkdag, als bron van belasting voor de app en de database
+# Starten vanuit de map "Startcode treintje":
+#   python -m live.parksimulatie                                   alleen de simulatie, zo snel mogelijk
+#   python -m live.parksimulatie --database piekdag.db             een drukke dag in de database (nieuw bestand: groot park)
+#   python -m live.parksimulatie --database piekdag.db --tempo 60  een minuut parkdag per seconde, voor de app
+#   python -m live.parksimulatie --profiel parkdag.prof            met cProfile
+# In de app: LSM_DATABASE=piekdag.db LSM_SIMULATIE=60 python main.py (zie simulatie_uit_omgeving).
+#
+# Discrete events: een heap met (tijd, volgnummer, actie, doel). De klok springt van event naar event,
+# dus een dag van negen uur kost alleen de rekentijd van de events. Alle toeval komt uit één random.Random(seed)
+# en gelijke tijden worden in volgorde van inplannen afgehandeld: dezelfde seed geeft dezelfde dag.
+#
+# Het model:
+#   - de treinen rijden de ringlijn van Scherm2 (maak_ringlijn langs alle locaties) en stoppen bij elke halte
+#   - bezoekers komen binnen bij de ingang (het eerste perron) en scannen hun QR-code, met een piek bij de opening
+#   - een bezoeker gaat steeds naar de dichtstbijzijnde attractie van zijn plan: lopen, of met de trein als
+#     dat sneller is (dezelfde afweging als planning/bezoekvolgorde.py); voor de sluiting gaan ze terug naar de ingang
+#   - check-in en check-out (Reis) bij elke attractie en bij elke treinrit; een attractie heeft een doorvoer
+#     per minuut, zo ontstaan de rijen en de wachttijden
+#   - een paar bezoekers (rolstoel, kinderwagen) reserveren een plek in de trein, na een rit geeft een deel feedback
+# Wat er gebeurt gaat naar een Afnemer: niets (alleen rekenen), of de DatabaseAfnemer die alles via de
+# bestaande paden in de database schrijft (ScanValidatie, CheckinPijplijn, ReserveringsAllocator, FeedbackRollups).
+
+import argparse
+import heapq
+import itertools
+import math
+import os
+import random
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+
+from database.checkin import CheckinPijplijn
+from database.gegevens import KAART_SCHAAL, PERRON_PREFIX
+from database.qrscan import ScanValidatie
+from planning.bezoekvolgorde import INSTAP_MINUTEN, LOOP_MINUTEN_PER_EENHEID
+from planning.reserveringen import GERESERVEERD, ReserveringsAllocator
+from planning.routegraaf import maak_ringlijn
+
+# De parkdag in seconden sinds middernacht. Na LAATSTE_START begint niemand meer aan een attractie
+# en na LAATSTE_AANKOMST komen er geen bezoekers meer binnen. De simulatie loopt tot EINDE.
+
+OPENING = 9 * 3600
+SLUITING = 18 * 3600
+LAATSTE_START = SLUITING - 3600
+LAATSTE_AANKOMST = SLUITING - 3 * 3600
+EINDE = SLUITING + 3600
+
+# Aankomst: PIEK_DEEL van de bezoekers komt rond de opening (halve normale verdeling met PIEK_SPREIDING seconden),
+# de rest verspreid tot LAATSTE_AANKOMST
+
+PIEK_DEEL = 0.6
+PIEK_SPREIDING = 45 * 60
+
+ATTRACTIES_PER_BEZOEKER = (3, 8)
+DOORVOER_PER_MINUUT = (15.0, 40.0)
+RITDUUR_MINUTEN = (2.0, 6.0)
+MAX_WACHTTIJD = 60 * 60
+
+# Treinen: stilstaan per halte, en hoeveel plekken per trein gereserveerd kunnen worden
+
+HALTE_SECONDEN = 30
+RESERVEERBAAR = 4
+
+RESERVEER_KANS = 0.03
+FEEDBACK_KANS = 0.2
+WACHTTIJD_INTERVAL = 300
+
+STANDAARD_BEZOEKERS = 50_000
+
+
+def kloktijd(tijd):
+    tijd = int(tijd)
+    return f"{tijd // 3600:02d}:{tijd // 60 % 60:02d}:{tijd % 60:02d}"
+
+
+# Klasse : Park
+# De locaties en treinen (rijen uit Gegevens.locaties() en Gegevens.treinen()) omgezet naar haltes op de
+# ringlijn. Alles hieronder werkt met de index van de halte; ids[i] is het locatie_id.
+
+class Park:
+    def __init__(self, locaties, treinen):
+        rijen = {rij["naam"]: rij for rij in locaties if rij["loc_x"] is not None and rij["loc_y"] is not None}
+        if not rijen:
+            raise ValueError("het park heeft geen locaties op de kaart")
+        self.ring = maak_ringlijn([(rij["loc_x"] / KAART_SCHAAL, rij["loc_y"] / KAART_SCHAAL, naam) for naam, rij in rijen.items()])
+        self.namen = self.ring.namen
+        self.ids = [rijen[naam]["locatie_id"] for naam in self.namen]
+        xy = [(rijen[naam]["loc_x"] / KAART_SCHAAL, rijen[naam]["loc_y"] / KAART_SCHAAL) for naam in self.namen]
+        n = len(self.namen)
+
+        # alle tijden in seconden
+        self.lopen = [[math.dist(a, b) * LOOP_MINUTEN_PER_EENHEID * 60.0 for b in xy] for a in xy]
+        self.rit = (self.ring.tabel() * 60.0).tolist()
+        self.stuk = [self.ring.reistijd(self.namen[i], self.namen[(i + 1) % n]) * 60.0 if n > 1 else 0.0 for i in range(n)]
+
+        self.is_perron = [naam.startswith(PERRON_PREFIX) for naam in self.namen]
+        self.attracties = [i for i in range(n) if not self.is_perron[i]]
+        perrons = sorted((self.ids[i], i) for i in range(n) if self.is_perron[i])
+        self.ingang = perrons[0][1] if perrons else 0
+        self.treinen = [(rij["trein_id"], rij["max_capaciteit"]) for rij in treinen] if n > 1 else []
+
+        # aankomsttijd van een trein bij halte i, gerekend vanaf halte 0 (inclusief stilstaan)
+        self.offset = list(itertools.accumulate((stuk + HALTE_SECONDEN for stuk in self.stuk), initial=0.0))
+        self.rondje = self.offset[-1]
+
+    def __len__(self):
+        return len(self.namen)
+
+
+# Klasse : _Bezoeker
+# plek is de halte waar de bezoeker nu is, doel waar hij heen gaat; sinds is het begin van het wachten op de trein
+
+class _Bezoeker:
+    __slots__ = ("nummer", "qr_id", "plan", "plek", "doel", "van", "sinds", "ingestapt", "reserveert", "reservering")
+
+    def __init__(self, nummer, qr_id, plan, plek, reserveert):
+        self.nummer = nummer
+        self.qr_id = qr_id
+        self.plan = plan
+        self.plek = plek
+        self.doel = plek
+        self.van = plek
+        self.sinds = 0.0
+        self.ingestapt = 0.0
+        self.reserveert = reserveert
+        self.reservering = None
+
+
+# Klasse : _Trein
+# halte is de volgende halte en aankomst de tijd dat de trein daar is; passagiers[i] stappen uit bij halte i.
+# Zonder reservering mogen er capaciteit - reserveerbaar mensen in, de rest van de plekken is voor reserveringen.
+
+class _Trein:
+    __slots__ = ("trein_id", "capaciteit", "reserveerbaar", "halte", "aankomst", "passagiers", "zonder", "gereserveerd")
+
+    def __init__(self, trein_id, capaciteit, haltes, halte, aankomst):
+        self.trein_id = trein_id
+        self.capaciteit = capaciteit
+        self.reserveerbaar = min(RESERVEERBAAR, capaciteit)
+        self.halte = halte
+        self.aankomst = aankomst
+        self.passagiers = [[] for _ in range(haltes)]
+        self.zonder = 0
+        self.gereserveerd = 0
+
+
+# Klasse : Afnemer
+# Krijgt alles wat er in de simulatie gebeurt. Deze versie doet niets (voor het meten van de simulatie zelf);
+# locatie_ids zijn de ids uit de database, tijd is in seconden sinds middernacht.
+
+class Afnemer:
+    def begin_dag(self, datum, codes):
+        pass
+
+# Het qr_id bij een gescande code, of None als de code niet geldig is
+
+    def scan(self, data, nummer):
+        return nummer + 1
+
+    def reis(self, tijd, qr_id, locatie_id, trein_id, ingecheckt):
+        pass
+
+# True als de reservering gelukt is
+
+    def reserveer(self, tijd, qr_id, trein_id, van_locatie_id, naar_locatie_id):
+        return True
+
+    def einde_reservering(self, tijd, qr_id, trein_id):
+        pass
+
+    def feedback(self, tijd, qr_id, van_locatie_id, naar_locatie_id, rating):
+        pass
+
+    def trein_rit(self, tijd, trein_id, van_locatie_id, naar_locatie_id):
+        pass
+
+    def wachttijden(self, tijd, wachttijden):
+        pass
+
+    def einde_dag(self):
+        pass
+
+    def tellers(self):
+        return {}
+
+
+# Klasse : TelAfnemer
+# Telt de events per soort en houdt een checksum over alles bij: twee runs met dezelfde seed geven dezelfde checksum
+
+class TelAfnemer(Afnemer):
+    def __init__(self):
+        self.aantallen = {}
+        self.checksum = 0
+
+    def _tel(self, soort, *waarden):
+        self.aantallen[soort] = self.aantallen.get(soort, 0) + 1
+        self.checksum = zlib.crc32(repr((soort, waarden)).encode(), self.checksum)
+
+    def reis(self, tijd, qr_id, locatie_id, trein_id, ingecheckt):
+        self._tel("reis", round(tijd, 3), qr_id, locatie_id, trein_id, ingecheckt)
+
+    def reserveer(self, tijd, qr_id, trein_id, van_locatie_id, naar_locatie_id):
+        self._tel("reservering", round(tijd, 3), qr_id, trein_id, van_locatie_id, naar_locatie_id)
+        return True
+
+    def feedback(self, tijd, qr_id, van_locatie_id, naar_locatie_id, rating):
+        self._tel("feedback", round(tijd, 3), qr_id, van_locatie_id, naar_locatie_id, rating)
+
+    def trein_rit(self, tijd, trein_id, van_locatie_id, naar_locatie_id):
+        self._tel("trein_rit", round(tijd, 3), trein_id, van_locatie_id, naar_locatie_id)
+
+    def wachttijden(self, tijd, wachttijden):
+        self._tel("wachttijden", round(tijd, 3), sorted(wachttijden.items()))
+
+    def tellers(self):
+        return {**self.aantallen, "checksum": f"{self.checksum:08x}"}
+
+
+# Klasse : DatabaseAfnemer
+# Schrijft de parkdag via dezelfde paden als de kiosken en poorten in de database:
+#   scan             : ScanValidatie (de codes van de dag worden bij begin_dag aangemaakt en geladen)
+#   reis             : CheckinPijplijn (write-behind, in batches); scans die niet in de wachtrij passen tellen als verloren
+#   reserveer        : ReserveringsAllocator met de haltes van de ringlijn, net als Scherm2
+#   feedback         : FeedbackRollups.geef_veel per FEEDBACK_BATCH, met de tijd van de gesimuleerde dag
+#   trein_rit        : Trein.vertrekkend_locatie_id / aankomend_locatie_id
+#   wachttijden      : Locatie.wachttijd
+# Trein, Locatie en Reservering hebben triggers voor het wijzigingslog, dus de snapshot van de app volgt vanzelf.
+
+class DatabaseAfnemer(Afnemer):
+    FEEDBACK_BATCH = 500
+    MAX_WACHT = 5.0
+
+    def __init__(self, gegevens, park):
+        self.gegevens = gegevens
+        self.datum = None
+        self._naam = dict(zip(park.ids, park.namen))
+        self.validatie = ScanValidatie(gegevens.pool)
+        self.pijplijn = CheckinPijplijn(gegevens.pool, max_wachtrij=50_000)
+        self.allocator = ReserveringsAllocator(gegevens.pool, park.namen, capaciteit=lambda _trein_id: RESERVEERBAAR)
+        self._feedback = []
+        self.fouten = 0
+        self.verloren = 0
+
+        # scan_id per rij in Reis: uniek per run, zonder voor elke scan een uuid te maken
+        self._run = uuid.uuid4().hex[:12]
+        self._scan_nummer = itertools.count()
+
+# Maakt de QR-codes van de dag aan (alleen de codes die er nog niet zijn) en laadt ze in de ScanValidatie
+
+    def begin_dag(self, datum, codes):
+        self.datum = datum
+        pool = self.gegevens.pool
+        bestaand = {rij["data"] for rij in pool.haal_op("SELECT data FROM QRCode WHERE datum = ?", (datum,))}
+        pool.voer_veel_uit("INSERT INTO QRCode (data, datum) VALUES (?, ?)", [(data, datum) for data in codes if data not in bestaand])
+        self.validatie.laad_dag(datum)
+        self.pijplijn.start()
+
+    def scan(self, data, nummer):
+        return self.validatie.valideer(data)
+
+# Wacht op plek in de wachtrij zolang de schrijfthread loopt, maar hoogstens MAX_WACHT seconden.
+# Loopt de thread niet (meer), of komt er geen plek vrij, dan telt de scan als verloren in plaats van
+# dat de simulatie eeuwig blijft wachten op een wachtrij die nooit meer leegloopt.
+
+    def reis(self, tijd, qr_id, locatie_id, trein_id, ingecheckt):
+        scan_id = f"{self._run}-{next(self._scan_nummer)}"
+        if not self.pijplijn.loopt() or not self.pijplijn.aanbieden(qr_id, locatie_id, ingecheckt, trein_id=trein_id,
+                                                                    scan_id=scan_id, timeout=self.MAX_WACHT):
+            self.verloren += 1
+
+    def reserveer(self, tijd, qr_id, trein_id, van_locatie_id, naar_locatie_id):
+        resultaat = self.allocator.reserveer(qr_id, trein_id, self._naam[van_locatie_id], self._naam[naar_locatie_id])
+        return resultaat == GERESERVEERD
+
+    def einde_reservering(self, tijd, qr_id, trein_id):
+        self.allocator.annuleer(qr_id, trein_id)
+
+    def feedback(self, tijd, qr_id, van_locatie_id, naar_locatie_id, rating):
+        self._feedback.append((qr_id, van_locatie_id, naar_locatie_id, rating, "", f"{self.datum} {kloktijd(tijd)}"))
+        if len(self._feedback) >= self.FEEDBACK_BATCH:
+            self._schrijf_feedback()
+
+    def _schrijf_feedback(self):
+        rijen, self._feedback = self._feedback, []
+        if rijen:
+            self.gegevens.feedback.geef_veel(rijen)
+
+    def trein_rit(self, tijd, trein_id, van_locatie_id, naar_locatie_id):
+        try:
+            self.gegevens.zet_trein_rit(trein_id, van_locatie_id, naar_locatie_id)
+        except Exception:
+            self.fouten += 1
+
+    def wachttijden(self, tijd, wachttijden):
+        self._schrijf_feedback()
+        self.gegevens.bewaar_wachttijden(wachttijden)
+
+    def einde_dag(self):
+        self._schrijf_feedback()
+        self.pijplijn.leeg(timeout=60.0)
+        self.pijplijn.stop()
+
+    def tellers(self):
+        return {
+            "scans": self.validatie.tellers(),
+            "checkin": self.pijplijn.tellers(),
+            "verloren": self.verloren,
+            "reserveringen": {"geaccepteerd": self.allocator.geaccepteerd, "afgewezen": self.allocator.afgewezen,
+                              "conflicten": self.allocator.conflicten},
+            "fouten": self.fouten,
+        }
+
+
+# Klasse : ParkSimulatie
+# park      : Park
+# afnemer   : Afnemer die de events krijgt (standaard: niets doen)
+# bezoekers : aantal bezoekers op deze dag
+# seed      : zelfde seed, zelfde dag
+# datum     : datum van de QR-codes en de feedback
+# tempo     : gesimuleerde seconden per echte seconde; None is zo snel mogelijk
+
+class ParkSimulatie:
+    def __init__(self, park, afnemer=None, bezoekers=STANDAARD_BEZOEKERS, seed=1, datum=None, tempo=None):
+        self.park = park
+        self.afnemer = afnemer or Afnemer()
+        self.bezoekers = bezoekers
+        self.seed = seed
+        self.datum = time.strftime("%Y-%m-%d") if datum is None else datum
+        self.tempo = tempo
+        self.nu = float(OPENING)
+        self._rng = random.Random(seed)
+        self._heap = []
+        self._volgnummer = itertools.count()
+        self._stop = threading.Event()
+        self._thread = None
+        self._begonnen = False
+
+        n = len(park)
+        self._wachtend = [deque() for _ in range(n)]
+        self._met_reservering = [[] for _ in range(n)]
+        self._vrij_om = [0.0] * n
+        self._per_bezoeker = [60.0 / self._rng.uniform(*DOORVOER_PER_MINUUT) for _ in range(n)]
+        self._ritduur = [60.0 * self._rng.uniform(*RITDUUR_MINUTEN) for _ in range(n)]
+        self._treinen = []
+        if park.treinen:
+            self._interval = park.rondje / len(park.treinen)
+            self._plekken_per_trein = max(1, sum(c - min(RESERVEERBAAR, c) for _id, c in park.treinen) // len(park.treinen))
+
+        self.events = 0
+        self.binnen = 0
+        self.geweigerd = 0
+        self.vertrokken = 0
+        self.ritten = 0
+        self.attractiebezoeken = 0
+        self.reserveringen = 0
+        self.feedback = 0
+        self.rekentijd = 0.0
+
+    def codes(self):
+        return [f"SIM{self.seed}-{self.datum}-{nummer:06d}" for nummer in range(self.bezoekers)]
+
+    def plan(self, tijd, actie, doel=None):
+        heapq.heappush(self._heap, (tijd, next(self._volgnummer), actie, doel))
+
+# De dag klaarzetten: codes naar de afnemer, alle aankomsten en de treinen (verdeeld over het rondje) in de heap
+
+    def _begin(self):
+        self._begonnen = True
+        park, rng = self.park, self._rng
+        self.afnemer.begin_dag(self.datum, self.codes())
+        for nummer in range(self.bezoekers):
+            if rng.random() < PIEK_DEEL:
+                aankomst = OPENING + abs(rng.gauss(0.0, PIEK_SPREIDING))
+            else:
+                aankomst = rng.uniform(OPENING, LAATSTE_AANKOMST)
+            self.plan(min(aankomst, LAATSTE_AANKOMST), self._kom_aan, nummer)
+        for i, (trein_id, capaciteit) in enumerate(park.treinen):
+            start = park.rondje * i / len(park.treinen)
+            halte = next(h for h in range(len(park.offset)) if park.offset[h] >= start)
+            trein = _Trein(trein_id, capaciteit, len(park), halte % len(park), OPENING + park.offset[halte] - start)
+            self._treinen.append(trein)
+            self.plan(trein.aankomst, self._trein_aankomst, trein)
+        self.plan(OPENING + WACHTTIJD_INTERVAL, self._meet_wachttijden)
+
+# Handelt events af tot de heap leeg is, tot het tijdstip tot (standaard EINDE) of tot stop()
+
+    def draai(self, tot=EINDE):
+        if not self._begonnen:
+            self._begin()
+        heap = self._heap
+        start_echt, start_sim = time.monotonic(), self.nu
+        start = time.perf_counter()
+        gewacht = 0.0
+        try:
+            while heap and heap[0][0] <= tot and not self._stop.is_set():
+                if self.tempo:
+                    wacht = start_echt + (heap[0][0] - start_sim) / self.tempo - time.monotonic()
+                    if wacht > 0:
+                        gewacht += wacht
+                        if self._stop.wait(wacht):
+                            break
+                tijd, _volgnummer, actie, doel = heapq.heappop(heap)
+                self.nu = tijd
+                actie(doel)
+                self.events += 1
+        finally:
+            self.rekentijd += time.perf_counter() - start - gewacht
+        if self._stop.is_set() or not heap or tot >= EINDE:
+            self.afnemer.einde_dag()
+        return self
+
+# In een achtergrondthread draaien (bijvoorbeeld in de app), stop() wacht tot de thread klaar is
+
+    def start(self):
+        self._thread = threading.Thread(target=self.draai, name="parksimulatie", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=10.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+# Bezoekers
+
+    def _kom_aan(self, nummer):
+        park, rng = self.park, self._rng
+        qr_id = self.afnemer.scan(f"SIM{self.seed}-{self.datum}-{nummer:06d}", nummer)
+        if qr_id is None or not park.attracties:
+            self.geweigerd += 1
+            return
+        aantal = min(len(park.attracties), rng.randint(*ATTRACTIES_PER_BEZOEKER))
+        bezoeker = _Bezoeker(nummer, qr_id, rng.sample(park.attracties, aantal), park.ingang, rng.random() < RESERVEER_KANS)
+        self.binnen += 1
+        self._verder(bezoeker)
+
+# Naar de dichtstbijzijnde attractie van het plan (of naar de uitgang). Kiezen gaat met de gemiddelde wachttijd
+# op de trein, zoals in bezoekvolgorde.py; lopen of de trein nemen met de rij die nu op het perron staat:
+# wie voor zich meer mensen ziet dan er in de volgende treinen passen, gaat lopen.
+
+    def _verder(self, bezoeker):
+        park, plek = self.park, bezoeker.plek
+        lopen, rit = park.lopen[plek], park.rit[plek]
+        instap = INSTAP_MINUTEN * 60.0
+        if bezoeker.plan and self.nu < LAATSTE_START:
+            doel = min(bezoeker.plan, key=lambda i: min(lopen[i], rit[i] + instap))
+            bezoeker.plan.remove(doel)
+        elif plek == park.ingang:
+            self.vertrokken += 1
+            return
+        else:
+            bezoeker.plan = []
+            doel = park.ingang
+        bezoeker.doel = doel
+        if self._treinen:
+            wachten = (len(self._wachtend[plek]) // self._plekken_per_trein + 0.5) * self._interval
+            if rit[doel] + wachten < lopen[doel]:
+                self._naar_halte(bezoeker)
+                return
+        self.plan(self.nu + lopen[doel], self._aangekomen, bezoeker)
+
+# Bij een attractie: is de rij langer dan MAX_WACHTTIJD, dan slaat de bezoeker hem over
+
+    def _aangekomen(self, bezoeker):
+        park = self.park
+        bezoeker.plek = doel = bezoeker.doel
+        if park.is_perron[doel] or self._vrij_om[doel] - self.nu > MAX_WACHTTIJD:
+            self._verder(bezoeker)
+            return
+        self.afnemer.reis(self.nu, bezoeker.qr_id, park.ids[doel], None, True)
+        self._vrij_om[doel] = max(self.nu, self._vrij_om[doel]) + self._per_bezoeker[doel]
+        self.plan(self._vrij_om[doel] + self._ritduur[doel], self._klaar, bezoeker)
+
+    def _klaar(self, bezoeker):
+        self.attractiebezoeken += 1
+        self.afnemer.reis(self.nu, bezoeker.qr_id, self.park.ids[bezoeker.plek], None, False)
+        self._verder(bezoeker)
+
+# Wachten op de trein. Wie een plek wil reserveren, reserveert in de eerste trein die hier aankomt
+# en nog reserveerbare plekken heeft; lukt dat niet, dan wacht hij gewoon in de rij.
+
+    def _naar_halte(self, bezoeker):
+        park, plek = self.park, bezoeker.plek
+        bezoeker.sinds = self.nu
+        if bezoeker.reserveert:
+            vrij = [trein for trein in self._treinen if trein.gereserveerd < trein.reserveerbaar]
+            if vrij:
+                trein = min(vrij, key=lambda t: (t.aankomst + (park.offset[plek] - park.offset[t.halte]) % park.rondje, t.trein_id))
+                if self.afnemer.reserveer(self.nu, bezoeker.qr_id, trein.trein_id, park.ids[plek], park.ids[bezoeker.doel]):
+                    self.reserveringen += 1
+                    trein.gereserveerd += 1
+                    bezoeker.reservering = trein
+                    self._met_reservering[plek].append(bezoeker)
+                    return
+        self._wachtend[plek].append(bezoeker)
+
+# Treinen: uitstappen, instappen (eerst met reservering), vertrekken naar de volgende halte
+
+    def _trein_aankomst(self, trein):
+        park, afnemer, nu = self.park, self.afnemer, self.nu
+        halte = trein.halte
+        locatie_id = park.ids[halte]
+
+        uitstappers, trein.passagiers[halte] = trein.passagiers[halte], []
+        for bezoeker in uitstappers:
+            afnemer.reis(nu, bezoeker.qr_id, locatie_id, trein.trein_id, False)
+            if bezoeker.reservering is trein:
+                trein.gereserveerd -= 1
+                bezoeker.reservering = None
+                afnemer.einde_reservering(nu, bezoeker.qr_id, trein.trein_id)
+            else:
+                trein.zonder -= 1
+            if self._rng.random() < FEEDBACK_KANS:
+                self._geef_feedback(bezoeker, halte)
+            self.ritten += 1
+            bezoeker.plek = halte
+            self._aangekomen(bezoeker)
+
+        instappers = []
+        gereserveerd = self._met_reservering[halte]
+        if gereserveerd:
+            instappers = [bezoeker for bezoeker in gereserveerd if bezoeker.reservering is trein]
+            self._met_reservering[halte] = [bezoeker for bezoeker in gereserveerd if bezoeker.reservering is not trein]
+        wachtend = self._wachtend[halte]
+        ruimte = trein.capaciteit - trein.reserveerbaar - trein.zonder
+        while wachtend and ruimte > 0:
+            instappers.append(wachtend.popleft())
+            trein.zonder += 1
+            ruimte -= 1
+        for bezoeker in instappers:
+            afnemer.reis(nu, bezoeker.qr_id, locatie_id, trein.trein_id, True)
+            bezoeker.van = halte
+            bezoeker.ingestapt = nu
+            trein.passagiers[bezoeker.doel].append(bezoeker)
+
+        volgende = (halte + 1) % len(park)
+        afnemer.trein_rit(nu, trein.trein_id, locatie_id, park.ids[volgende])
+        trein.halte = volgende
+        trein.aankomst = nu + HALTE_SECONDEN + park.stuk[halte]
+        self.plan(trein.aankomst, self._trein_aankomst, trein)
+
+# Een rating voor de rit: wie lang op de trein heeft gewacht is minder tevreden
+
+    def _geef_feedback(self, bezoeker, halte):
+        gewacht = bezoeker.ingestapt - bezoeker.sinds
+        rating = 5 - int(gewacht // 300) + self._rng.choice((-1, 0, 0, 0, 1))
+        rating = max(1, min(5, rating))
+        self.feedback += 1
+        self.afnemer.feedback(self.nu, bezoeker.qr_id, self.park.ids[bezoeker.van], self.park.ids[halte], rating)
+
+# Wachttijd per attractie in minuten: hoe lang een bezoeker die nu aansluit in de rij staat
+
+    def _meet_wachttijden(self, _doel):
+        park = self.park
+        self.afnemer.wachttijden(self.nu, {
+            park.ids[i]: int(max(0.0, self._vrij_om[i] - self.nu) // 60) for i in park.attracties
+        })
+        if self.nu + WACHTTIJD_INTERVAL <= SLUITING:
+            self.plan(self.nu + WACHTTIJD_INTERVAL, self._meet_wachttijden)
+
+    def in_park(self):
+        return self.binnen - self.vertrokken
+
+    def tellers(self):
+        return {
+            "tijd": kloktijd(self.nu),
+            "events": self.events,
+            "binnen": self.binnen,
+            "in_park": self.in_park(),
+            "geweigerd": self.geweigerd,
+            "attractiebezoeken": self.attractiebezoeken,
+            "treinritten": self.ritten,
+            "reserveringen": self.reserveringen,
+            "feedback": self.feedback,
+            "rekentijd_s": round(self.rekentijd, 3),
+            "afnemer": self.afnemer.tellers(),
+        }
+
+
+# Een groot park voor een nieuwe database: perron 1 bij de ingang (zoals in de demo), de rest willekeurig
+
+def maak_park(pool, rng, attracties=30, perrons=5, treinen=8, capaciteit=40):
+    locaties = [("Perron 1", "Treinperron bij de ingang", 0, 12, 86)]
+    locaties += [(f"Perron {i}", "Treinperron", 0, rng.randint(5, 95), rng.randint(5, 95)) for i in range(2, perrons + 1)]
+    locaties += [(f"Attractie {i}", "Attractie", 0, rng.randint(5, 95), rng.randint(5, 95)) for i in range(1, attracties + 1)]
+    with pool.verbinding() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            pool.sql("INSERT INTO Locatie (naam, beschrijving, wachttijd, loc_x, loc_y) VALUES (?, ?, ?, ?, ?)"),
+            locaties,
+        )
+        cursor.executemany(
+            pool.sql("INSERT INTO Trein (max_capaciteit, vertrekkend_locatie_id, aankomend_locatie_id) VALUES (?, ?, ?)"),
+            [(capaciteit, 1, 2) for _ in range(treinen)],
+        )
+
+
+# Een park zonder database: hetzelfde als maak_park, maar als rijen zoals Gegevens ze teruggeeft
+
+def demo_park(seed=1, attracties=30, perrons=5, treinen=8, capaciteit=40):
+    rng = random.Random(seed)
+    locaties = [{"locatie_id": 1, "naam": "Perron 1", "wachttijd": 0, "loc_x": 12, "loc_y": 86}]
+    for i in range(2, perrons + 1):
+        locaties.append({"locatie_id": i, "naam": f"Perron {i}", "wachttijd": 0, "loc_x": rng.randint(5, 95), "loc_y": rng.randint(5, 95)})
+    for i in range(1, attracties + 1):
+        locaties.append({"locatie_id": perrons + i, "naam": f"Attractie {i}", "wachttijd": 0,
+                         "loc_x": rng.randint(5, 95), "loc_y": rng.randint(5, 95)})
+    return Park(locaties, [{"trein_id": i, "max_capaciteit": capaciteit} for i in range(1, treinen + 1)])
+
+
+# Simulatie in de app (optioneel, via LSM_SIMULATIE = tempo, bijvoorbeeld 60 voor een minuut parkdag per seconde).
+# LSM_SIMULATIE_BEZOEKERS en LSM_SIMULATIE_SEED zijn optioneel. Geeft de gestarte simulatie terug, of None.
+
+def simulatie_uit_omgeving(gegevens, omgeving=os.environ):
+    tempo = omgeving.get("LSM_SIMULATIE")
+    if not tempo or gegevens is None:
+        return None
+    park = Park(gegevens.locaties(), gegevens.treinen())
+    return ParkSimulatie(
+        park,
+        DatabaseAfnemer(gegevens, park),
+        bezoekers=int(omgeving.get("LSM_SIMULATIE_BEZOEKERS", STANDAARD_BEZOEKERS)),
+        seed=int(omgeving.get("LSM_SIMULATIE_SEED", 1)),
+        tempo=float(tempo),
+    ).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simuleert een parkdag (deterministisch) als belasting voor de app en de database")
+    parser.add_argument("--database", help="SQLite bestand; een nieuw bestand krijgt het schema en een groot park")
+    parser.add_argument("--bezoekers", type=int, default=STANDAARD_BEZOEKERS)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--datum", default=None, help="datum van de parkdag (standaard vandaag)")
+    parser.add_argument("--tempo", type=float, default=None, help="gesimuleerde seconden per seconde (standaard zo snel mogelijk)")
+    parser.add_argument("--profiel", help="schrijf een cProfile naar dit bestand")
+    args = parser.parse_args()
+
+    if args.database:
+        from database.gegevens import Gegevens
+        from database.verbinding import maak_schema, sqlite_pool
+
+        nieuw = not os.path.exists(args.database)
+        pool = sqlite_pool(args.database)
+        if nieuw:
+            maak_schema(pool)
+            maak_park(pool, random.Random(args.seed))
+        gegevens = Gegevens(pool)
+        park = Park(gegevens.locaties(), gegevens.treinen())
+        afnemer = DatabaseAfnemer(gegevens, park)
+    else:
+        park = demo_park(args.seed)
+        afnemer = TelAfnemer()
+
+    simulatie = ParkSimulatie(park, afnemer, args.bezoekers, args.seed, args.datum, args.tempo)
+    print(f"Parkdag {simulatie.datum}: {args.bezoekers} bezoekers, {len(park.attracties)} attracties, "
+          f"{len(park.treinen)} treinen, rondje {park.rondje / 60:.0f} min. Stoppen met Ctrl+C.")
+    start = time.perf_counter()
+    try:
+        if args.profiel:
+            import cProfile
+            cProfile.runctx("simulatie.draai()", globals(), {"simulatie": simulatie}, args.profiel)
+        else:
+            simulatie.draai()
+    except KeyboardInterrupt:
+        simulatie.afnemer.einde_dag()
+    duur = time.perf_counter() - start
+    print(f"{simulatie.events} events in {duur:.1f} s ({simulatie.events / duur:,.0f} per s), "
+          f"{(simulatie.nu - OPENING) / duur:,.0f}x sneller dan echt")
+    for naam, waarde in simulatie.tellers().items():
+        print(f"  {naam}: {waarde}")
+
+
+if __name__ == "__main__":
+    main()
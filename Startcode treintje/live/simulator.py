@@ -0,0 +1,148 @@
+# simulator.py - Lokale vervanger voor de echte treinen: stuurt telemetrie frames over een socket
+# Starten vanuit de map "Startcode treintje":
+#   python -m live.simulator --treinen 3 --hz 10
+# Start de app met LSM_TELEMETRIE=127.0.0.1:5555, dan maakt de TelemetrieOntvanger verbinding met de simulator.
+# Met --max worden de frames zo snel mogelijk verstuurd, dat gebruiken we in de benchmark.
+
+import argparse
+import math
+import random
+import socket
+import threading
+import time
+
+from .telemetrie import STANDAARD_HOST, STANDAARD_POORT, pak_frame
+
+# De route van de treinen: langs de perrons en attracties van Scherm2 en weer terug naar het begin
+
+ROUTE = [
+    (0.12, 0.86),
+    (0.2, 0.2),
+    (0.8, 0.25),
+    (0.88, 0.86),
+    (0.5, 0.7),
+]
+
+TOTAAL_PLEKKEN = 20
+
+
+# Klasse : SimTrein
+# Een trein die met een vaste snelheid (routelengte per minuut) over de route rijdt
+
+class SimTrein:
+    def __init__(self, trein_id, rng, route=ROUTE):
+        self.trein_id = trein_id
+        self.route = route
+        self._lengtes = [math.dist(route[i], route[(i + 1) % len(route)]) for i in range(len(route))]
+        self.afstand = rng.uniform(0, sum(self._lengtes))
+        self.snelheid = rng.uniform(0.15, 0.3)
+        self.plekken = rng.randint(0, TOTAAL_PLEKKEN)
+
+    def stap(self, dt, rng):
+        self.afstand = (self.afstand + self.snelheid * dt / 60.0) % sum(self._lengtes)
+        if rng.random() < 0.05:
+            self.plekken = min(TOTAAL_PLEKKEN, max(0, self.plekken + rng.choice((-1, 1))))
+
+# Positie op de route en minuten tot de volgende halte
+
+    def positie(self):
+        rest = self.afstand
+        for i, lengte in enumerate(self._lengtes):
+            if rest <= lengte:
+                (x0, y0), (x1, y1) = self.route[i], self.route[(i + 1) % len(self.route)]
+                t = rest / lengte if lengte else 0.0
+                aankomst = (lengte - rest) / self.snelheid
+                return x0 + (x1 - x0) * t, y0 + (y1 - y0) * t, aankomst
+            rest -= lengte
+        x, y = self.route[0]
+        return x, y, 0.0
+
+    def frame(self):
+        x, y, aankomst = self.positie()
+        return pak_frame(self.trein_id, time.time(), x, y, self.plekken, TOTAAL_PLEKKEN, aankomst)
+
+
+# Klasse : TelemetrieSimulator
+# Een TCP server die elke verbonden ontvanger frames van alle treinen stuurt
+
+class TelemetrieSimulator:
+    def __init__(self, host=STANDAARD_HOST, poort=STANDAARD_POORT, treinen=3, hz=10.0, seed=1, maximaal=False):
+        self.host = host
+        self.poort = poort
+        self.hz = hz
+        self.maximaal = maximaal
+        self._rng = random.Random(seed)
+        self.treinen = [SimTrein(trein_id, self._rng) for trein_id in range(1, treinen + 1)]
+        self._stop = threading.Event()
+        self._server = None
+        self._thread = None
+        self.frames_verstuurd = 0
+
+    def start(self):
+        self._server = socket.create_server((self.host, self.poort))
+        self.poort = self._server.getsockname()[1]
+        self._server.settimeout(0.2)
+        self._thread = threading.Thread(target=self._draai, name="simulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+        if self._server is not None:
+            self._server.close()
+
+    def _draai(self):
+        while not self._stop.is_set():
+            try:
+                client, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            with client:
+                try:
+                    self._zend(client)
+                except OSError:
+                    pass
+
+# Stuurt per tick één frame per trein in één sendall. In maximale modus zonder te wachten.
+
+    def _zend(self, client):
+        interval = 1.0 / self.hz if self.hz > 0 else 0.0
+        volgende = time.monotonic()
+        while not self._stop.is_set():
+            for trein in self.treinen:
+                trein.stap(interval if not self.maximaal else 0.001, self._rng)
+            client.sendall(b"".join(trein.frame() for trein in self.treinen))
+            self.frames_verstuurd += len(self.treinen)
+            if self.maximaal:
+                continue
+            volgende += interval
+            self._stop.wait(max(0.0, volgende - time.monotonic()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stuurt gesimuleerde trein-telemetrie naar de app")
+    parser.add_argument("--host", default=STANDAARD_HOST)
+    parser.add_argument("--poort", type=int, default=STANDAARD_POORT)
+    parser.add_argument("--treinen", type=int, default=3)
+    parser.add_argument("--hz", type=float, default=10.0, help="frames per seconde per trein")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max", action="store_true", help="zo snel mogelijk versturen")
+    args = parser.parse_args()
+
+    simulator = TelemetrieSimulator(args.host, args.poort, args.treinen, args.hz, args.seed, args.max).start()
+    print(f"Simulator luistert op {args.host}:{simulator.poort} met {args.treinen} trein(en). Stoppen met Ctrl+C.")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
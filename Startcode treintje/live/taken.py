@@ -0,0 +1,240 @@
+# taken.py - Achtergrondtaken voor de schermen
+# Alles wat een scherm doet gebeurt op de GUI thread; één trage aanroep (database, bestand) en de hele kiosk staat stil.
+# Met de TaakPool zet een scherm zulk werk op een pool van threads (of processen) en krijgt het het resultaat
+# via een Qt signaal terug op de GUI thread, waar het veilig widgets kan aanpassen.
+#
+#   taken.start(sleutel, functie, *args, eigenaar=self, klaar=callback, fout=callback)
+#
+# sleutel  : loopt er al een taak met dezelfde sleutel, dan wordt de aanvraag samengevoegd met die taak.
+#            De functie wordt dan één keer uitgevoerd en alle callbacks krijgen hetzelfde resultaat.
+#            Dezelfde callback twee keer voor één taak wordt maar één keer aangeroepen.
+# eigenaar : het scherm dat de taak vraagt. annuleer(eigenaar) (bijvoorbeeld in hideEvent) trekt al zijn
+#            aanvragen in. Vraagt niemand anders meer om de taak, dan wordt hij geannuleerd: uit de wachtrij
+#            gehaald, of als hij al loopt wordt het resultaat weggegooid. Lange functies kunnen onderweg
+#            geannuleerd() controleren en dan stoppen.
+#
+# Met processen=True draaien de taken in aparte processen (voor rekenwerk dat de GIL vasthoudt).
+# De functie en argumenten moeten dan te pickelen zijn en geannuleerd() is daar altijd False.
+
+import threading
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from .metrieken import METRIEKEN
+
+WERKERS = 4
+
+_huidige = threading.local()
+
+
+# Geeft True als de taak die in deze thread draait geannuleerd is
+
+def geannuleerd():
+    taak = getattr(_huidige, "taak", None)
+    return taak is not None and taak.annuleren.is_set()
+
+
+# Draait in de werker (thread of proces). Fouten gaan als waarde terug, zodat we ook van een
+# mislukte taak weten wanneer hij begon en eindigde.
+
+def _voer_uit(taak, functie, args, kwargs):
+    _huidige.taak = taak
+    begonnen = time.perf_counter()
+    try:
+        return begonnen, time.perf_counter(), True, functie(*args, **kwargs)
+    except Exception as fout:
+        return begonnen, time.perf_counter(), False, fout
+    finally:
+        _huidige.taak = None
+
+
+# Klasse : Taak
+# Eén uitvoering van een functie met alle aanvragen (eigenaar, klaar, fout) die erop wachten
+
+class Taak:
+    __slots__ = ("sleutel", "aanvragen", "annuleren", "aangemaakt", "future")
+
+    def __init__(self, sleutel):
+        self.sleutel = sleutel
+        self.aanvragen = []
+        self.annuleren = threading.Event()
+        self.aangemaakt = time.perf_counter()
+        self.future = None
+
+    def vraag(self, eigenaar, klaar, fout):
+        for aanvraag in self.aanvragen:
+            if aanvraag[1] == klaar and aanvraag[2] == fout and aanvraag[0] is eigenaar:
+                return
+        self.aanvragen.append((eigenaar, klaar, fout))
+
+
+# Klasse : TaakPool
+# taak_klaar(sleutel, resultaat) en taak_mislukt(sleutel, fout) worden op de GUI thread uitgezonden,
+# na de callbacks van de aanvragen. Een geannuleerde taak levert niets af.
+
+class TaakPool(QObject):
+    taak_klaar = pyqtSignal(object, object)
+    taak_mislukt = pyqtSignal(object, object)
+    _afgerond = pyqtSignal(object)
+
+    def __init__(self, werkers=WERKERS, processen=False, parent=None):
+        super().__init__(parent)
+        self.werkers = werkers
+        self.processen = processen
+        self._pool = None
+        self._taken = {}
+        self._gestopt = False
+
+# Tellers voor de statusbalk / benchmarks
+
+        self.gestart = 0
+        self.samengevoegd = 0
+        self.geannuleerd = 0
+        self.mislukt = 0
+        self.afgerond = 0
+
+        self._afgerond.connect(self._lever_af)
+        if METRIEKEN.actief:
+            naam = "taken_processen" if processen else "taken"
+            METRIEKEN.meter(f"{naam}_wachtrij", self.wachtrij)
+            METRIEKEN.meter(f"{naam}_bezig", self.bezig)
+
+# De pool maken we pas bij de eerste taak. Ook concurrent.futures en multiprocessing importeren we dan pas,
+# zodat het opstarten van de kiosk er niet op hoeft te wachten.
+
+    def _zorg_voor_pool(self):
+        if self._pool is None:
+            if self.processen:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                self._pool = ProcessPoolExecutor(self.werkers, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                from concurrent.futures import ThreadPoolExecutor
+                self._pool = ThreadPoolExecutor(self.werkers, thread_name_prefix="taak")
+        return self._pool
+
+    def start(self, sleutel, functie, *args, eigenaar=None, klaar=None, fout=None, **kwargs):
+        if self._gestopt:
+            return None
+        taak = self._taken.get(sleutel)
+        if taak is not None:
+            taak.vraag(eigenaar, klaar, fout)
+            self.samengevoegd += 1
+            if METRIEKEN.actief:
+                METRIEKEN.tel("taken_samengevoegd")
+            return taak
+
+        taak = Taak(sleutel)
+        taak.vraag(eigenaar, klaar, fout)
+        self._taken[sleutel] = taak
+        self.gestart += 1
+        if METRIEKEN.actief:
+            METRIEKEN.tel("taken_gestart")
+        try:
+            taak.future = self._zorg_voor_pool().submit(
+                _voer_uit, None if self.processen else taak, functie, args, kwargs)
+        except Exception:
+            del self._taken[sleutel]
+            raise
+        taak.future.add_done_callback(lambda _future: self._meld(taak))
+        return taak
+
+# Wordt aangeroepen in de werker (of in de thread die annuleert); het signaal brengt de taak naar de GUI thread.
+# Na stop() kan het object al weg zijn.
+
+    def _meld(self, taak):
+        try:
+            self._afgerond.emit(taak)
+        except RuntimeError:
+            pass
+
+    def loopt(self, sleutel):
+        return sleutel in self._taken
+
+# Trekt de aanvragen van eigenaar in (of alle aanvragen met eigenaar=None)
+
+    def annuleer(self, eigenaar=None):
+        for taak in list(self._taken.values()):
+            if eigenaar is None:
+                taak.aanvragen.clear()
+            else:
+                taak.aanvragen = [a for a in taak.aanvragen if a[0] is not eigenaar]
+            if not taak.aanvragen:
+                self._annuleer_taak(taak)
+
+    def _annuleer_taak(self, taak):
+        if self._taken.get(taak.sleutel) is taak:
+            del self._taken[taak.sleutel]
+        taak.annuleren.set()
+        taak.future.cancel()
+        self.geannuleerd += 1
+        if METRIEKEN.actief:
+            METRIEKEN.tel("taken_geannuleerd")
+
+# Aantal taken dat nog op een werker wacht en aantal dat nu draait
+
+    def wachtrij(self):
+        return sum(1 for taak in list(self._taken.values()) if not taak.future.running() and not taak.future.done())
+
+    def bezig(self):
+        return sum(1 for taak in list(self._taken.values()) if taak.future.running())
+
+    def tellers(self):
+        return {
+            "gestart": self.gestart,
+            "samengevoegd": self.samengevoegd,
+            "geannuleerd": self.geannuleerd,
+            "mislukt": self.mislukt,
+            "afgerond": self.afgerond,
+            "wachtrij": self.wachtrij(),
+            "bezig": self.bezig(),
+        }
+
+# Op de GUI thread: resultaat (of fout) naar de callbacks van alle aanvragen
+
+    def _lever_af(self, taak):
+        if taak.annuleren.is_set() or taak.future.cancelled():
+            return
+        if self._taken.get(taak.sleutel) is taak:
+            del self._taken[taak.sleutel]
+        try:
+            begonnen, geeindigd, gelukt, waarde = taak.future.result()
+        except Exception as fout:
+            begonnen = geeindigd = None
+            gelukt, waarde = False, fout
+
+        if METRIEKEN.actief:
+            nu = time.perf_counter()
+            if begonnen is not None:
+                METRIEKEN.observeer("taak_wachttijd", (begonnen - taak.aangemaakt) * 1000.0)
+                METRIEKEN.observeer("taak_looptijd", (geeindigd - begonnen) * 1000.0)
+            METRIEKEN.observeer("taak_latentie", (nu - taak.aangemaakt) * 1000.0)
+            if not gelukt:
+                METRIEKEN.tel("taken_mislukt")
+
+        if gelukt:
+            self.afgerond += 1
+        else:
+            self.mislukt += 1
+        for _eigenaar, klaar, fout in taak.aanvragen:
+            callback = klaar if gelukt else fout
+            if callback is None:
+                continue
+            try:
+                callback(waarde)
+            except Exception:
+                pass
+        if gelukt:
+            self.taak_klaar.emit(taak.sleutel, waarde)
+        else:
+            self.taak_mislukt.emit(taak.sleutel, waarde)
+
+# Bij het afsluiten: wachtende taken vervallen, lopende taken maken we niet af (ze krijgen geannuleerd())
+
+    def stop(self):
+        self._gestopt = True
+        self.annuleer()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,200 @@
+# telemetrie.py - Ontvangt live posities en bezetting van de treinen via een lokale socket
+# De treinen (of de simulator in live/simulator.py) sturen vaste binaire frames van 32 bytes.
+# Een achtergrondthread leest de socket uit en ontleedt de frames zonder kopieën (memoryview).
+# Per trein bewaren we alleen het laatste frame, zo blijft het geheugen begrensd, hoe snel de frames ook binnenkomen.
+# De GUI krijgt via een Qt signaal één melding per batch en haalt dan de laatste stand op.
+# De kiosk luistert alleen als LSM_TELEMETRIE een adres bevat (host:poort), zie telemetrie_uit_omgeving.
+
+import os
+import socket
+import struct
+import threading
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from .metrieken import METRIEKEN, gemeten
+
+STANDAARD_HOST = "127.0.0.1"
+STANDAARD_POORT = 5555
+
+# Frame : magic "LS", 2 bytes opvulling, trein_id, tijdstempel (s), x, y (0..1), plekken beschikbaar,
+# totaal aantal plekken en minuten tot aankomst. Little-endian, 32 bytes.
+
+FRAME = struct.Struct("<2sxxIdffHHf")
+MAGIC = b"LS"
+
+BUFFER_GROOTTE = 64 * 1024
+MAX_TREINEN = 4096
+
+
+def pak_frame(trein_id, tijd, x, y, plekken, totaal, aankomst):
+    return FRAME.pack(MAGIC, trein_id, tijd, x, y, plekken, totaal, aankomst)
+
+
+# Zet een frame om naar hetzelfde info-formaat als Scherm2.train_info, plus de positie
+
+def frame_naar_info(frame):
+    _, trein_id, tijd, x, y, plekken, totaal, aankomst = frame
+    info = {
+        "trein_id": trein_id,
+        "seats_available": plekken,
+        "total_seats": totaal,
+        "arrival_minutes": int(round(aankomst)),
+        "timestamp": tijd,
+    }
+    return info, (x, y)
+
+
+# Klasse : TelemetrieOntvanger
+# Start met start() een daemon thread die verbinding maakt met de zender en opnieuw verbindt als die wegvalt.
+# treinen_bijgewerkt(dict) wordt op de GUI thread uitgezonden met {trein_id: frame} van alle treinen
+# die sinds de vorige keer een nieuw frame hebben gestuurd.
+
+class TelemetrieOntvanger(QObject):
+    treinen_bijgewerkt = pyqtSignal(dict)
+    _updates_klaar = pyqtSignal()
+
+    def __init__(self, host=STANDAARD_HOST, poort=STANDAARD_POORT, parent=None):
+        super().__init__(parent)
+        self.host = host
+        self.poort = poort
+        self._lock = threading.Lock()
+        self._laatste = {}
+        self._melding_onderweg = False
+        self._stop = threading.Event()
+        self._thread = None
+        self._socket = None
+        self.verbonden = False
+
+# Tellers voor de statusbalk / benchmarks
+
+        self.frames_ontvangen = 0
+        self.frames_verworpen = 0
+        self.bytes_ontvangen = 0
+
+        self._updates_klaar.connect(self._lever_af)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._draai, name="telemetrie", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        sock = self._socket
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+# Haalt alle frames op die sinds de vorige keer zijn binnengekomen (ook bruikbaar zonder Qt event loop)
+
+    def haal_op(self):
+        with self._lock:
+            updates = self._laatste
+            self._laatste = {}
+            self._melding_onderweg = False
+        return updates
+
+    @gemeten("telemetrie_aflevering")
+    def _lever_af(self):
+        updates = self.haal_op()
+        if updates:
+            if METRIEKEN.actief:
+                METRIEKEN.tel("telemetrie_updates", len(updates))
+            self.treinen_bijgewerkt.emit(updates)
+
+# Hoofdlus van de thread: verbinden, lezen tot de verbinding wegvalt, even wachten en opnieuw proberen
+
+    def _draai(self):
+        wachttijd = 0.1
+        while not self._stop.is_set():
+            try:
+                with socket.create_connection((self.host, self.poort), timeout=1.0) as sock:
+                    sock.settimeout(None)
+                    self._socket = sock
+                    self.verbonden = True
+                    wachttijd = 0.1
+                    self._lees(sock)
+            except OSError:
+                pass
+            finally:
+                self._socket = None
+                self.verbonden = False
+            self._stop.wait(wachttijd)
+            wachttijd = min(wachttijd * 2, 5.0)
+
+# Leest de socket in een vaste buffer. Alleen complete frames worden ontleed, een half frame
+# wordt naar het begin van de buffer geschoven en bij de volgende recv aangevuld.
+
+    def _lees(self, sock):
+        buffer = bytearray(BUFFER_GROOTTE - BUFFER_GROOTTE % FRAME.size)
+        view = memoryview(buffer)
+        gevuld = 0
+        while not self._stop.is_set():
+            n = sock.recv_into(view[gevuld:])
+            if n == 0:
+                return
+            self.bytes_ontvangen += n
+            gevuld += n
+            bruikbaar = gevuld - gevuld % FRAME.size
+            if bruikbaar and not self._verwerk(view[:bruikbaar]):
+                return
+            rest = gevuld - bruikbaar
+            if rest:
+                view[:rest] = view[bruikbaar:gevuld]
+            gevuld = rest
+
+# Ontleedt een blok complete frames. Bij een verkeerde magic is de stroom uit de pas en verbreken we de verbinding.
+
+    def _verwerk(self, data):
+        nieuw = {}
+        aantal = 0
+        for frame in FRAME.iter_unpack(data):
+            if frame[0] != MAGIC:
+                self.frames_verworpen += 1
+                return False
+            nieuw[frame[1]] = frame
+            aantal += 1
+        self.frames_ontvangen += aantal
+
+        with self._lock:
+            for trein_id, frame in nieuw.items():
+                if trein_id in self._laatste or len(self._laatste) < MAX_TREINEN:
+                    self._laatste[trein_id] = frame
+                else:
+                    self.frames_verworpen += 1
+            melden = not self._melding_onderweg
+            self._melding_onderweg = True
+        if melden:
+            self._updates_klaar.emit()
+        return True
+
+
+# Wacht tot de ontvanger verbonden is (handig voor de simulator en benchmarks)
+
+def wacht_op_verbinding(ontvanger, timeout=5.0):
+    einde = time.monotonic() + timeout
+    while not ontvanger.verbonden and time.monotonic() < einde:
+        time.sleep(0.01)
+    return ontvanger.verbonden
+
+
+# Ontvanger voor het adres in LSM_TELEMETRIE ("host:poort", "host" of "poort"), nog niet gestart.
+# None als de variabele niet gezet is: dan is er geen telemetrie en beweegt de trein gesimuleerd.
+
+def telemetrie_uit_omgeving(parent=None, omgeving=os.environ):
+    adres = omgeving.get("LSM_TELEMETRIE")
+    if not adres:
+        return None
+    host, _, poort = adres.rpartition(":")
+    if poort and not poort.isdigit():
+        host, poort = adres, ""
+    return TelemetrieOntvanger(host or STANDAARD_HOST, int(poort) if poort else STANDAARD_POORT, parent=parent)
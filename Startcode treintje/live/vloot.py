@@ -0,0 +1,140 @@
+# vloot.py - Model voor meerdere treinen tegelijk (de vloot)
+# Alle gegevens van de treinen staan in aaneengesloten NumPy arrays: één rij per trein.
+# Daardoor kunnen we de posities van honderden treinen in één keer begrenzen, omrekenen
+# naar pixels en tekenen, in plaats van per trein een losse functieaanroep te doen.
+
+import numpy as np
+
+# Klasse : Vloot
+# posities : (n, 2) genormaliseerde x/y tussen 0 en 1
+# plekken  : beschikbare zitplaatsen per trein
+# totaal   : totaal aantal zitplaatsen per trein
+# aankomst : minuten tot aankomst bij de volgende halte
+
+class Vloot:
+    def __init__(self, capaciteit=16):
+        capaciteit = max(1, int(capaciteit))
+        self._n = 0
+        self._ids = np.zeros(capaciteit, dtype=np.int64)
+        self._posities = np.zeros((capaciteit, 2), dtype=np.float64)
+        self._plekken = np.zeros(capaciteit, dtype=np.int32)
+        self._totaal = np.zeros(capaciteit, dtype=np.int32)
+        self._aankomst = np.zeros(capaciteit, dtype=np.float32)
+        self._rij_van_id = {}
+        self.versie = 0
+
+    def __len__(self):
+        return self._n
+
+# Views op het gevulde deel van de arrays (geen kopie)
+
+    @property
+    def ids(self):
+        return self._ids[:self._n]
+
+    @property
+    def posities(self):
+        return self._posities[:self._n]
+
+    @property
+    def plekken(self):
+        return self._plekken[:self._n]
+
+    @property
+    def totaal(self):
+        return self._totaal[:self._n]
+
+    @property
+    def aankomst(self):
+        return self._aankomst[:self._n]
+
+    def rij_van(self, trein_id):
+        return self._rij_van_id.get(trein_id)
+
+# Voegt een trein toe en geeft zijn rijnummer terug. Als de arrays vol zijn worden ze verdubbeld.
+
+    def voeg_toe(self, trein_id, x=0.5, y=0.5, plekken=20, totaal=20, aankomst=0):
+        if trein_id in self._rij_van_id:
+            raise ValueError(f"trein {trein_id} zit al in de vloot")
+        if self._n == len(self._ids):
+            self._groei(len(self._ids) * 2)
+        rij = self._n
+        self._ids[rij] = trein_id
+        self._posities[rij] = (min(max(0.0, float(x)), 1.0), min(max(0.0, float(y)), 1.0))
+        self._plekken[rij] = plekken
+        self._totaal[rij] = totaal
+        self._aankomst[rij] = aankomst
+        self._rij_van_id[trein_id] = rij
+        self._n += 1
+        self.versie += 1
+        return rij
+
+    def _groei(self, capaciteit):
+        self._ids = np.resize(self._ids, capaciteit)
+        self._posities = np.resize(self._posities, (capaciteit, 2))
+        self._plekken = np.resize(self._plekken, capaciteit)
+        self._totaal = np.resize(self._totaal, capaciteit)
+        self._aankomst = np.resize(self._aankomst, capaciteit)
+
+# Zet posities van alle treinen (rijen=None) of van de opgegeven rijen in één keer.
+# De waarden worden in bulk tussen 0 en 1 begrensd.
+
+    def zet_posities(self, xy, rijen=None):
+        nieuw = np.clip(np.asarray(xy, dtype=np.float64), 0.0, 1.0)
+        if rijen is None:
+            self._posities[:self._n] = nieuw
+        else:
+            self._posities[np.asarray(rijen)] = nieuw
+        self.versie += 1
+
+    def zet_positie(self, rij, x, y):
+        self._posities[rij, 0] = min(max(0.0, float(x)), 1.0)
+        self._posities[rij, 1] = min(max(0.0, float(y)), 1.0)
+        self.versie += 1
+
+    def zet_bezetting(self, rijen, plekken=None, totaal=None, aankomst=None):
+        rijen = np.asarray(rijen)
+        if plekken is not None:
+            self._plekken[rijen] = plekken
+        if totaal is not None:
+            self._totaal[rijen] = totaal
+        if aankomst is not None:
+            self._aankomst[rijen] = aankomst
+        self.versie += 1
+
+# Rekent alle posities in één keer om naar pixels voor een kaart van w x h
+
+    def pixel_posities(self, w, h):
+        return (self.posities * (w, h)).astype(np.int32)
+
+# De kleinste rechthoek (x0, y0, x1, y1) in pixels waar alle treinen in passen, of None als de vloot leeg is
+
+    def begrenzing(self, w, h, marge=0):
+        if self._n == 0:
+            return None
+        pixels = self.pixel_posities(w, h)
+        x0, y0 = pixels.min(axis=0) - marge
+        x1, y1 = pixels.max(axis=0) + marge
+        return int(x0), int(y0), int(x1), int(y1)
+
+# Zoekt de trein die het dichtst bij (x, y) ligt binnen straal r, of None.
+# Met pixels (n, 2) zoeken we in de getekende plek van de treinen in plaats van hun laatste positie.
+
+    def trein_op(self, x, y, w, h, r, pixels=None):
+        if self._n == 0:
+            return None
+        if pixels is None or len(pixels) != self._n:
+            pixels = self.pixel_posities(w, h)
+        afstand = ((pixels - (x, y)) ** 2).sum(axis=1)
+        rij = int(afstand.argmin())
+        return rij if afstand[rij] <= r * r else None
+
+# Info van één trein in hetzelfde formaat als Scherm2.train_info
+
+    def info(self, rij):
+        return {
+            "trein_id": int(self._ids[rij]),
+            "seats_available": int(self._plekken[rij]),
+            "total_seats": int(self._totaal[rij]),
+            "arrival_minutes": int(round(float(self._aankomst[rij]))),
+        }
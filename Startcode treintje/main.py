@@ -1,16 +1,30 @@
+import time
+
+_START = time.perf_counter()
+
 from PyQt6.QtWidgets import QApplication
 from schermen.main_window import MainWindow
+from schermen.opstartmeting import Opstartmeting
+from schermen.thema import compileer
 
 def main():
+    meting = Opstartmeting(_START)
+    meting.markeer("imports")
     app = QApplication([])
     load_stylesheet(app)
+    meting.markeer("qapplication")
     window = MainWindow()
+    meting.markeer("venster")
+    meting.volg(window)
     window.show()
     app.exec()
 
+# style.qss is de basis; compileer() voegt daar de regels van alle thema's aan toe
+# zodat er maar één stylesheet op de app staat
+
 def load_stylesheet(app):
     with open("style.qss", "r") as f:
-        app.setStyleSheet(f.read())
+        app.setStyleSheet(compileer(f.read()))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
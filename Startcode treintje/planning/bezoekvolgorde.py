@@ -0,0 +1,255 @@
+# bezoekvolgorde.py - In welke volgorde een bezoeker de attracties uit zijn Reisplan het best kan bezoeken
+# De kosten van een volgorde zijn de minuten onderweg (lopen, of lopen naar de halte + op de trein wachten +
+# meerijden + lopen vanaf de halte, wat het snelst is) plus de wachttijd in de rij bij elke attractie.
+# De reistijden tussen alle locaties rekenen we één keer uit (Netwerk), daarna is één plan een klein
+# handelsreizigersprobleem: eerst een snelle schatting (steeds de dichtstbijzijnde volgende attractie),
+# daarna lokaal verbeteren tot geen enkele zet nog tijd wint.
+# Bezoekers met dezelfde start en dezelfde set attracties krijgen dezelfde volgorde; die rekenen we maar één keer uit.
+# De wachttijden tellen bij elke volgorde even zwaar mee (elke attractie wordt één keer bezocht), ze veranderen
+# de beste volgorde dus niet. Veranderen alleen de wachttijden, dan tellen we de minuten opnieuw op zonder te zoeken.
+# Veel plannen tegelijk (bijvoorbeeld alle plannen opnieuw als de wachttijden veranderen) verdelen we over
+# een pool van processen, want het rekenwerk houdt de GIL vast.
+
+import math
+import os
+
+import numpy as np
+
+from database.gegevens import KAART_SCHAAL, PERRON_PREFIX
+from .routegraaf import maak_ringlijn
+
+# Lopen gaat ongeveer drie keer zo langzaam als de trein (routegraaf.MINUTEN_PER_EENHEID); bij het instappen
+# wachten we gemiddeld een halve dienstregeling op de trein
+
+LOOP_MINUTEN_PER_EENHEID = 15.0
+INSTAP_MINUTEN = 2.0
+
+# Lokaal verbeteren stopt na zoveel rondes, ook als er nog iets te winnen zou zijn;
+# een stuk dat verplaatst wordt is hoogstens zo lang
+
+MAX_RONDES = 50
+MAX_STUK = 3
+
+# Onder PARALLEL_VANAF verschillende plannen rekenen we gewoon in dit proces (processen opstarten kost meer);
+# anders krijgt elk proces stukken van PLANNEN_PER_STUK plannen
+
+PARALLEL_VANAF = 64
+PLANNEN_PER_STUK = 256
+
+
+# Klasse : Netwerk
+# ids       : locatie_id per rij/kolom
+# reistijd  : (n, n) minuten van locatie i naar locatie j (niet symmetrisch: de trein rijdt één kant op)
+# wachttijd : (n,) minuten in de rij per locatie
+
+class Netwerk:
+    def __init__(self, ids, reistijd, wachttijd):
+        self.ids = list(ids)
+        self.index = {locatie_id: i for i, locatie_id in enumerate(self.ids)}
+        self.reistijd = np.asarray(reistijd, dtype=np.float64)
+        self.wachttijd = np.asarray(wachttijd, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+# Bouwt het netwerk uit de rijen van Gegevens.locaties(). Zonder routegraaf rijdt de trein een ringlijn langs
+# alle locaties, net als op Scherm2. Een locatie die geen halte is gebruikt de dichtstbijzijnde halte.
+
+def maak_netwerk(locaties, routegraaf=None):
+    rijen = [rij for rij in locaties if rij["loc_x"] is not None and rij["loc_y"] is not None]
+    xy = np.array([(rij["loc_x"] / KAART_SCHAAL, rij["loc_y"] / KAART_SCHAAL) for rij in rijen], dtype=np.float64).reshape(-1, 2)
+    lopen = np.sqrt(((xy[:, None, :] - xy[None, :, :]) ** 2).sum(axis=2)) * LOOP_MINUTEN_PER_EENHEID
+    reistijd = lopen
+    if len(rijen) > 1:
+        if routegraaf is None:
+            routegraaf = maak_ringlijn([(x, y, rij["naam"]) for (x, y), rij in zip(xy.tolist(), rijen)])
+        halte_index = {naam: i for i, naam in enumerate(routegraaf.namen)}
+        positie = {rij["naam"]: i for i, rij in enumerate(rijen)}
+        haltes = [rij["naam"] if rij["naam"] in halte_index else routegraaf.dichtstbijzijnde(x, y)
+                  for (x, y), rij in zip(xy.tolist(), rijen)]
+        # lopen tussen locatie en halte (0 als de locatie zelf de halte is of we de halte niet op de kaart hebben)
+        naar_halte = np.array([lopen[i, positie[halte]] if halte in positie else 0.0 for i, halte in enumerate(haltes)])
+        rit = routegraaf.tabel()[np.ix_([halte_index[h] for h in haltes], [halte_index[h] for h in haltes])]
+        trein = naar_halte[:, None] + INSTAP_MINUTEN + rit + naar_halte[None, :]
+        reistijd = np.minimum(lopen, trein)
+    np.fill_diagonal(reistijd, 0.0)
+    wachttijd = [rij["wachttijd"] or 0 for rij in rijen]
+    return Netwerk([rij["locatie_id"] for rij in rijen], reistijd, wachttijd)
+
+
+# Een volgorde voor één plan. m is de reistijdmatrix van alleen dit plan (lijsten, knoop 0 is de start).
+# Geeft de knopen in bezoekvolgorde terug (zonder de start) en de reistijd.
+
+def _los_op(m):
+    n = len(m)
+    pad = [0]
+    over = set(range(1, n))
+    while over:
+        rij = m[pad[-1]]
+        volgende = min(over, key=rij.__getitem__)
+        pad.append(volgende)
+        over.remove(volgende)
+    _verbeter(m, pad)
+    return pad[1:], sum(m[a][b] for a, b in zip(pad, pad[1:]))
+
+
+# Lokaal verbeteren van een open pad (de start blijft vooraan, het eind is vrij):
+#   verplaatsen : een stuk van 1..MAX_STUK bezoeken ergens anders neerzetten (winst in O(1) uit te rekenen)
+#   omdraaien   : een stuk in omgekeerde volgorde bezoeken (2-opt; reistijden zijn niet symmetrisch,
+#                 dus het stuk zelf moet opnieuw opgeteld worden)
+
+def _verbeter(m, pad):
+    n = len(pad)
+    for _ronde in range(MAX_RONDES):
+        if not (_verplaats(m, pad, n) or _draai_om(m, pad, n)):
+            return
+
+
+def _verplaats(m, pad, n):
+    for lengte in range(1, MAX_STUK + 1):
+        for i in range(1, n - lengte + 1):
+            j = i + lengte - 1
+            a, eerste, laatste = pad[i - 1], pad[i], pad[j]
+            b = pad[j + 1] if j + 1 < n else None
+            winst = m[a][eerste] - (m[a][b] if b is not None else 0.0)
+            if b is not None:
+                winst += m[laatste][b]
+            for k in range(n):
+                if i - 1 <= k <= j:
+                    continue
+                c = pad[k]
+                d = pad[k + 1] if k + 1 < n else None
+                kosten = m[c][eerste]
+                if d is not None:
+                    kosten += m[laatste][d] - m[c][d]
+                if kosten < winst - 1e-9:
+                    stuk = pad[i:j + 1]
+                    del pad[i:j + 1]
+                    plek = k + 1 if k < i else k + 1 - lengte
+                    pad[plek:plek] = stuk
+                    return True
+    return False
+
+
+def _draai_om(m, pad, n):
+    for i in range(1, n - 1):
+        for j in range(i + 1, n):
+            a = pad[i - 1]
+            b = pad[j + 1] if j + 1 < n else None
+            heen = m[a][pad[i]] + sum(m[pad[k]][pad[k + 1]] for k in range(i, j))
+            terug = m[a][pad[j]] + sum(m[pad[k + 1]][pad[k]] for k in range(i, j))
+            if b is not None:
+                heen += m[pad[j]][b]
+                terug += m[pad[i]][b]
+            if terug < heen - 1e-9:
+                pad[i:j + 1] = pad[i:j + 1][::-1]
+                return True
+    return False
+
+
+# Rekent een lijst plannen (start, bezoeken) uit met de reistijdmatrix en geeft per plan (volgorde, reisminuten)
+# terug, in netwerkindices. Draait ook in de werkerprocessen, dus alleen gewone argumenten.
+
+def optimaliseer_plannen(reistijd, plannen):
+    uitkomsten = []
+    for start, bezoeken in plannen:
+        knopen = [start] + list(bezoeken)
+        volgorde, minuten = _los_op(reistijd[np.ix_(knopen, knopen)].tolist())
+        uitkomsten.append(([knopen[k] for k in volgorde], minuten))
+    return uitkomsten
+
+
+# Klasse : BezoekPlanner
+# optimaliseer({qr_id: [locatie_id, ...]}, start) -> {qr_id: ([locatie_id, ...] in bezoekvolgorde, minuten)}
+# minuten is de reistijd plus de wachttijden met de wachttijden van het huidige netwerk.
+# Volgordes worden onthouden per (start, set attracties) tot de locaties of reistijden veranderen (zet_netwerk).
+# De processen worden pas gestart bij de eerste grote batch en daarna hergebruikt.
+
+class BezoekPlanner:
+    def __init__(self, netwerk, werkers=None, parallel_vanaf=PARALLEL_VANAF):
+        self.netwerk = netwerk
+        self.werkers = werkers or os.cpu_count() or 1
+        self.parallel_vanaf = parallel_vanaf
+        self._onthouden = {}
+        self._pool = None
+
+        self.berekend = 0
+        self.onthouden = 0
+
+    def zet_netwerk(self, netwerk):
+        oud = self.netwerk
+        self.netwerk = netwerk
+        if oud is None or netwerk.ids != oud.ids or not np.array_equal(netwerk.reistijd, oud.reistijd):
+            self.vergeet()
+
+    def vergeet(self):
+        self._onthouden.clear()
+
+    def optimaliseer(self, plannen, start):
+        netwerk = self.netwerk
+        start = netwerk.index[start]
+        sleutels = {}
+        for qr_id, locatie_ids in plannen.items():
+            bezoeken = frozenset(netwerk.index[i] for i in locatie_ids if i in netwerk.index) - {start}
+            sleutels[qr_id] = (start, bezoeken)
+
+        nieuw = [sleutel for sleutel in dict.fromkeys(sleutels.values()) if sleutel not in self._onthouden]
+        self.onthouden += len(sleutels) - len(nieuw)
+        self.berekend += len(nieuw)
+        taken = [(s, sorted(bezoeken)) for s, bezoeken in nieuw]
+        for sleutel, uitkomst in zip(nieuw, self._reken(taken)):
+            self._onthouden[sleutel] = uitkomst
+
+        ids = netwerk.ids
+        wachttijd = netwerk.wachttijd.tolist()
+        per_sleutel = {}
+        for sleutel in dict.fromkeys(sleutels.values()):
+            volgorde, minuten = self._onthouden[sleutel]
+            per_sleutel[sleutel] = ([ids[k] for k in volgorde], minuten + sum(wachttijd[k] for k in volgorde))
+        return {qr_id: per_sleutel[sleutel] for qr_id, sleutel in sleutels.items()}
+
+    def _reken(self, taken):
+        reistijd = self.netwerk.reistijd
+        if self.werkers <= 1 or len(taken) < self.parallel_vanaf:
+            return optimaliseer_plannen(reistijd, taken)
+        per_stuk = min(PLANNEN_PER_STUK, math.ceil(len(taken) / self.werkers))
+        stukken = [taken[i:i + per_stuk] for i in range(0, len(taken), per_stuk)]
+        pool = self._zorg_voor_pool()
+        futures = [pool.submit(optimaliseer_plannen, reistijd, stuk) for stuk in stukken]
+        return [uitkomst for future in futures for uitkomst in future.result()]
+
+# Net als de TaakPool (live/taken.py) met "spawn": een fork van een proces met Qt threads is niet veilig
+
+    def _zorg_voor_pool(self):
+        if self._pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(self.werkers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def tellers(self):
+        return {"berekend": self.berekend, "onthouden": self.onthouden, "bewaard": len(self._onthouden)}
+
+
+# Alle plannen uit de database opnieuw: netwerk uit de locaties (met de huidige wachttijden), uitrekenen
+# en de volgorde terugschrijven in Reisplan. Iedereen begint bij het eerste perron (de ingang).
+
+def herplan(gegevens, planner=None):
+    locaties = gegevens.locaties()
+    netwerk = maak_netwerk(locaties)
+    if planner is None:
+        planner = BezoekPlanner(netwerk)
+    else:
+        planner.zet_netwerk(netwerk)
+    perrons = [rij["locatie_id"] for rij in locaties if rij["locatie_id"] in netwerk.index and rij["naam"].startswith(PERRON_PREFIX)]
+    if not perrons:
+        return {}
+    uitkomsten = planner.optimaliseer(gegevens.reisplannen(), perrons[0])
+    gegevens.bewaar_volgordes({qr_id: volgorde for qr_id, (volgorde, _minuten) in uitkomsten.items()})
+    return uitkomsten
@@ -0,0 +1,239 @@
+# reserveringen.py - Stoelen reserveren per spoorsegment, veilig met veel kiosken tegelijk
+# Een trein rijdt langs haltes 0..n-1. Een reservering van halte a naar halte b bezet de segmenten
+# a t/m b-1 (bij een rondgaande lijn met b <= a loopt hij via het eind weer door naar het begin).
+# Per trein houden we de bezetting bij in een SegmentBoom, dus controleren of er plek is kost O(log n).
+#
+# Elke kiosk heeft zijn eigen kopie in het geheugen. Om te voorkomen dat twee kiosken tegelijk de laatste
+# plek weggeven gebruiken we optimistische concurrency: elke wijziging verhoogt ReserveringVersie.versie
+# alleen als die nog gelijk is aan de versie die wij kennen. Lukt dat niet, dan heeft een andere kiosk
+# iets veranderd: we laden de bezetting van die trein opnieuw en proberen het nog eens.
+
+import threading
+
+from .segmentboom import SegmentBoom
+
+GERESERVEERD = "gereserveerd"
+VOL = "vol"
+AL_GERESERVEERD = "al gereserveerd"
+NIET_GEVONDEN = "niet gevonden"
+ONGELDIG = "ongeldig"
+CONFLICT = "conflict"
+MISLUKT = "mislukt"
+
+
+class _Conflict(Exception):
+    pass
+
+
+# Klasse : _TreinStaat
+# De kopie van één trein in het geheugen: versie uit de database en de bezetting per segment
+
+class _TreinStaat:
+    def __init__(self, aantal_segmenten):
+        self.versie = None
+        self.boom = SegmentBoom(aantal_segmenten)
+        self.lock = threading.Lock()
+
+
+# Klasse : ReserveringsAllocator
+# pool       : Verbindingspool naar de database
+# haltes     : namen van de haltes in de volgorde van de route
+# capaciteit : functie of dict trein_id -> aantal reserveerbare plekken
+
+class ReserveringsAllocator:
+    def __init__(self, pool, haltes, capaciteit, rondgaand=True, pogingen=20):
+        self.pool = pool
+        self.haltes = list(haltes)
+        self._halte_index = {naam: i for i, naam in enumerate(self.haltes)}
+        self._capaciteit = capaciteit
+        self.rondgaand = rondgaand
+        self.pogingen = pogingen
+        self._treinen = {}
+        self._lock = threading.Lock()
+
+        self.geaccepteerd = 0
+        self.afgewezen = 0
+        self.conflicten = 0
+
+    def capaciteit(self, trein_id):
+        if callable(self._capaciteit):
+            return self._capaciteit(trein_id)
+        return self._capaciteit[trein_id]
+
+# Zet (van, naar) om naar een of twee bereiken van segmenten
+
+    def bereiken(self, van, naar):
+        if van is None or naar is None:
+            return [(0, len(self.haltes))]
+        a = self._halte_index.get(van, van)
+        b = self._halte_index.get(naar, naar)
+        if a < b:
+            return [(a, b)]
+        if not self.rondgaand or a == b:
+            raise ValueError(f"ongeldige rit van {van} naar {naar}")
+        return [(a, len(self.haltes)), (0, b)]
+
+# Aantal nog vrije plekken voor de hele rit van -> naar. De kopie in het geheugen wordt eerst geladen als hij
+# er nog niet is of als een andere kiosk de versie in de database heeft opgehoogd. Lezen gebeurt onder het
+# lock van de trein, zodat een reservering die net wordt verwerkt niet half meetelt.
+
+# Blijft de versie tijdens het laden steeds veranderen, dan geeft vrij een TimeoutError in plaats van een oude waarde.
+
+    def vrij(self, trein_id, van=None, naar=None):
+        bereiken = self.bereiken(van, naar)
+        staat = self._staat(trein_id)
+        with staat.lock:
+            if staat.versie is None or self._versie_in_database(trein_id) != staat.versie:
+                try:
+                    self._herlaad(trein_id, staat)
+                except _Conflict:
+                    raise TimeoutError(f"bezetting van trein {trein_id} blijft veranderen") from None
+            bezet = max(staat.boom.maximum(a, b) for (a, b) in bereiken)
+        return max(0, self.capaciteit(trein_id) - bezet)
+
+    def _versie_in_database(self, trein_id):
+        rijen = self.pool.haal_op("SELECT versie FROM ReserveringVersie WHERE trein_id = ?", (trein_id,))
+        return rijen[0]["versie"] if rijen else None
+
+# Probeert een plek te reserveren. Geeft GERESERVEERD, VOL, AL_GERESERVEERD, ONGELDIG (onbekende qr_id of trein_id),
+# CONFLICT (na self.pogingen keer een andere kiosk voor) of MISLUKT (database fout) terug.
+# Een bestaande reservering zoeken we eerst op; een fout bij het invoegen is daarna altijd ongeldige invoer.
+
+    def reserveer(self, qr_id, trein_id, van=None, naar=None, type_behoefte="rolstoel"):
+        bereiken = self.bereiken(van, naar)
+        a = self._halte_index.get(van, van)
+        b = self._halte_index.get(naar, naar)
+        capaciteit = self.capaciteit(trein_id)
+
+        def wijziging(cursor, staat):
+            cursor.execute(self.pool.sql("SELECT 1 FROM Reservering WHERE qr_id = ? AND trein_id = ?"), (qr_id, trein_id))
+            if cursor.fetchone() is not None:
+                return AL_GERESERVEERD
+            if max(staat.boom.maximum(x, y) for (x, y) in bereiken) >= capaciteit:
+                return VOL
+            try:
+                cursor.execute(
+                    self.pool.sql("INSERT INTO Reservering (qr_id, trein_id, type_behoefte, van_halte, naar_halte) VALUES (?, ?, ?, ?, ?)"),
+                    (qr_id, trein_id, type_behoefte, a, b),
+                )
+            except Exception as fout:
+                if _integriteitsfout(fout):
+                    return ONGELDIG
+                raise
+            return GERESERVEERD
+
+        resultaat = self._voer_uit(trein_id, wijziging, bereiken, +1)
+        self._tel("geaccepteerd" if resultaat == GERESERVEERD else "afgewezen")
+        return resultaat
+
+    def annuleer(self, qr_id, trein_id):
+        gevonden = {}
+
+        def wijziging(cursor, staat):
+            cursor.execute(
+                self.pool.sql("SELECT van_halte, naar_halte FROM Reservering WHERE qr_id = ? AND trein_id = ?"),
+                (qr_id, trein_id),
+            )
+            rij = cursor.fetchone()
+            if rij is None:
+                return NIET_GEVONDEN
+            cursor.execute(self.pool.sql("DELETE FROM Reservering WHERE qr_id = ? AND trein_id = ?"), (qr_id, trein_id))
+            gevonden["bereiken"] = self.bereiken(*rij)
+            return GERESERVEERD
+
+        resultaat = self._voer_uit(trein_id, wijziging, lambda: gevonden["bereiken"], -1)
+        return resultaat == GERESERVEERD
+
+# Kern van de optimistische concurrency: binnen één transactie eerst de versie ophogen (alleen als hij
+# nog klopt) en dan de wijziging doen. Afwijzingen worden ook tegen de versie gecontroleerd, want met
+# een verouderde kopie zouden we ten onrechte "vol" kunnen zeggen.
+# Na een conflict wordt de trein bij de volgende poging opnieuw geladen; na self.pogingen keer geven we CONFLICT.
+# Een trein_id die niet bestaat valt al bij het laden af (foreign key op ReserveringVersie): ONGELDIG.
+
+    def _voer_uit(self, trein_id, wijziging, bereiken, delta):
+        staat = self._staat(trein_id)
+        for _ in range(self.pogingen):
+            with staat.lock:
+                try:
+                    if staat.versie is None:
+                        self._herlaad(trein_id, staat)
+                    with self.pool.verbinding() as conn:
+                        cursor = conn.cursor()
+                        cursor.execute(
+                            self.pool.sql("UPDATE ReserveringVersie SET versie = versie + 1 WHERE trein_id = ? AND versie = ?"),
+                            (trein_id, staat.versie),
+                        )
+                        if cursor.rowcount != 1:
+                            raise _Conflict()
+                        resultaat = wijziging(cursor, staat)
+                        if resultaat != GERESERVEERD:
+                            # niets veranderd: de versie-ophoging wordt teruggedraaid
+                            raise _Afgewezen(resultaat)
+                except _Conflict:
+                    self._tel("conflicten")
+                    staat.versie = None
+                    continue
+                except _Afgewezen as afwijzing:
+                    return afwijzing.resultaat
+                except Exception as fout:
+                    staat.versie = None
+                    return ONGELDIG if _integriteitsfout(fout) else MISLUKT
+
+                staat.versie += 1
+                for (a, b) in (bereiken() if callable(bereiken) else bereiken):
+                    staat.boom.tel_op(a, b, delta)
+                return GERESERVEERD
+        return CONFLICT
+
+    def _staat(self, trein_id):
+        with self._lock:
+            staat = self._treinen.get(trein_id)
+            if staat is None:
+                staat = self._treinen[trein_id] = _TreinStaat(len(self.haltes))
+            return staat
+
+# Laadt de bezetting van één trein opnieuw uit de database. De versie wordt voor en na gelezen:
+# als die tussendoor verandert, lezen we opnieuw zodat versie en reserveringen bij elkaar passen
+# (maximaal self.pogingen keer, daarna _Conflict).
+
+    def _herlaad(self, trein_id, staat):
+        invoegen = "INSERT OR IGNORE" if self.pool.dialect == "sqlite" else "INSERT IGNORE"
+        self.pool.voer_uit(f"{invoegen} INTO ReserveringVersie (trein_id, versie) VALUES (?, 0)", (trein_id,))
+        for _ in range(self.pogingen):
+            with self.pool.verbinding() as conn:
+                cursor = conn.cursor()
+                versie_sql = self.pool.sql("SELECT versie FROM ReserveringVersie WHERE trein_id = ?")
+                cursor.execute(versie_sql, (trein_id,))
+                voor = cursor.fetchone()[0]
+                cursor.execute(self.pool.sql("SELECT van_halte, naar_halte FROM Reservering WHERE trein_id = ?"), (trein_id,))
+                ritten = cursor.fetchall()
+                cursor.execute(versie_sql, (trein_id,))
+                na = cursor.fetchone()[0]
+            if voor == na:
+                break
+        else:
+            raise _Conflict()
+
+        boom = SegmentBoom(len(self.haltes))
+        for (van, naar) in ritten:
+            for (a, b) in self.bereiken(van, naar):
+                boom.tel_op(a, b, 1)
+        staat.boom = boom
+        staat.versie = voor
+
+    def _tel(self, naam):
+        with self._lock:
+            setattr(self, naam, getattr(self, naam) + 1)
+
+    def tellers(self):
+        return {"geaccepteerd": self.geaccepteerd, "afgewezen": self.afgewezen, "conflicten": self.conflicten}
+
+
+def _integriteitsfout(fout):
+    return type(fout).__name__ == "IntegrityError"
+
+
+class _Afgewezen(Exception):
+    def __init__(self, resultaat):
+        super().__init__(resultaat)
+        self.resultaat = resultaat
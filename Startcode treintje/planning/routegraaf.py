@@ -0,0 +1,152 @@
+# routegraaf.py - Spoormodel van het park met reistijden per segment en een vooraf berekende ETA-tabel
+# De haltes (perrons en attracties) zijn knopen, de spoorsegmenten zijn gerichte kanten met een reistijd
+# in minuten. Voor alle paren haltes berekenen we één keer de kortste reistijd (Floyd-Warshall met NumPy),
+# daarna is een ETA opvragen één opzoeking in de tabel.
+# Verandert de reistijd van één segment (bijvoorbeeld een langzaam stuk spoor), dan rekenen we alleen
+# bij wat nodig is: bij een snellere tijd in één vectorstap, bij een langzamere tijd alleen de rijen
+# van vertrekpunten waarvan de snelste route over dat segment liep.
+
+import math
+
+import numpy as np
+
+ONBEREIKBAAR = math.inf
+
+# Standaard rijsnelheid: minuten per kaarteenheid (de kaart is 1 x 1)
+
+MINUTEN_PER_EENHEID = 5.0
+
+
+# Klasse : RouteGraaf
+
+class RouteGraaf:
+    def __init__(self, namen, coordinaten=None):
+        self.namen = list(namen)
+        self._index = {naam: i for i, naam in enumerate(self.namen)}
+        if len(self._index) != len(self.namen):
+            raise ValueError("haltenamen moeten uniek zijn")
+        self._buren = [dict() for _ in self.namen]
+        self._coordinaten = None if coordinaten is None else np.asarray(coordinaten, dtype=np.float64)
+        self._tabel = None
+
+        self.volledige_berekeningen = 0
+        self.incrementele_updates = 0
+
+    def __len__(self):
+        return len(self.namen)
+
+    def __contains__(self, naam):
+        return naam in self._index
+
+    def voeg_segment_toe(self, van, naar, minuten, beide_richtingen=False):
+        self._buren[self._index[van]][self._index[naar]] = float(minuten)
+        if beide_richtingen:
+            self._buren[self._index[naar]][self._index[van]] = float(minuten)
+        self._tabel = None
+
+    def reistijd(self, van, naar):
+        return self._buren[self._index[van]].get(self._index[naar], ONBEREIKBAAR)
+
+# Volledige berekening van alle kortste reistijden (alleen nodig na het opbouwen van het spoor)
+
+    def bereken(self):
+        n = len(self.namen)
+        tabel = np.full((n, n), ONBEREIKBAAR)
+        np.fill_diagonal(tabel, 0.0)
+        for i, buren in enumerate(self._buren):
+            for j, minuten in buren.items():
+                tabel[i, j] = min(tabel[i, j], minuten)
+        for k in range(n):
+            np.minimum(tabel, tabel[:, k, None] + tabel[None, k, :], out=tabel)
+        self._tabel = tabel
+        self.volledige_berekeningen += 1
+        return tabel
+
+    def tabel(self):
+        return self._tabel if self._tabel is not None else self.bereken()
+
+# ETA in minuten van halte van naar halte naar: één opzoeking in de tabel
+
+    def eta(self, van, naar):
+        return float(self.tabel()[self._index[van], self._index[naar]])
+
+# Vertrekbord voor één halte: de reistijd vanaf elke andere halte
+
+    def bord(self, naar):
+        kolom = self.tabel()[:, self._index[naar]]
+        return {naam: float(kolom[i]) for i, naam in enumerate(self.namen) if naam != naar}
+
+# Past de reistijd van één segment aan en werkt de tabel incrementeel bij
+
+    def zet_reistijd(self, van, naar, minuten):
+        u = self._index[van]
+        v = self._index[naar]
+        oud = self._buren[u].get(v, ONBEREIKBAAR)
+        minuten = float(minuten)
+        self._buren[u][v] = minuten
+        if self._tabel is None or minuten == oud:
+            return
+
+        tabel = self._tabel
+        if minuten < oud:
+            # sneller: een route kan alleen korter worden door het nieuwe segment te gebruiken
+            np.minimum(tabel, tabel[:, u, None] + minuten + tabel[None, v, :], out=tabel)
+        else:
+            # langzamer: alleen de paren waarvan een kortste route over (u, v) liep kunnen veranderen
+            via = tabel[:, u, None] + oud + tabel[None, v, :]
+            geraakt = np.isfinite(tabel) & np.isclose(via, tabel)
+            bronnen = np.nonzero(geraakt.any(axis=1))[0]
+            tabel[geraakt] = ONBEREIKBAAR
+            self._herstel_rijen(bronnen[np.argsort(tabel[bronnen, u])])
+        self.incrementele_updates += 1
+
+# Berekent de rijen van de geraakte vertrekpunten opnieuw vanuit hun buren:
+# tabel[i] = min over buren k van (reistijd(i, k) + tabel[k]). De andere rijen kloppen nog en
+# worden hergebruikt. Vertrekpunten dicht bij het gewijzigde segment gaan eerst, dan is één ronde
+# meestal genoeg; we herhalen tot er niets meer verandert.
+
+    def _herstel_rijen(self, bronnen):
+        tabel = self._tabel
+        buren = {}
+        for i in bronnen:
+            doelen = list(self._buren[i].items())
+            buren[i] = (np.array([j for j, _ in doelen], dtype=np.intp), np.array([m for _, m in doelen])[:, None])
+        veranderd = True
+        while veranderd:
+            veranderd = False
+            for i in bronnen:
+                doelen, minuten = buren[i]
+                if not len(doelen):
+                    continue
+                nieuw = np.minimum(tabel[i], (tabel[doelen] + minuten).min(axis=0))
+                nieuw[i] = 0.0
+                if (nieuw < tabel[i]).any():
+                    tabel[i] = nieuw
+                    veranderd = True
+
+# De halte die het dichtst bij een punt op de kaart ligt (alleen als de graaf coördinaten heeft)
+
+    def dichtstbijzijnde(self, x, y):
+        if self._coordinaten is None or not len(self.namen):
+            return None
+        afstand = ((self._coordinaten - (x, y)) ** 2).sum(axis=1)
+        return self.namen[int(afstand.argmin())]
+
+
+# Bouwt een rondgaande lijn langs alle punten (x, y, naam): gesorteerd op hoek rond het midden,
+# zodat de trein in één richting een rondje door het park rijdt. Reistijd = afstand * minuten_per_eenheid.
+
+def maak_ringlijn(punten, minuten_per_eenheid=MINUTEN_PER_EENHEID):
+    punten = list(punten)
+    if not punten:
+        return RouteGraaf([])
+    mx = sum(p[0] for p in punten) / len(punten)
+    my = sum(p[1] for p in punten) / len(punten)
+    volgorde = sorted(punten, key=lambda p: math.atan2(p[1] - my, p[0] - mx))
+    graaf = RouteGraaf([p[2] for p in volgorde], [(p[0], p[1]) for p in volgorde])
+    for i, (x0, y0, van) in enumerate(volgorde):
+        x1, y1, naar = volgorde[(i + 1) % len(volgorde)]
+        if van != naar:
+            graaf.voeg_segment_toe(van, naar, math.dist((x0, y0), (x1, y1)) * minuten_per_eenheid)
+    graaf.bereken()
+    return graaf
@@ -0,0 +1,50 @@
+# segmentboom.py - Segmentboom met optellen op een bereik en het maximum van een bereik opvragen
+# We gebruiken hem voor de bezetting van een trein per spoorsegment: een reservering van halte a
+# naar halte b telt één op bij de segmenten a t/m b-1, en een nieuwe reservering past alleen als
+# het maximum over die segmenten nog onder de capaciteit ligt. Beide acties zijn O(log n).
+
+
+# Klasse : SegmentBoom
+# Lazy propagation: een optelling voor een heel deelbereik wordt in de knoop bewaard en pas doorgegeven als dat nodig is
+
+class SegmentBoom:
+    def __init__(self, grootte):
+        self.grootte = max(1, int(grootte))
+        self._max = [0] * (4 * self.grootte)
+        self._extra = [0] * (4 * self.grootte)
+
+# Telt waarde op bij de segmenten van begin t/m eind-1
+
+    def tel_op(self, begin, eind, waarde):
+        if begin < eind:
+            self._tel_op(1, 0, self.grootte, max(0, begin), min(self.grootte, eind), waarde)
+
+# Het maximum over de segmenten van begin t/m eind-1 (0 bij een leeg bereik)
+
+    def maximum(self, begin, eind):
+        if begin >= eind:
+            return 0
+        return self._maximum(1, 0, self.grootte, max(0, begin), min(self.grootte, eind))
+
+    def _tel_op(self, knoop, links, rechts, begin, eind, waarde):
+        if eind <= links or rechts <= begin:
+            return
+        if begin <= links and rechts <= eind:
+            self._max[knoop] += waarde
+            self._extra[knoop] += waarde
+            return
+        midden = (links + rechts) // 2
+        self._tel_op(2 * knoop, links, midden, begin, eind, waarde)
+        self._tel_op(2 * knoop + 1, midden, rechts, begin, eind, waarde)
+        self._max[knoop] = self._extra[knoop] + max(self._max[2 * knoop], self._max[2 * knoop + 1])
+
+    def _maximum(self, knoop, links, rechts, begin, eind):
+        if eind <= links or rechts <= begin:
+            return float("-inf")
+        if begin <= links and rechts <= eind:
+            return self._max[knoop]
+        midden = (links + rechts) // 2
+        return self._extra[knoop] + max(
+            self._maximum(2 * knoop, links, midden, begin, eind),
+            self._maximum(2 * knoop + 1, midden, rechts, begin, eind),
+        )
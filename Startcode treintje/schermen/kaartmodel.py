@@ -0,0 +1,128 @@
+import time
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from live.historie import Historie
+from live.metrieken import METRIEKEN
+from live.vloot import Vloot
+
+# De delen van de kaart die los van elkaar kunnen veranderen:
+#   indeling : attracties en perrons (de statische laag en de klik-index moeten opnieuw)
+#   treinen  : posities in de vloot (alleen de plekken waar treinen waren en nu zijn opnieuw tekenen)
+#   info     : train_info van de gevolgde trein (wordt niet getekend, alleen gebruikt bij een klik)
+
+DELEN = ("indeling", "treinen", "info")
+
+
+# Klasse : KaartModel
+# Eén gedeelde stand van de kaart. Scherm2 en de vergrote kaart in Scherm4 tekenen allebei hieruit,
+# er wordt dus niets meer per scherm gekopieerd.
+# Elke wijziging verhoogt versie, en versies[deel] krijgt de versie van de laatste wijziging van dat deel.
+# gewijzigd(versie, wijzigingen) meldt wat er veranderde: {deel: lijst met rijen in de vloot, of None voor alles}.
+# Een view onthoudt welke versies hij al verwerkt heeft en doet niets als er niets nieuws is.
+# Een verborgen view slaat versies over en haalt bij het tonen alleen de nieuwste in (samenvoegen).
+# Per view telt afgeleverd hoeveel versies hij verwerkt en hoeveel hij daarbij heeft samengevoegd (tellers()).
+# Elke nieuwe positie gaat ook in de historie (een begrensde ringbuffer per trein, voor hoogstens MAX_TREINEN treinen) voor het spoor en terugspelen.
+
+class KaartModel(QObject):
+    gewijzigd = pyqtSignal(int, object)
+
+    def __init__(self, vloot=None, parent=None, klok=time.time):
+        super().__init__(parent)
+        self.historie = Historie()
+        self._klok = klok
+        if vloot is None:
+            vloot = Vloot()
+            vloot.voeg_toe(0)
+        self.vloot = vloot
+        self.attracties = ()
+        self.perrons = ()
+        self.trein_info = {"seats_available": 20, "total_seats": 20, "arrival_minutes": 0}
+        self.versie = 0
+        self.versies = dict.fromkeys(DELEN, 0)
+        self.geleverd = 0
+        self.samengevoegd = 0
+
+# Positie (x, y) van de gevolgde trein (rij 0), genormaliseerd tussen 0 en 1
+
+    @property
+    def positie(self):
+        if not len(self.vloot):
+            return (0.5, 0.5)
+        x, y = self.vloot.posities[0]
+        return (float(x), float(y))
+
+    def zet_attracties(self, attracties):
+        attracties = tuple(attracties) if attracties else ()
+        if attracties != self.attracties:
+            self.attracties = attracties
+            self._wijzig({"indeling": None})
+
+    def zet_perrons(self, perrons):
+        perrons = tuple(perrons) if perrons else ()
+        if perrons != self.perrons:
+            self.perrons = perrons
+            self._wijzig({"indeling": None})
+
+    def zet_positie(self, x, y, rij=0):
+        x = min(max(0.0, float(x)), 1.0)
+        y = min(max(0.0, float(y)), 1.0)
+        if (x, y) == tuple(self.vloot.posities[rij]):
+            return
+        self.vloot.zet_positie(rij, x, y)
+        self.historie.registreer_een(int(self.vloot.ids[rij]), x, y, self._klok())
+        self._wijzig({"treinen": [rij]})
+
+# De dict wordt niet gekopieerd: wie info zet maakt bij elke update een nieuwe dict aan
+
+    def zet_info(self, info):
+        self.trein_info = info if info is not None else {}
+        if len(self.vloot):
+            self.vloot.zet_bezetting(
+                [0],
+                plekken=self.trein_info.get("seats_available", 0),
+                totaal=self.trein_info.get("total_seats", 0),
+                aankomst=self.trein_info.get("arrival_minutes", 0),
+            )
+        self._wijzig({"info": [0]})
+
+# Een hele nieuwe vloot, of een melding na een bulk-update van de posities (rijen=None: mogelijk alle treinen)
+
+    def zet_vloot(self, vloot):
+        self.vloot = vloot
+        self._registreer(None)
+        self._wijzig({"treinen": None})
+
+    def treinen_bijgewerkt(self, rijen=None):
+        self._registreer(rijen)
+        self._wijzig({"treinen": None if rijen is None else list(rijen)})
+
+    def _registreer(self, rijen):
+        if not len(self.vloot):
+            return
+        if rijen is None:
+            self.historie.registreer(self.vloot.ids, self.vloot.posities, self._klok())
+        else:
+            rijen = np.asarray(rijen)
+            self.historie.registreer(self.vloot.ids[rijen], self.vloot.posities[rijen], self._klok())
+
+    def _wijzig(self, wijzigingen):
+        self.versie += 1
+        for deel in wijzigingen:
+            self.versies[deel] = self.versie
+        self.gewijzigd.emit(self.versie, wijzigingen)
+
+# Een view heeft versie verwerkt; de versies tussen zijn vorige en deze zijn samengevoegd en nooit los afgeleverd
+
+    def afgeleverd(self, vorige, versie):
+        overgeslagen = max(0, versie - vorige - 1)
+        self.geleverd += 1
+        self.samengevoegd += overgeslagen
+        if METRIEKEN.actief:
+            METRIEKEN.tel("kaart_geleverd")
+            if overgeslagen:
+                METRIEKEN.tel("kaart_samengevoegd", overgeslagen)
+
+    def tellers(self):
+        return {"versie": self.versie, "geleverd": self.geleverd, "samengevoegd": self.samengevoegd}
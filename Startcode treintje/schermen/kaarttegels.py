@@ -0,0 +1,131 @@
+# kaarttegels.py - Tegels, zoomniveaus en labels voor de inzoombare kaart (Scherm4)
+# Ingezoomd is de kaart veel groter dan de widget. In plaats van één enorme statische laag knippen we de
+# kaart per zoomniveau in tegels van TEGEL x TEGEL pixels (een tegelpiramide). Een tegel wordt pas getekend
+# als hij in beeld komt en daarna bewaard in een LRU cache, zodat pannen en terugzoomen alleen tegels kost
+# die er nog niet waren.
+# Labels die over elkaar zouden vallen laten we per zoomniveau weg (labels_zonder_overlap).
+
+from collections import OrderedDict
+import math
+
+import numpy as np
+
+# Zoomniveau n toont de kaart ZOOM_STAP ** n keer zo groot als passend in de widget (niveau 0)
+
+TEGEL = 256
+ZOOM_STAP = 2 ** 0.25
+MAX_NIVEAU = 20
+
+# Hoeveel tegels (ongeveer 256 kB per stuk) en hoeveel zoomniveaus (posities en labels) we bewaren
+
+TEGEL_CACHE = 128
+NIVEAU_CACHE = 8
+
+# Level of detail: liggen er in een tegel meer markers dan LOD_DICHTHEID, dan tekenen we ze als
+# eenvoudige stippen (één drawPoints per kleur) in plaats van cirkels met een rand
+
+LOD_DICHTHEID = 96
+
+# Hoeveel ms één paint aan nieuwe tegels mag besteden; de rest komt in de volgende paints (eerst een lege tegel)
+
+TEGEL_BUDGET_MS = 8.0
+
+# Ruimte in pixels die rond een label vrij moet blijven
+
+LABEL_MARGE = 2
+
+
+def schaal_van(niveau):
+    return ZOOM_STAP ** niveau
+
+
+# De tegels (tx, ty) die de rechthoek x0..x1, y0..y1 (in pixels van de kaart) raken
+
+def tegels_voor(x0, y0, x1, y1):
+    for ty in range(max(0, math.floor(y0 / TEGEL)), math.floor(y1 / TEGEL) + 1):
+        for tx in range(max(0, math.floor(x0 / TEGEL)), math.floor(x1 / TEGEL) + 1):
+            yield tx, ty
+
+
+# Klasse : LRUCache
+# Bewaart maximaal capaciteit waarden; de langst niet gebruikte gaat er als eerste uit.
+# haal(sleutel, maak) geeft de bewaarde waarde of maakt hem met maak().
+
+class LRUCache:
+    def __init__(self, capaciteit):
+        self.capaciteit = capaciteit
+        self._waarden = OrderedDict()
+        self.treffers = 0
+        self.missers = 0
+        self.weggegooid = 0
+
+    def __len__(self):
+        return len(self._waarden)
+
+# kijk geeft alleen een bewaarde waarde (of None), zonder iets te maken
+
+    def kijk(self, sleutel):
+        waarde = self._waarden.get(sleutel)
+        if waarde is not None:
+            self._waarden.move_to_end(sleutel)
+            self.treffers += 1
+        return waarde
+
+    def haal(self, sleutel, maak):
+        waarde = self._waarden.get(sleutel)
+        if waarde is not None:
+            self._waarden.move_to_end(sleutel)
+            self.treffers += 1
+            return waarde
+        self.missers += 1
+        waarde = maak()
+        self._waarden[sleutel] = waarde
+        while len(self._waarden) > self.capaciteit:
+            self._waarden.popitem(last=False)
+            self.weggegooid += 1
+        return waarde
+
+    def leeg(self):
+        self._waarden.clear()
+
+    def tellers(self):
+        return {"treffers": self.treffers, "missers": self.missers, "weggegooid": self.weggegooid, "aantal": len(self._waarden)}
+
+
+# Welke labels getekend worden. boxen is een (n, 4) array met x0, y0, x1, y1 per label, op volgorde van
+# voorrang: een label komt alleen op de kaart als hij geen eerder geplaatst label raakt.
+# De geplaatste labels staan in een raster van cellen, zodat we alleen de buren hoeven te controleren.
+# Met cellen zo breed als het breedste label raakt een label hoogstens twee kolommen.
+
+def labels_zonder_overlap(boxen):
+    boxen = np.asarray(boxen, dtype=np.float64).reshape(-1, 4)
+    zichtbaar = np.zeros(len(boxen), dtype=bool)
+    if not len(boxen):
+        return zichtbaar
+    boxen = boxen + (-LABEL_MARGE, -LABEL_MARGE, LABEL_MARGE, LABEL_MARGE)
+    cel_x = max(1.0, float((boxen[:, 2] - boxen[:, 0]).max()))
+    cel_y = max(1.0, float((boxen[:, 3] - boxen[:, 1]).max()))
+    kolommen = np.floor(boxen[:, [0, 2]] / cel_x).astype(np.int64).tolist()
+    rijen = np.floor(boxen[:, [1, 3]] / cel_y).astype(np.int64).tolist()
+    cellen = {}
+    for i, (x0, y0, x1, y1) in enumerate(boxen.tolist()):
+        (k0, k1), (r0, r1) = kolommen[i], rijen[i]
+        bereik = [(k, r) for k in range(k0, k1 + 1) for r in range(r0, r1 + 1)]
+        vrij = True
+        for sleutel in bereik:
+            for (a0, b0, a1, b1) in cellen.get(sleutel, ()):
+                if x0 < a1 and a0 < x1 and y0 < b1 and b0 < y1:
+                    vrij = False
+                    break
+            if not vrij:
+                break
+        if vrij:
+            zichtbaar[i] = True
+            box = (x0, y0, x1, y1)
+            for sleutel in bereik:
+                lijst = cellen.get(sleutel)
+                if lijst is None:
+                    cellen[sleutel] = [box]
+                else:
+                    lijst.append(box)
+    return zichtbaar
@@ -1,13 +1,36 @@
-from PyQt6.QtWidgets import QMainWindow, QStackedWidget, QWidget, QVBoxLayout, QPushButton
-from .startscherm import Startscherm
-from .scherm3 import Scherm3
-from .scherm2 import Scherm2
-from .scherm4 import Scherm4
-from .scherm1 import Scherm1
+import importlib
+import os
+import time
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QKeySequence, QShortcut
+from PyQt6.QtWidgets import QMainWindow, QStackedWidget
+from live.metrieken import METRIEKEN, MetriekExport, gemeten
+from live.taken import TaakPool
+from .thema import STANDAARD_THEMA, zet_thema, volgend_thema, werk_thema_bij
+
+# Register met alle pagina's: naam -> (module, klasse)
+# Een pagina wordt pas geïmporteerd en gebouwd als hij voor het eerst nodig is
+# (bijvoorbeeld via self.scherm2 of toon_pagina). Zo hoeft de kiosk bij het opstarten
+# alleen het startscherm te bouwen.
+
+PAGINAS = {
+    "startscherm": ("schermen.startscherm", "Startscherm"),
+    "scherm1": ("schermen.scherm1", "Scherm1"),
+    "scherm2": ("schermen.scherm2", "Scherm2"),
+    "scherm3": ("schermen.scherm3", "Scherm3"),
+    "scherm4": ("schermen.scherm4", "Scherm4"),
+}
+
+# Volgorde waarin de overige pagina's worden voorverwarmd als de app niets te doen heeft.
+# We beginnen pas na VOORVERWARM_NA_MS, zodat de eerste paint van het startscherm niet hoeft te wachten.
+
+VOORVERWARM_VOLGORDE = ["scherm2", "scherm4", "scherm3", "scherm1"]
+VOORVERWARM_NA_MS = 1000
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, voorverwarmen=True):
         super().__init__()
         self.setWindowTitle("Lake Side Mania - GUI")
         self.setGeometry(100, 100, 1024, 768)
@@ -15,21 +38,139 @@ class MainWindow(QMainWindow):
         self.stack = QStackedWidget()
         self.setCentralWidget(self.stack)
 
-        # Pagina's
-        self.startscherm = Startscherm(self)
-        self.scherm1 = Scherm1(self)
-        self.scherm2 = Scherm2(self)
-        self.scherm3 = Scherm3(self)  
-        self.scherm4 = Scherm4(self)  
-       
-        # Voeg toe aan stack
-        self.stack.addWidget(self.startscherm)
-        self.stack.addWidget(self.scherm3)
-        self.stack.addWidget(self.scherm2)
-        self.stack.addWidget(self.scherm4)
-        self.stack.addWidget(self.scherm1)
-
-        self.stack.setCurrentWidget(self.startscherm)
-
-    def toon_pagina(self, widget: QWidget):
+# Thema (standaard, nacht of hoog_contrast) via LSM_THEMA; Ctrl+T wisselt tijdens het draaien
+
+        try:
+            zet_thema(self, os.environ.get("LSM_THEMA", STANDAARD_THEMA))
+        except ValueError:
+            zet_thema(self, STANDAARD_THEMA)
+        self.thema_sneltoets = QShortcut(QKeySequence("Ctrl+T"), self)
+        self.thema_sneltoets.activated.connect(lambda: volgend_thema(self))
+
+# Achtergrondtaken: werk dat de GUI thread zou blokkeren (database, bestanden). Elk scherm annuleert zijn
+# eigen taken als het verborgen wordt; de resultaten komen via een signaal terug op de GUI thread.
+
+        self.taken = TaakPool(parent=self)
+
+# Instrumentatie (optioneel, via LSM_METRIEKEN / LSM_METRIEKEN_OVERLAY): event loop lag meten en metrieken wegschrijven
+
+        self.metriek_export = None
+        if METRIEKEN.actief:
+            self.metriek_export = MetriekExport(os.environ.get("LSM_METRIEKEN"), parent=self)
+
+# Database (optioneel, via LSM_DATABASE). Zonder database gebruiken de schermen hun demo-waarden.
+# Is de database bij het opstarten niet bereikbaar, dan starten we zonder en werken de schermen uit de snapshot.
+# Database en snapshot importeren we pas als ze aan staan, zodat een kiosk zonder database sneller opstart.
+
+        self.gegevens = None
+        if os.environ.get("LSM_DATABASE"):
+            try:
+                from database.gegevens import open_uit_omgeving
+                self.gegevens = open_uit_omgeving()
+            except Exception:
+                self.gegevens = None
+
+# Lokale snapshot (optioneel, via LSM_SNAPSHOT): de laatst bekende kaart, direct beschikbaar bij het opstarten
+# en als de database niet bereikbaar is. Scherm2 houdt hem op de achtergrond in sync met de database.
+
+        self.snapshot = None
+        if os.environ.get("LSM_SNAPSHOT"):
+            try:
+                from database.snapshot import snapshot_uit_omgeving
+                self.snapshot = snapshot_uit_omgeving()
+            except Exception:
+                self.snapshot = None
+
+# Parksimulatie (optioneel, via LSM_SIMULATIE = tempo, zie live/parksimulatie.py): een gesimuleerde parkdag schrijft
+# scans, check-ins, reserveringen en feedback in de database, zodat de schermen de belasting van een drukke dag zien.
+# Pas hier importeren: zonder simulatie hoeft de module niet geladen te worden.
+
+        self.simulatie = None
+        if self.gegevens is not None and os.environ.get("LSM_SIMULATIE"):
+            try:
+                from live.parksimulatie import simulatie_uit_omgeving
+                self.simulatie = simulatie_uit_omgeving(self.gegevens)
+            except Exception:
+                self.simulatie = None
+
+        # Pagina's: alleen het startscherm meteen, de rest bij eerste gebruik
+        self._paginas = {}
+        self.pagina_tijden = {}
+        self.stack.setCurrentWidget(self.pagina("startscherm"))
+
+        # Als de app niets te doen heeft bouwen we de andere pagina's alvast, één per keer
+        self._voorverwarmen = list(VOORVERWARM_VOLGORDE) if voorverwarmen else []
+        if self._voorverwarmen:
+            QTimer.singleShot(VOORVERWARM_NA_MS, self._verwarm_volgende)
+
+# self.scherm2 enz. bestaan pas als de pagina gebouwd is; tot die tijd bouwen we hem hier op aanvraag.
+# self.kaart is de gedeelde stand van de kaart (KaartModel): Scherm2 vult hem, Scherm2 en Scherm4 tekenen er allebei uit.
+# Ook die maken we pas bij eerste gebruik, zodat NumPy (voor de vloot) niet bij het opstarten geladen hoeft te worden.
+
+    def __getattr__(self, naam):
+        if naam == "kaart":
+            from .kaartmodel import KaartModel
+            self.kaart = KaartModel(parent=self)
+            return self.kaart
+        if naam not in PAGINAS:
+            raise AttributeError(naam)
+        return self.pagina(naam)
+
+    def is_gebouwd(self, naam):
+        return naam in self.__dict__.get("_paginas", {})
+
+# Importeert en bouwt een pagina (één keer) en zet hem in de stack
+
+    def pagina(self, naam):
+        widget = self._paginas.get(naam)
+        if widget is not None:
+            return widget
+
+        module_naam, klasse_naam = PAGINAS[naam]
+        start = time.perf_counter()
+        module = importlib.import_module(module_naam)
+        geimporteerd = time.perf_counter()
+        widget = getattr(module, klasse_naam)(self)
+        gebouwd = time.perf_counter()
+
+        self._paginas[naam] = widget
+        setattr(self, naam, widget)
+        self.stack.addWidget(widget)
+        self.pagina_tijden[naam] = {
+            "import_ms": (geimporteerd - start) * 1000.0,
+            "bouw_ms": (gebouwd - geimporteerd) * 1000.0,
+        }
+        return widget
+
+    def _verwarm_volgende(self):
+        while self._voorverwarmen:
+            naam = self._voorverwarmen.pop(0)
+            if not self.is_gebouwd(naam):
+                self.pagina(naam)
+                break
+        if self._voorverwarmen:
+            QTimer.singleShot(0, self._verwarm_volgende)
+
+    @gemeten("pagina_wissel")
+    def toon_pagina(self, widget):
+        if isinstance(widget, str):
+            widget = self.pagina(widget)
+        werk_thema_bij(self, widget)
         self.stack.setCurrentWidget(widget)
+
+# Bij het afsluiten stoppen we de telemetrie, snapshot, simulatie en taken threads netjes en schrijven we de metrieken nog één keer weg
+
+    def closeEvent(self, event):
+        try:
+            if self.is_gebouwd("scherm2"):
+                if self.scherm2.telemetrie is not None:
+                    self.scherm2.telemetrie.stop()
+                self.scherm2.stop_snapshot()
+        except Exception:
+            pass
+        if self.simulatie is not None:
+            self.simulatie.stop()
+        self.taken.stop()
+        if self.metriek_export is not None:
+            self.metriek_export.stop()
+        super().closeEvent(event)
@@ -0,0 +1,71 @@
+# opstartmeting.py - Meet hoe lang het opstarten van de kiosk duurt
+# Mijlpalen (in ms vanaf de start van main.py):
+#   imports      : alle modules van main.py zijn geladen
+#   qapplication : QApplication is aangemaakt en de stylesheet is geladen
+#   venster      : MainWindow is gebouwd (alleen het startscherm, de rest is lui)
+#   eerste_paint : het eerste paint event van een widget
+#   interactief  : de event loop is na de eerste paint voor het eerst vrij (de kiosk reageert op klikken)
+# Het rapport wordt op stdout gezet als de metrieken aan staan (LSM_METRIEKEN / LSM_METRIEKEN_OVERLAY)
+# en als JSON weggeschreven als LSM_OPSTART_RAPPORT een pad bevat.
+
+import json
+import os
+import time
+
+from PyQt6.QtCore import QEvent, QObject, QTimer
+from PyQt6.QtWidgets import QApplication
+
+from live.metrieken import METRIEKEN
+
+
+# Klasse : Opstartmeting
+
+class Opstartmeting(QObject):
+    def __init__(self, start, rapport_pad=None):
+        super().__init__()
+        self.start = start
+        self.mijlpalen = {}
+        self.rapport_pad = rapport_pad if rapport_pad is not None else os.environ.get("LSM_OPSTART_RAPPORT")
+        self._venster = None
+        self.klaar = False
+
+    def markeer(self, naam):
+        if naam not in self.mijlpalen:
+            self.mijlpalen[naam] = (time.perf_counter() - self.start) * 1000.0
+
+# Volgt het venster tot de eerste paint en het eerste vrije moment van de event loop daarna
+
+    def volg(self, venster):
+        self._venster = venster
+        QApplication.instance().installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and "eerste_paint" not in self.mijlpalen:
+            self.markeer("eerste_paint")
+            QApplication.instance().removeEventFilter(self)
+            QTimer.singleShot(0, self._interactief)
+        return False
+
+    def _interactief(self):
+        self.markeer("interactief")
+        self.klaar = True
+        self.schrijf_rapport()
+
+    def rapport(self):
+        return {
+            "mijlpalen_ms": dict(self.mijlpalen),
+            "paginas": dict(getattr(self._venster, "pagina_tijden", {})) if self._venster is not None else {},
+        }
+
+    def schrijf_rapport(self):
+        rapport = self.rapport()
+        if METRIEKEN.actief:
+            tekst = ", ".join(f"{naam} {ms:.0f} ms" for naam, ms in rapport["mijlpalen_ms"].items())
+            print(f"Opstarttijd: {tekst}")
+        if self.rapport_pad:
+            try:
+                with open(self.rapport_pad, "w") as f:
+                    json.dump(rapport, f, indent=2)
+            except OSError:
+                pass
+        return rapport
@@ -0,0 +1,78 @@
+# ruimtelijke_index.py - Uniform raster (grid) om snel markers op de kaart te vinden
+# Bij een klik of als de muis over de kaart beweegt willen we weten welke marker (trein, attractie
+# of perron) onder de muis ligt. In plaats van alle markers één voor één te controleren, verdelen
+# we de kaart in vakjes (cellen) en kijken we alleen naar de markers in het vakje onder de muis.
+
+import math
+
+# Volgorde bij overlappende markers: de trein gaat voor, daarna attracties en als laatste perrons
+
+PRIORITEIT = {"trein": 0, "attractie": 1, "perron": 2}
+
+# Klasse : RasterIndex
+# Elke marker is een cirkel (x, y, r) in pixels. Een marker wordt in elke cel gezet die zijn cirkel raakt,
+# zodat een zoekopdracht maar één cel hoeft te bekijken.
+
+class RasterIndex:
+    def __init__(self, celgrootte=32):
+        self._cel = max(1, int(celgrootte))
+        self._cellen = {}
+        self._markers = {}
+
+    def __len__(self):
+        return len(self._markers)
+
+    def leeg(self):
+        self._cellen.clear()
+        self._markers.clear()
+
+# Voegt een marker toe. Met een bestaande sleutel wordt de oude marker eerst weggehaald.
+
+    def voeg_toe(self, sleutel, x, y, r, soort, waarde=None):
+        if sleutel in self._markers:
+            self.verwijder(sleutel)
+        marker = (sleutel, float(x), float(y), float(r), soort, waarde)
+        self._markers[sleutel] = marker
+        for cel in self._cellen_voor(x, y, r):
+            self._cellen.setdefault(cel, []).append(marker)
+
+    def verwijder(self, sleutel):
+        marker = self._markers.pop(sleutel, None)
+        if marker is None:
+            return
+        _, x, y, r, _, _ = marker
+        for cel in self._cellen_voor(x, y, r):
+            inhoud = self._cellen.get(cel)
+            if inhoud is None:
+                continue
+            inhoud.remove(marker)
+            if not inhoud:
+                del self._cellen[cel]
+
+# Geeft de marker onder het punt (x, y) terug als (sleutel, soort, waarde), of None.
+# Bij meerdere treffers wint eerst de soort met de hoogste prioriteit en daarna de dichtstbijzijnde.
+
+    def zoek(self, x, y):
+        beste = None
+        beste_score = None
+        for (sleutel, mx, my, r, soort, waarde) in self._cellen.get(self._cel_van(x, y), ()):
+            dx = x - mx
+            dy = y - my
+            afstand = dx * dx + dy * dy
+            if afstand > r * r:
+                continue
+            score = (PRIORITEIT.get(soort, len(PRIORITEIT)), afstand)
+            if beste_score is None or score < beste_score:
+                beste_score = score
+                beste = (sleutel, soort, waarde)
+        return beste
+
+    def _cel_van(self, x, y):
+        return (math.floor(x / self._cel), math.floor(y / self._cel))
+
+    def _cellen_voor(self, x, y, r):
+        x0, y0 = self._cel_van(x - r, y - r)
+        x1, y1 = self._cel_van(x + r, y + r)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield (cx, cy)
@@ -1,4 +1,68 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QTableWidget, QTableWidgetItem,
+                             QHeaderView, QSizePolicy)
+from PyQt6.QtCore import Qt, QTimer, QRectF
+from PyQt6.QtGui import QPainter, QColor
+
+from .thema import stijl
+
+# Hoe vaak het dashboard ververst terwijl het zichtbaar is, en hoeveel routes de tabel toont
+
+VERVERS_MS = 10_000
+MAX_ROUTES = 15
+
+BALK_KLEUR = QColor("#0069d9")
+TEKST_KLEUR = QColor("#333")
+
+
+def _getal(waarde, formaat="{:.2f}"):
+    return "-" if waarde is None else formaat.format(waarde)
+
+
+# Klasse : UurGrafiek
+# Staafjes met het aantal ratings per uur (oudste links), met het gemiddelde erboven
+
+class UurGrafiek(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._uren = []
+        self.setMinimumHeight(160)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
+
+    def zet_uren(self, uren):
+        self._uren = uren
+        self.update()
+
+    def paintEvent(self, event):
+        if not self._uren:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        font = painter.font()
+        font.setPointSize(7)
+        painter.setFont(font)
+
+        tekst_hoogte = 14
+        hoogte = self.height() - 2 * tekst_hoogte
+        breedte = self.width() / len(self._uren)
+        hoogste = max(1, max(verdeling.aantal for _uur, verdeling in self._uren))
+        for i, (uur, verdeling) in enumerate(self._uren):
+            x = i * breedte
+            balk = hoogte * verdeling.aantal / hoogste
+            painter.fillRect(QRectF(x + 2, tekst_hoogte + hoogte - balk, breedte - 4, balk), BALK_KLEUR)
+            painter.setPen(TEKST_KLEUR)
+            if verdeling.aantal:
+                painter.drawText(QRectF(x, tekst_hoogte + hoogte - balk - tekst_hoogte, breedte, tekst_hoogte),
+                                 Qt.AlignmentFlag.AlignCenter, f"{verdeling.gemiddelde():.1f}")
+            if i % 3 == 0:
+                painter.drawText(QRectF(x, self.height() - tekst_hoogte, breedte * 3, tekst_hoogte),
+                                 Qt.AlignmentFlag.AlignLeft, uur[-5:])
+        painter.end()
+
+
+# Klasse : Scherm1
+# Dashboard voor het personeel met de feedback (ratings) van de gasten: het totaal, de laatste 24 uur per uur
+# en per route. Alles komt uit de rollups (database/feedback.py), dus verversen kost even veel, hoe groot
+# de Feedback tabel ook wordt. Het ophalen gebeurt in een achtergrondtaak en alleen als het scherm zichtbaar is.
 
 class Scherm1(QWidget):
     def __init__(self, main_window):
@@ -6,6 +70,74 @@ class Scherm1(QWidget):
         self.main_window = main_window
         layout = QVBoxLayout()
 
-        layout.addWidget(QLabel("Dit is scherm 1"))
+        top_row = QHBoxLayout()
+        self.btn_terug = QPushButton("Terug")
+        self.btn_terug.setFixedSize(120, 40)
+        stijl(self.btn_terug, "primair", "klein")
+        self.btn_terug.clicked.connect(lambda: self.main_window.toon_pagina(self.main_window.startscherm))
+        top_row.addWidget(self.btn_terug)
+        top_row.addWidget(QLabel("<b>Feedback van de gasten</b>"))
+        top_row.addStretch(1)
+        layout.addLayout(top_row)
+
+        self.samenvatting = QLabel("Feedback wordt opgehaald")
+        layout.addWidget(self.samenvatting)
+
+        layout.addWidget(QLabel("Laatste 24 uur (UTC): aantal ratings per uur en het gemiddelde"))
+        self.grafiek = UurGrafiek()
+        layout.addWidget(self.grafiek)
+
+        self.tabel = QTableWidget(0, 6)
+        self.tabel.setHorizontalHeaderLabels(["Van", "Naar", "Aantal", "Gemiddelde", "Mediaan", "P10"])
+        self.tabel.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.tabel.verticalHeader().setVisible(False)
+        self.tabel.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.tabel, 1)
 
         self.setLayout(layout)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(VERVERS_MS)
+        self._timer.timeout.connect(self.ververs)
+
+    def showEvent(self, event):
+        self.ververs()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        taken = getattr(self.main_window, 'taken', None)
+        if taken is not None:
+            taken.annuleer(self)
+        super().hideEvent(event)
+
+# Zonder database is er geen feedback; anders halen we het dashboard op de achtergrond op
+
+    def ververs(self):
+        gegevens = getattr(self.main_window, 'gegevens', None)
+        if gegevens is None:
+            self.samenvatting.setText("Geen database: er is nog geen feedback")
+            return
+        taken = getattr(self.main_window, 'taken', None)
+        if taken is None:
+            self.toon(gegevens.feedback.dashboard())
+            return
+        taken.start("feedback_dashboard", gegevens.feedback.dashboard, eigenaar=self, klaar=self.toon,
+                    fout=lambda _fout: self.samenvatting.setText("Feedback kon niet worden opgehaald"))
+
+    def toon(self, dashboard):
+        totaal = dashboard["totaal"]
+        self.samenvatting.setText(
+            f"{totaal.aantal} ratings   gemiddelde {_getal(totaal.gemiddelde())}   "
+            f"mediaan {_getal(totaal.kwantiel(0.5), '{}')}   P10 {_getal(totaal.kwantiel(0.1), '{}')}"
+        )
+        self.grafiek.zet_uren(dashboard["uren"])
+
+        routes = dashboard["routes"][:MAX_ROUTES]
+        self.tabel.setRowCount(len(routes))
+        for rij, ((van, naar), verdeling) in enumerate(routes):
+            waarden = (van, naar, str(verdeling.aantal), _getal(verdeling.gemiddelde()),
+                       _getal(verdeling.kwantiel(0.5), "{}"), _getal(verdeling.kwantiel(0.1), "{}"))
+            for kolom, waarde in enumerate(waarden):
+                self.tabel.setItem(rij, kolom, QTableWidgetItem(waarde))
@@ -4,10 +4,43 @@
 # Hier worden de benodigde klassen uit PyQt6 geïmporteerd
 # We importeren hier ook "import random" omdat we willekeurige posities willen genereren voor de locatie van de trein
 
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QHBoxLayout
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QPainter, QBrush, QColor
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QHBoxLayout, QToolTip
+from PyQt6.QtCore import Qt, pyqtSignal, QPoint, QRect, QRectF, QPointF, QTimer
+from PyQt6.QtGui import QPainter, QBrush, QColor, QPixmap, QStaticText, QPen, QPolygon, QRegion, QFontMetricsF
+import numpy as np
 import random
+import time
+
+from live.beweging import Beweging
+from live.historie import Spoor
+from live.metrieken import METRIEKEN, gemeten
+from live.telemetrie import frame_naar_info, telemetrie_uit_omgeving
+from live.vloot import Vloot
+from database.snapshot import SnapshotSync
+from planning.reserveringen import ReserveringsAllocator
+from planning.routegraaf import maak_ringlijn
+from .kaartmodel import KaartModel
+from .kaarttegels import (LOD_DICHTHEID, MAX_NIVEAU, NIVEAU_CACHE, TEGEL, TEGEL_BUDGET_MS, TEGEL_CACHE, LRUCache,
+                          labels_zonder_overlap, schaal_van, tegels_voor)
+from .ruimtelijke_index import RasterIndex
+from .thema import stijl
+
+# Hoe vaak de treinstanden naar de lokale snapshot gaan
+
+SNAPSHOT_INTERVAL_MS = 10_000
+
+# Het spoor van een trein: een halfdoorzichtige lijn achter de treinen
+
+SPOOR_KLEUR = QColor(0, 140, 70, 170)
+SPOOR_DIKTE = 3
+
+# Verversfrequentie van de renderklok als het scherm die niet opgeeft
+
+STANDAARD_HZ = 60
+
+# Kleuren van de markers per soort (0 = attractie, 1 = perron)
+
+MARKER_KLEUREN = (QColor(200, 30, 30), QColor(50, 120, 220))
 
 # Klasse : Scherm 2
 # Deze klasse is het 2e scherm van de applicatie, waar de gebruiker een kaart ziet met daarop de locatie van een treintje. 
@@ -15,10 +48,15 @@ import random
 
 class Scherm2(QWidget):
     train_updated = pyqtSignal(dict, tuple)        # Info over de trein
+    _snapshot_bijgewerkt = pyqtSignal(dict)        # Nieuwe kaart uit de snapshot (vanuit de sync thread)
 
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
+
+# De stand van de kaart staat in het gedeelde KaartModel van het hoofdvenster (ook de vergrote kaart in Scherm4 tekent daaruit)
+
+        self.kaart = getattr(main_window, 'kaart', None) or KaartModel(parent=self)
         layout = QVBoxLayout()
 
 # Deze "terug" knop brengt je terug naar het startscherm
@@ -26,7 +64,7 @@ class Scherm2(QWidget):
         top_row = QHBoxLayout()
         self.btn_terug_top = QPushButton("Terug")
         self.btn_terug_top.setFixedSize(120, 40)
-        self.btn_terug_top.setStyleSheet("QPushButton{background-color: #28a745; color: white; border-radius: 20px; font-weight: 600;}")
+        stijl(self.btn_terug_top, "primair", "klein")
 
 # Hier kan je dmv een klik terug naar het startscherm
 
@@ -41,7 +79,7 @@ class Scherm2(QWidget):
 
         self.map_container = QHBoxLayout()
         self.map_container.addStretch(1)
-        self.map_widget = MapWidget()
+        self.map_widget = MapWidget(self.kaart)
         self.map_container.addWidget(self.map_widget)
         self.map_container.addStretch(1)
         layout.addLayout(self.map_container)
@@ -53,7 +91,6 @@ class Scherm2(QWidget):
             (0.8, 0.25, "Ferris Wheel"),
             (0.5, 0.7, "Haunted House"),
         ]
-        self.map_widget.set_attractions(self.attractions)
 
 # Perrons: punten op de kaart.
 
@@ -62,10 +99,22 @@ class Scherm2(QWidget):
             (0.88, 0.86, "Perron 2"),
         ]
 
-# Hier maken we een dict aan om reserveringen bij te houden voor elk perron.
+# Als er een snapshot (MainWindow.snapshot) of database (MainWindow.gegevens) is halen we attracties,
+# perrons en capaciteit daaruit op. trein_id is de trein die we op dit scherm volgen.
 
-        self.map_widget.set_platforms(self.platforms)
-        self.reservations = {label: 0 for (_, _, label) in self.platforms}
+        self.trein_id = 1
+        self.totaal_plekken = 20
+        self.wachttijden = {}
+        self.snapshot_sync = None
+        self.routegraaf = None
+        self.allocator = None
+        self.reservations = {}
+        standen = self._laad_uit_database()
+
+# Spoormodel langs alle haltes met een vooraf berekende ETA-tabel,
+# reserveringen per spoorsegment (alleen met een database, anders blijft de demo in self.reservations)
+
+        self._bouw_route()
 
         layout.addSpacing(12)
 
@@ -79,9 +128,7 @@ class Scherm2(QWidget):
         btn_ververs = QPushButton("Volg de trein")
         btn_ververs.setFixedSize(200, 50)
         btn_ververs.clicked.connect(self.ververs_locatie)    # Hier wordt de klikactie gekoppeld aan de functie ververs_locatie
-        btn_ververs.setStyleSheet(
-            "QPushButton{background-color: #28a745; color: white; border-radius: 25px; font-weight: 600;}"
-        )
+        stijl(btn_ververs, "primair", "groot")
         middle_row.addWidget(btn_ververs)
 
         middle_row.addSpacing(12)
@@ -91,7 +138,7 @@ class Scherm2(QWidget):
         self.vergroot_btn = QPushButton("Vergroot")
         self.vergroot_btn.setFixedSize(200, 50)
         self.vergroot_btn.clicked.connect(self.open_scherm4) # Hier wordt de klikactie gekoppeld aan de functie open_scherm4
-        self.vergroot_btn.setStyleSheet("QPushButton{background-color: #0069d9; color: white; border-radius: 25px;}" )
+        stijl(self.vergroot_btn, "secundair", "groot")
         middle_row.addWidget(self.vergroot_btn)
 
         middle_row.addStretch(1)
@@ -106,27 +153,175 @@ class Scherm2(QWidget):
         btn_reserveer = QPushButton("Reserveer")
         btn_reserveer.setFixedSize(200, 50)
         btn_reserveer.clicked.connect(self.open_scherm3)    # Hier wordt de klikactie gekoppeld aan de functie open_scherm3 
-        btn_reserveer.setStyleSheet(
-            "QPushButton{background-color: #28a745; color: white; border-radius: 25px; font-weight: 600;}"
-        )
+        stijl(btn_reserveer, "primair", "groot")
         lower_row.addWidget(btn_reserveer)
         lower_row.addStretch(1)
         layout.addLayout(lower_row)
 
         self.setLayout(layout)
 
+# De vloot op de kaart: rij 0 is de trein die we volgen (trein_id), andere treinen uit de telemetrie komen erbij
+
+        self.vloot = Vloot()
+        self.vloot.voeg_toe(self.trein_id)
+        self.kaart.zet_vloot(self.vloot)
+
 # start locatie van de trein 
 
         self.current_pos = (0.5, 0.5)
-        self.map_widget.set_dot_normalized(*self.current_pos)
         
 #informatie over de trein
 
-        self.train_info = {"seats_available": 20, "total_seats": 20, "arrival_minutes": 0}
+        self.train_info = {"seats_available": self.totaal_plekken, "total_seats": self.totaal_plekken, "arrival_minutes": 0}
+
+# Live telemetrie (optioneel, via LSM_TELEMETRIE=host:poort): een achtergrondthread leest de frames,
+# wij krijgen per batch de laatste stand per trein. Zonder telemetrie beweegt de trein gesimuleerd (ververs_locatie).
+
+        self.telemetrie = telemetrie_uit_omgeving(parent=self)
+        if self.telemetrie is not None:
+            self.telemetrie.treinen_bijgewerkt.connect(self.verwerk_telemetrie)
+            self.telemetrie.start()
+
+# De laatst bekende treinstanden uit de snapshot terugzetten, daarna de sync starten
+# en de standen elke SNAPSHOT_INTERVAL_MS bewaren
+
+        self._herstel_treinstanden(standen)
+        if self.snapshot_sync is not None:
+            self._snapshot_bijgewerkt.connect(self._pas_kaart_toe)
+            self.snapshot_sync.start()
+            self._snapshot_timer = QTimer(self)
+            self._snapshot_timer.setInterval(SNAPSHOT_INTERVAL_MS)
+            self._snapshot_timer.timeout.connect(self.bewaar_treinstanden)
+            self._snapshot_timer.start()
+
+# attractions, platforms, current_pos en train_info lezen en schrijven direct in het kaartmodel
+
+    @property
+    def attractions(self):
+        return self.kaart.attracties
+
+    @attractions.setter
+    def attractions(self, attracties):
+        self.kaart.zet_attracties(attracties)
+
+    @property
+    def platforms(self):
+        return self.kaart.perrons
+
+    @platforms.setter
+    def platforms(self, perrons):
+        self.kaart.zet_perrons(perrons)
+
+    @property
+    def current_pos(self):
+        return self.kaart.positie
+
+    @current_pos.setter
+    def current_pos(self, pos):
+        self.kaart.zet_positie(*pos)
+
+    @property
+    def train_info(self):
+        return self.kaart.trein_info
+
+    @train_info.setter
+    def train_info(self, info):
+        self.kaart.zet_info(info)
 
     def get_train_info(self):
         return getattr(self, 'train_info', {"seats_available": 0, "total_seats": 20, "arrival_minutes": 0})
 
+# Haalt de kaart op: eerst uit de snapshot (milliseconden), anders in één keer uit de database.
+# Met een snapshot wordt de database daarna alleen op de achtergrond gelezen (SnapshotSync).
+# Lukt het allebei niet, dan blijven de demo-waarden staan.
+# Geeft de laatst bekende treinstanden uit de snapshot terug (die worden pas hersteld als de vloot er is).
+
+    def _laad_uit_database(self):
+        gegevens = getattr(self.main_window, 'gegevens', None)
+        snapshot = getattr(self.main_window, 'snapshot', None)
+        kaart = None
+        standen = ()
+        if snapshot is not None:
+            try:
+                kaart = snapshot.laad()
+                standen = kaart["treinstanden"]
+            except Exception:
+                kaart = None
+            if kaart is not None and kaart["laatste_sync"] is None:
+                kaart = None
+            self.snapshot_sync = SnapshotSync(snapshot, gegevens, bij_wijziging=self._snapshot_bijgewerkt.emit)
+        if kaart is None and gegevens is not None:
+            try:
+                kaart = gegevens.laad_kaart()
+            except Exception:
+                kaart = None
+        if kaart is not None:
+            self._pas_kaart_toe(kaart)
+        return standen
+
+# Zet een kaart (uit de database of de snapshot) op het scherm. Verandert de indeling na het opstarten,
+# dan bouwen we het spoormodel opnieuw op.
+
+    def _pas_kaart_toe(self, kaart):
+        indeling = (self.attractions, self.platforms)
+        if kaart["attracties"]:
+            self.attractions = kaart["attracties"]
+        if kaart["perrons"]:
+            self.platforms = kaart["perrons"]
+        self.wachttijden = kaart["wachttijden"]
+        for trein in kaart["treinen"]:
+            if trein["trein_id"] == self.trein_id:
+                self.totaal_plekken = trein["max_capaciteit"]
+        if self.routegraaf is not None and indeling != (self.attractions, self.platforms):
+            self._bouw_route()
+
+    def _bouw_route(self):
+        self.routegraaf = maak_ringlijn(self.attractions + self.platforms)
+        self.allocator = None
+        gegevens = getattr(self.main_window, 'gegevens', None)
+        if gegevens is not None:
+            self.allocator = ReserveringsAllocator(gegevens.pool, self.routegraaf.namen, capaciteit=lambda _trein_id: self.totaal_plekken)
+
+# Hier maken we een dict aan om reserveringen bij te houden voor elk perron.
+
+        self.reservations = {label: self.reservations.get(label, 0) for (_, _, label) in self.platforms}
+
+# Standen uit de snapshot: de gevolgde trein via current_pos/train_info, de rest in één keer in de vloot
+
+    def _herstel_treinstanden(self, standen):
+        rijen = []
+        for stand in standen:
+            if stand["trein_id"] == self.trein_id:
+                self.current_pos = (stand["x"], stand["y"])
+                self.train_info = {
+                    "seats_available": stand["plekken"],
+                    "total_seats": stand["totaal"],
+                    "arrival_minutes": int(round(stand["aankomst"])),
+                }
+                continue
+            rij = self.vloot.rij_van(stand["trein_id"])
+            if rij is None:
+                rij = self.vloot.voeg_toe(stand["trein_id"], stand["x"], stand["y"], stand["plekken"], stand["totaal"], stand["aankomst"])
+            rijen.append(rij)
+        if rijen:
+            self.kaart.treinen_bijgewerkt(rijen)
+
+# Geeft de huidige stand van de vloot door aan de snapshot (de sync thread schrijft hem weg)
+
+    def bewaar_treinstanden(self):
+        if self.snapshot_sync is None or not len(self.vloot):
+            return
+        self.snapshot_sync.bewaar_treinstanden([
+            {"trein_id": int(trein_id), "x": float(x), "y": float(y), "plekken": int(plekken), "totaal": int(totaal), "aankomst": float(aankomst)}
+            for trein_id, (x, y), plekken, totaal, aankomst
+            in zip(self.vloot.ids, self.vloot.posities, self.vloot.plekken, self.vloot.totaal, self.vloot.aankomst)
+        ])
+
+    def stop_snapshot(self):
+        if self.snapshot_sync is not None:
+            self.bewaar_treinstanden()
+            self.snapshot_sync.stop()
+
     def resizeEvent(self, event):
         try:
             h = max(220, int(self.main_window.size().height() * 0.55))
@@ -139,47 +334,91 @@ class Scherm2(QWidget):
     def position_vergroot_button(self):
         return
 
-# Hier verversen we de locatie van de trein op de kaart met willekeurige coördinaten
-
-    def ververs_locatie(self):
-        x = random.random()
-        y = random.random()
-        self.current_pos = (x, y)
-        self.map_widget.set_dot_normalized(x, y)
-
-# Hier genereren we willekeurige info over de trein
-
-        seats = random.randint(0, 20)
-        minutes = random.randint(1, 12)
-        dest_label = None
-        reservations_for_dest = 0
+# Verwerkt een batch telemetrie (op de GUI thread). De andere treinen gaan in één keer in de vloot,
+# voor de gevolgde trein werken we current_pos en train_info bij en sturen we train_updated uit.
+
+    def verwerk_telemetrie(self, updates: dict):
+        gevolgd = None
+        rijen = []
+        posities = []
+        plekken = []
+        totaal = []
+        aankomst = []
+        for trein_id, frame in updates.items():
+            info, pos = frame_naar_info(frame)
+            if trein_id == self.trein_id:
+                gevolgd = (info, pos)
+                continue
+            rij = self.vloot.rij_van(trein_id)
+            if rij is None:
+                rij = self.vloot.voeg_toe(trein_id)
+            rijen.append(rij)
+            posities.append(pos)
+            plekken.append(info["seats_available"])
+            totaal.append(info["total_seats"])
+            aankomst.append(info["arrival_minutes"])
+
+        if rijen:
+            self.vloot.zet_posities(posities, rijen)
+            self.vloot.zet_bezetting(rijen, plekken=plekken, totaal=totaal, aankomst=aankomst)
+            self.kaart.treinen_bijgewerkt(rijen)
+
+        if gevolgd is not None:
+            info, pos = gevolgd
+            self.current_pos = pos
+            self.train_info = {**self.train_info, **info}
+            self.train_updated.emit(self.train_info, self.current_pos)
 
-# Hier kiezen we een willekeurige bestemming en bepalen we het aantal reserveringen
+# Als er live telemetrie binnenkomt volgen we die en sturen we alleen de laatste stand opnieuw uit.
+# Zonder telemetrie verversen we de locatie van de trein op de kaart met willekeurige coördinaten.
+# De database en de allocator kunnen traag zijn, daarom bepalen we de nieuwe stand in een achtergrondtaak.
+# Klikt iemand nog een keer terwijl die loopt, dan wordt dat dezelfde taak (en één verversing).
 
+    def ververs_locatie(self):
+        if self.telemetrie is not None and self.telemetrie.verbonden:
+            self.train_updated.emit(self.train_info, self.current_pos)
+            return
+
+        vraag = self._stand_vraag()
+        taken = getattr(self.main_window, 'taken', None)
+        if taken is None:
+            self._zet_stand(nieuwe_stand(vraag))
+            return
+        taken.start(("trein_stand", self.trein_id), nieuwe_stand, vraag, eigenaar=self, klaar=self._zet_stand)
+
+# Op de GUI thread: een willekeurige nieuwe plek en bestemming, en alles wat nieuwe_stand daarbij nodig heeft
+# als gewone waarden (de werker leest niets van het scherm). De ETA is één opzoeking in de tabel, die doen we hier.
+
+    def _stand_vraag(self):
+        pos = (random.random(), random.random())
+        vraag = {
+            "trein_id": self.trein_id,
+            "pos": pos,
+            "totaal": self.totaal_plekken,
+            "bestemming": None,
+            "van": None,
+            "eta": None,
+            "gegevens": getattr(self.main_window, 'gegevens', None),
+            "allocator": self.allocator,
+        }
         try:
-            if self.platforms :
-                dest_label = random.choice(self.platforms)[2]
-                proposed = random.randint(0, 15)
-                onboard = 20 - seats
-                max_allowed_reservations = max(0, 20 - onboard)
-                reservations_for_dest = min(proposed, max_allowed_reservations)
-                self.reservations[dest_label] = reservations_for_dest
+            if self.platforms:
+                bestemming = vraag["bestemming"] = random.choice(self.platforms)[2]
+                if self.routegraaf is not None and bestemming in self.routegraaf:
+                    van = vraag["van"] = self.routegraaf.dichtstbijzijnde(*pos)
+                    vraag["eta"] = int(round(self.routegraaf.eta(van, bestemming)))
         except Exception:
-            dest_label = None
+            vraag["bestemming"] = None
+        return vraag
 
-# Update de trein info en kaartweergave
+# Update de trein info en kaartweergave (op de GUI thread)
 
-        self.train_info = {
-            "seats_available": seats,
-            "total_seats": 20,
-            "arrival_minutes": minutes,
-            "destination": dest_label,
-            "reservations_for_destination": reservations_for_dest,
-        }
-        try:
-            self.map_widget.set_train_info(self.train_info)
-        except Exception:
-            pass
+    def _zet_stand(self, stand):
+        pos, info = stand
+        self.current_pos = pos
+        if info["destination"] is not None:
+            self.reservations[info["destination"]] = info["reservations_for_destination"]
+        self.train_info = info
         try:
             self.train_updated.emit(self.train_info, self.current_pos)
         except Exception:
@@ -203,130 +442,790 @@ class Scherm2(QWidget):
             except Exception:
                 pass
 
+# Nieuwe stand van de gevolgde trein uit een vraag van Scherm2._stand_vraag (op een werker thread).
+# Alleen de database en de allocator worden hier gelezen; zonder database blijft het bij willekeurige waarden.
+
+def nieuwe_stand(vraag):
+    totaal = vraag["totaal"]
+    seats = random.randint(0, totaal)
+    gegevens = vraag["gegevens"]
+    if gegevens is not None:
+        try:
+            seats, totaal = gegevens.bezetting.plekken_beschikbaar(vraag["trein_id"])
+        except Exception:
+            pass
+    minutes = vraag["eta"] if vraag["eta"] is not None else random.randint(1, 12)
+    bestemming = vraag["bestemming"]
+    reservations_for_dest = 0
+
+# Het aantal reserveringen voor de bestemming: uit de allocator, anders een willekeurig aantal dat nog past
+
+    if bestemming is not None:
+        onboard = totaal - seats
+        reservations_for_dest = min(random.randint(0, 15), max(0, totaal - onboard))
+        allocator, van = vraag["allocator"], vraag["van"]
+        if allocator is not None and van is not None and van != bestemming:
+            try:
+                reservations_for_dest = totaal - allocator.vrij(vraag["trein_id"], van, bestemming)
+            except Exception:
+                pass
+
+    info = {
+        "seats_available": seats,
+        "total_seats": totaal,
+        "arrival_minutes": minutes,
+        "destination": bestemming,
+        "reservations_for_destination": reservations_for_dest,
+    }
+    return vraag["pos"], info
+
+
 # Klasse : interactieve MapWidget
 # Deze klasse tekent een kaart met de trein, attracties en perrons.
 # De kaart reageert op muisklikken om informatie over de trein of attracties te tonen.
+# Alles wat niet beweegt (achtergrond, raster, attracties, perrons en labels) wordt één keer
+# in een statische laag (QPixmap) getekend. Als de trein beweegt tekenen we alleen het stukje
+# van de kaart opnieuw waar de trein was en waar hij nu is.
+# Voor klikken en tooltips gebruiken we een RasterIndex die alleen opnieuw wordt opgebouwd als de indeling verandert.
+# De stand (attracties, perrons, vloot en train_info) staat in een KaartModel dat door meerdere kaarten gedeeld
+# kan worden. De kaart krijgt een melding met wat er veranderd is en tekent alleen dat stuk opnieuw.
+# De treinen staan in een Vloot (NumPy arrays). Rij 0 is de trein van set_dot_normalized / set_train_info,
+# met set_vloot kan een hele vloot worden getoond die in één keer wordt getekend.
+# Met set_spoor tekent de kaart waar een trein geweest is (uit de historie van het model, één drawPolyline),
+# met set_terugspeeltijd toont hij de treinen zoals ze op dat moment stonden in plaats van de live stand.
+# Een nieuwe positie laat de trein niet meer verspringen: de renderklok loopt op de verversfrequentie van
+# het scherm en schuift de treinen (Beweging) naar hun nieuwe plek, elke tik alleen waar een trein beweegt.
+# De klok staat stil als er niets beweegt, de kaart verborgen is of na pauzeer_klok.
+# Een zoombare kaart (Scherm4) kan in- en uitzoomen (wiel, zoom) en verschuiven (slepen, verschuif).
+# Alles wat op de kaart staat heeft dan een positie in pixels van de hele kaart op dat zoomniveau;
+# op het scherm is dat die positie min de verschuiving. De attracties en perrons komen uit tegels (kaarttegels.py).
 
 class MapWidget(QWidget):
     train_clicked = pyqtSignal(dict)
     attraction_clicked = pyqtSignal(str)
+    platform_clicked = pyqtSignal(str)
 
-    def __init__(self, parent=None):
+    def __init__(self, model=None, parent=None, zoombaar=False):
         super().__init__(parent)
-        self._dot = (0.5, 0.5)
         self.setMinimumSize(220, 220)
-        self._train_info = {"seats_available": 20, "total_seats": 20, "arrival_minutes": 0}
-
-# hier wordt de positie van de trein ingesteld / geupdate
+        self._last_attraction_positions = []
+        self._last_platform_positions = []
+        self._statische_laag = None
+        self._labels = {}
+        self._index = None
+        self._hover = None
+        self._getekend = None
+        self._te_tekenen = None
+        self._spoor = None
+        self._spoor_staart = None
+        self._spoor_sleutel = None
+        self._spoor_laag = None
+        self._spoor_laag_sleutel = None
+        self._terugspeeltijd = None
+        self.setMouseTracking(True)
+
+        self._zoombaar = zoombaar
+        self._niveau = 0
+        self._verschuiving = (0, 0)
+        self._pannen = None
+        self._onaf = None
+        self._markers = None
+        self._label_breedtes = {}
+        self._niveaus = LRUCache(NIVEAU_CACHE)
+        self._tegels = LRUCache(TEGEL_CACHE)
+
+        self._beweging = Beweging()
+        self._klok_gepauzeerd = False
+        self._frame_s = 1.0 / STANDAARD_HZ
+        self._klok = QTimer(self)
+        self._klok.setTimerType(Qt.TimerType.PreciseTimer)
+        self._klok.timeout.connect(self._tik)
+
+# De kaart tekent uit een KaartModel. Zonder model (bijvoorbeeld in een benchmark) maakt hij er zelf een.
+
+        self._model = None
+        self.set_model(model if model is not None else KaartModel(parent=self))
+
+# De statische laag bedekt altijd de hele widget, Qt hoeft de achtergrond dus niet eerst te wissen
+
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+# Optionele overlay met FPS en p99 frametijd van de laatste halve seconde (LSM_METRIEKEN_OVERLAY=1)
+
+        self._overlay_tekst = None
+        if METRIEKEN.overlay:
+            self._overlay_tekst = ""
+            self._frames = 0
+            self._overlay_emmers = list(METRIEKEN.histogram("paint").emmers)
+            self._overlay_tijd = time.perf_counter()
+            self._overlay_timer = QTimer(self)
+            self._overlay_timer.timeout.connect(self._ververs_overlay)
+            self._overlay_timer.start(500)
+
+    @property
+    def model(self):
+        return self._model
+
+    def set_model(self, model):
+        if self._model is not None:
+            self._model.gewijzigd.disconnect(self._model_gewijzigd)
+        self._model = model
+        self._versie = model.versie
+        self._gezien = dict(model.versies)
+        model.gewijzigd.connect(self._model_gewijzigd)
+        self._getekend = None
+        self._spring()
+        if self._spoor is not None:
+            self.set_spoor(self._spoor.trein_id)
+        self._invalideer_laag()
+
+# Alles wat de kaart tekent komt uit het model
+
+    @property
+    def _vloot(self):
+        return self._model.vloot
+
+    @property
+    def _train_info(self):
+        return self._model.trein_info
+
+    @property
+    def _attractions(self):
+        return self._model.attracties
+
+    @property
+    def _platforms(self):
+        return self._model.perrons
+
+# De oude setters blijven bestaan, maar schrijven nu in het (gedeelde) model
 
     def set_dot_normalized(self, x, y):
-        x = min(max(0.0, float(x)), 1.0)
-        y = min(max(0.0, float(y)), 1.0)
-        self._dot = (x, y)
-        self.update()
+        self._model.zet_positie(x, y)
+
+    def set_vloot(self, vloot):
+        self._model.zet_vloot(vloot)
+
+    def vloot_bijgewerkt(self):
+        self._model.treinen_bijgewerkt()
 
     def set_attractions(self, attractions):
-        self._attractions = attractions
+        self._model.zet_attracties(attractions)
+
+    def set_train_info(self, info: dict):
+        self._model.zet_info(info)
+
+    def set_platforms(self, platforms):
+        self._model.zet_perrons(platforms)
+
+# Spoor van één trein tonen (trein_id), of uitzetten (None)
+
+    def set_spoor(self, trein_id):
+        self._spoor = None if trein_id is None else Spoor(self._model.historie, trein_id)
+        self._spoor_staart = None
+        self._spoor_sleutel = None
+        self._spoor_laag = None
+        self._spoor_laag_sleutel = None
         self.update()
 
-# hier wordt de info van de trein geupdate
+# Terugspelen: de treinen en het spoor zoals ze op tijdstip tijd waren. None gaat terug naar de live stand.
 
-    def set_train_info(self, info: dict):
-        self._train_info = dict(info) if info is not None else {}
+    def set_terugspeeltijd(self, tijd):
+        self._terugspeeltijd = tijd
+        self._getekend = None
+        self._klok.stop()
+        self._spring()
         self.update()
 
-    def set_platforms(self, platforms):
-        self._platforms = platforms
+    @property
+    def terugspeeltijd(self):
+        return self._terugspeeltijd
+
+# Zoomen met stappen van ZOOM_STAP rond het punt anker (in widgetpixels, standaard het midden): wat onder
+# het anker ligt blijft daar liggen. Verschuiven beweegt de kaart mee met de vinger of muis.
+
+    @property
+    def niveau(self):
+        return self._niveau
+
+    def zoom(self, stappen, anker=None):
+        if anker is None:
+            anker = (self.width() / 2, self.height() / 2)
+        niveau = min(max(self._niveau + int(stappen), 0), MAX_NIVEAU if self._zoombaar else 0)
+        factor = schaal_van(niveau) / schaal_van(self._niveau)
+        ox, oy = self._verschuiving
+        self._zet_weergave(niveau, ((ox + anker[0]) * factor - anker[0], (oy + anker[1]) * factor - anker[1]))
+
+    def verschuif(self, dx, dy):
+        ox, oy = self._verschuiving
+        self._zet_weergave(self._niveau, (ox - dx, oy - dy))
+
+    def passend(self):
+        self._zet_weergave(0, (0, 0))
+
+# De verschuiving blijft binnen de kaart. Een ander niveau betekent andere posities voor de index;
+# de tegels per niveau blijven in hun cache.
+
+    def _zet_weergave(self, niveau, verschuiving):
+        w, h = self._kaartgrootte(niveau)
+        ox = min(max(int(round(verschuiving[0])), 0), max(0, int(w) - self.width()))
+        oy = min(max(int(round(verschuiving[1])), 0), max(0, int(h) - self.height()))
+        if niveau == self._niveau and (ox, oy) == self._verschuiving:
+            return
+        if niveau != self._niveau:
+            self._index = None
+            QTimer.singleShot(0, self._bereid_buren_voor)
+        self._niveau = niveau
+        self._verschuiving = (ox, oy)
+        self._getekend = None
+        self._te_tekenen = None
         self.update()
 
-# Tekent de achtergrond, kaart, de trein, attracties en perrons.
+    def _kaartgrootte(self, niveau=None):
+        schaal = schaal_van(self._niveau if niveau is None else niveau)
+        return self.width() * schaal, self.height() * schaal
+
+# Genormaliseerde posities (n, 2) naar widgetpixels
+
+    def _naar_scherm(self, xy):
+        return (xy * self._kaartgrootte() - self._verschuiving).astype(np.int32)
+
+# Melding van het model. Een verborgen kaart doet niets: bij het tonen kijkt hij welke delen een nieuwere versie hebben.
+
+    def _model_gewijzigd(self, versie, wijzigingen):
+        if versie <= self._versie or not self.isVisible():
+            return
+        self._verwerk(wijzigingen)
+
+    def showEvent(self, event):
+        self._frame_s = self._frame_duur()
+        self._spring()
+        if self._model.versie != self._versie:
+            veranderd = {deel: None for deel, v in self._model.versies.items() if v != self._gezien.get(deel)}
+            self._verwerk(veranderd)
+        super().showEvent(event)
+
+# Een nieuwe indeling betekent een nieuwe statische laag; nieuwe posities van treinen worden het doel van hun
+# beweging en de renderklok tekent ze onderweg. De beweging begint één frame terug, zodat de eerste stap
+# meteen te zien is en niet pas bij de volgende tik.
+# De info van de trein wordt niet getekend, daarvoor hoeft er niets opnieuw.
+
+    def _verwerk(self, wijzigingen):
+        self._model.afgeleverd(self._versie, self._model.versie)
+        self._versie = self._model.versie
+        self._gezien = dict(self._model.versies)
+        if "indeling" in wijzigingen:
+            self._invalideer_laag()
+        elif "treinen" in wijzigingen and self._terugspeeltijd is None:
+            if not self._klok_gepauzeerd:
+                self._beweging.zet(self._vloot.posities, time.perf_counter() - self._frame_s, wijzigingen["treinen"])
+            if self._spoor is not None:
+                self.update(self._spoor_regio())
+            self._tik()
+
+# Renderklok: pauzeer_klok (bij het verbergen) zet de klok stil, nieuwe posities worden dan weer meteen getekend.
+# hervat_klok zet de treinen op hun laatste plek, zonder de gemiste beweging in te halen.
+
+    def pauzeer_klok(self):
+        self._klok_gepauzeerd = True
+        self._klok.stop()
+
+    def hervat_klok(self):
+        self._klok_gepauzeerd = False
+        self._spring()
+        if self.isVisible() and self._terugspeeltijd is None:
+            self._tik()
+
+# Eén tik van de renderklok: waar staan de treinen nu, en alleen de rechthoeken van de treinen die een pixel
+# verschoven zijn opnieuw tekenen. De paint tekent precies deze posities (_te_tekenen), anders kan een trein
+# net buiten het opnieuw getekende gebied vallen. Zolang er nog iets beweegt loopt de klok door.
+
+    @gemeten("render_tik")
+    def _tik(self):
+        if self._terugspeeltijd is not None or not self.isVisible():
+            self._klok.stop()
+            return
+        nu = time.perf_counter()
+        pixels = self._te_tekenen = self._weergave(nu)
+        regio = self._treinen_regio(pixels)
+        if not regio.isEmpty():
+            self.update(regio)
+        if self._klok_gepauzeerd or not self._beweging.beweegt(nu):
+            self._klok.stop()
+        elif not self._klok.isActive():
+            self._klok.start(max(1, int(round(self._frame_s * 1000.0))))
+
+    def _spring(self):
+        self._beweging.spring(self._vloot.posities)
+        self._te_tekenen = None
+
+    def _weergave(self, nu):
+        if self._klok_gepauzeerd:
+            return self._naar_scherm(self._vloot.posities)
+        if len(self._beweging) != len(self._vloot):
+            self._beweging.spring(self._vloot.posities)
+        return self._naar_scherm(self._beweging.posities(nu))
+
+    def _frame_duur(self):
+        scherm = self.screen()
+        hz = scherm.refreshRate() if scherm is not None else 0
+        return 1.0 / (hz if hz > 0 else STANDAARD_HZ)
+
+# Het spoor verandert alleen als er een positie in de historie bijkomt. Blijft het vaste deel hetzelfde,
+# dan tekenen we alleen het gebied van de oude en de nieuwe staart opnieuw.
+
+    def _spoor_regio(self):
+        if self._spoor_sleutel == self._spoor_sleutel_nu():
+            return QRegion()
+        laag = self._spoor_laag_sleutel
+        oud = self._spoor_staart
+        nieuw = self._spoor_delen()
+        if oud is None or laag != self._spoor_laag_sleutel or not len(oud) or not len(nieuw):
+            return QRegion(self.rect())
+        marge = SPOOR_DIKTE + 2
+        x0, y0 = np.minimum(oud.min(axis=0), nieuw.min(axis=0)) - marge - self._verschuiving
+        x1, y1 = np.maximum(oud.max(axis=0), nieuw.max(axis=0)) + marge - self._verschuiving
+        return QRegion(QRect(QPoint(int(x0), int(y0)), QPoint(int(x1), int(y1))))
+
+    def _spoor_sleutel_nu(self):
+        return (self._model.historie.versie(self._spoor.trein_id), self._terugspeeltijd, self._weergave_sleutel())
+
+    def _weergave_sleutel(self):
+        return (self.width(), self.height(), self._niveau, self._verschuiving)
+
+# Het vaste deel van het spoor staat in een eigen (doorzichtige) laag die alleen opnieuw getekend wordt
+# als er een blok bijkomt of afvalt; de staart (hoogstens één blok, vereenvoudigd) tekenen we elke paint.
+# Bij het terugspelen loopt de staart door tot de geïnterpoleerde positie van de trein op dat moment.
+# Geeft de staart in pixels van de kaart terug. Op een verschoven kaart tekent de laag het vaste deel
+# opnieuw zodra de verschuiving verandert.
+
+    def _spoor_delen(self):
+        sleutel = self._spoor_sleutel_nu()
+        if sleutel == self._spoor_sleutel:
+            return self._spoor_staart
+        grootte = self._kaartgrootte()
+        laag_sleutel, vast, staart = self._spoor.delen(grootte, tot=self._terugspeeltijd)
+        if self._terugspeeltijd is not None and len(staart):
+            ids, xy = self._model.historie.posities_op(self._terugspeeltijd)
+            hier = xy[ids == self._spoor.trein_id]
+            if len(hier):
+                staart = np.concatenate([staart, hier * grootte])
+        laag_sleutel = (laag_sleutel, self._weergave_sleutel())
+        if laag_sleutel != self._spoor_laag_sleutel:
+            self._spoor_laag = self._teken_spoor_laag(vast)
+            self._spoor_laag_sleutel = laag_sleutel
+        self._spoor_staart = staart
+        self._spoor_sleutel = sleutel
+        return staart
+
+    def _teken_spoor_laag(self, punten):
+        if len(punten) < 2:
+            return None
+        dpr = self.devicePixelRatioF()
+        laag = QPixmap(max(1, int(self.width() * dpr)), max(1, int(self.height() * dpr)))
+        laag.setDevicePixelRatio(dpr)
+        laag.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(laag)
+        painter.translate(-self._verschuiving[0], -self._verschuiving[1])
+        self._teken_spoor(painter, punten)
+        painter.end()
+        return laag
+
+    @staticmethod
+    def _teken_spoor(painter, punten):
+        pen = QPen(SPOOR_KLEUR)
+        pen.setWidth(SPOOR_DIKTE)
+        pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        pen.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
+        painter.setPen(pen)
+        lijn = QPolygon()
+        lijn.setPoints(*punten.astype(np.int32).ravel().tolist())
+        painter.drawPolyline(lijn)
+
+# De treinen die op een andere pixel staan dan bij de vorige paint: tot 16 treinen elk hun oude en nieuwe
+# rechthoek, bij meer één rechthoek om alles heen
+
+    def _treinen_regio(self, nieuw):
+        oud = self._getekend
+        if oud is None or len(oud) != len(nieuw):
+            return QRegion(self.rect())
+        rijen = np.flatnonzero((oud != nieuw).any(axis=1))
+        radius = self._dot_radius() + 2
+        if len(rijen) <= 16:
+            regio = QRegion()
+            for rij in rijen:
+                for (px, py) in (oud[rij], nieuw[rij]):
+                    regio += QRect(int(px) - radius, int(py) - radius, radius * 2, radius * 2)
+            return regio
+        oud = oud[rijen]
+        nieuw = nieuw[rijen]
+        x0, y0 = np.minimum(oud.min(axis=0), nieuw.min(axis=0)) - radius
+        x1, y1 = np.maximum(oud.max(axis=0), nieuw.max(axis=0)) + radius
+        return QRegion(QRect(QPoint(int(x0), int(y0)), QPoint(int(x1), int(y1))))
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
+    def resizeEvent(self, event):
+        self._statische_laag = None
+        self._index = None
+        self._getekend = None
+        self._te_tekenen = None
+        self._niveaus.leeg()
+        self._tegels.leeg()
+        w, h = self._kaartgrootte()
+        ox, oy = self._verschuiving
+        self._verschuiving = (min(ox, max(0, int(w) - self.width())), min(oy, max(0, int(h) - self.height())))
+        super().resizeEvent(event)
+
+# Gooit de statische laag, de tegels en de index weg zodat ze bij de volgende paint of klik opnieuw worden opgebouwd
+
+    def _invalideer_laag(self):
+        self._statische_laag = None
+        self._index = None
+        self._markers = None
+        self._niveaus.leeg()
+        self._tegels.leeg()
+        self.update()
+
+# Berekent de pixelposities (op de kaart) van alle markers en bouwt de index voor klikken en tooltips.
+# Dit gebeurt alleen na een resize, een ander zoomniveau of nieuwe attracties/perrons, niet bij elke paint.
+
+    def _zorg_voor_layout(self):
+        if self._index is not None:
+            return
+        w, h = self._kaartgrootte()
+        marker_radius = self._marker_radius()
+        self._last_attraction_positions = [(int(ax * w), int(ay * h), marker_radius, label) for (ax, ay, label) in self._attractions]
+        self._last_platform_positions = [(int(px * w), int(py * h), marker_radius, label) for (px, py, label) in self._platforms]
+
+        self._index = RasterIndex(celgrootte=marker_radius * 2)
+        for i, (mx, my, r, label) in enumerate(self._last_attraction_positions):
+            self._index.voeg_toe(("attractie", i), mx, my, r, "attractie", label)
+        for i, (mx, my, r, label) in enumerate(self._last_platform_positions):
+            self._index.voeg_toe(("perron", i), mx, my, r, "perron", label)
+
+# Alle markers als arrays om te tekenen: genormaliseerde posities, soort (0 = attractie, 1 = perron), labels
+# en de breedte van elk label. Eén keer per indeling.
+
+    def _zorg_voor_markers(self):
+        if self._markers is not None:
+            return self._markers
+        rijen = [(x, y, 0, label) for (x, y, label) in self._attractions] + [(x, y, 1, label) for (x, y, label) in self._platforms]
+        metriek = QFontMetricsF(self.font())
+        breedtes = self._label_breedtes
+        for (_x, _y, _soort, label) in rijen:
+            if label not in breedtes:
+                breedtes[label] = metriek.horizontalAdvance(label)
+        xy = np.array([(x, y) for (x, y, _soort, _label) in rijen], dtype=np.float64).reshape(-1, 2)
+        soorten = np.array([soort for (_x, _y, soort, _label) in rijen], dtype=np.int8)
+        labels = [label for (_x, _y, _soort, label) in rijen]
+        breedte = np.array([breedtes[label] for label in labels], dtype=np.float64)
+        self._markers = (xy, soorten, labels, breedte)
+        return self._markers
+
+# Per zoomniveau: de markers in pixels van de kaart, de rechthoek van elk label en welke labels
+# getekend worden (zonder overlap, attracties gaan voor). Bij pannen blijft dat dus hetzelfde.
+
+    def _niveau_inhoud(self, niveau=None):
+        niveau = self._niveau if niveau is None else niveau
+
+        def maak():
+            xy, soorten, labels, breedte = self._zorg_voor_markers()
+            pixels = (xy * (w, h)).astype(np.int32)
+            metriek = QFontMetricsF(self.font())
+            x0 = pixels[:, 0] + r + 4
+            y0 = pixels[:, 1] + r // 2 - metriek.ascent()
+            boxen = np.column_stack([x0, y0, x0 + breedte, y0 + metriek.height()])
+            return pixels, soorten, labels, boxen, labels_zonder_overlap(boxen)
+
+        w, h = self._kaartgrootte(niveau)
+        r = self._marker_radius()
+        return self._niveaus.haal((niveau, self.width(), self.height()), maak)
+
+# Het wegstrepen van labels kost bij duizenden markers een paar frames. Na een zoomstap doen we dat voor
+# de niveaus ernaast alvast als de event loop niets te doen heeft, dan is de volgende stap direct klaar.
+
+    def _bereid_buren_voor(self):
+        for niveau in (self._niveau + 1, self._niveau - 1):
+            if 0 <= niveau <= MAX_NIVEAU:
+                self._niveau_inhoud(niveau)
+
+    def _marker_radius(self):
+        return max(6, int(min(self.width(), self.height()) * 0.03))
+
+    def _dot_radius(self):
+        return max(10, int(min(self.width(), self.height()) * 0.045))
+
+# De rechthoek van de trein in rij 0, met een kleine marge voor de rand van de pen
+
+    def _dot_rect(self):
+        if not len(self._vloot):
+            return QRect()
+        radius = self._dot_radius()
+        dot_x, dot_y = self._naar_scherm(self._vloot.posities[:1])[0].tolist()
+        return QRect(dot_x - radius, dot_y - radius, radius * 2, radius * 2).adjusted(-2, -2, 2, 2)
+
+# Labels worden één keer opgemaakt (QStaticText) en hergebruikt bij elke nieuwe laag
+
+    def _label(self, tekst):
+        static = self._labels.get(tekst)
+        if static is None:
+            static = QStaticText(tekst)
+            static.setTextFormat(Qt.TextFormat.PlainText)
+            self._labels[tekst] = static
+        return static
+
+# Tekent de statische laag (de hele kaart op widgetgrootte) voor een kaart die niet zoomt
+
+    def _bouw_statische_laag(self):
+        dpr = self.devicePixelRatioF()
+        laag = QPixmap(max(1, int(self.width() * dpr)), max(1, int(self.height() * dpr)))
+        laag.setDevicePixelRatio(dpr)
+        laag.fill(self.palette().color(self.backgroundRole()))
+        painter = QPainter(laag)
+        self._teken_inhoud(painter, self.rect())
+        painter.end()
+        self._statische_laag = laag
+
+# Eén tegel (tx, ty) van het huidige zoomniveau
+
+    @gemeten("tegel")
+    def _maak_tegel(self, tx, ty):
+        dpr = self.devicePixelRatioF()
+        tegel = QPixmap(int(TEGEL * dpr), int(TEGEL * dpr))
+        tegel.setDevicePixelRatio(dpr)
+        tegel.fill(self.palette().color(self.backgroundRole()))
+        painter = QPainter(tegel)
+        painter.translate(-tx * TEGEL, -ty * TEGEL)
+        self._teken_inhoud(painter, QRect(tx * TEGEL, ty * TEGEL, TEGEL, TEGEL))
+        painter.end()
+        return tegel
+
+# Tekent de achtergrond, het raster, de attracties, de perrons en hun labels voor het stuk rect van de kaart
+# (in pixels van de kaart). Alleen de markers en labels die rect raken worden getekend.
+# Level of detail: bij veel markers in rect worden het stippen zonder rand, in één drawPoints per soort.
+
+    def _teken_inhoud(self, painter, rect):
+        w, h = self._kaartgrootte()
         painter.setBrush(QBrush(QColor(230, 230, 230)))
         pen = painter.pen()
         pen.setColor(QColor(160, 160, 160))
         pen.setWidth(4)
         painter.setPen(pen)
-        painter.drawRect(self.rect())
+        painter.drawRect(0, 0, int(w), int(h))
 
         grid_pen = painter.pen()
         grid_pen.setColor(QColor(210, 210, 210))
         grid_pen.setWidth(1)
         painter.setPen(grid_pen)
-        w = self.width()
-        h = self.height()
         for i in range(1, 4):
-            painter.drawLine(int(w * i / 4), 0, int(w * i / 4), h)
-            painter.drawLine(0, int(h * i / 4), w, int(h * i / 4))
+            painter.drawLine(int(w * i / 4), 0, int(w * i / 4), int(h))
+            painter.drawLine(0, int(h * i / 4), int(w), int(h * i / 4))
+
+        pixels, soorten, labels, boxen, zichtbaar = self._niveau_inhoud()
+        r = self._marker_radius()
+        x0, y0, x1, y1 = rect.left() - r - 1, rect.top() - r - 1, rect.right() + r + 1, rect.bottom() + r + 1
+        binnen = np.flatnonzero((pixels[:, 0] >= x0) & (pixels[:, 0] <= x1) & (pixels[:, 1] >= y0) & (pixels[:, 1] <= y1))
+        eenvoudig = len(binnen) > LOD_DICHTHEID * rect.width() * rect.height() / (TEGEL * TEGEL)
+        for soort, kleur in enumerate(MARKER_KLEUREN):
+            rijen = binnen[soorten[binnen] == soort]
+            if not len(rijen):
+                continue
+            if eenvoudig:
+                stip = QPen(kleur)
+                stip.setWidth(max(3, r // 2))
+                stip.setCapStyle(Qt.PenCapStyle.RoundCap)
+                painter.setPen(stip)
+                punten = QPolygon()
+                punten.setPoints(*pixels[rijen].ravel().tolist())
+                painter.drawPoints(punten)
+            else:
+                painter.setBrush(QBrush(kleur))
+                painter.setPen(Qt.GlobalColor.black)
+                for (mx, my) in pixels[rijen].tolist():
+                    painter.drawEllipse(mx - r, my - r, r * 2, r * 2)
 
-        dot_x = int(self._dot[0] * w)
-        dot_y = int(self._dot[1] * h)
-        radius = max(10, int(min(w, h) * 0.045))
-        painter.setBrush(QBrush(QColor(0, 0, 0)))
         painter.setPen(Qt.GlobalColor.black)
-        painter.drawEllipse(dot_x - radius, dot_y - radius, radius * 2, radius * 2)
-
-        self._last_dot_rect = (dot_x - radius, dot_y - radius, radius * 2, radius * 2)
-
-        self._last_attraction_positions = []
-        if (self, '_attractions') and self._attractions:
-            marker_radius = max(6, int(min(w, h) * 0.03))
-            painter.setBrush(QBrush(QColor(200, 30, 30)))
-            painter.setPen(Qt.GlobalColor.black)
-            for (ax, ay, label) in self._attractions:
-                mx = int(ax * w)
-                my = int(ay * h)
-                painter.drawEllipse(mx - marker_radius, my - marker_radius, marker_radius * 2, marker_radius * 2)
-                painter.drawText(mx + marker_radius + 4, my + marker_radius // 2, label)
-                self._last_attraction_positions.append((mx, my, marker_radius, label))
-
-        if (self, '_platforms') and self._platforms:
-            platform_marker_radius = max(6, int(min(w, h) * 0.03))
-            painter.setBrush(QBrush(QColor(50, 120, 220)))
-            painter.setPen(Qt.GlobalColor.black)
-            for (px, py, plabel) in self._platforms:
-                mx = int(px * w)
-                my = int(py * h)
-                painter.drawEllipse(mx - platform_marker_radius, my - platform_marker_radius, platform_marker_radius * 2, platform_marker_radius * 2)
-                painter.drawText(mx + platform_marker_radius + 4, my + platform_marker_radius // 2, plabel)
-
-# Hiermee kunnen muisklikken op de kaart worden verwerkt
-
-    def mousePressEvent(self, event):
+        painter.setFont(self.font())
+        raakt = zichtbaar & (boxen[:, 0] <= rect.right()) & (boxen[:, 2] >= rect.left()) & (boxen[:, 1] <= rect.bottom()) & (boxen[:, 3] >= rect.top())
+        for i in np.flatnonzero(raakt).tolist():
+            painter.drawStaticText(QPointF(boxen[i, 0], boxen[i, 1]), self._label(labels[i]))
+
+# Voor elke tegel onder dirty (in widgetpixels) het stuk dat in dirty valt. Nieuwe tegels tekenen we tot
+# TEGEL_BUDGET_MS op is; daarna komt er een lege tegel en volgen de rest in de volgende paint, zodat een zoomstap
+# of snel pannen het beeld niet ophoudt.
+
+    def _teken_tegels(self, painter, dirty, dpr):
+        ox, oy = self._verschuiving
+        eind = time.perf_counter() + TEGEL_BUDGET_MS / 1000.0
+        onaf = QRegion()
+        for tx, ty in tegels_voor(dirty.left() + ox, dirty.top() + oy, dirty.right() + ox, dirty.bottom() + oy):
+            doel = QRect(tx * TEGEL - ox, ty * TEGEL - oy, TEGEL, TEGEL).intersected(dirty)
+            sleutel = (self._niveau, tx, ty)
+            tegel = self._tegels.kijk(sleutel)
+            if tegel is None:
+                if time.perf_counter() > eind:
+                    painter.fillRect(doel, QColor(230, 230, 230))
+                    onaf += doel
+                    continue
+                tegel = self._tegels.haal(sleutel, lambda: self._maak_tegel(tx, ty))
+            bron = QRectF((doel.x() + ox - tx * TEGEL) * dpr, (doel.y() + oy - ty * TEGEL) * dpr, doel.width() * dpr, doel.height() * dpr)
+            painter.drawPixmap(QRectF(doel), tegel, bron)
+        if not onaf.isEmpty():
+            if self._onaf is None:
+                QTimer.singleShot(0, self._maak_af)
+                self._onaf = onaf
+            else:
+                self._onaf += onaf
+
+    def _maak_af(self):
+        onaf, self._onaf = self._onaf, None
+        if onaf is not None:
+            self.update(onaf)
+
+# Een kaart die niet zoomt tekent het gevraagde stuk van de statische laag, een zoombare kaart de tegels
+# eronder (uit de cache, of nieuw). Daarna het spoor en alle treinen er bovenop.
+# Alle treinen gaan in één drawPoints aanroep: een ronde pen zo breed als de trein tekent elk punt als stip.
+
+    @gemeten("paint")
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        dirty = event.rect()
+        dpr = self.devicePixelRatioF()
+        bron = QRectF(dirty.x() * dpr, dirty.y() * dpr, dirty.width() * dpr, dirty.height() * dpr)
+        if self._zoombaar:
+            self._teken_tegels(painter, dirty, dpr)
+        else:
+            if self._statische_laag is None:
+                self._bouw_statische_laag()
+            painter.drawPixmap(QRectF(dirty), self._statische_laag, bron)
+
+        if self._spoor is not None:
+            staart = self._spoor_delen()
+            if self._spoor_laag is not None:
+                painter.drawPixmap(QRectF(dirty), self._spoor_laag, bron)
+            if len(staart) > 1:
+                painter.translate(-self._verschuiving[0], -self._verschuiving[1])
+                self._teken_spoor(painter, staart)
+                painter.resetTransform()
+
+        if self._terugspeeltijd is not None:
+            _ids, xy = self._model.historie.posities_op(self._terugspeeltijd)
+            pixels = self._naar_scherm(xy)
+        elif len(self._vloot):
+            pixels = self._te_tekenen
+            if pixels is None or len(pixels) != len(self._vloot):
+                pixels = self._te_tekenen = self._weergave(time.perf_counter())
+            self._getekend = pixels
+        else:
+            pixels = ()
+        if len(pixels):
+            pen = QPen(QColor(0, 0, 0))
+            pen.setWidth(self._dot_radius() * 2 + 1)
+            pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+            painter.setPen(pen)
+            punten = QPolygon()
+            punten.setPoints(*pixels.ravel().tolist())
+            painter.drawPoints(punten)
+
+        if self._overlay_tekst is not None:
+            self._frames += 1
+            if self._overlay_tekst:
+                rect = self._overlay_rect()
+                painter.fillRect(rect, QColor(0, 0, 0, 170))
+                painter.setPen(QColor(255, 255, 255))
+                painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, self._overlay_tekst)
+
+    def _overlay_rect(self):
+        return QRect(4, 4, 160, 20)
+
+# Rekent FPS en p99 uit over de paints sinds de vorige keer (het verschil in de emmers van het paint histogram)
+
+    def _ververs_overlay(self):
+        nu = time.perf_counter()
+        histogram = METRIEKEN.histogram("paint")
+        verschil = [nieuw - oud for nieuw, oud in zip(histogram.emmers, self._overlay_emmers)]
+        fps = self._frames / max(nu - self._overlay_tijd, 1e-6)
+        self._overlay_tekst = f"{fps:.0f} FPS   p99 {histogram.kwantiel(0.99, verschil):.2f} ms"
+        self._overlay_emmers = list(histogram.emmers)
+        self._overlay_tijd = nu
+        self._frames = 0
+        if self.isVisible():
+            self.update(self._overlay_rect())
+
+# Zoekt de marker onder de muis op. Treinen bewegen de hele tijd, die zoeken we met één vectorberekening
+# in de vloot (niet bij het terugspelen: dan staan de getekende treinen niet op hun live plek).
+# Attracties en perrons staan stil en komen uit de index.
+
+    def marker_op(self, x, y):
+        rij = None
+        if self._terugspeeltijd is None and len(self._vloot):
+            pixels = self._getekend if self._getekend is not None else self._naar_scherm(self._vloot.posities)
+            rij = self._vloot.trein_op(x, y, self.width(), self.height(), self._dot_radius(), pixels)
+        if rij is not None:
+            return (("trein", int(self._vloot.ids[rij])), "trein", rij)
+        self._zorg_voor_layout()
+        return self._index.zoek(x + self._verschuiving[0], y + self._verschuiving[1])
+
+    @staticmethod
+    def _muis_positie(event):
         try:
-            x = event.position().x()
-            y = event.position().y()
+            return event.position().x(), event.position().y()
         except Exception:
-            x = event.x()
-            y = event.y()
-
-# Hiermee kunnen we klik acties op de trein detecteren
+            return event.x(), event.y()
 
-        if (self, '_last_dot_rect'):
-            rx, ry, rw, rh = self._last_dot_rect
-            if rx <= x <= rx + rw and ry <= y <= ry + rh:
-                try:
-                    self.train_clicked.emit(getattr(self, '_train_info', {}))
-                except Exception:
-                    pass
-                return
-
-# Hiermee kunnen we klik acties op de attracties detecteren
+# Hiermee kunnen muisklikken op de kaart worden verwerkt (trein, attractie of perron).
+# Op een zoombare kaart begint een klik naast de markers met slepen (pannen).
 
+    @gemeten("muis_klik")
+    def mousePressEvent(self, event):
+        x, y = self._muis_positie(event)
+        treffer = self.marker_op(x, y)
+        if treffer is None:
+            if self._zoombaar and event.button() == Qt.MouseButton.LeftButton:
+                self._pannen = (x, y)
+            super().mousePressEvent(event)
+            return
+
+        _, soort, label = treffer
         try:
-            if (self, '_last_attraction_positions'):
-                for (cx, cy, r, label) in self._last_attraction_positions:
-                    dx = x - cx
-                    dy = y - cy
-                    if dx * dx + dy * dy <= r * r:
-                        try:
-                            self.attraction_clicked.emit(label)
-                        except Exception:
-                            pass
-                        return
+            if soort == "trein":
+                self.train_clicked.emit(self._train_info if label == 0 else self._vloot.info(label))
+            elif soort == "attractie":
+                self.attraction_clicked.emit(label)
+            elif soort == "perron":
+                self.platform_clicked.emit(label)
         except Exception:
             pass
-        super().mousePressEvent(event)
 
-    
+# Toont een tooltip als de muis boven een marker hangt
+
+    @gemeten("muis_beweging")
+    def mouseMoveEvent(self, event):
+        x, y = self._muis_positie(event)
+        if self._pannen is not None:
+            self.verschuif(x - self._pannen[0], y - self._pannen[1])
+            self._pannen = (x, y)
+            return
+        treffer = self.marker_op(x, y)
+        sleutel = treffer[0] if treffer else None
+        if sleutel != self._hover:
+            self._hover = sleutel
+            if treffer is None:
+                QToolTip.hideText()
+            else:
+                _, soort, label = treffer
+                tekst = f"Trein {treffer[0][1]}" if soort == "trein" else label
+                QToolTip.showText(event.globalPosition().toPoint(), tekst, self)
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        self._pannen = None
+        super().mouseReleaseEvent(event)
+
+# Het muiswiel zoomt rond de muis, één stap per klik van het wiel
+
+    def wheelEvent(self, event):
+        stappen = event.angleDelta().y() // 120
+        if not self._zoombaar or not stappen:
+            super().wheelEvent(event)
+            return
+        self.zoom(stappen, self._muis_positie(event))
+        event.accept()
@@ -1,4 +1,5 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout
+from .thema import stijl
 
 # Klasse : Scherm3
 # Deze klasse wordt niet gebruikt voor het doeleinde van dit project
@@ -16,7 +17,7 @@ class Scherm3(QWidget):
         top_row = QHBoxLayout()
         self.btn_terug = QPushButton("Terug")
         self.btn_terug.setFixedSize(120, 40)
-        self.btn_terug.setStyleSheet("QPushButton{background-color: #28a745; color: white; border-radius: 20px; font-weight: 600;}")
+        stijl(self.btn_terug, "primair", "klein")
         self.btn_terug.clicked.connect(lambda: self.main_window.toon_pagina(self.main_window.scherm2))
         top_row.addWidget(self.btn_terug)
         top_row.addStretch(1)
@@ -1,8 +1,41 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QHBoxLayout, QSizePolicy, QMessageBox
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QHBoxLayout, QSizePolicy, QMessageBox, QSlider, QLabel
+from PyQt6.QtCore import Qt, QTimer
 import random
+import time
 
+from database.wachttijden import WachttijdCache
 from .scherm2 import MapWidget
+from .thema import stijl
+
+# Demo-bronnen voor de caches als er geen database is: willekeurige waarden, net als vroeger
+
+def _demo_wachttijden(namen):
+    return {naam: random.randint(3, 25) for naam in namen}
+
+
+def _demo_aankomsttijden(perrons):
+    return {perron: random.randint(1, 12) for perron in perrons}
+
+
+# Terugspelen: snelheden waar de snelheidsknop langs loopt, de stapgrootte van de tijdlijn en hoe vaak de kaart ververst
+
+SNELHEDEN = (1, 2, 4, 8, 16, 32, 64)
+TIJDLIJN_STAPPEN = 1000
+TERUGSPEEL_INTERVAL_MS = 40
+
+
+# Wachttijden uit de database, en uit de lokale snapshot als de database niet bereikbaar is (of er geen is)
+
+def _met_snapshot(laad_wachttijden, snapshot):
+    def laad(namen):
+        if laad_wachttijden is not None:
+            try:
+                return laad_wachttijden(namen)
+            except Exception:
+                pass
+        return snapshot.wachttijden_voor(namen)
+    return laad
+
 
 # Klasse : Scherm4
 # Dit is de klasse waarin de vergrote versie van de map wordt weergegeven
@@ -17,7 +50,7 @@ class Scherm4(QWidget):
         layout.setContentsMargins(8, 8, 8, 8)
 
         
-        self.map_widget = MapWidget()
+        self.map_widget = MapWidget(getattr(self.main_window, 'kaart', None), zoombaar=True)
 
         self.map_widget.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         layout.addWidget(self.map_widget)
@@ -32,82 +65,167 @@ class Scherm4(QWidget):
         except Exception:
             pass
 
+# Bediening: in- en uitzoomen (slepen op de kaart verschuift hem, het muiswiel zoomt ook) en voor het personeel
+# het spoor van de gevolgde trein tonen en incidenten terugspelen met een instelbare snelheid en een tijdlijn
+
+        bediening = QHBoxLayout()
+        for tekst, actie in (("−", lambda: self.map_widget.zoom(-1)), ("+", lambda: self.map_widget.zoom(1)), ("Passend", self.map_widget.passend)):
+            knop = QPushButton(tekst)
+            knop.setFixedSize(100 if tekst == "Passend" else 44, 40)
+            stijl(knop, "secundair", "klein")
+            knop.clicked.connect(actie)
+            bediening.addWidget(knop)
+
+        self.btn_spoor = QPushButton("Spoor")
+        self.btn_spoor.setCheckable(True)
+        self.btn_spoor.setFixedSize(120, 40)
+        stijl(self.btn_spoor, "secundair", "klein")
+        self.btn_spoor.toggled.connect(self._zet_spoor)
+        bediening.addWidget(self.btn_spoor)
+
+        self.btn_terugspelen = QPushButton("Terugspelen")
+        self.btn_terugspelen.setCheckable(True)
+        self.btn_terugspelen.setFixedSize(140, 40)
+        stijl(self.btn_terugspelen, "secundair", "klein")
+        self.btn_terugspelen.toggled.connect(self._zet_terugspelen)
+        bediening.addWidget(self.btn_terugspelen)
+
+        self._snelheid = SNELHEDEN[0]
+        self.btn_snelheid = QPushButton(f"{self._snelheid}×")
+        self.btn_snelheid.setFixedSize(80, 40)
+        stijl(self.btn_snelheid, "secundair", "klein")
+        self.btn_snelheid.clicked.connect(self._volgende_snelheid)
+        bediening.addWidget(self.btn_snelheid)
+
+        self.tijdlijn = QSlider(Qt.Orientation.Horizontal)
+        self.tijdlijn.setRange(0, TIJDLIJN_STAPPEN)
+        self.tijdlijn.setEnabled(False)
+        self.tijdlijn.valueChanged.connect(self._zoek)
+        bediening.addWidget(self.tijdlijn, 1)
+
+        self.tijd_label = QLabel("live")
+        self.tijd_label.setFixedWidth(80)
+        bediening.addWidget(self.tijd_label)
+        layout.addLayout(bediening)
+
+        self._speeltijd = None
+        self._speelbereik = None
+        self._speel_vorige = 0.0
+        self._terugspeel_timer = QTimer(self)
+        self._terugspeel_timer.setInterval(TERUGSPEEL_INTERVAL_MS)
+        self._terugspeel_timer.timeout.connect(self._speel_stap)
+
 # Terug knop onderaan de pagina
 
         btn_row = QHBoxLayout()
         btn_row.addStretch(1)
         self.btn_terug = QPushButton("Terug")
         self.btn_terug.setFixedSize(160, 44)
-        self.btn_terug.setStyleSheet("QPushButton{background-color: #28a745; color: white; border-radius: 22px; font-weight: 600;}")
+        stijl(self.btn_terug, "primair", "middel")
         self.btn_terug.clicked.connect(self.terug)
         btn_row.addWidget(self.btn_terug)
         btn_row.addStretch(1)
         layout.addLayout(btn_row)
 
-#Dictionaries voor simulatie van wachttijden etz
-
         self.setLayout(layout)
-        # Nederlandse namen voor simulatie-dictionaries
-        self._wachttijden_attracties = {}
-        self._extra_tijden_perron = {}
-        self._aankomst_minuten_perron = {}
+        # Wachttijden komen uit een cache (TTL + LRU) die op de achtergrond ververst wordt,
+        # bij een klik wordt dus nooit op de database gewacht
+        gegevens = getattr(self.main_window, 'gegevens', None)
+        laad_wachttijden = gegevens.wachttijden_voor if gegevens is not None else _demo_wachttijden
+        snapshot = getattr(self.main_window, 'snapshot', None)
+        if snapshot is not None:
+            laad_wachttijden = _met_snapshot(laad_wachttijden if gegevens is not None else None, snapshot)
+        self._wachttijden_attracties = WachttijdCache(laad_wachttijden, ttl=30.0)
+        self._aankomst_minuten_perron = WachttijdCache(_demo_aankomsttijden, ttl=60.0)
     
-# Event bij het tonen van het scherm : Hierbij worden de gegevens van scherm2 opgehaald en weergegeven op de map
+# Event bij het tonen van het scherm
+# De kaart tekent uit hetzelfde KaartModel als Scherm2, er hoeft dus niets gekopieerd te worden.
+# Scherm2 vult dat model (uit de database), daarom zorgen we dat hij gebouwd is.
 
     def showEvent(self, event):
         
         try:
             s2 = getattr(self.main_window, 'scherm2', None)
-            if s2:
-                if hasattr(s2, 'current_pos'):
-                    self.map_widget.set_dot_normalized(*s2.current_pos)
-                if hasattr(s2, 'attractions'):
-                    self.map_widget.set_attractions(s2.attractions)
-                    for (_ax, _ay, label) in s2.attractions:
-                        if label not in self._wachttijden_attracties:
-                            self._wachttijden_attracties[label] = random.randint(3, 25)
-                if hasattr(s2, 'platforms'):
-                    self.map_widget.set_platforms(s2.platforms)
-                if hasattr(s2, 'train_info'):
-                    try:
-                        self.map_widget.set_train_info(s2.train_info)
-                    except Exception:
-                        pass
-                # connect signaal voor position updates als aanwezig
-                try:
-                    s2.train_updated.connect(self._on_train_updated)
-                except Exception:
-                    pass
+            if s2 is not None:
+                # alle wachttijden alvast in één batch op de achtergrond ophalen
+                self._wachttijden_attracties.vernieuw([label for (_ax, _ay, label) in s2.attractions])
         except Exception:
             pass
 
+        self.map_widget.hervat_klok()
         super().showEvent(event)
 
-# Event bij het verbergen van het scherm : Hierbij wordt de verbinding met scherm2 verbroken
+# Bij het verlaten van het scherm stoppen we het terugspelen en de renderklok; terugkomen toont weer de live stand.
+# Taken die dit scherm nog had lopen (een popup die op de database wacht) worden geannuleerd.
 
     def hideEvent(self, event):
-        
-        try:
-            s2 = getattr(self.main_window, 'scherm2', None)
-            if s2:
-                try:
-                    s2.train_updated.disconnect(self._on_train_updated)
-                except Exception:
-                    pass
-        except Exception:
-            pass
+        self.btn_terugspelen.setChecked(False)
+        self.map_widget.pauzeer_klok()
+        taken = getattr(self.main_window, 'taken', None)
+        if taken is not None:
+            taken.annuleer(self)
         super().hideEvent(event)
 
-# Event bij het updaten van de trein positie : Hierbij worden de gegevens van de trein bijgewerkt op de map
+# Spoor van de trein die Scherm2 volgt
 
-    def _on_train_updated(self, info: dict, pos: tuple):
-        try:
-            if pos:
-                self.map_widget.set_dot_normalized(*pos)
-            if info:
-                self.map_widget.set_train_info(info)
-        except Exception:
-            pass
+    def _zet_spoor(self, aan):
+        s2 = getattr(self.main_window, 'scherm2', None)
+        self.map_widget.set_spoor(s2.trein_id if aan and s2 is not None else None)
+
+    def _volgende_snelheid(self):
+        self._snelheid = SNELHEDEN[(SNELHEDEN.index(self._snelheid) + 1) % len(SNELHEDEN)]
+        self.btn_snelheid.setText(f"{self._snelheid}×")
+
+# Terugspelen begint bij de oudste bewaarde positie. De live stand wordt ondertussen gewoon verder opgenomen.
+
+    def _zet_terugspelen(self, aan):
+        historie = self.map_widget.model.historie
+        self._speelbereik = historie.bereik() if aan else None
+        if self._speelbereik is None:
+            self._terugspeel_timer.stop()
+            self._speeltijd = None
+            self.tijdlijn.setEnabled(False)
+            self.tijd_label.setText("live")
+            self.map_widget.set_terugspeeltijd(None)
+            if aan:
+                self.btn_terugspelen.setChecked(False)
+            return
+        self.tijdlijn.setEnabled(True)
+        self._ga_naar(self._speelbereik[0])
+        self._speel_vorige = time.perf_counter()
+        self._terugspeel_timer.start()
+
+# Eén stap: de verstreken tijd maal de snelheid. Aan het eind (de live stand van dat moment) pauzeren we.
+
+    def _speel_stap(self):
+        nu = time.perf_counter()
+        stap = (nu - self._speel_vorige) * self._snelheid
+        self._speel_vorige = nu
+        self._speelbereik = self.map_widget.model.historie.bereik() or self._speelbereik
+        tijd = min(self._speeltijd + stap, self._speelbereik[1])
+        if tijd >= self._speelbereik[1]:
+            self._terugspeel_timer.stop()
+        self._ga_naar(tijd)
+
+# De tijdlijn verslepen springt naar dat moment en speelt vanaf daar verder
+
+    def _zoek(self, waarde):
+        if self._speelbereik is None:
+            return
+        begin, eind = self._speelbereik
+        self._ga_naar(begin + (eind - begin) * waarde / TIJDLIJN_STAPPEN)
+        self._speel_vorige = time.perf_counter()
+        if not self._terugspeel_timer.isActive():
+            self._terugspeel_timer.start()
+
+    def _ga_naar(self, tijd):
+        self._speeltijd = tijd
+        self.map_widget.set_terugspeeltijd(tijd)
+        begin, eind = self._speelbereik
+        self.tijdlijn.blockSignals(True)
+        self.tijdlijn.setValue(int(round((tijd - begin) / max(eind - begin, 1e-9) * TIJDLIJN_STAPPEN)))
+        self.tijdlijn.blockSignals(False)
+        self.tijd_label.setText(time.strftime("%H:%M:%S", time.localtime(tijd)))
 
 # Functie (Terug knop)
 # Deze functie gebruiken wij om terug te gaan naar het vorige scherm (scherm2) als de terug knop wordt ingedrukt
@@ -119,48 +237,105 @@ class Scherm4(QWidget):
             pass
 
 # toont informatie bij het klikken op de trein
+# Alles wat van Scherm2 en de kaart komt (positie, volgende perron, ETA, reserveringen) lezen we hier op de GUI thread.
+# Alleen de plekken (database) en de vrije plekken (allocator) halen we op in een achtergrondtaak, de popup volgt als die klaar is.
+# Nog een klik op dezelfde trein terwijl de taak loopt geeft geen tweede popup.
 
     def _on_train_clicked(self, info: dict):
+        vraag = self._trein_vraag(info, getattr(self.main_window, 'scherm2', None))
+        taken = getattr(self.main_window, 'taken', None)
+        if taken is None:
+            self._toon_trein_info(self._haal_trein_info(vraag))
+            return
+        taken.start(("trein_info", vraag["trein_id"]), self._haal_trein_info, vraag,
+                    eigenaar=self, klaar=self._toon_trein_info)
+
+# Op de GUI thread: de geklikte trein, zijn dichtstbijzijnde halte en het eerstvolgende perron als gewone waarden.
+# Zonder perrons (demo) blijft het bij een willekeurig perron.
+
+    def _trein_vraag(self, info, s2):
+        info = info or {}
+        trein_id = info.get("trein_id", getattr(s2, 'trein_id', None))
+        vraag = {
+            "trein_id": trein_id,
+            "seats_available": int(info.get("seats_available", 0)),
+            "total": int(info.get("total_seats", 20)),
+            "van": None,
+            "platform_label": None,
+            "platform_display": f"Perron {random.randint(1,4)}",
+            "arrival_min": None,
+            "existing": 0,
+            "gegevens": getattr(self.main_window, 'gegevens', None),
+            "allocator": None,
+        }
         try:
-            seats_available = random.randint(0, 20)    
-            total = 20
+            vloot = s2.kaart.vloot
+            rij = vloot.rij_van(trein_id) if "trein_id" in info else 0
+            x, y = (float(v) for v in vloot.posities[rij if rij is not None else 0])
+            perrons = [label for (_px, _py, label) in s2.platforms]
+            graaf = s2.routegraaf
+            van = graaf.dichtstbijzijnde(x, y) if graaf is not None else None
+            if van is not None and perrons and all(label in graaf for label in perrons):
+                label = min((p for p in perrons if p != van), key=lambda p: graaf.eta(van, p), default=van)
+                vraag["arrival_min"] = int(round(graaf.eta(van, label)))
+            else:
+                label = min(s2.platforms, key=lambda p: (p[0] - x) ** 2 + (p[1] - y) ** 2)[2]
+            vraag.update(van=van, platform_label=label, platform_display=label,
+                         existing=int(s2.reservations.get(label, 0)), allocator=s2.allocator)
+        except Exception:
+            pass
+        if vraag["arrival_min"] is None:
+            vraag["arrival_min"] = self._aankomst_minuten_perron.get(vraag["platform_label"] or vraag["platform_display"])
+        return vraag
 
-            platform_label = None
-            platform_display = "-"
-            reservations_for_platform = None
+# Draait op een werker thread: krijgt alleen de waarden uit _trein_vraag, leest niets van de schermen
+
+    def _haal_trein_info(self, vraag):
+        seats_available = vraag["seats_available"]
+        total = vraag["total"]
+        gegevens = vraag["gegevens"]
+        if gegevens is not None and vraag["trein_id"] is not None:
             try:
-                s2 = getattr(self.main_window, 'scherm2', None)
-                if s2 and hasattr(s2, 'platforms') and s2.platforms:
-                    p = random.choice(s2.platforms)
-                    platform_label = p[2]
-                    platform_display = platform_label
-                    try:
-                        reservations_map = getattr(s2, 'reservations', {})
-                        existing = int(reservations_map.get(platform_label, 0))
-                        onboard = total - seats_available
-                        max_allowed = max(0, total - onboard)
-                        reservations_for_platform = max(0, max_allowed - existing)
-                    except Exception:
-                        reservations_for_platform = None
-                else:
-                    platform_display = f"Perron {random.randint(1,4)}"
+                seats_available, total = gegevens.bezetting.plekken_beschikbaar(vraag["trein_id"])
             except Exception:
-                platform_display = f"Perron {random.randint(1,4)}"
+                pass
+
+        label = vraag["platform_label"]
+        reservations_for_platform = None
+        if label is not None:
+            onboard = total - seats_available
+            max_allowed = max(0, total - onboard)
+            reservations_for_platform = max(0, max_allowed - vraag["existing"])
+            allocator, van = vraag["allocator"], vraag["van"]
+            if allocator is not None and van is not None and van != label:
+                try:
+                    reservations_for_platform = allocator.vrij(vraag["trein_id"], van, label)
+                except Exception:
+                    pass
+
+        return {
+            "seats_available": seats_available,
+            "total": total,
+            "platform_display": vraag["platform_display"],
+            "arrival_min": vraag["arrival_min"],
+            "reservations_for_platform": reservations_for_platform,
+        }
+
+# Op de GUI thread: tekst opbouwen en de popup tonen
+
+    def _toon_trein_info(self, gegevens):
+        try:
+            seats_available = gegevens["seats_available"]
+            total = gegevens["total"]
+            platform_display = gegevens["platform_display"]
+            arrival_min = gegevens["arrival_min"]
+            reservations_for_platform = gegevens["reservations_for_platform"]
 
             text = f"plekken beschikbaar : {seats_available} / {total}\n"
-            key_for_arrival = platform_label if platform_label else platform_display
-            if key_for_arrival not in self._aankomst_minuten_perron:
-                self._aankomst_minuten_perron[key_for_arrival] = random.randint(1, 12)
-            arrival_min = self._aankomst_minuten_perron[key_for_arrival]
-            text += f"aankomst tot {platform_display}: {arrival_min} minuten\n"
-            show_extra = False
-            try:
-                if platform_label and ('2' in platform_label or platform_label.lower().strip() == 'perron 2'):
-                    show_extra = True
-                elif isinstance(platform_display, str) and '2' in platform_display:
-                    show_extra = True
-            except Exception:
-                show_extra = False
+            if arrival_min is None:
+                text += f"aankomst tot {platform_display}: wordt opgehaald\n"
+            else:
+                text += f"aankomst tot {platform_display}: {arrival_min} minuten\n"
 
             if reservations_for_platform is None:
                 demo_reserve_spots = random.randint(0, max(0, total - (total - seats_available)))
@@ -180,10 +355,12 @@ class Scherm4(QWidget):
 
     def _on_attraction_clicked(self, label: str):
         try:
-            if label not in self._wachttijden_attracties:
-                self._wachttijden_attracties[label] = random.randint(3, 25)
-            wait = self._wachttijden_attracties[label]
-            text = f"Wachttijd = {wait} minuut"
+            # een verouderde wachttijd wordt direct getoond en op de achtergrond ververst
+            wait = self._wachttijden_attracties.get(label)
+            if wait is None:
+                text = "Wachttijd wordt opgehaald, probeer het zo nog eens"
+            else:
+                text = f"Wachttijd = {wait} minuut"
 
             dlg = QMessageBox(self)
             dlg.setWindowTitle(f"Wachttijd - {label}")
@@ -7,6 +7,7 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton #Widgets en layout klassen
 from PyQt6.QtCore import Qt                                           
 from PyQt6.QtGui import QFont                                         #Lettertype en stijl klassen
+from .thema import stijl
 
 # Klasse : Startscherm
 # Dit is de klasse die eerste scherm van de applicatie voorstelt,
@@ -32,17 +33,13 @@ class Startscherm(QWidget):
         label.setAlignment(Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop)
         label.setFont(QFont("Arial", 20))
     
-        label.setStyleSheet(
-            "QLabel{background-color: white; color: black; border: 1px solid black; border-radius: 18px; padding: 10px 18px;}"
-        ) 
+        stijl(label, "welkom")
 
 # Hier wordt de startknop gemaakt en gestyled en hiermee ga je naar het volgende scherm
         btn_start = QPushButton("Volg de trein")
         btn_start.setFixedSize(200, 50)
         btn_start.clicked.connect(self.naar_volgende_scherm)
-        btn_start.setStyleSheet(
-            "QPushButton{background-color: #28a745; color: white; border-radius: 25px; font-weight: 600;}"
-        )
+        stijl(btn_start, "primair", "groot")
 
 # de addStretch wordt gebruikt om ruimte toe te voegen tussen de widgets
 
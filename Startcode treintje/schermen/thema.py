@@ -0,0 +1,154 @@
+from functools import lru_cache
+
+from PyQt6.QtWidgets import QWidget
+
+# Thema's voor de kiosk
+# In plaats van per knop een eigen stylesheet (setStyleSheet) krijgen widgets een "rol" en een "maat"
+# als dynamische property. Alle regels staan in één stylesheet die we één keer op de QApplication zetten.
+# Qt hoeft zo maar één stylesheet te parsen in plaats van één per knop.
+#
+# Het thema zelf is een property op het hoofdvenster: QMainWindow[thema="nacht"] QPushButton[rol="primair"] ...
+# Bij het wisselen van thema zetten we die property en polishen we alleen de widgets met een rol
+# (en het venster zelf), niet de hele widget boom.
+
+THEMAS = {
+    "standaard": {
+        "achtergrond": "#E0E0E0",
+        "tekst": "#333",
+        "primair": "#28a745",
+        "secundair": "#0069d9",
+        "knoptekst": "white",
+        "vlak": "white",
+        "vlaktekst": "black",
+        "rand": "black",
+    },
+    "nacht": {
+        "achtergrond": "#1E1F24",
+        "tekst": "#D8D8D8",
+        "primair": "#2E7D45",
+        "secundair": "#2F5F9E",
+        "knoptekst": "#F0F0F0",
+        "vlak": "#2B2D33",
+        "vlaktekst": "#F0F0F0",
+        "rand": "#5A5D66",
+    },
+    "hoog_contrast": {
+        "achtergrond": "black",
+        "tekst": "white",
+        "primair": "#FFD600",
+        "secundair": "#00E5FF",
+        "knoptekst": "black",
+        "vlak": "black",
+        "vlaktekst": "white",
+        "rand": "white",
+    },
+}
+
+STANDAARD_THEMA = "standaard"
+
+# Regels per thema; {naam} en de kleuren worden per thema ingevuld
+
+SJABLOON = """
+QMainWindow[thema="{naam}"] {{ background-color: {achtergrond}; }}
+QMainWindow[thema="{naam}"] QLabel {{ color: {tekst}; }}
+QMainWindow[thema="{naam}"] QPushButton[rol="primair"] {{ background-color: {primair}; color: {knoptekst}; font-weight: 600; }}
+QMainWindow[thema="{naam}"] QPushButton[rol="secundair"] {{ background-color: {secundair}; color: {knoptekst}; }}
+QMainWindow[thema="{naam}"] QLabel[rol="welkom"] {{ background-color: {vlak}; color: {vlaktekst}; border: 1px solid {rand}; border-radius: 18px; padding: 10px 18px; }}
+"""
+
+# De vorm van een knop hangt alleen af van zijn maat (ronde knoppen: radius = halve hoogte)
+
+MATEN = """
+QPushButton[maat="klein"] { border-radius: 20px; }
+QPushButton[maat="middel"] { border-radius: 22px; }
+QPushButton[maat="groot"] { border-radius: 25px; }
+"""
+
+
+# Bouwt de volledige stylesheet: basis (style.qss) + maten + de regels van alle thema's
+# Het resultaat wordt onthouden, dus bij een tweede aanroep is er niets meer te doen
+
+@lru_cache(maxsize=4)
+def compileer(basis=""):
+    delen = [basis, MATEN]
+    for naam, kleuren in THEMAS.items():
+        delen.append(SJABLOON.format(naam=naam, **kleuren))
+    return "\n".join(delen)
+
+
+# Geeft een widget zijn rol (en eventueel maat). Dit vervangt widget.setStyleSheet(...) in de schermen.
+
+def stijl(widget, rol, maat=None):
+    widget.setProperty("rol", rol)
+    if maat is not None:
+        widget.setProperty("maat", maat)
+    return widget
+
+
+def huidig_thema(venster):
+    return venster.property("thema") or STANDAARD_THEMA
+
+
+# Wisselt het thema van een venster
+# Alleen widgets met een rol (en gewone labels) hebben thema-regels, dus alleen die worden opnieuw gepolished.
+# Widgets die nu niet zichtbaar zijn (andere pagina's in de stack) zetten we op een achterstand-lijst;
+# die worden pas gepolished als hun pagina getoond wordt (zie werk_thema_bij).
+# Pagina's die nog niet gebouwd zijn krijgen het juiste thema vanzelf bij hun eerste polish.
+
+def _polish(widget):
+    stijl_van_widget = widget.style()
+    stijl_van_widget.unpolish(widget)
+    stijl_van_widget.polish(widget)
+    widget.update()
+
+
+def _heeft_thema_regels(widget):
+    return widget.property("rol") is not None or widget.metaObject().className() == "QLabel"
+
+
+def zet_thema(venster, naam):
+    if naam not in THEMAS:
+        raise ValueError(f"Onbekend thema: {naam}")
+    if venster.property("thema") == naam:
+        return 0
+
+    venster.setProperty("thema", naam)
+    _polish(venster)
+
+    achterstand = []
+    aantal = 1
+    for widget in venster.findChildren(QWidget):
+        if not _heeft_thema_regels(widget):
+            continue
+        if widget.isVisible():
+            _polish(widget)
+            aantal += 1
+        else:
+            achterstand.append(widget)
+    venster._thema_achterstand = achterstand
+    return aantal
+
+
+# Polisht de widgets van een pagina die bij de laatste themawissel verborgen waren
+
+def werk_thema_bij(venster, pagina):
+    achterstand = getattr(venster, "_thema_achterstand", None)
+    if not achterstand:
+        return 0
+    bij = [w for w in achterstand if w is pagina or pagina.isAncestorOf(w)]
+    if not bij:
+        return 0
+    for widget in bij:
+        _polish(widget)
+    venster._thema_achterstand = [w for w in achterstand if not (w is pagina or pagina.isAncestorOf(w))]
+    return len(bij)
+
+
+# Gaat naar het volgende thema in THEMAS (handig voor een sneltoets op de kiosk)
+
+def volgend_thema(venster):
+    namen = list(THEMAS)
+    index = namen.index(huidig_thema(venster)) if huidig_thema(venster) in namen else -1
+    naam = namen[(index + 1) % len(namen)]
+    zet_thema(venster, naam)
+    return naam
@@ -86,4 +86,249 @@ CREATE TABLE `Feedback` (
   FOREIGN KEY `fk_feedback_qr_code` (`qr_code`) REFERENCES `QRCode` (`qr_id`) ON UPDATE CASCADE ON DELETE RESTRICT,
   FOREIGN KEY `fk_feedback_trein_van` (`van_locatie_id`) REFERENCES `Locatie` (`locatie_id`) ON UPDATE CASCADE ON DELETE RESTRICT,
   FOREIGN KEY `fk_feedback_trein_naar` (`naar_locatie_id`) REFERENCES `Locatie` (`locatie_id`) ON UPDATE CASCADE ON DELETE RESTRICT
-);
\ No newline at end of file
+);
+
+-- ========================================
+-- Indexen en bezettingstellers
+-- ========================================
+
+-- Reis groeit de hele dag: tellen per trein/locatie moet via een index en niet via een table scan
+CREATE INDEX `idx_reis_trein_ingecheckt` ON `Reis` (`trein_id`, `ingecheckt`);
+CREATE INDEX `idx_reis_locatie` ON `Reis` (`locatie_id`);
+
+-- QR-scans bij de poorten zoeken een code op via data (en alleen codes van die dag zijn geldig);
+-- laden per dag gaat via datum
+CREATE INDEX `idx_qrcode_data` ON `QRCode` (`data`, `datum`);
+CREATE INDEX `idx_qrcode_datum` ON `QRCode` (`datum`);
+
+-- Tabel: TreinBezetting (aantal mensen dat nu in de trein is ingecheckt)
+CREATE TABLE `TreinBezetting` (
+  `trein_id` INT NOT NULL,
+  `aanwezig` INT NOT NULL DEFAULT 0,
+
+  PRIMARY KEY (`trein_id`),
+  FOREIGN KEY `fk_treinbezetting_trein` (`trein_id`) REFERENCES `Trein` (`trein_id`) ON UPDATE CASCADE ON DELETE CASCADE
+);
+
+-- Tabel: LocatieBezetting (aantal mensen dat nu bij de locatie is ingecheckt)
+CREATE TABLE `LocatieBezetting` (
+  `locatie_id` INT NOT NULL,
+  `aanwezig` INT NOT NULL DEFAULT 0,
+
+  PRIMARY KEY (`locatie_id`),
+  FOREIGN KEY `fk_locatiebezetting_locatie` (`locatie_id`) REFERENCES `Locatie` (`locatie_id`) ON UPDATE CASCADE ON DELETE CASCADE
+);
+
+-- Tabel: OpenReis (open check-in per QR-code: waar de bezoeker nu is ingecheckt)
+-- Een check-out telt af bij de plek van de check-in, niet bij de plek waar uitgecheckt wordt
+-- (uitstappen gebeurt bij een andere halte dan instappen).
+CREATE TABLE `OpenReis` (
+  `qr_id` INT NOT NULL,
+  `reis_check_id` INT NOT NULL,
+  `trein_id` INT NULL,
+  `locatie_id` INT NOT NULL,
+
+  PRIMARY KEY (`qr_id`),
+  FOREIGN KEY `fk_openreis_qr_code` (`qr_id`) REFERENCES `QRCode` (`qr_id`) ON UPDATE CASCADE ON DELETE CASCADE
+);
+
+-- Elke scan sluit eerst de open check-in van die QR-code af (één af bij die trein en locatie).
+-- Een check-in (ingecheckt = 1) wordt daarna de nieuwe open check-in en telt één op.
+-- Een check-out zonder open check-in telt niets af.
+DELIMITER //
+CREATE TRIGGER `trg_reis_bezetting_insert` AFTER INSERT ON `Reis`
+FOR EACH ROW
+BEGIN
+  DECLARE open_trein INT DEFAULT NULL;
+  DECLARE open_locatie INT DEFAULT NULL;
+  SET open_trein = (SELECT `trein_id` FROM `OpenReis` WHERE `qr_id` = NEW.`qr_id`);
+  SET open_locatie = (SELECT `locatie_id` FROM `OpenReis` WHERE `qr_id` = NEW.`qr_id`);
+  IF open_locatie IS NOT NULL THEN
+    UPDATE `TreinBezetting` SET `aanwezig` = `aanwezig` - 1 WHERE `trein_id` = open_trein;
+    UPDATE `LocatieBezetting` SET `aanwezig` = `aanwezig` - 1 WHERE `locatie_id` = open_locatie;
+    DELETE FROM `OpenReis` WHERE `qr_id` = NEW.`qr_id`;
+  END IF;
+  IF NEW.`ingecheckt` THEN
+    INSERT INTO `OpenReis` (`qr_id`, `reis_check_id`, `trein_id`, `locatie_id`)
+      VALUES (NEW.`qr_id`, NEW.`reis_check_id`, NEW.`trein_id`, NEW.`locatie_id`);
+    IF NEW.`trein_id` IS NOT NULL THEN
+      INSERT INTO `TreinBezetting` (`trein_id`, `aanwezig`) VALUES (NEW.`trein_id`, 1)
+        ON DUPLICATE KEY UPDATE `aanwezig` = `aanwezig` + 1;
+    END IF;
+    INSERT INTO `LocatieBezetting` (`locatie_id`, `aanwezig`) VALUES (NEW.`locatie_id`, 1)
+      ON DUPLICATE KEY UPDATE `aanwezig` = `aanwezig` + 1;
+  END IF;
+END //
+
+-- Alleen het verwijderen van de open check-in verandert de tellers; voor oudere rijen is de
+-- bezetting al door een latere scan bijgewerkt (Bezetting.herbereken zet alles weer recht)
+CREATE TRIGGER `trg_reis_bezetting_delete` AFTER DELETE ON `Reis`
+FOR EACH ROW
+BEGIN
+  DECLARE open_trein INT DEFAULT NULL;
+  DECLARE open_locatie INT DEFAULT NULL;
+  SET open_trein = (SELECT `trein_id` FROM `OpenReis` WHERE `qr_id` = OLD.`qr_id` AND `reis_check_id` = OLD.`reis_check_id`);
+  SET open_locatie = (SELECT `locatie_id` FROM `OpenReis` WHERE `qr_id` = OLD.`qr_id` AND `reis_check_id` = OLD.`reis_check_id`);
+  IF open_locatie IS NOT NULL THEN
+    UPDATE `TreinBezetting` SET `aanwezig` = `aanwezig` - 1 WHERE `trein_id` = open_trein;
+    UPDATE `LocatieBezetting` SET `aanwezig` = `aanwezig` - 1 WHERE `locatie_id` = open_locatie;
+    DELETE FROM `OpenReis` WHERE `qr_id` = OLD.`qr_id`;
+  END IF;
+END //
+DELIMITER ;
+
+
+-- ========================================
+-- Idempotente check-ins
+-- ========================================
+
+-- Elke scan van een poort krijgt een unieke scan_id. Wordt een batch opnieuw verstuurd,
+-- dan worden scans die al in Reis staan overgeslagen (INSERT IGNORE).
+ALTER TABLE `Reis` ADD COLUMN `scan_id` VARCHAR(64) NULL, ADD UNIQUE KEY `uq_reis_scan` (`scan_id`);
+
+
+-- ========================================
+-- Reserveringen per spoorsegment
+-- ========================================
+
+-- Een reservering geldt van halte van_halte tot halte naar_halte (volgorde op de route).
+-- NULL betekent de hele rit.
+ALTER TABLE `Reservering` ADD COLUMN `van_halte` INT NULL, ADD COLUMN `naar_halte` INT NULL;
+
+-- Tabel: ReserveringVersie (versienummer per trein voor optimistische concurrency)
+CREATE TABLE `ReserveringVersie` (
+  `trein_id` INT NOT NULL,
+  `versie` INT NOT NULL DEFAULT 0,
+
+  PRIMARY KEY (`trein_id`),
+  FOREIGN KEY `fk_reserveringversie_trein` (`trein_id`) REFERENCES `Trein` (`trein_id`) ON UPDATE CASCADE ON DELETE CASCADE
+);
+
+
+-- ========================================
+-- Wijzigingslog voor de delta-sync van de kiosks
+-- ========================================
+
+-- Elke insert/update/delete op Locatie, Trein of Reservering krijgt een oplopend wijziging_id.
+-- Een kiosk onthoudt het laatste id dat hij gezien heeft en haalt alleen de rijen op die daarna veranderd zijn.
+-- sleutel is locatie_id (Locatie) of trein_id (Trein en Reservering: de reserveringen worden per trein ververst).
+CREATE TABLE `Wijziging` (
+  `wijziging_id` BIGINT NOT NULL AUTO_INCREMENT,
+  `tabel` VARCHAR(32) NOT NULL,
+  `sleutel` INT NOT NULL,
+
+  PRIMARY KEY (`wijziging_id`)
+);
+
+DELIMITER //
+CREATE TRIGGER `trg_locatie_wijziging_insert` AFTER INSERT ON `Locatie`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `Wijziging` (`tabel`, `sleutel`) VALUES ('Locatie', NEW.`locatie_id`);
+END //
+
+CREATE TRIGGER `trg_locatie_wijziging_update` AFTER UPDATE ON `Locatie`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `Wijziging` (`tabel`, `sleutel`) VALUES ('Locatie', NEW.`locatie_id`);
+END //
+
+CREATE TRIGGER `trg_locatie_wijziging_delete` AFTER DELETE ON `Locatie`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `Wijziging` (`tabel`, `sleutel`) VALUES ('Locatie', OLD.`locatie_id`);
+END //
+
+CREATE TRIGGER `trg_trein_wijziging_insert` AFTER INSERT ON `Trein`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `Wijziging` (`tabel`, `sleutel`) VALUES ('Trein', NEW.`trein_id`);
+END //
+
+CREATE TRIGGER `trg_trein_wijziging_update` AFTER UPDATE ON `Trein`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `Wijziging` (`tabel`, `sleutel`) VALUES ('Trein', NEW.`trein_id`);
+END //
+
+CREATE TRIGGER `trg_trein_wijziging_delete` AFTER DELETE ON `Trein`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `Wijziging` (`tabel`, `sleutel`) VALUES ('Trein', OLD.`trein_id`);
+END //
+
+CREATE TRIGGER `trg_reservering_wijziging_insert` AFTER INSERT ON `Reservering`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `Wijziging` (`tabel`, `sleutel`) VALUES ('Reservering', NEW.`trein_id`);
+END //
+
+CREATE TRIGGER `trg_reservering_wijziging_update` AFTER UPDATE ON `Reservering`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `Wijziging` (`tabel`, `sleutel`) VALUES ('Reservering', OLD.`trein_id`), ('Reservering', NEW.`trein_id`);
+END //
+
+CREATE TRIGGER `trg_reservering_wijziging_delete` AFTER DELETE ON `Reservering`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `Wijziging` (`tabel`, `sleutel`) VALUES ('Reservering', OLD.`trein_id`);
+END //
+DELIMITER ;
+
+
+-- ========================================
+-- Bezoekvolgorde
+-- ========================================
+
+-- De volgorde waarin de attracties van een reisplan het snelst bezocht worden (1 = eerst), zie planning/bezoekvolgorde.py.
+ALTER TABLE `Reisplan` ADD COLUMN `volgorde` INT NULL;
+
+
+-- ========================================
+-- Rollups van de feedback
+-- ========================================
+
+-- Per route en per uur het aantal ratings per ratingwaarde. Daaruit volgen aantal, som, gemiddelde en kwantielen,
+-- zonder elke keer over de hele Feedback tabel te groeperen.
+CREATE TABLE `FeedbackRoute` (
+  `van_locatie_id` INT NOT NULL,
+  `naar_locatie_id` INT NOT NULL,
+  `rating` INT NOT NULL,
+  `aantal` INT NOT NULL DEFAULT 0,
+
+  PRIMARY KEY (`van_locatie_id`, `naar_locatie_id`, `rating`),
+  FOREIGN KEY `fk_feedbackroute_van` (`van_locatie_id`) REFERENCES `Locatie` (`locatie_id`) ON UPDATE CASCADE ON DELETE CASCADE,
+  FOREIGN KEY `fk_feedbackroute_naar` (`naar_locatie_id`) REFERENCES `Locatie` (`locatie_id`) ON UPDATE CASCADE ON DELETE CASCADE
+);
+
+-- Tabel: FeedbackUur (uur is 'YYYY-MM-DD HH:00')
+CREATE TABLE `FeedbackUur` (
+  `uur` CHAR(16) NOT NULL,
+  `rating` INT NOT NULL,
+  `aantal` INT NOT NULL DEFAULT 0,
+
+  PRIMARY KEY (`uur`, `rating`)
+);
+
+DELIMITER //
+CREATE TRIGGER `trg_feedback_rollup_insert` AFTER INSERT ON `Feedback`
+FOR EACH ROW
+BEGIN
+  INSERT INTO `FeedbackRoute` (`van_locatie_id`, `naar_locatie_id`, `rating`, `aantal`)
+    VALUES (NEW.`van_locatie_id`, NEW.`naar_locatie_id`, NEW.`rating`, 1)
+    ON DUPLICATE KEY UPDATE `aantal` = `aantal` + 1;
+  INSERT INTO `FeedbackUur` (`uur`, `rating`, `aantal`)
+    VALUES (DATE_FORMAT(NEW.`verzonden_op`, '%Y-%m-%d %H:00'), NEW.`rating`, 1)
+    ON DUPLICATE KEY UPDATE `aantal` = `aantal` + 1;
+END //
+
+CREATE TRIGGER `trg_feedback_rollup_delete` AFTER DELETE ON `Feedback`
+FOR EACH ROW
+BEGIN
+  UPDATE `FeedbackRoute` SET `aantal` = `aantal` - 1
+    WHERE `van_locatie_id` = OLD.`van_locatie_id` AND `naar_locatie_id` = OLD.`naar_locatie_id` AND `rating` = OLD.`rating`;
+  UPDATE `FeedbackUur` SET `aantal` = `aantal` - 1
+    WHERE `uur` = DATE_FORMAT(OLD.`verzonden_op`, '%Y-%m-%d %H:00') AND `rating` = OLD.`rating`;
+END //
+DELIMITER ;